@@ -11,9 +11,11 @@ from aeneas.analyzecontainer import AnalyzeContainer
 from aeneas.audiofile import AudioFile
 from aeneas.container import Container, ContainerFormat
 from aeneas.dtw import DTWAlgorithm, DTWAligner
+from aeneas.espeaklibrary import ESPEAKLibrary
 from aeneas.espeakwrapper import ESPEAKWrapper
 from aeneas.executejob import ExecuteJob
 from aeneas.executetask import ExecuteTask
+from aeneas.featurestore import FeatureStore
 from aeneas.ffmpegwrapper import FFMPEGWrapper
 from aeneas.ffprobewrapper import FFPROBEWrapper
 import aeneas.globalconstants as gc
@@ -23,6 +25,10 @@ from aeneas.idsortingalgorithm import IDSortingAlgorithm
 from aeneas.job import Job, JobConfiguration
 from aeneas.language import Language
 from aeneas.logger import Logger
+from aeneas.mfcccache import MFCCCache
+from aeneas.mfccfeatures import MFCCFeatures
+from aeneas.mfccstream import MFCCStream
+from aeneas.precision import Precision
 from aeneas.sd import SD, SDMetric
 from aeneas.syncmap import SyncMap, SyncMapFragment, SyncMapFormat, SyncMapHeadTailFormat
 from aeneas.synthesizer import Synthesizer
@@ -5,7 +5,9 @@
 A class representing an audio file.
 """
 
+import numpy
 import os
+import struct
 from scikits.audiolab import wavread
 from scikits.audiolab import wavwrite
 
@@ -13,7 +15,9 @@ import aeneas.globalconstants as gc
 import aeneas.globalfunctions as gf
 from aeneas.ffprobewrapper import FFPROBEWrapper
 from aeneas.logger import Logger
-from aeneas.mfcc import MFCC
+from aeneas.mfcccache import MFCCCache
+from aeneas.mfccfeatures import MFCCFeatures
+from aeneas.mfccstream import MFCCStream
 
 __author__ = "Alberto Pettarin"
 __copyright__ = """
@@ -26,6 +30,81 @@ __version__ = "1.2.0"
 __email__ = "aeneas@readbeyond.it"
 __status__ = "Production"
 
+def read_wav(file_path):
+    """
+    Read the WAVE file at ``file_path``,
+    parsing its RIFF header and memory-mapping its PCM payload,
+    without decoding it.
+
+    Return a triple, as ``scikits.audiolab.wavread`` does,
+    except that the samples are not converted to floating point:
+
+    1. the samples, as a read-only ``numpy.memmap`` of int16,
+       with shape ``(n,)`` for mono files,
+       and ``(n, channels)`` otherwise
+    2. the sample rate
+    3. the encoding (``pcm16``)
+
+    Only 16 bit PCM files are supported:
+    for any other file, ``ValueError`` is raised.
+
+    :param file_path: the path of the WAVE file
+    :type  file_path: string (path)
+    :rtype: tuple
+
+    .. versionadded:: 1.3.0
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as wav_file:
+        header = wav_file.read(12)
+        if (len(header) < 12) or (header[0:4] != b"RIFF") or (header[8:12] != b"WAVE"):
+            raise ValueError("Not a RIFF WAVE file")
+        channels = None
+        sample_rate = None
+        while True:
+            chunk_header = wav_file.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError("No data chunk found")
+            chunk_id = chunk_header[0:4]
+            chunk_size = struct.unpack("<I", chunk_header[4:8])[0]
+            if chunk_id == b"fmt ":
+                fmt = wav_file.read(chunk_size)
+                if len(fmt) < 16:
+                    raise ValueError("Malformed fmt chunk")
+                audio_format, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", fmt[0:16])
+                # WAVE_FORMAT_EXTENSIBLE stores the actual format
+                # in the first two bytes of the subformat GUID
+                if (audio_format == 0xFFFE) and (len(fmt) >= 26):
+                    audio_format = struct.unpack("<H", fmt[24:26])[0]
+                if (audio_format != 1) or (bits != 16) or (channels < 1):
+                    raise ValueError("Only 16 bit PCM files are supported")
+                if chunk_size % 2 == 1:
+                    wav_file.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError("No fmt chunk before the data chunk")
+                offset = wav_file.tell()
+                # streamed files (e.g., written by ffmpeg to a pipe)
+                # might not have the actual size of the data chunk
+                data_size = min(chunk_size, file_size - offset)
+                break
+            else:
+                wav_file.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+    number_of_samples = data_size // (2 * channels)
+    if number_of_samples == 0:
+        samples = numpy.zeros(0, dtype="<i2")
+    else:
+        samples = numpy.memmap(
+            file_path,
+            dtype="<i2",
+            mode="r",
+            offset=offset,
+            shape=(number_of_samples * channels,)
+        )
+    if channels > 1:
+        samples = samples.reshape((number_of_samples, channels))
+    return (samples, sample_rate, "pcm16")
+
 class AudioFile(object):
     """
     A class representing an audio file.
@@ -40,27 +119,43 @@ class AudioFile(object):
 
     If the file is a monoaural WAVE file,
     its data can be read and MFCCs can be extracted.
+    The samples of 16 bit PCM files are memory-mapped
+    (see :func:`aeneas.audiofile.read_wav`),
+    and converted to floating point only when accessed.
+    Trimming the data only restricts the window
+    over the loaded samples that the other functions read.
 
     :param file_path: the path to the audio file
     :type  file_path: string (path)
     :param logger: the logger object
     :type  logger: :class:`aeneas.logger.Logger`
+    :param precision: the floating point precision of the audio data
+                      and of the MFCCs. If ``None``, use
+                      :class:`aeneas.globalconstants.PRECISION`
+    :type  precision: string (from :class:`aeneas.precision.Precision` enumeration)
+
+    .. versionadded:: 1.3.0
+       The ``precision`` parameter.
     """
 
     TAG = "AudioFile"
 
-    def __init__(self, file_path, logger=None):
+    def __init__(self, file_path, logger=None, precision=None):
         self.logger = logger
         if self.logger is None:
             self.logger = Logger()
+        self.precision = precision
+        if self.precision is None:
+            self.precision = gc.PRECISION
         self.file_path = file_path
         self.file_size = None
-        self.audio_data = None
+        self.__samples = None
+        self.__window = None
         self.audio_length = None
         self.audio_format = None
         self.audio_sample_rate = None
         self.audio_channels = None
-        self.audio_mfcc = None
+        self.audio_features = None
 
     def _log(self, message, severity=Logger.DEBUG):
         """ Log """
@@ -76,6 +171,20 @@ class AudioFile(object):
         accumulator += "Audio channels:    %s" % gf.safe_int(self.audio_channels)
         return accumulator
 
+    @property
+    def precision(self):
+        """
+        The floating point precision of the audio data and of the MFCCs.
+
+        .. versionadded:: 1.3.0
+
+        :rtype: string (from :class:`aeneas.precision.Precision` enumeration)
+        """
+        return self.__precision
+    @precision.setter
+    def precision(self, precision):
+        self.__precision = precision
+
     @property
     def file_path(self):
         """
@@ -100,6 +209,53 @@ class AudioFile(object):
     def file_size(self, file_size):
         self.__file_size = file_size
 
+    @property
+    def audio_data(self):
+        """
+        The audio samples inside the current window,
+        or ``None`` if the audio data is not loaded.
+
+        If the sample buffer holds 16 bit samples,
+        only the samples inside the window are converted
+        to floating point, with the precision of this audio file,
+        every time this property is read.
+        Otherwise, a view of the sample buffer is returned.
+
+        Setting this property replaces the sample buffer
+        and resets the window to the whole buffer.
+
+        .. versionchanged:: 1.3.0
+           The returned array is restricted to the window
+           set by :func:`aeneas.audiofile.AudioFile.trim`.
+
+        :rtype: numpy 1D array
+        """
+        if self.__samples is None:
+            return None
+        samples = self.__samples[self.__window[0]:self.__window[1]]
+        if samples.dtype == numpy.int16:
+            return numpy.multiply(samples, 1.0 / 32768, dtype=self.precision)
+        return samples
+    @audio_data.setter
+    def audio_data(self, audio_data):
+        self.__samples = audio_data
+        self.__window = None
+        if audio_data is not None:
+            self.__window = (0, len(audio_data))
+
+    @property
+    def audio_window(self):
+        """
+        The window over the sample buffer,
+        as a ``(begin, end)`` pair of sample indices,
+        or ``None`` if the audio data is not loaded.
+
+        .. versionadded:: 1.3.0
+
+        :rtype: tuple of int
+        """
+        return self.__window
+
     @property
     def audio_length(self):
         """
@@ -151,15 +307,38 @@ class AudioFile(object):
     @property
     def audio_mfcc(self):
         """
-        The MFCCs of the audio file.
+        The MFCCs of the audio file,
+        one frame per column (``l x n``),
+        as a transposed view of :data:`audio_features`.
 
         :rtype: numpy 2D array
         """
-        return self.__audio_mfcc
+        if self.audio_features is None:
+            return None
+        return self.audio_features.mfcc
 
     @audio_mfcc.setter
     def audio_mfcc(self, audio_mfcc):
-        self.__audio_mfcc = audio_mfcc
+        if audio_mfcc is None:
+            self.audio_features = None
+        else:
+            self.audio_features = MFCCFeatures.from_mfcc(audio_mfcc)
+
+    @property
+    def audio_features(self):
+        """
+        The MFCCs of the audio file,
+        stored frame-major.
+
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+
+        .. versionadded:: 1.3.0
+        """
+        return self.__audio_features
+
+    @audio_features.setter
+    def audio_features(self, audio_features):
+        self.__audio_features = audio_features
 
     def read_properties(self):
         """
@@ -217,14 +396,50 @@ class AudioFile(object):
             raise OSError("File cannot be read")
 
         self._log("Loading wav file...")
-        self.audio_data, self.audio_sample_rate, self.audio_format = wavread(self.file_path)
-        self.audio_length = (float(len(self.audio_data)) / self.audio_sample_rate)
+        try:
+            self.audio_data, self.audio_sample_rate, self.audio_format = read_wav(self.file_path)
+            self._log("Memory-mapped 16 bit samples")
+        except ValueError as e:
+            self._log(["Cannot memory-map the samples (%s), calling wavread", e])
+            self.audio_data, self.audio_sample_rate, self.audio_format = wavread(self.file_path)
+            self.audio_data = numpy.asarray(self.audio_data, dtype=self.precision)
+        self.audio_length = (float(len(self.__samples)) / self.audio_sample_rate)
         self._log(["Sample length: %f", self.audio_length])
         self._log(["Sample rate:   %f", self.audio_sample_rate])
         self._log(["Audio format:  %s", self.audio_format])
+        self._log(["Precision:     %s", self.precision])
         self._log("Loading wav file... done")
 
-    def extract_mfcc(self, frame_rate=gc.MFCC_FRAME_RATE):
+    def load_samples(self, samples, sample_rate):
+        """
+        Load the given 16 bit samples as the audio data,
+        for example those decoded by
+        :func:`aeneas.ffmpegwrapper.FFMPEGWrapper.decode`,
+        without reading any file.
+
+        The samples are kept as they are,
+        and scaled to ``[-1.0, 1.0)``
+        when :data:`aeneas.audiofile.AudioFile.audio_data` is read,
+        as done when loading a wav file.
+
+        :param samples: the mono 16 bit samples
+        :type  samples: numpy 1D array of int16
+        :param sample_rate: the sample rate of the samples
+        :type  sample_rate: int
+
+        .. versionadded:: 1.3.0
+        """
+        self._log("Loading samples...")
+        self.audio_data = samples
+        self.audio_sample_rate = sample_rate
+        self.audio_format = "pcm16"
+        self.audio_length = (float(len(samples)) / self.audio_sample_rate)
+        self._log(["Sample length: %f", self.audio_length])
+        self._log(["Sample rate:   %f", self.audio_sample_rate])
+        self._log(["Precision:     %s", self.precision])
+        self._log("Loading samples... done")
+
+    def extract_mfcc(self, frame_rate=gc.MFCC_FRAME_RATE, use_cache=False):
         """
         Extract MFCCs from the given audio file.
 
@@ -233,44 +448,78 @@ class AudioFile(object):
 
         This function works only for mono wav files!
 
+        The MFCCs are stored with the precision of this audio file.
+
+        The samples inside the window are converted and processed
+        in blocks of :class:`aeneas.globalconstants.MFCC_BLOCK_LENGTH` seconds,
+        by :class:`aeneas.mfccstream.MFCCStream`,
+        so that the memory used does not depend on the length of the audio data.
+
+        If ``use_cache`` is ``True`` and the on-disk MFCC cache is enabled
+        (see :class:`aeneas.globalconstants.MFCC_CACHE_PATH`),
+        the MFCCs of the samples inside the window are looked up there first,
+        and stored there after being extracted.
+        Use it only for audio files that might be processed again,
+        not for short-lived audio (e.g., synthesized waves),
+        whose entries would just evict the useful ones.
+
         :param frame_rate: the MFCC frame rate, in frames per second. Default:
                            :class:`aeneas.globalconstants.MFCC_FRAME_RATE`
         :type  frame_rate: int
+        :param use_cache: if ``True``, use the on-disk MFCC cache, if enabled
+        :type  use_cache: bool
+
+        .. versionchanged:: 1.3.0
+           The MFCCs are extracted block by block,
+           and they can be cached on disk.
         """
         # remember if we have audio data
-        had_audio_data = (self.audio_data is not None)
+        had_audio_data = (self.audio_window is not None)
         if not had_audio_data:
             self.load_data()
 
-        if gc.USE_C_EXTENSIONS:
-            self._log("C extensions enabled in gc")
-            if gf.can_run_c_extension("cmfcc"):
-                self._log("C extensions enabled in gc and cmfcc can be loaded")
-                try:
-                    self._compute_mfcc_c_extension(frame_rate)
-                    if not had_audio_data:
-                        self.clear_data()
-                    return
-                except:
-                    self._log(
-                        "An error occurred running cmfcc",
-                        severity=Logger.WARNING
-                    )
-            else:
-                self._log("C extensions enabled in gc, but cmfcc cannot be loaded")
+        cache = MFCCCache(logger=self.logger)
+        key = None
+        cached = None
+        if use_cache and cache.enabled:
+            key = cache.samples_key(
+                self.__samples[self.__window[0]:self.__window[1]],
+                MFCCCache.mfcc_parameters(self.audio_sample_rate, frame_rate, self.precision)
+            )
+            cached = cache.get(key)
+        if cached is not None:
+            self._log("Using cached MFCCs")
+            self.audio_features = cached[0]
         else:
-            self._log("C extensions disabled in gc")
-        self._log("Running the pure Python code")
-        try:
-            self._compute_mfcc_pure_python(frame_rate)
-        except:
-            self._log(
-                "An error occurred running _compute_mfcc_pure_python",
-                severity=Logger.WARNING
+            stream = MFCCStream(
+                self.audio_sample_rate,
+                frame_rate=frame_rate,
+                precision=self.precision,
+                logger=self.logger
             )
+            try:
+                self.audio_features = stream.extract(self._audio_data_blocks())
+                if key is not None:
+                    cache.put(key, self.audio_features, self.audio_length)
+            except:
+                self._log(
+                    "An error occurred extracting MFCCs",
+                    severity=Logger.WARNING
+                )
         if not had_audio_data:
             self.clear_data()
 
+    def _audio_data_blocks(self):
+        """
+        Yield the samples inside the window,
+        in blocks of :class:`aeneas.globalconstants.MFCC_BLOCK_LENGTH` seconds,
+        without converting them.
+        """
+        block_length = max(int(gc.MFCC_BLOCK_LENGTH * self.audio_sample_rate), 1)
+        window_begin, window_end = self.__window
+        for begin in range(window_begin, window_end, block_length):
+            yield self.__samples[begin:min(begin + block_length, window_end)]
+
     def reverse(self):
         """
         Reverse the audio data.
@@ -281,32 +530,42 @@ class AudioFile(object):
 
         .. versionadded:: 1.2.0
         """
-        if self.audio_data is None:
+        if self.audio_window is None:
             self._log("No audio data: loading it")
             self.load_data()
         self._log("Reversing audio data...")
-        self.audio_data = self.audio_data[::-1]
+        self.audio_data = self.__samples[self.__window[0]:self.__window[1]][::-1]
         self._log("Reversing audio data... done")
 
     def trim(self, begin=None, length=None):
         """
-        Get a slice of the audio data of ``length`` seconds,
+        Restrict the audio data to ``length`` seconds,
         starting from ``begin`` seconds.
 
-        If audio data is not loaded, load it and then slice it.
+        Only the window over the sample buffer is moved,
+        so no sample is copied and
+        :data:`aeneas.audiofile.AudioFile.audio_data`
+        and the MFCCs extracted afterwards
+        see the trimmed audio data only.
+        Calling this function again trims the current window further.
+
+        If audio data is not loaded, load it and then trim it.
 
         This function works only for mono wav files!
 
         :param begin: the start position, in seconds
         :type  begin: float
-        :param length: the  position, in seconds
+        :param length: the length, in seconds
         :type  length: float
+
+        .. versionchanged:: 1.3.0
+           The sample buffer is not sliced, only its window is set.
         """
         if (begin is None) and (length is None):
             # nothing to do
             return
 
-        if self.audio_data is None:
+        if self.audio_window is None:
             self._log("No audio data: loading it")
             self.load_data()
 
@@ -322,10 +581,12 @@ class AudioFile(object):
             self._log(["length was None, now set to %.3f", length])
         length = min(max(0, length), self.audio_length - begin)
         self._log(["length is %.3f", length])
-        begin_index = int(begin * self.audio_sample_rate)
-        end_index = int((begin + length) * self.audio_sample_rate)
-        self.audio_data = self.audio_data[begin_index:end_index]
-        self.audio_length = (float(len(self.audio_data)) / self.audio_sample_rate)
+        window_begin, window_end = self.__window
+        begin_index = min(window_begin + int(begin * self.audio_sample_rate), window_end)
+        end_index = min(window_begin + int((begin + length) * self.audio_sample_rate), window_end)
+        self.__window = (begin_index, end_index)
+        self._log(["Window: %d %d", begin_index, end_index])
+        self.audio_length = (float(end_index - begin_index) / self.audio_sample_rate)
 
     def write(self, file_path):
         """
@@ -351,39 +612,10 @@ class AudioFile(object):
     def clear_data(self):
         """
         Clear the audio data, freeing memory.
+
+        The window over the sample buffer is cleared as well.
         """
         self.audio_data = None
 
-    def _compute_mfcc_c_extension(self, frame_rate):
-        """
-        Compute MFCCs using the Python C extension cmfcc.
-        """
-        self._log("Computing MFCCs using C extension...")
-        self._log("Importing cmfcc...")
-        import aeneas.cmfcc
-        self._log("Importing cmfcc... done")
-        self.audio_mfcc = aeneas.cmfcc.cmfcc_compute_mfcc(
-            self.audio_data,
-            self.audio_sample_rate,
-            frame_rate,
-            40,
-            13,
-            512,
-            133.3333,
-            6855.4976,
-            0.97,
-            0.0256
-        ).transpose()
-        self._log("Computing MFCCs using C extension... done")
-
-    def _compute_mfcc_pure_python(self, frame_rate):
-        """
-        Compute MFCCs using the pure Python code.
-        """
-        self._log("Computing MFCCs using pure Python code...")
-        extractor = MFCC(samprate=self.audio_sample_rate, frate=frame_rate)
-        self.audio_mfcc = extractor.sig2s2mfc(self.audio_data).transpose()
-        self._log("Computing MFCCs using pure Python code... done")
-
 
 
@@ -20,6 +20,16 @@ __status__ = "Production"
 #include <math.h>
 #include <numpy/npy_math.h>
 
+// on POSIX systems, the rows of the cost matrix can be computed by multiple threads
+#ifndef _WIN32
+#include <pthread.h>
+#define CDTW_USE_THREADS
+#endif
+
+// number of rows of the cost matrix computed by each thread
+// before the fused kernel accumulates them
+#define COST_BLOCK_ROWS_PER_THREAD 16
+
 // return the max of the given arguments
 static int _max(int a, int b) {
     if (a > b) {
@@ -28,6 +38,14 @@ static int _max(int a, int b) {
     return b;
 }
 
+// return the min of the given arguments
+static int _min(int a, int b) {
+    if (a < b) {
+        return a;
+    }
+    return b;
+}
+
 // return the argmin of the three arguments
 static int _three_way_argmin(double cost0, double cost1, double cost2) {
     if ((cost0 <= cost1) && (cost0 <= cost2)) {
@@ -50,34 +68,59 @@ static double _three_way_min(double cost0, double cost1, double cost2) {
     return cost2;
 }
 
-// append a new tuple (i, j) to the given list
-static void _append(PyObject *list, int i, int j) {
-    PyObject *tuple;
-    
-    tuple = PyTuple_New(2);
-    // PyTuple_SetItem steals a reference, so no PyDECREF is needed
-    PyTuple_SetItem(tuple, 0, Py_BuildValue("i", i));
-    PyTuple_SetItem(tuple, 1, Py_BuildValue("i", j));
-    PyList_Append(list, tuple);
+// append the pair (i, j) to the given path, stored as a flat array of int
+static void _append(int *path_ptr, int *path_length_ptr, int i, int j) {
+    path_ptr[2 * (*path_length_ptr)] = i;
+    path_ptr[2 * (*path_length_ptr) + 1] = j;
+    (*path_length_ptr)++;
 }
 
-// compute cost matrix from mfcc? and norm2_?
-static void _compute_cost_matrix(
-        double *mfcc1_ptr,          // pointer to the MFCCs of the first wave (2D, l x n)
-        double *mfcc2_ptr,          // pointer to the MFCCs of the second wave (2D, l x m)
-        double *norm2_1_ptr,        // pointer to the norm2 of the first wave (1D, n)
-        double *norm2_2_ptr,        // pointer to the norm2 of the second wave (1D, m)
-        int delta,                  // margin parameter
-        double *cost_matrix_ptr,    // pointer to the cost matrix (2D, n x delta)
-        int *centers_ptr,           // pointer to the centers (1D, n); centers[i] = center for the i-th row; delta/2 <= centers[i] < m - delta/2
+// create a 2D array (path_length x 2) of int32 containing the given path,
+// which is stored from the last pair to the first one, in reverse order,
+// so that the returned array goes from (0, 0) to (n-1, m-1)
+static PyObject *_create_best_path(int *path_ptr, int path_length) {
+    PyArrayObject *best_path;
+    npy_intp best_path_dimensions[2];
+    int *best_path_ptr;
+    int k;
+
+    best_path_dimensions[0] = path_length;
+    best_path_dimensions[1] = 2;
+    best_path = (PyArrayObject *)PyArray_SimpleNew(2, best_path_dimensions, PyArray_INT32);
+    if (best_path == NULL) {
+        return NULL;
+    }
+    best_path_ptr = (int *)best_path->data;
+    for (k = 0; k < path_length; ++k) {
+        best_path_ptr[2 * k] = path_ptr[2 * (path_length - 1 - k)];
+        best_path_ptr[2 * k + 1] = path_ptr[2 * (path_length - 1 - k) + 1];
+    }
+    return PyArray_Return(best_path);
+}
+
+// store the given move (0, 1, or 2) for the cell with the given index
+// into the moves matrix, which packs four 2-bit moves per byte
+static void _set_move(unsigned char *moves_ptr, size_t index, int move) {
+    moves_ptr[index >> 2] |= (unsigned char)(move << ((index & 3) << 1));
+}
+
+// read the move (0, 1, or 2) for the cell with the given index
+// from the moves matrix, which packs four 2-bit moves per byte
+static int _get_move(unsigned char *moves_ptr, size_t index) {
+    return (moves_ptr[index >> 2] >> ((index & 3) << 1)) & 3;
+}
+
+// compute the stripe centers, that is,
+// the index of the first column of the stripe at each row
+static void _compute_centers(
+        int *centers_ptr,           // pointer to the centers (1D, n); centers[i] = start of the stripe at the i-th row
         int n,                      // number of frames of the first wave
         int m,                      // number of frames of the second wave
-        int l                       // number of MFCCs
+        int delta                   // margin parameter
     ) {
 
-    double sum;
     int center_j, range_start, range_end;
-    int i, j, k;
+    int i;
     for (i = 0; i < n; ++i) {
         center_j = (int)floor(m * (1.0 * i / n));
         range_start = _max(0, center_j - (delta / 2));
@@ -87,13 +130,230 @@ static void _compute_cost_matrix(
             range_start = range_end - delta;
         }
         centers_ptr[i] = range_start;
-        for (j = range_start; j < range_end; ++j) {
-            sum = 0.0;
-            for (k = 0; k < l; ++k) {
-                sum += (mfcc1_ptr[k * n + i] * mfcc2_ptr[k * m + j]);
-            }
-            cost_matrix_ptr[(i * delta) + (j - range_start)] = 1 - (sum / (norm2_1_ptr[i] * norm2_2_ptr[j]));
-        } 
+    }
+}
+
+// check that the given stripe centers are valid, that is,
+// non-decreasing and such that the stripe is within [0, m),
+// returning 0 if they are valid, 1 otherwise
+static int _check_centers(
+        int *centers_ptr,           // pointer to the centers (1D, n); centers[i] = start of the stripe at the i-th row
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int delta                   // margin parameter
+    ) {
+
+    int i;
+    for (i = 0; i < n; ++i) {
+        if ((centers_ptr[i] < 0) || (centers_ptr[i] + delta > m)) {
+            return 1;
+        }
+        if ((i > 0) && (centers_ptr[i] < centers_ptr[i-1])) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+// compute the i-th row of the cost matrix from mfcc?,
+// whose frames are normalized to unit norm2,
+// hence the cost is one minus the dot product of the two frames
+//
+// NOTE: the MFCCs are stored frame-major, so the inner loop
+//       runs over contiguous memory in both waves
+static void _compute_cost_matrix_row(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int delta,                  // margin parameter
+        int range_start,            // start of the stripe at the i-th row
+        int i,                      // index of the row to compute
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        double *row_ptr             // pointer to the row to be filled (1D, delta)
+    ) {
+
+    double sum;
+    double *frame1_ptr, *frame2_ptr;
+    int j, k;
+    frame1_ptr = mfcc1_ptr + ((size_t)i * l);
+    for (j = range_start; j < range_start + delta; ++j) {
+        frame2_ptr = mfcc2_ptr + ((size_t)j * l);
+        sum = 0.0;
+        for (k = 0; k < l; ++k) {
+            sum += (frame1_ptr[k] * frame2_ptr[k]);
+        }
+        row_ptr[j - range_start] = 1 - sum;
+    }
+}
+
+// a contiguous range of rows of the cost matrix, computed by one thread
+typedef struct {
+    double *mfcc1_ptr;          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+    double *mfcc2_ptr;          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+    int delta;                  // margin parameter
+    int *centers_ptr;           // pointer to the centers (1D, n)
+    int n;                      // number of frames of the first wave
+    int m;                      // number of frames of the second wave
+    int l;                      // number of MFCCs
+    int first_row;              // index of the first row to compute
+    int end_row;                // index of the row after the last row to compute
+    double *rows_ptr;           // pointer to the rows to be filled (2D, (end_row - first_row) x delta)
+} cost_rows_job;
+
+// compute the rows of the cost matrix described by the given job
+// (the signature is the one required by pthread_create)
+static void *_compute_cost_matrix_rows_job(void *job_ptr) {
+    cost_rows_job *job = (cost_rows_job *)job_ptr;
+    int i;
+    for (i = job->first_row; i < job->end_row; ++i) {
+        _compute_cost_matrix_row(job->mfcc1_ptr, job->mfcc2_ptr, job->delta, job->centers_ptr[i], i, job->n, job->m, job->l, job->rows_ptr + ((size_t)(i - job->first_row) * job->delta));
+    }
+    return NULL;
+}
+
+// compute the rows [first_row, first_row + number_of_rows) of the cost matrix,
+// splitting them into contiguous ranges computed by (at most) threads threads,
+// the last range being computed by the calling thread
+// (each row is computed exactly as in the single-threaded case,
+// hence the result does not depend on the number of threads)
+//
+// NOTE: it does not call the Python API, so it can be called with the GIL released
+static void _compute_cost_matrix_rows(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int delta,                  // margin parameter
+        int *centers_ptr,           // pointer to the centers (1D, n)
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        int first_row,              // index of the first row to compute
+        int number_of_rows,         // number of rows to compute
+        int threads,                // maximum number of threads
+        double *rows_ptr            // pointer to the rows to be filled (2D, number_of_rows x delta)
+    ) {
+
+    cost_rows_job *jobs;
+    int rows_per_thread, t;
+#ifdef CDTW_USE_THREADS
+    pthread_t *thread_ids;
+    int *created;
+#endif
+
+    if (threads > number_of_rows) {
+        threads = number_of_rows;
+    }
+    if (threads < 1) {
+        threads = 1;
+    }
+    jobs = (cost_rows_job *)malloc(threads * sizeof(cost_rows_job));
+    if (jobs == NULL) {
+        // fall back to a single range, computed by the calling thread
+        threads = 1;
+    }
+    rows_per_thread = (number_of_rows + threads - 1) / threads;
+    if (threads == 1) {
+        cost_rows_job job = { mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l, first_row, first_row + number_of_rows, rows_ptr };
+        _compute_cost_matrix_rows_job((void *)&job);
+        free((void *)jobs);
+        return;
+    }
+    for (t = 0; t < threads; ++t) {
+        jobs[t].mfcc1_ptr = mfcc1_ptr;
+        jobs[t].mfcc2_ptr = mfcc2_ptr;
+        jobs[t].delta = delta;
+        jobs[t].centers_ptr = centers_ptr;
+        jobs[t].n = n;
+        jobs[t].m = m;
+        jobs[t].l = l;
+        jobs[t].first_row = first_row + _min(t * rows_per_thread, number_of_rows);
+        jobs[t].end_row = first_row + _min((t + 1) * rows_per_thread, number_of_rows);
+        jobs[t].rows_ptr = rows_ptr + ((size_t)(jobs[t].first_row - first_row) * delta);
+    }
+#ifdef CDTW_USE_THREADS
+    thread_ids = (pthread_t *)malloc(threads * sizeof(pthread_t));
+    created = (int *)calloc(threads, sizeof(int));
+    if ((thread_ids != NULL) && (created != NULL)) {
+        for (t = 0; t < threads - 1; ++t) {
+            created[t] = (pthread_create(&thread_ids[t], NULL, _compute_cost_matrix_rows_job, (void *)&jobs[t]) == 0);
+        }
+    }
+    // the calling thread computes the last range,
+    // and the ranges of the threads which could not be created
+    for (t = threads - 1; t >= 0; --t) {
+        if ((created == NULL) || (!created[t])) {
+            _compute_cost_matrix_rows_job((void *)&jobs[t]);
+        }
+    }
+    for (t = 0; t < threads; ++t) {
+        if ((created != NULL) && (created[t])) {
+            pthread_join(thread_ids[t], NULL);
+        }
+    }
+    free((void *)created);
+    free((void *)thread_ids);
+#else
+    for (t = 0; t < threads; ++t) {
+        _compute_cost_matrix_rows_job((void *)&jobs[t]);
+    }
+#endif
+    free((void *)jobs);
+}
+
+// compute cost matrix from mfcc?
+static void _compute_cost_matrix(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int delta,                  // margin parameter
+        double *cost_matrix_ptr,    // pointer to the cost matrix (2D, n x delta)
+        int *centers_ptr,           // pointer to the centers (1D, n); centers[i] = start of the stripe at the i-th row
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        int threads                 // number of threads computing the rows
+    ) {
+
+    _compute_cost_matrix_rows(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l, 0, n, threads, cost_matrix_ptr);
+}
+
+// compute the first row of the accumulated cost matrix, in-place
+// (i.e., this function overwrites row with the accumulated cost values)
+static void _compute_accumulated_cost_first_row(
+        double *row_ptr,            // pointer to the first row of the cost matrix (1D, delta)
+        int delta                   // margin parameter
+    ) {
+
+    int j;
+    for (j = 1; j < delta; ++j) {
+        row_ptr[j] = row_ptr[j] + row_ptr[j-1];
+    }
+}
+
+// compute a (non-first) row of the accumulated cost matrix, in-place
+// (i.e., this function overwrites current_row with the accumulated cost values)
+static void _compute_accumulated_cost_row(
+        double *previous_row_ptr,   // pointer to the previous row of the accumulated cost matrix (1D, delta)
+        double *current_row_ptr,    // pointer to the current row of the cost matrix (1D, delta)
+        int offset,                 // centers[i] - centers[i-1]
+        int delta                   // margin parameter
+    ) {
+
+    double cost0, cost1, cost2;
+    int j;
+    for (j = 0; j < delta; ++j) {
+        cost0 = NPY_INFINITY;
+        if ((j+offset) < delta) {
+            cost0 = previous_row_ptr[j+offset];
+        }
+        cost1 = NPY_INFINITY;
+        if (j > 0) {
+            cost1 = current_row_ptr[j-1];
+        }
+        cost2 = NPY_INFINITY;
+        if (((j+offset-1) < delta) && ((j+offset-1) >= 0)) {
+            cost2 = previous_row_ptr[j+offset-1];
+        }
+        current_row_ptr[j] = current_row_ptr[j] + _three_way_min(cost0, cost1, cost2);
     }
 }
 
@@ -150,159 +410,516 @@ static void _print_row(double *ptr, int row, int width, int max) {
 }
 */
 
-// copy the row-th row of cost_matrix into buffer
-static void _copy_cost_matrix_row(double *cost_matrix_ptr, int row, int width, double *buffer_ptr) {
-    memcpy(buffer_ptr, cost_matrix_ptr + row * width, width * sizeof(double));
-}
-
-// compute accumulated cost matrix, in-place
-// (i.e., this function overwrites cost_matrix with the accumulated cost values)
-static void _compute_accumulated_cost_matrix_in_place(
-        double *cost_matrix_ptr,                // pointer to the cost matrix (2D, n x delta)
+// compute best path in reverse order, from (n-1, delta-1) to (0,0)
+static void _compute_best_path(
+        double *accumulated_cost_matrix_ptr,    // pointer to the accumulated cost matrix (2D, n x delta)
         int *centers_ptr,                       // pointer to the centers (1D, n)
         int n,                                  // number of frames of the first wave
-        int delta                               // margin parameter
+        int delta,                              // margin parameter
+        int *path_ptr,                          // pointer to the path (2D, at most (n + m) x 2), filled in reverse order
+        int *path_length_ptr                    // pointer to the length of the path
+    ){
+
+    double cost0, cost1, cost2;
+    int argmin, offset;
+    int i, j, r_j;
+
+    i = n - 1;
+    j = delta - 1 + centers_ptr[i];
+    *path_length_ptr = 0;
+    _append(path_ptr, path_length_ptr, i, j);
+    while ((i > 0) || (j > 0)) {
+        if (i == 0) {
+            _append(path_ptr, path_length_ptr, 0, --j);
+        } else if (j == 0) {
+            _append(path_ptr, path_length_ptr, --i, j);
+        } else {
+            offset = centers_ptr[i] - centers_ptr[i-1];
+            r_j = j - centers_ptr[i];
+            cost0 = NPY_INFINITY;
+            if ((r_j+offset) < delta) {
+                cost0 = accumulated_cost_matrix_ptr[(i-1) * delta + (r_j+offset)];
+            }
+            cost1 = NPY_INFINITY;
+            if (r_j > 0) {
+                cost1 = accumulated_cost_matrix_ptr[  (i) * delta + (r_j-1)];
+            }
+            cost2 = NPY_INFINITY;
+            if ((r_j > 0) && ((r_j+offset-1 < delta) && ((r_j+offset-1) >= 0))) {
+                cost2 = accumulated_cost_matrix_ptr[(i-1) * delta + (r_j+offset-1)];
+            }
+            argmin = _three_way_argmin(cost0, cost1, cost2);
+            if (argmin == 0) {
+                _append(path_ptr, path_length_ptr, --i, j);
+            } else if (argmin == 1) {
+                _append(path_ptr, path_length_ptr, i, --j);
+            } else {
+                _append(path_ptr, path_length_ptr, --i, --j);
+            }
+        }
+    }
+}
+
+// compute best path in reverse order, from (n-1, delta-1) to (0,0),
+// computing the cost and the accumulated cost row by row (keeping two rows only),
+// and storing only the move selected by the backtracking at each cell (2 bits per cell)
+// (memory: O(n * delta / 4) bytes instead of O(n * delta * 8) bytes)
+//
+// the cost rows are computed in blocks of COST_BLOCK_ROWS_PER_THREAD rows per thread,
+// by threads threads, and then accumulated sequentially
+//
+// NOTE: the backtracking of _compute_best_path does not consider the diagonal move
+//       when r_j == 0, hence the stored move is the argmin with that restriction,
+//       while the accumulated cost is computed exactly as in _compute_accumulated_cost_row,
+//       so that the returned path is the same path returned by _compute_best_path
+static int _compute_best_path_moves(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int delta,                  // margin parameter
+        int *centers_ptr,           // pointer to the centers (1D, n)
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        int threads,                // number of threads computing the cost rows
+        int *path_ptr,              // pointer to the path (2D, at most (n + m) x 2), filled in reverse order
+        int *path_length_ptr        // pointer to the length of the path
     ) {
-   
-    double *current_row_ptr;
+
+    unsigned char *moves_ptr;
+    double *block_ptr, *last_row_ptr, *previous_row_ptr, *current_row_ptr;
     double cost0, cost1, cost2;
-    int current_idx, offset;
-    int i, j;
-    
-    // to compute the i-th row of the accumulated cost matrix
-    // we only need the i-th row of the cost matrix
-    current_row_ptr = (double *)malloc(delta * sizeof(double));
-    
-    // copy the first row of cost_matrix_ptr to current row buffer
-    _copy_cost_matrix_row(cost_matrix_ptr, 0, delta, current_row_ptr);
-    //cost_matrix_ptr[0] = current_row_ptr[0];
-    for (j = 1; j < delta; ++j) {
-        cost_matrix_ptr[j] = current_row_ptr[j] + cost_matrix_ptr[j-1];
+    size_t row_index;
+    int block_rows, block_start, block_length;
+    int argmin, offset;
+    int i, j, r_j;
+
+    if (threads < 1) {
+        threads = 1;
     }
-    for (i = 1; i < n; ++i) {
-        // copy current row of cost_matrix_ptr (= i-th row of cost_matrix, not accumulated) to current row buffer
-        _copy_cost_matrix_row(cost_matrix_ptr, i, delta, current_row_ptr);
+    block_rows = _min(COST_BLOCK_ROWS_PER_THREAD * threads, n);
+    moves_ptr = (unsigned char *)calloc((((size_t)n * delta) + 3) / 4, sizeof(unsigned char));
+    block_ptr = (double *)malloc((size_t)block_rows * delta * sizeof(double));
+    last_row_ptr = (double *)malloc(delta * sizeof(double));
+    if ((moves_ptr == NULL) || (block_ptr == NULL) || (last_row_ptr == NULL)) {
+        free((void *)moves_ptr);
+        free((void *)block_ptr);
+        free((void *)last_row_ptr);
+        return 1;
+    }
+
+    // forward pass
+    // NOTE: the moves of the first row are never read, as the backtracking goes left there
+    previous_row_ptr = NULL;
+    for (i = 0; i < n; ++i) {
+        if ((i % block_rows) == 0) {
+            // compute the cost rows of the next block,
+            // keeping a copy of the last accumulated row of the current block
+            if (previous_row_ptr != NULL) {
+                memcpy(last_row_ptr, previous_row_ptr, delta * sizeof(double));
+                previous_row_ptr = last_row_ptr;
+            }
+            block_start = i;
+            block_length = _min(block_rows, n - block_start);
+            _compute_cost_matrix_rows(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l, block_start, block_length, threads, block_ptr);
+        }
+        current_row_ptr = block_ptr + ((size_t)(i - block_start) * delta);
+        if (i == 0) {
+            _compute_accumulated_cost_first_row(current_row_ptr, delta);
+            previous_row_ptr = current_row_ptr;
+            continue;
+        }
         offset = centers_ptr[i] - centers_ptr[i-1];
+        row_index = (size_t)i * delta;
         for (j = 0; j < delta; ++j) {
             cost0 = NPY_INFINITY;
             if ((j+offset) < delta) {
-                cost0 = cost_matrix_ptr[(i-1) * delta + (j+offset)];
+                cost0 = previous_row_ptr[j+offset];
             }
             cost1 = NPY_INFINITY;
             if (j > 0) {
-                cost1 = cost_matrix_ptr[  (i) * delta + (j-1)];
+                cost1 = current_row_ptr[j-1];
             }
             cost2 = NPY_INFINITY;
             if (((j+offset-1) < delta) && ((j+offset-1) >= 0)) {
-                cost2 = cost_matrix_ptr[(i-1) * delta + (j+offset-1)];
+                cost2 = previous_row_ptr[j+offset-1];
+            }
+            current_row_ptr[j] = current_row_ptr[j] + _three_way_min(cost0, cost1, cost2);
+            if (j > 0) {
+                argmin = _three_way_argmin(cost0, cost1, cost2);
+            } else {
+                argmin = _three_way_argmin(cost0, cost1, NPY_INFINITY);
+            }
+            _set_move(moves_ptr, row_index + j, argmin);
+        }
+        previous_row_ptr = current_row_ptr;
+    }
+    free((void *)last_row_ptr);
+    free((void *)block_ptr);
+
+    // backward pass, reading the stored moves
+    i = n - 1;
+    j = delta - 1 + centers_ptr[i];
+    *path_length_ptr = 0;
+    _append(path_ptr, path_length_ptr, i, j);
+    while ((i > 0) || (j > 0)) {
+        if (i == 0) {
+            _append(path_ptr, path_length_ptr, 0, --j);
+        } else if (j == 0) {
+            _append(path_ptr, path_length_ptr, --i, j);
+        } else {
+            r_j = j - centers_ptr[i];
+            if (r_j < delta) {
+                argmin = _get_move(moves_ptr, (size_t)i * delta + r_j);
+            } else {
+                // the path left the stripe (this happens only if two consecutive centers
+                // are more than delta - 1 frames apart): go left, back into the stripe
+                argmin = 1;
+            }
+            if (argmin == 0) {
+                _append(path_ptr, path_length_ptr, --i, j);
+            } else if (argmin == 1) {
+                _append(path_ptr, path_length_ptr, i, --j);
+            } else {
+                _append(path_ptr, path_length_ptr, --i, --j);
             }
-            current_idx = i * delta + j;
-            cost_matrix_ptr[current_idx] = current_row_ptr[j] + _three_way_min(cost0, cost1, cost2);
         }
     }
-    free((void *)current_row_ptr);
+
+    free((void *)moves_ptr);
+    return 0;
 }
 
-// compute best path and return it as a list of (i, j) tuples, from (0,0) to (n-1, delta-1)
-static void _compute_best_path(
-        double *accumulated_cost_matrix_ptr,    // pointer to the accumulated cost matrix (2D, n x delta)
-        int *centers_ptr,                       // pointer to the centers (1D, n)
-        int n,                                  // number of frames of the first wave
-        int delta,                              // margin parameter
-        PyObject *best_path_ptr                 // pointer to the list (of tuples) to be returned
-    ){
+// recompute the rows [first_row, first_row + length) of the accumulated cost matrix,
+// starting from the (stored) row first_row, and store them into block
+static void _recompute_accumulated_cost_block(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int delta,                  // margin parameter
+        int *centers_ptr,           // pointer to the centers (1D, n)
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        double *checkpoint_ptr,     // pointer to the stored row first_row of the accumulated cost matrix (1D, delta)
+        int first_row,              // index of the first row of the block
+        int length,                 // number of rows of the block
+        double *block_ptr           // pointer to the block (2D, length x delta)
+    ) {
+
+    int r;
+    memcpy(block_ptr, checkpoint_ptr, delta * sizeof(double));
+    for (r = 1; r < length; ++r) {
+        _compute_cost_matrix_row(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr[first_row + r], first_row + r, n, m, l, block_ptr + ((size_t)r * delta));
+        _compute_accumulated_cost_row(block_ptr + ((size_t)(r - 1) * delta), block_ptr + ((size_t)r * delta), centers_ptr[first_row + r] - centers_ptr[first_row + r - 1], delta);
+    }
+}
 
+// compute best path in reverse order, from (n-1, delta-1) to (0,0),
+// storing only one row of the accumulated cost matrix every interval rows (checkpoints),
+// and recomputing the rows between two consecutive checkpoints while backtracking
+// (memory: O((n / interval + interval) * delta) instead of O(n * delta));
+// sizes and offsets are computed as size_t, since they might overflow an int
+// for long waves and a small interval
+static int _compute_best_path_checkpoint(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int delta,                  // margin parameter
+        int *centers_ptr,           // pointer to the centers (1D, n)
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        int interval,               // number of rows between two consecutive checkpoints
+        int *path_ptr,              // pointer to the path (2D, at most (n + m) x 2), filled in reverse order
+        int *path_length_ptr        // pointer to the length of the path
+    ) {
+
+    double *checkpoints_ptr, *block_ptr, *previous_row_ptr, *current_row_ptr, *tmp_ptr;
     double cost0, cost1, cost2;
+    int number_of_checkpoints, block_start, block_length;
     int argmin, offset;
-    int i, j, r_j;
+    int i, j, r_i, r_j;
+
+    number_of_checkpoints = ((n - 1) / interval) + 1;
+    checkpoints_ptr = (double *)malloc((size_t)number_of_checkpoints * delta * sizeof(double));
+    block_ptr = (double *)malloc((size_t)(interval + 1) * delta * sizeof(double));
+    if ((checkpoints_ptr == NULL) || (block_ptr == NULL)) {
+        free((void *)checkpoints_ptr);
+        free((void *)block_ptr);
+        return 1;
+    }
 
+    // forward pass: keep two rows only, storing a copy of every interval-th row
+    previous_row_ptr = block_ptr;
+    current_row_ptr = block_ptr + delta;
+    _compute_cost_matrix_row(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr[0], 0, n, m, l, previous_row_ptr);
+    _compute_accumulated_cost_first_row(previous_row_ptr, delta);
+    memcpy(checkpoints_ptr, previous_row_ptr, delta * sizeof(double));
+    for (i = 1; i < n; ++i) {
+        _compute_cost_matrix_row(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr[i], i, n, m, l, current_row_ptr);
+        _compute_accumulated_cost_row(previous_row_ptr, current_row_ptr, centers_ptr[i] - centers_ptr[i-1], delta);
+        if ((i % interval) == 0) {
+            memcpy(checkpoints_ptr + ((size_t)(i / interval) * delta), current_row_ptr, delta * sizeof(double));
+        }
+        tmp_ptr = previous_row_ptr;
+        previous_row_ptr = current_row_ptr;
+        current_row_ptr = tmp_ptr;
+    }
+
+    // backward pass: recompute the block containing the current row, if needed
+    block_start = ((n - 1) / interval) * interval;
+    block_length = n - block_start;
+    _recompute_accumulated_cost_block(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l, checkpoints_ptr + ((size_t)(block_start / interval) * delta), block_start, block_length, block_ptr);
     i = n - 1;
     j = delta - 1 + centers_ptr[i];
-    _append(best_path_ptr, i, j);
+    *path_length_ptr = 0;
+    _append(path_ptr, path_length_ptr, i, j);
     while ((i > 0) || (j > 0)) {
         if (i == 0) {
-            _append(best_path_ptr, 0, --j);
+            _append(path_ptr, path_length_ptr, 0, --j);
         } else if (j == 0) {
-            _append(best_path_ptr, --i, j);
+            _append(path_ptr, path_length_ptr, --i, j);
         } else {
+            if (i == block_start) {
+                // the previous row belongs to the previous block:
+                // recompute it, including its last row (i.e., the current row)
+                block_start -= interval;
+                _recompute_accumulated_cost_block(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l, checkpoints_ptr + ((size_t)(block_start / interval) * delta), block_start, interval + 1, block_ptr);
+            }
+            r_i = i - block_start;
             offset = centers_ptr[i] - centers_ptr[i-1];
             r_j = j - centers_ptr[i];
             cost0 = NPY_INFINITY;
             if ((r_j+offset) < delta) {
-                cost0 = accumulated_cost_matrix_ptr[(i-1) * delta + (r_j+offset)];
+                cost0 = block_ptr[(size_t)(r_i-1) * delta + (r_j+offset)];
             }
             cost1 = NPY_INFINITY;
             if (r_j > 0) {
-                cost1 = accumulated_cost_matrix_ptr[  (i) * delta + (r_j-1)];
+                cost1 = block_ptr[  (size_t)(r_i) * delta + (r_j-1)];
             }
             cost2 = NPY_INFINITY;
             if ((r_j > 0) && ((r_j+offset-1 < delta) && ((r_j+offset-1) >= 0))) {
-                cost2 = accumulated_cost_matrix_ptr[(i-1) * delta + (r_j+offset-1)];
+                cost2 = block_ptr[(size_t)(r_i-1) * delta + (r_j+offset-1)];
             }
             argmin = _three_way_argmin(cost0, cost1, cost2);
             if (argmin == 0) {
-                _append(best_path_ptr, --i, j);
+                _append(path_ptr, path_length_ptr, --i, j);
             } else if (argmin == 1) {
-                _append(best_path_ptr, i, --j);
+                _append(path_ptr, path_length_ptr, i, --j);
             } else {
-                _append(best_path_ptr, --i, --j);
+                _append(path_ptr, path_length_ptr, --i, --j);
             }
         }
     }
-    PyList_Reverse(best_path_ptr);
+
+    free((void *)block_ptr);
+    free((void *)checkpoints_ptr);
+    return 0;
+}
+
+// compute the subsequence DTW of the first wave (the query)
+// against the second wave (the audio), open-begin and open-end,
+// where a match can begin only at the given (sorted) starts:
+// for each start, store the min accumulated cost of the matches
+// beginning there, among those whose length (in frames of the second wave)
+// is in [min_length, max_length), and the corresponding length
+//
+// the columns of the accumulated cost matrix are computed one at a time,
+// keeping only two of them, each with the index of the start
+// of the best match ending at each cell
+// (memory: O(n) instead of O(n * m));
+// if end_costs_ptr is not NULL, also store the min accumulated cost
+// of a match ending at each frame of the second wave, beginning at any start
+//
+// NOTE: with several starts, a start gets a value only if it is the best start
+//       of a match ending at some frame of the second wave,
+//       before filtering the matches by length;
+//       otherwise its value is NPY_INFINITY and its length is -1:
+//       hence the exact values are computed with one start at a time
+//       (see cdtw_compute_subsequence_costs),
+//       while the end costs, which are lower bounds of the cost
+//       of any match ending there, are computed with all the starts
+static int _compute_subsequence_costs(
+        double *mfcc1_ptr,          // pointer to the normalized MFCCs of the first wave (2D, n x l)
+        double *mfcc2_ptr,          // pointer to the normalized MFCCs of the second wave (2D, m x l)
+        int *starts_ptr,            // pointer to the starts, sorted and distinct (1D, k)
+        int n,                      // number of frames of the first wave
+        int m,                      // number of frames of the second wave
+        int l,                      // number of MFCCs
+        int k,                      // number of starts
+        int min_length,             // min length of a match
+        int max_length,             // max length of a match (excluded)
+        double *values_ptr,         // pointer to the min cost of the matches beginning at each start (1D, k)
+        int *lengths_ptr,           // pointer to the length of the corresponding matches (1D, k)
+        double *end_costs_ptr       // pointer to the min cost of the matches ending at each frame (1D, m), or NULL
+    ) {
+
+    double *previous_column_ptr, *current_column_ptr, *swap_ptr;
+    int *previous_starts_ptr, *current_starts_ptr, *swap_starts_ptr;
+    double *frame1_ptr, *frame2_ptr;
+    double sum, cost, cost0, cost1, cost2;
+    int i, j, h, argmin, next_start, last_frame, length;
+
+    for (h = 0; h < k; ++h) {
+        values_ptr[h] = NPY_INFINITY;
+        lengths_ptr[h] = -1;
+    }
+    if (end_costs_ptr != NULL) {
+        for (j = 0; j < m; ++j) {
+            end_costs_ptr[j] = NPY_INFINITY;
+        }
+    }
+    if ((k == 0) || (n == 0)) {
+        return 0;
+    }
+
+    previous_column_ptr = (double *)malloc(n * sizeof(double));
+    current_column_ptr = (double *)malloc(n * sizeof(double));
+    previous_starts_ptr = (int *)malloc(n * sizeof(int));
+    current_starts_ptr = (int *)malloc(n * sizeof(int));
+    if ((previous_column_ptr == NULL) || (current_column_ptr == NULL) || (previous_starts_ptr == NULL) || (current_starts_ptr == NULL)) {
+        free((void *)previous_column_ptr);
+        free((void *)current_column_ptr);
+        free((void *)previous_starts_ptr);
+        free((void *)current_starts_ptr);
+        return 1;
+    }
+    for (i = 0; i < n; ++i) {
+        previous_column_ptr[i] = NPY_INFINITY;
+        previous_starts_ptr[i] = -1;
+    }
+
+    // no match can end after the last start plus max_length
+    last_frame = _min(m, starts_ptr[k - 1] + max_length);
+    next_start = 0;
+    for (j = starts_ptr[0]; j < last_frame; ++j) {
+        frame2_ptr = mfcc2_ptr + ((size_t)j * l);
+        for (i = 0; i < n; ++i) {
+            frame1_ptr = mfcc1_ptr + ((size_t)i * l);
+            sum = 0.0;
+            for (h = 0; h < l; ++h) {
+                sum += (frame1_ptr[h] * frame2_ptr[h]);
+            }
+            cost = 1 - sum;
+            if (i == 0) {
+                if ((next_start < k) && (starts_ptr[next_start] == j)) {
+                    // a new match beginning here costs less than any match continuing here,
+                    // since all the costs are non-negative
+                    current_column_ptr[0] = cost;
+                    current_starts_ptr[0] = next_start;
+                    next_start++;
+                } else {
+                    current_column_ptr[0] = cost + previous_column_ptr[0];
+                    current_starts_ptr[0] = previous_starts_ptr[0];
+                }
+            } else {
+                cost0 = current_column_ptr[i - 1];
+                cost1 = previous_column_ptr[i];
+                cost2 = previous_column_ptr[i - 1];
+                argmin = _three_way_argmin(cost0, cost1, cost2);
+                if (argmin == 0) {
+                    current_column_ptr[i] = cost + cost0;
+                    current_starts_ptr[i] = current_starts_ptr[i - 1];
+                } else if (argmin == 1) {
+                    current_column_ptr[i] = cost + cost1;
+                    current_starts_ptr[i] = previous_starts_ptr[i];
+                } else {
+                    current_column_ptr[i] = cost + cost2;
+                    current_starts_ptr[i] = previous_starts_ptr[i - 1];
+                }
+            }
+        }
+        // the match ending here consumed the whole first wave
+        if (end_costs_ptr != NULL) {
+            end_costs_ptr[j] = current_column_ptr[n - 1];
+        }
+        h = current_starts_ptr[n - 1];
+        if (h >= 0) {
+            length = j - starts_ptr[h];
+            if ((length >= min_length) && (length < max_length) && (current_column_ptr[n - 1] < values_ptr[h])) {
+                values_ptr[h] = current_column_ptr[n - 1];
+                lengths_ptr[h] = length;
+            }
+        }
+        swap_ptr = previous_column_ptr;
+        previous_column_ptr = current_column_ptr;
+        current_column_ptr = swap_ptr;
+        swap_starts_ptr = previous_starts_ptr;
+        previous_starts_ptr = current_starts_ptr;
+        current_starts_ptr = swap_starts_ptr;
+    }
+
+    free((void *)previous_column_ptr);
+    free((void *)current_column_ptr);
+    free((void *)previous_starts_ptr);
+    free((void *)current_starts_ptr);
+    return 0;
+}
+
+// return the given MFCCs argument as an array, without copying it,
+// or NULL if it is not a 2D C contiguous array of double
+//
+// NOTE: the returned reference is borrowed from the arguments tuple,
+//       which holds it until the caller returns
+static PyArrayObject *_get_mfcc(PyObject *mfcc_raw) {
+    PyArrayObject *mfcc;
+    if (!PyArray_Check(mfcc_raw)) {
+        return NULL;
+    }
+    mfcc = (PyArrayObject *)mfcc_raw;
+    if ((PyArray_NDIM(mfcc) != 2) || (PyArray_TYPE(mfcc) != NPY_DOUBLE) || (!PyArray_ISCARRAY_RO(mfcc))) {
+        return NULL;
+    }
+    return mfcc;
 }
 
 
 
 // compute the best path "all in one"
 // take the PyObject containing the following arguments:
-//   - mfcc1:       2D array (l x n) of double, MFCCs of the first wave
-//   - mfcc2:       2D array (l x m) of double, MFCCs of the second wave
-//   - norm2_1:     1D array (n x 1) of double, norm2 of the first wave
-//   - norm2_2:     1D array (m x 1) of double, norm2 of the second wave
+//   - mfcc1:       2D array (n x l) of double, C contiguous, MFCCs of the first wave,
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - mfcc2:       2D array (m x l) of double, C contiguous, MFCCs of the second wave,
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
 //   - delta:       int, the number of frames of margin
-// and return the best path as a list of (i, j) tuples, from (0,0) to (n-1, delta-1)
+//   - centers:     optional 1D array (n x 1) of int32, the index of the first column
+//                  of the stripe at each row (if not given or None, the stripe follows the main diagonal)
+//   - threads:     optional int, the number of threads computing the cost matrix (default: 1)
+// and return the best path as a 2D array (k x 2) of int32, each row being a pair (i, j),
+// from (0,0) to (n-1, m-1)
+// (the GIL is released during the computation)
 static PyObject *cdtw_compute_best_path(PyObject *self, PyObject *args) {
     PyObject *mfcc1_raw;
     PyObject *mfcc2_raw;
-    PyObject *norm2_1_raw;
-    PyObject *norm2_2_raw;
+    PyObject *centers_raw = NULL;
     int delta;
+    int threads = 1;
  
-    PyArrayObject *mfcc1, *mfcc2, *norm2_1, *norm2_2, *cost_matrix, *centers;
+    PyArrayObject *mfcc1, *mfcc2, *centers = NULL;
     PyObject *best_path_ptr;
-    npy_intp cost_matrix_dimensions[2];
-    npy_intp centers_dimensions[1];
-    double *mfcc1_ptr, *mfcc2_ptr,  *norm2_1_ptr, *norm2_2_ptr, *cost_matrix_ptr;
-    int *centers_ptr;
-    int l1, l2, n, m;
+    double *mfcc1_ptr, *mfcc2_ptr;
+    int *centers_ptr, *path_ptr;
+    int l1, l2, n, m, result, path_length;
 
     // O = object (do not convert or check for errors)
     // i = int
-    if (!PyArg_ParseTuple(args, "OOOOi", &mfcc1_raw, &mfcc2_raw, &norm2_1_raw, &norm2_2_raw, &delta)) {
-        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOOOi mask");
+    // | = the following arguments are optional
+    if (!PyArg_ParseTuple(args, "OOi|Oi", &mfcc1_raw, &mfcc2_raw, &delta, &centers_raw, &threads)) {
+        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOi|Oi mask");
         return NULL;
     }
 
-    // convert to C contiguous array
-    mfcc1   = (PyArrayObject *) PyArray_ContiguousFromObject(mfcc1_raw,   PyArray_DOUBLE, 2, 2);
-    mfcc2   = (PyArrayObject *) PyArray_ContiguousFromObject(mfcc2_raw,   PyArray_DOUBLE, 2, 2);
-    norm2_1 = (PyArrayObject *) PyArray_ContiguousFromObject(norm2_1_raw, PyArray_DOUBLE, 1, 1);
-    norm2_2 = (PyArrayObject *) PyArray_ContiguousFromObject(norm2_2_raw, PyArray_DOUBLE, 1, 1);
-
-    // check for conversion errors
-    if ((mfcc1 == NULL) || (mfcc2 == NULL) || (norm2_1 == NULL) || (norm2_2 == NULL)) {
-        PyErr_SetString(PyExc_ValueError, "Error while converting arguments using PyArray_ContiguousFromObject");
+    // get the MFCCs, without copying them
+    mfcc1 = _get_mfcc(mfcc1_raw);
+    mfcc2 = _get_mfcc(mfcc2_raw);
+    if ((mfcc1 == NULL) || (mfcc2 == NULL)) {
+        PyErr_SetString(PyExc_ValueError, "The MFCCs must be 2D C contiguous arrays of double");
         return NULL;
     }
-
-    // NOTE: if arrived here, the mfcc? and norm2_? have the correct number of dimensions (2 and 1, respectively)
    
     // get the dimensions of the input arguments
-    l1 = mfcc1->dimensions[0]; // number of MFCCs in the first wave
-    l2 = mfcc2->dimensions[0]; // number of MFCCs in the second wave
-    n  = mfcc1->dimensions[1]; // number of frames in the first wave
-    m  = mfcc2->dimensions[1]; // number of frames in the second wave
+    n  = mfcc1->dimensions[0]; // number of frames in the first wave
+    m  = mfcc2->dimensions[0]; // number of frames in the second wave
+    l1 = mfcc1->dimensions[1]; // number of MFCCs in the first wave
+    l2 = mfcc2->dimensions[1]; // number of MFCCs in the second wave
 
     // check that the number of MFCCs is the same for both waves
     if (l1 != l2) {
@@ -310,110 +927,468 @@ static PyObject *cdtw_compute_best_path(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    // check that the norm (1D) arrays have the correct number of elements
-    if (norm2_1->dimensions[0] != n) {
-        PyErr_SetString(PyExc_ValueError, "The number of columns of mfcc1 must be equal to the number of elements of norm2_1");
+    // delta cannot be greater than m 
+    if (delta > m) {
+        delta = m;
+    }
+    
+    // pointer to cost matrix data
+    mfcc1_ptr   = (double *)mfcc1->data;
+    mfcc2_ptr   = (double *)mfcc2->data;
+    
+    // compute the centers, or copy the given ones
+    centers_ptr = (int *)malloc((size_t)n * sizeof(int));
+    if (centers_ptr == NULL) {
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the centers");
         return NULL;
     }
-    if (norm2_2->dimensions[0] != m) {
-        PyErr_SetString(PyExc_ValueError, "The number of columns of mfcc2 must be equal to the number of elements of norm2_2");
+    if ((centers_raw != NULL) && (centers_raw != Py_None)) {
+        centers = (PyArrayObject *) PyArray_ContiguousFromObject(centers_raw, PyArray_INT32, 1, 1);
+        if ((centers == NULL) || (centers->dimensions[0] != n)) {
+            free((void *)centers_ptr);
+            PyErr_SetString(PyExc_ValueError, "The number of elements of centers must be equal to the number of rows of mfcc1");
+            return NULL;
+        }
+        memcpy(centers_ptr, centers->data, (size_t)n * sizeof(int));
+        Py_DECREF(centers);
+        if (_check_centers(centers_ptr, n, m, delta) != 0) {
+            free((void *)centers_ptr);
+            PyErr_SetString(PyExc_ValueError, "The centers must be non-decreasing and the stripe must be within the rows of mfcc2");
+            return NULL;
+        }
+    } else {
+        _compute_centers(centers_ptr, n, m, delta);
+    }
+
+    // allocate the path, which has at most n + m pairs
+    path_ptr = (int *)malloc(2 * ((size_t)n + m) * sizeof(int));
+    if (path_ptr == NULL) {
+        free((void *)centers_ptr);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the path");
         return NULL;
     }
 
-    // delta cannot be greater than m 
+    // actual computation, storing only the moves instead of the full accumulated cost matrix
+    Py_BEGIN_ALLOW_THREADS
+    result = _compute_best_path_moves(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l1, threads, path_ptr, &path_length);
+    Py_END_ALLOW_THREADS
+
+    // free the centers, no longer needed
+    free((void *)centers_ptr);
+
+    if (result != 0) {
+        free((void *)path_ptr);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the moves matrix");
+        return NULL;
+    }
+
+    // create the best path array
+    best_path_ptr = _create_best_path(path_ptr, path_length);
+    free((void *)path_ptr);
+    return best_path_ptr;
+}
+
+
+
+// compute the best path "all in one", using checkpoints to bound the memory
+// take the PyObject containing the following arguments:
+//   - mfcc1:       2D array (n x l) of double, C contiguous, MFCCs of the first wave,
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - mfcc2:       2D array (m x l) of double, C contiguous, MFCCs of the second wave,
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - delta:       int, the number of frames of margin
+//   - interval:    int, the number of rows between two consecutive checkpoints
+//                  (if <= 0, use ceil(sqrt(n)))
+// and return the best path as a 2D array (k x 2) of int32, each row being a pair (i, j),
+// from (0,0) to (n-1, m-1)
+static PyObject *cdtw_compute_best_path_checkpoint(PyObject *self, PyObject *args) {
+    PyObject *mfcc1_raw;
+    PyObject *mfcc2_raw;
+    int delta;
+    int interval;
+
+    PyArrayObject *mfcc1, *mfcc2;
+    PyObject *best_path_ptr;
+    double *mfcc1_ptr, *mfcc2_ptr;
+    int *centers_ptr, *path_ptr;
+    int l1, l2, n, m, result, path_length;
+
+    // O = object (do not convert or check for errors)
+    // i = int
+    if (!PyArg_ParseTuple(args, "OOii", &mfcc1_raw, &mfcc2_raw, &delta, &interval)) {
+        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOii mask");
+        return NULL;
+    }
+
+    // get the MFCCs, without copying them
+    mfcc1 = _get_mfcc(mfcc1_raw);
+    mfcc2 = _get_mfcc(mfcc2_raw);
+    if ((mfcc1 == NULL) || (mfcc2 == NULL)) {
+        PyErr_SetString(PyExc_ValueError, "The MFCCs must be 2D C contiguous arrays of double");
+        return NULL;
+    }
+
+    // get the dimensions of the input arguments
+    n  = mfcc1->dimensions[0]; // number of frames in the first wave
+    m  = mfcc2->dimensions[0]; // number of frames in the second wave
+    l1 = mfcc1->dimensions[1]; // number of MFCCs in the first wave
+    l2 = mfcc2->dimensions[1]; // number of MFCCs in the second wave
+
+    // check that the number of MFCCs is the same for both waves
+    if (l1 != l2) {
+        PyErr_SetString(PyExc_ValueError, "The number of MFCCs must be the same for both waves");
+        return NULL;
+    }
+
+    // delta cannot be greater than m
     if (delta > m) {
         delta = m;
     }
-    
-    // pointer to cost matrix data
+
+    // default interval is ceil(sqrt(n)), which minimizes the memory used
+    if (interval <= 0) {
+        interval = (int)ceil(sqrt(1.0 * n));
+    }
+    if (interval < 1) {
+        interval = 1;
+    }
+
+    // pointer to data
     mfcc1_ptr   = (double *)mfcc1->data;
     mfcc2_ptr   = (double *)mfcc2->data;
-    norm2_1_ptr = (double *)norm2_1->data;
-    norm2_2_ptr = (double *)norm2_2->data;
-    
-    // create cost matrix object
-    cost_matrix_dimensions[0] = n;
-    cost_matrix_dimensions[1] = delta;
-    cost_matrix = (PyArrayObject *)PyArray_SimpleNew(2, cost_matrix_dimensions, PyArray_DOUBLE);
-    cost_matrix_ptr = (double *)cost_matrix->data;
 
-    // create centers object
-    centers_dimensions[0] = n;
-    centers = (PyArrayObject *)PyArray_SimpleNew(1, centers_dimensions, PyArray_INT32);
-    centers_ptr = (int *)centers->data;
+    // compute the centers
+    centers_ptr = (int *)malloc((size_t)n * sizeof(int));
+    if (centers_ptr == NULL) {
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the centers");
+        return NULL;
+    }
+    _compute_centers(centers_ptr, n, m, delta);
 
-    // create best path array of integers
-    best_path_ptr = PyList_New(0);
+    // allocate the path, which has at most n + m pairs
+    path_ptr = (int *)malloc(2 * ((size_t)n + m) * sizeof(int));
+    if (path_ptr == NULL) {
+        free((void *)centers_ptr);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the path");
+        return NULL;
+    }
 
     // actual computation
-    _compute_cost_matrix(mfcc1_ptr, mfcc2_ptr, norm2_1_ptr, norm2_2_ptr, delta, cost_matrix_ptr, centers_ptr, n, m, l1);
-    _compute_accumulated_cost_matrix_in_place(cost_matrix_ptr, centers_ptr, n, delta);
-    _compute_best_path(cost_matrix_ptr, centers_ptr, n, delta, best_path_ptr);
+    Py_BEGIN_ALLOW_THREADS
+    result = _compute_best_path_checkpoint(mfcc1_ptr, mfcc2_ptr, delta, centers_ptr, n, m, l1, interval, path_ptr, &path_length);
+    Py_END_ALLOW_THREADS
 
-    // decrement reference to local object no longer needed
-    Py_DECREF(mfcc1);
-    Py_DECREF(mfcc2);
-    Py_DECREF(norm2_1);
-    Py_DECREF(norm2_2);
-    Py_DECREF(cost_matrix);
-    Py_DECREF(centers);
+    // free the centers, no longer needed
+    free((void *)centers_ptr);
 
+    if (result != 0) {
+        free((void *)path_ptr);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the checkpoint buffers");
+        return NULL;
+    }
+
+    // create the best path array
+    best_path_ptr = _create_best_path(path_ptr, path_length);
+    free((void *)path_ptr);
     return best_path_ptr;
 }
 
 
 
+// return the given starts argument as a C contiguous array of int32,
+// or NULL (setting the exception) if the starts are not increasing
+// and within the m frames of the second wave
+//
+// NOTE: the returned reference is new, and it must be decremented by the caller
+static PyArrayObject *_get_starts(PyObject *starts_raw, int m) {
+    PyArrayObject *starts;
+    int *starts_ptr;
+    int k, h;
+
+    starts = (PyArrayObject *) PyArray_ContiguousFromObject(starts_raw, PyArray_INT32, 1, 1);
+    if (starts == NULL) {
+        PyErr_SetString(PyExc_ValueError, "Error while converting starts using PyArray_ContiguousFromObject");
+        return NULL;
+    }
+    k = starts->dimensions[0];
+    starts_ptr = (int *)starts->data;
+    for (h = 0; h < k; ++h) {
+        if ((starts_ptr[h] < 0) || (starts_ptr[h] >= m) || ((h > 0) && (starts_ptr[h] <= starts_ptr[h - 1]))) {
+            Py_DECREF(starts);
+            PyErr_SetString(PyExc_ValueError, "The starts must be increasing and within the rows of mfcc2");
+            return NULL;
+        }
+    }
+    return starts;
+}
+
+
+
+// compute the subsequence DTW of the first wave against the second one,
+// separately for each start
+// take the PyObject containing the following arguments:
+//   - mfcc1:       2D array (n x l) of double, C contiguous, MFCCs of the first wave (the query),
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - mfcc2:       2D array (m x l) of double, C contiguous, MFCCs of the second wave (the audio),
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - starts:      1D array (k x 1) of int32, the frames of the second wave
+//                  where a match can begin, sorted and distinct
+//   - min_length:  int, the min length of a match, in frames of the second wave
+//   - max_length:  int, the max length (excluded) of a match, in frames of the second wave
+// and return a tuple (values, lengths), where
+//   - values:      1D array (k x 1) of double, the min accumulated cost of a match beginning at each start,
+//                  or inf if no match begins there
+//   - lengths:     1D array (k x 1) of int32, the length of the corresponding match,
+//                  or -1 if no match begins there
+//
+// NOTE: each start is evaluated in its own window [start, start + max_length),
+//       hence in O(k * max_length * n) time
+static PyObject *cdtw_compute_subsequence_costs(PyObject *self, PyObject *args) {
+    PyObject *mfcc1_raw;
+    PyObject *mfcc2_raw;
+    PyObject *starts_raw;
+    int min_length;
+    int max_length;
+
+    PyArrayObject *mfcc1, *mfcc2, *starts, *values, *lengths;
+    PyObject *tuple;
+    npy_intp dimensions[1];
+    double *mfcc1_ptr, *mfcc2_ptr, *values_ptr;
+    int *starts_ptr, *lengths_ptr;
+    int l1, l2, n, m, k, h, result;
+
+    // O = object (do not convert or check for errors)
+    // i = int
+    if (!PyArg_ParseTuple(args, "OOOii", &mfcc1_raw, &mfcc2_raw, &starts_raw, &min_length, &max_length)) {
+        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOOii mask");
+        return NULL;
+    }
+
+    // get the MFCCs, without copying them
+    mfcc1 = _get_mfcc(mfcc1_raw);
+    mfcc2 = _get_mfcc(mfcc2_raw);
+    if ((mfcc1 == NULL) || (mfcc2 == NULL)) {
+        PyErr_SetString(PyExc_ValueError, "The MFCCs must be 2D C contiguous arrays of double");
+        return NULL;
+    }
+
+    // get the dimensions of the input arguments
+    n  = mfcc1->dimensions[0]; // number of frames in the first wave
+    m  = mfcc2->dimensions[0]; // number of frames in the second wave
+    l1 = mfcc1->dimensions[1]; // number of MFCCs in the first wave
+    l2 = mfcc2->dimensions[1]; // number of MFCCs in the second wave
+
+    // check that the number of MFCCs is the same for both waves
+    if (l1 != l2) {
+        PyErr_SetString(PyExc_ValueError, "The number of MFCCs must be the same for both waves");
+        return NULL;
+    }
+
+    // convert the starts to C contiguous array, and check them
+    starts = _get_starts(starts_raw, m);
+    if (starts == NULL) {
+        return NULL;
+    }
+    k = starts->dimensions[0];
+    starts_ptr = (int *)starts->data;
+
+    // create the values and lengths objects
+    dimensions[0] = k;
+    values = (PyArrayObject *)PyArray_SimpleNew(1, dimensions, NPY_DOUBLE);
+    lengths = (PyArrayObject *)PyArray_SimpleNew(1, dimensions, PyArray_INT32);
+    if ((values == NULL) || (lengths == NULL)) {
+        Py_XDECREF(values);
+        Py_XDECREF(lengths);
+        Py_DECREF(starts);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the values and lengths");
+        return NULL;
+    }
+    values_ptr = (double *)values->data;
+    lengths_ptr = (int *)lengths->data;
+
+    // pointer to data
+    mfcc1_ptr = (double *)mfcc1->data;
+    mfcc2_ptr = (double *)mfcc2->data;
+
+    // actual computation, one start at a time
+    result = 0;
+    Py_BEGIN_ALLOW_THREADS
+    for (h = 0; (h < k) && (result == 0); ++h) {
+        result = _compute_subsequence_costs(mfcc1_ptr, mfcc2_ptr, starts_ptr + h, n, m, l1, 1, min_length, max_length, values_ptr + h, lengths_ptr + h, NULL);
+    }
+    Py_END_ALLOW_THREADS
+
+    // decrement reference to local object no longer needed
+    Py_DECREF(starts);
+
+    if (result != 0) {
+        Py_DECREF(values);
+        Py_DECREF(lengths);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the columns of the accumulated cost matrix");
+        return NULL;
+    }
+
+    // return tuple with computed values and lengths
+    // PyTuple_SetItem steals a reference, so no PyDECREF is needed
+    tuple = PyTuple_New(2);
+    PyTuple_SetItem(tuple, 0, PyArray_Return(values));
+    PyTuple_SetItem(tuple, 1, PyArray_Return(lengths));
+    return tuple;
+}
+
+
+
+// compute the subsequence DTW of the first wave against the second one,
+// with all the starts at once
+// take the PyObject containing the following arguments:
+//   - mfcc1:       2D array (n x l) of double, C contiguous, MFCCs of the first wave (the query),
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - mfcc2:       2D array (m x l) of double, C contiguous, MFCCs of the second wave (the audio),
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - starts:      1D array (k x 1) of int32, the frames of the second wave
+//                  where a match can begin, sorted and distinct
+//   - max_length:  int, the max length (excluded) of a match, in frames of the second wave
+// and return end_costs, a 1D array (m x 1) of double, where end_costs[j] is
+// the min accumulated cost of a match ending at frame j, beginning at any start,
+// (or inf if no match ends there), which is a lower bound of the cost
+// of the matches ending there computed by cdtw_compute_subsequence_costs
+//
+// NOTE: the end costs are computed in a single pass, in O(m * n) time
+static PyObject *cdtw_compute_subsequence_end_costs(PyObject *self, PyObject *args) {
+    PyObject *mfcc1_raw;
+    PyObject *mfcc2_raw;
+    PyObject *starts_raw;
+    int max_length;
+
+    PyArrayObject *mfcc1, *mfcc2, *starts, *end_costs;
+    npy_intp dimensions[1];
+    double *mfcc1_ptr, *mfcc2_ptr, *values_ptr;
+    int *starts_ptr, *lengths_ptr;
+    int l1, l2, n, m, k, result;
+
+    // O = object (do not convert or check for errors)
+    // i = int
+    if (!PyArg_ParseTuple(args, "OOOi", &mfcc1_raw, &mfcc2_raw, &starts_raw, &max_length)) {
+        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOOi mask");
+        return NULL;
+    }
+
+    // get the MFCCs, without copying them
+    mfcc1 = _get_mfcc(mfcc1_raw);
+    mfcc2 = _get_mfcc(mfcc2_raw);
+    if ((mfcc1 == NULL) || (mfcc2 == NULL)) {
+        PyErr_SetString(PyExc_ValueError, "The MFCCs must be 2D C contiguous arrays of double");
+        return NULL;
+    }
+
+    // get the dimensions of the input arguments
+    n  = mfcc1->dimensions[0]; // number of frames in the first wave
+    m  = mfcc2->dimensions[0]; // number of frames in the second wave
+    l1 = mfcc1->dimensions[1]; // number of MFCCs in the first wave
+    l2 = mfcc2->dimensions[1]; // number of MFCCs in the second wave
+
+    // check that the number of MFCCs is the same for both waves
+    if (l1 != l2) {
+        PyErr_SetString(PyExc_ValueError, "The number of MFCCs must be the same for both waves");
+        return NULL;
+    }
+
+    // convert the starts to C contiguous array, and check them
+    starts = _get_starts(starts_raw, m);
+    if (starts == NULL) {
+        return NULL;
+    }
+    k = starts->dimensions[0];
+    starts_ptr = (int *)starts->data;
+
+    // create the end costs object, and the (unused) values and lengths of the starts
+    dimensions[0] = m;
+    end_costs = (PyArrayObject *)PyArray_SimpleNew(1, dimensions, NPY_DOUBLE);
+    values_ptr = (double *)malloc(((size_t)k + 1) * sizeof(double));
+    lengths_ptr = (int *)malloc(((size_t)k + 1) * sizeof(int));
+    if ((end_costs == NULL) || (values_ptr == NULL) || (lengths_ptr == NULL)) {
+        Py_XDECREF(end_costs);
+        free((void *)values_ptr);
+        free((void *)lengths_ptr);
+        Py_DECREF(starts);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the end costs");
+        return NULL;
+    }
+
+    // pointer to data
+    mfcc1_ptr = (double *)mfcc1->data;
+    mfcc2_ptr = (double *)mfcc2->data;
+
+    // actual computation
+    Py_BEGIN_ALLOW_THREADS
+    result = _compute_subsequence_costs(mfcc1_ptr, mfcc2_ptr, starts_ptr, n, m, l1, k, 0, max_length, values_ptr, lengths_ptr, (double *)end_costs->data);
+    Py_END_ALLOW_THREADS
+
+    // decrement reference to local objects no longer needed
+    Py_DECREF(starts);
+    free((void *)values_ptr);
+    free((void *)lengths_ptr);
+
+    if (result != 0) {
+        Py_DECREF(end_costs);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the columns of the accumulated cost matrix");
+        return NULL;
+    }
+
+    return PyArray_Return(end_costs);
+}
+
+
+
 // compute the cost matrix and the corresponding stripe centers 
 // take the PyObject containing the following arguments:
-//   - mfcc1:       2D array (l x n) of double, MFCCs of the first wave
-//   - mfcc2:       2D array (l x m) of double, MFCCs of the second wave
-//   - norm2_1:     1D array (n x 1) of double, norm2 of the first wave
-//   - norm2_2:     1D array (m x 1) of double, norm2 of the second wave
+//   - mfcc1:       2D array (n x l) of double, C contiguous, MFCCs of the first wave,
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
+//   - mfcc2:       2D array (m x l) of double, C contiguous, MFCCs of the second wave,
+//                  each frame normalized to unit norm2 (see MFCCFeatures.normalized)
 //   - delta:       int, the number of frames of margin
+//   - centers:     optional 1D array (n x 1) of int32, the index of the first column
+//                  of the stripe at each row (if not given or None, the stripe follows the main diagonal)
+//   - threads:     optional int, the number of threads computing the cost matrix (default: 1)
 // and return a tuple (cost_matrix, centers), where
 //   - cost_matrix: 2D array (n x delta) of double
 //   - centers:     1D array (n x 1) of int, centers[i] is the 0 <= center < m of the stripe at row i
 static PyObject *cdtw_compute_cost_matrix_step(PyObject *self, PyObject *args) {
     PyObject *mfcc1_raw;
     PyObject *mfcc2_raw;
-    PyObject *norm2_1_raw;
-    PyObject *norm2_2_raw;
+    PyObject *centers_raw = NULL;
     int delta;
+    int threads = 1;
 
-    PyArrayObject *mfcc1, *mfcc2, *norm2_1, *norm2_2, *cost_matrix, *centers;
+    PyArrayObject *mfcc1, *mfcc2, *cost_matrix, *centers, *given_centers;
     PyObject *tuple;
     npy_intp cost_matrix_dimensions[2];
     npy_intp centers_dimensions[1];
-    double *mfcc1_ptr, *mfcc2_ptr,  *norm2_1_ptr, *norm2_2_ptr, *cost_matrix_ptr;
+    double *mfcc1_ptr, *mfcc2_ptr, *cost_matrix_ptr;
     int *centers_ptr;
     int l1, l2, n, m;
    
     // O = object (do not convert or check for errors)
     // i = int
-    if (!PyArg_ParseTuple(args, "OOOOi", &mfcc1_raw, &mfcc2_raw, &norm2_1_raw, &norm2_2_raw, &delta)) {
-        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOOOi mask");
+    // | = the following arguments are optional
+    if (!PyArg_ParseTuple(args, "OOi|Oi", &mfcc1_raw, &mfcc2_raw, &delta, &centers_raw, &threads)) {
+        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments with the OOi|Oi mask");
         return NULL;
     }
 
-    // convert to C contiguous array
-    mfcc1   = (PyArrayObject *) PyArray_ContiguousFromObject(mfcc1_raw,   PyArray_DOUBLE, 2, 2);
-    mfcc2   = (PyArrayObject *) PyArray_ContiguousFromObject(mfcc2_raw,   PyArray_DOUBLE, 2, 2);
-    norm2_1 = (PyArrayObject *) PyArray_ContiguousFromObject(norm2_1_raw, PyArray_DOUBLE, 1, 1);
-    norm2_2 = (PyArrayObject *) PyArray_ContiguousFromObject(norm2_2_raw, PyArray_DOUBLE, 1, 1);
-
-    // check for conversion errors
-    if ((mfcc1 == NULL) || (mfcc2 == NULL) || (norm2_1 == NULL) || (norm2_2 == NULL)) {
-        PyErr_SetString(PyExc_ValueError, "Error while converting arguments using PyArray_ContiguousFromObject");
+    // get the MFCCs, without copying them
+    mfcc1 = _get_mfcc(mfcc1_raw);
+    mfcc2 = _get_mfcc(mfcc2_raw);
+    if ((mfcc1 == NULL) || (mfcc2 == NULL)) {
+        PyErr_SetString(PyExc_ValueError, "The MFCCs must be 2D C contiguous arrays of double");
         return NULL;
     }
-
-    // NOTE: if arrived here, the mfcc? and norm2_? have the correct number of dimensions (2 and 1, respectively)
    
     // get the dimensions of the input arguments
-    l1 = mfcc1->dimensions[0]; // number of MFCCs in the first wave
-    l2 = mfcc2->dimensions[0]; // number of MFCCs in the second wave
-    n  = mfcc1->dimensions[1]; // number of frames in the first wave
-    m  = mfcc2->dimensions[1]; // number of frames in the second wave
+    n  = mfcc1->dimensions[0]; // number of frames in the first wave
+    m  = mfcc2->dimensions[0]; // number of frames in the second wave
+    l1 = mfcc1->dimensions[1]; // number of MFCCs in the first wave
+    l2 = mfcc2->dimensions[1]; // number of MFCCs in the second wave
 
     // check that the number of MFCCs is the same for both waves
     if (l1 != l2) {
@@ -421,16 +1396,6 @@ static PyObject *cdtw_compute_cost_matrix_step(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    // check that the norm (1D) arrays have the correct number of elements
-    if (norm2_1->dimensions[0] != n) {
-        PyErr_SetString(PyExc_ValueError, "The number of columns of mfcc1 must be equal to the number of elements of norm2_1");
-        return NULL;
-    }
-    if (norm2_2->dimensions[0] != m) {
-        PyErr_SetString(PyExc_ValueError, "The number of columns of mfcc2 must be equal to the number of elements of norm2_2");
-        return NULL;
-    }
-
     // delta cannot be greater than m 
     if (delta > m) {
         delta = m;
@@ -439,8 +1404,6 @@ static PyObject *cdtw_compute_cost_matrix_step(PyObject *self, PyObject *args) {
     // pointer to cost matrix data
     mfcc1_ptr   = (double *)mfcc1->data;
     mfcc2_ptr   = (double *)mfcc2->data;
-    norm2_1_ptr = (double *)norm2_1->data;
-    norm2_2_ptr = (double *)norm2_2->data;
     
     // create cost matrix object
     cost_matrix_dimensions[0] = n;
@@ -452,15 +1415,32 @@ static PyObject *cdtw_compute_cost_matrix_step(PyObject *self, PyObject *args) {
     centers_dimensions[0] = n;
     centers = (PyArrayObject *)PyArray_SimpleNew(1, centers_dimensions, PyArray_INT32);
     centers_ptr = (int *)centers->data;
+
+    // compute the centers, or copy the given ones
+    if ((centers_raw != NULL) && (centers_raw != Py_None)) {
+        given_centers = (PyArrayObject *) PyArray_ContiguousFromObject(centers_raw, PyArray_INT32, 1, 1);
+        if ((given_centers == NULL) || (given_centers->dimensions[0] != n)) {
+            Py_DECREF(cost_matrix);
+            Py_DECREF(centers);
+            PyErr_SetString(PyExc_ValueError, "The number of elements of centers must be equal to the number of rows of mfcc1");
+            return NULL;
+        }
+        memcpy(centers_ptr, given_centers->data, n * sizeof(int));
+        Py_DECREF(given_centers);
+        if (_check_centers(centers_ptr, n, m, delta) != 0) {
+            Py_DECREF(cost_matrix);
+            Py_DECREF(centers);
+            PyErr_SetString(PyExc_ValueError, "The centers must be non-decreasing and the stripe must be within the rows of mfcc2");
+            return NULL;
+        }
+    } else {
+        _compute_centers(centers_ptr, n, m, delta);
+    }
     
     // compute cost matrix
-    _compute_cost_matrix(mfcc1_ptr, mfcc2_ptr, norm2_1_ptr, norm2_2_ptr, delta, cost_matrix_ptr, centers_ptr, n, m, l1);
-
-    // decrement reference to local object no longer needed
-    Py_DECREF(mfcc1);
-    Py_DECREF(mfcc2);
-    Py_DECREF(norm2_1);
-    Py_DECREF(norm2_2);
+    Py_BEGIN_ALLOW_THREADS
+    _compute_cost_matrix(mfcc1_ptr, mfcc2_ptr, delta, cost_matrix_ptr, centers_ptr, n, m, l1, threads);
+    Py_END_ALLOW_THREADS
 
     // return tuple with computed cost matrix and centers
     // PyTuple_SetItem steals a reference, so no PyDECREF is needed 
@@ -538,7 +1518,8 @@ static PyObject *cdtw_compute_accumulated_cost_matrix_step(PyObject *self, PyObj
 // take the PyObject containing the following arguments:
 //   - accumulated_cost_matrix: 2D array (n x delta) of double
 //   - centers:                 1D array (n x 1) of int, centers[i] is the 0 <= center < m of the stripe at row i
-// and return the best path as a list of (i, j) tuples, from (0,0) to (n-1, delta-1)
+// and return the best path as a 2D array (k x 2) of int32, each row being a pair (i, j),
+// from (0,0) to (n-1, m-1)
 static PyObject *cdtw_compute_best_path_step(PyObject *self, PyObject *args) {
     PyObject *accumulated_cost_matrix_raw;
     PyObject *centers_raw;
@@ -546,8 +1527,8 @@ static PyObject *cdtw_compute_best_path_step(PyObject *self, PyObject *args) {
     PyArrayObject *accumulated_cost_matrix, *centers;
     PyObject *best_path_ptr;
     double *accumulated_cost_matrix_ptr;
-    int *centers_ptr;
-    int n, delta;
+    int *centers_ptr, *path_ptr;
+    int n, delta, path_length;
 
     // O = object (do not convert or check for errors)
     if (!PyArg_ParseTuple(args, "OO", &accumulated_cost_matrix_raw, &centers_raw)) {
@@ -575,17 +1556,25 @@ static PyObject *cdtw_compute_best_path_step(PyObject *self, PyObject *args) {
     // pointer to centers data
     centers_ptr = (int *)centers->data;
     
-    // create best path array of integers
-    best_path_ptr = PyList_New(0);
+    // allocate the path, which has at most n + m pairs
+    path_ptr = (int *)malloc(2 * ((size_t)n + delta + centers_ptr[n-1]) * sizeof(int));
+    if (path_ptr == NULL) {
+        Py_DECREF(accumulated_cost_matrix);
+        Py_DECREF(centers);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate the path");
+        return NULL;
+    }
     
     // compute best path
-    _compute_best_path(accumulated_cost_matrix_ptr, centers_ptr, n, delta, best_path_ptr);
+    _compute_best_path(accumulated_cost_matrix_ptr, centers_ptr, n, delta, path_ptr, &path_length);
 
     // decrement reference to local object no longer needed
     Py_DECREF(accumulated_cost_matrix);
     Py_DECREF(centers);
 
     // return computed best path
+    best_path_ptr = _create_best_path(path_ptr, path_length);
+    free((void *)path_ptr);
     return best_path_ptr;
 }
 
@@ -599,6 +1588,24 @@ static PyMethodDef cdtw_methods[] = {
         METH_VARARGS,
         "Given the MFCCs of the two waves, compute and return the DTW best path at once"
     },
+    {
+        "cdtw_compute_best_path_checkpoint",
+        cdtw_compute_best_path_checkpoint,
+        METH_VARARGS,
+        "Given the MFCCs of the two waves, compute and return the DTW best path at once, using checkpoints to bound the memory"
+    },
+    {
+        "cdtw_compute_subsequence_costs",
+        cdtw_compute_subsequence_costs,
+        METH_VARARGS,
+        "Given the MFCCs of a query wave and of an audio wave, compute the min cost of a match of the query beginning at each of the given frames of the audio"
+    },
+    {
+        "cdtw_compute_subsequence_end_costs",
+        cdtw_compute_subsequence_end_costs,
+        METH_VARARGS,
+        "Given the MFCCs of a query wave and of an audio wave, compute the min cost of a match of the query ending at each frame of the audio, beginning at any of the given frames"
+    },
     // compute in separate steps
     {
         "cdtw_compute_cost_matrix_step",
@@ -32,7 +32,12 @@ for compiled in ["cdtw.so", "cdtw.dylib", "cdtw.dll"]:
         except:
             pass
 
-CMODULE = Extension("cdtw", sources=["cdtw.c"])
+# on POSIX systems, the cost matrix is computed by multiple threads
+LIBRARIES = []
+if os.name != "nt":
+    LIBRARIES = ["pthread"]
+
+CMODULE = Extension("cdtw", sources=["cdtw.c"], libraries=LIBRARIES)
 
 setup(
     name="cdtw",
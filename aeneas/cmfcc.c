@@ -33,6 +33,14 @@ static int _min(int a, int b) {
     return b;
 }
 
+// return the max of the given arguments
+static int _max(int a, int b) {
+    if (a > b) {
+        return a;
+    }
+    return b;
+}
+
 // round to the nearest integer
 static int _round(double x) {
     if (x < 0) {
@@ -197,7 +205,8 @@ static double mel2hz(const double m) {
     return 700.0 * (pow(10.0, m / MEL_10) - 1.0);
 }
 
-// pre emphasis of the given frame
+// pre emphasis of the given frame, in place
+// (going backwards, so that each sample is read before being overwritten)
 // returns the prior to be used for the next frame
 static void apply_emphasis(
         double *frame,
@@ -206,39 +215,36 @@ static void apply_emphasis(
         double *prior
     ) {
     double prior_orig;
-    double *frame_orig;
     int i;
     
     prior_orig = frame[length - 1];
-    frame_orig = (double *)calloc(length, sizeof(double));
-    memcpy(frame_orig, frame, length * sizeof(double));
-    frame[0] = frame_orig[0] - emphasis_factor * (*prior);
-    for (i = 1; i < length; ++i) {
-        frame[i] = frame_orig[i] - frame_orig[i-1] * emphasis_factor;
+    for (i = length - 1; i > 0; --i) {
+        frame[i] = frame[i] - frame[i-1] * emphasis_factor;
     }
-    free((void *)frame_orig);
+    frame[0] = frame[0] - emphasis_factor * (*prior);
     *prior = prior_orig;
 }
 
 // compute the power of the given frame
+// tmp is a working buffer of (at least) length + 1 + (length / 2) values,
+// which is zeroed here
 static void compute_power(
         double *frame,
         double *power,
+        double *tmp,
         const int length,
         double *sin_table_full,
         double *sin_table_half
     ) {
     const int extra = 1 + (length / 2);
-    double *tmp;
     int k;
 
-    tmp = (double *)calloc(length + extra, sizeof(double));
+    memset(tmp, 0, (length + extra) * sizeof(double));
     rfft(frame, tmp, length, sin_table_full, sin_table_half);
     power[0] = frame[0] * frame[0];
     for (k = 1; k < extra; ++k) {
         power[k] = frame[k] * frame[k] + tmp[k] * tmp[k];
     }
-    free((void *)tmp);
 }
 
 // transform the frame using the Hamming window
@@ -265,6 +271,16 @@ static double *precompute_hamming(const int length) {
     return coefficients;
 }
 
+// a triangular filter of the Mel filter bank,
+// storing only its weights over the FFT bins
+// start, ..., start + length - 1,
+// since the weights over the other bins are zero
+struct FILTER {
+    int start;
+    int length;
+    double *weights;
+};
+
 // create Mel filter bank
 // return a pointer to a 2D matrix (filters_n x filter_bank_size)
 static double *create_mel_filter_bank(
@@ -328,6 +344,47 @@ static double *create_mel_filter_bank(
     return filters;
 }
 
+// create the sparse version of the given Mel filter bank
+// (2D matrix, filters_n x filter_bank_size),
+// that is, an array of filter_bank_size filters,
+// whose weights are stored into a single array
+static struct FILTER *create_sparse_mel_filter_bank(
+        double *filters,
+        int filters_n,
+        int filter_bank_size,
+        double **weights
+    ) {
+    struct FILTER *sparse_filters;
+    double *weights_ptr;
+    int i, j, start, end, total_length;
+
+    sparse_filters = (struct FILTER *)calloc(filter_bank_size, sizeof(struct FILTER));
+    total_length = 0;
+    for (j = 0; j < filter_bank_size; ++j) {
+        start = 0;
+        while ((start < filters_n) && (filters[start * filter_bank_size + j] == 0.0)) {
+            ++start;
+        }
+        end = filters_n;
+        while ((end > start) && (filters[(end - 1) * filter_bank_size + j] == 0.0)) {
+            --end;
+        }
+        sparse_filters[j].start = start;
+        sparse_filters[j].length = end - start;
+        total_length += end - start;
+    }
+    *weights = (double *)calloc(_max(total_length, 1), sizeof(double));
+    weights_ptr = *weights;
+    for (j = 0; j < filter_bank_size; ++j) {
+        sparse_filters[j].weights = weights_ptr;
+        for (i = 0; i < sparse_filters[j].length; ++i) {
+            weights_ptr[i] = filters[(sparse_filters[j].start + i) * filter_bank_size + j];
+        }
+        weights_ptr += sparse_filters[j].length;
+    }
+    return sparse_filters;
+}
+
 // create the DCT matrix
 // return a pointer to a 2D matrix (mfcc_size x filter_bank_size)
 static double *create_dct_matrix(int mfcc_size, int filter_bank_size) {
@@ -348,13 +405,307 @@ static double *create_dct_matrix(int mfcc_size, int filter_bank_size) {
     return s2dct;
 }
 
+// the tables used to compute the MFCCs
+// (sparse Mel filter bank, DCT matrix, sin tables for the FFT, Hamming window),
+// which depend only on the parameters stored here
+struct TABLES {
+    int sample_rate;
+    int filter_bank_size;
+    int mfcc_size;
+    int fft_order;
+    int frame_length;
+    double lower_frequency;
+    double upper_frequency;
+    struct FILTER *sparse_filters;
+    double *filter_weights;
+    double *s2dct;
+    double *sin_table_full;
+    double *sin_table_half;
+    double *hamming_coefficients;
+    unsigned long last_used;
+};
+
+// the tables are cached, keyed by their parameters,
+// so that they are not built again on every call;
+// when the cache is full, the least recently used tables are freed
+// (the cache is only accessed holding the GIL)
+#define TABLES_CACHE_SIZE 16
+static struct TABLES *tables_cache[TABLES_CACHE_SIZE];
+static unsigned long tables_cache_clock = 0;
+static unsigned long tables_cache_hits = 0;
+static unsigned long tables_cache_misses = 0;
+
+// create the tables for the given parameters
+static struct TABLES *create_tables(
+        const int sample_rate,
+        const int filter_bank_size,
+        const int mfcc_size,
+        const int fft_order,
+        const int frame_length,
+        const double lower_frequency,
+        const double upper_frequency
+    ) {
+    struct TABLES *tables;
+    double *filters;
+
+    tables = (struct TABLES *)calloc(1, sizeof(struct TABLES));
+    tables->sample_rate = sample_rate;
+    tables->filter_bank_size = filter_bank_size;
+    tables->mfcc_size = mfcc_size;
+    tables->fft_order = fft_order;
+    tables->frame_length = frame_length;
+    tables->lower_frequency = lower_frequency;
+    tables->upper_frequency = upper_frequency;
+
+    // create Mel filter bank (2D matrix, filters_n x filter_bank_size)
+    // and store only its non zero weights
+    filters = create_mel_filter_bank(
+            fft_order,
+            filter_bank_size,
+            sample_rate,
+            upper_frequency,
+            lower_frequency);
+    tables->sparse_filters = create_sparse_mel_filter_bank(
+            filters,
+            (fft_order / 2) + 1,
+            filter_bank_size,
+            &(tables->filter_weights));
+    free((void *)filters);
+
+    // compute DCT matrix
+    tables->s2dct = create_dct_matrix(mfcc_size, filter_bank_size);
+
+    // precompute sin tables
+    tables->sin_table_full = precompute_sin_table(fft_order);
+    tables->sin_table_half = precompute_sin_table(fft_order / 2);
+
+    // precompute hamming coefficients
+    tables->hamming_coefficients = precompute_hamming(frame_length);
+
+    return tables;
+}
+
+// free the given tables
+static void free_tables(struct TABLES *tables) {
+    free((void *)tables->hamming_coefficients);
+    free((void *)tables->sin_table_half);
+    free((void *)tables->sin_table_full);
+    free((void *)tables->s2dct);
+    free((void *)tables->sparse_filters);
+    free((void *)tables->filter_weights);
+    free((void *)tables);
+}
+
+// return the tables for the given parameters,
+// from the cache if possible, otherwise creating and caching them
+// NOTE: the returned tables are owned by the cache
+static struct TABLES *get_tables(
+        const int sample_rate,
+        const int filter_bank_size,
+        const int mfcc_size,
+        const int fft_order,
+        const int frame_length,
+        const double lower_frequency,
+        const double upper_frequency
+    ) {
+    struct TABLES *tables;
+    int k, slot;
+
+    slot = 0;
+    for (k = 0; k < TABLES_CACHE_SIZE; ++k) {
+        tables = tables_cache[k];
+        if (tables == NULL) {
+            slot = k;
+            break;
+        }
+        if (
+                (tables->sample_rate == sample_rate) &&
+                (tables->filter_bank_size == filter_bank_size) &&
+                (tables->mfcc_size == mfcc_size) &&
+                (tables->fft_order == fft_order) &&
+                (tables->frame_length == frame_length) &&
+                (tables->lower_frequency == lower_frequency) &&
+                (tables->upper_frequency == upper_frequency)
+            ) {
+            ++tables_cache_hits;
+            tables->last_used = ++tables_cache_clock;
+            return tables;
+        }
+        if (tables->last_used < tables_cache[slot]->last_used) {
+            slot = k;
+        }
+    }
+
+    // not cached: replace the empty or the least recently used slot
+    ++tables_cache_misses;
+    if (tables_cache[slot] != NULL) {
+        free_tables(tables_cache[slot]);
+    }
+    tables = create_tables(
+            sample_rate,
+            filter_bank_size,
+            mfcc_size,
+            fft_order,
+            frame_length,
+            lower_frequency,
+            upper_frequency);
+    tables->last_used = ++tables_cache_clock;
+    tables_cache[slot] = tables;
+    return tables;
+}
+
+// compute the MFCCs of the frames first_frame, ..., first_frame + number_of_frames - 1
+// of a signal, storing them into mfcc_ptr (or mfcc_float_ptr, if single_precision)
+// as a number_of_frames x mfcc_size 2D matrix
+//
+// the given signal buffer holds the samples of the signal
+// from signal_offset to signal_offset + signal_length - 1,
+// and it must contain all the samples of the given frames
+// that are inside the signal:
+// the samples of a frame past the end of the buffer are taken to be zero
+//
+// prior is the value of the last sample of the frame before first_frame
+// (zero for the first frame of the signal),
+// and it is updated to the value of the last sample of the last computed frame
+static void _compute_mfcc_frames(
+        double *signal_ptr,
+        float *signal_float_ptr,
+        const int single_precision,
+        const int signal_length,
+        const int signal_offset,
+        const int first_frame,
+        const int number_of_frames,
+        double *prior,
+        double *mfcc_ptr,
+        float *mfcc_float_ptr,
+        const int sample_rate,
+        const int frame_rate,
+        const int filter_bank_size,
+        const int mfcc_size,
+        const int fft_order,
+        const double lower_frequency,
+        const double upper_frequency,
+        const double emphasis_factor,
+        const double window_length
+    ) {
+    double samples_per_frame, acc;
+    double *s2dct, *sin_table_full, *sin_table_half, *hamming_coefficients;
+    double *frame, *tmp, *power, *logsp, *power_ptr;
+    struct FILTER *sparse_filters;
+    struct TABLES *tables;
+    int filters_n, frame_length, frame_buffer_length;
+    int i, j, k, frame_index, frame_start, frame_end;
+
+    filters_n = ((fft_order / 2) + 1);
+
+    // samples per frame
+    samples_per_frame = 1.0 * sample_rate / frame_rate;
+
+    // length of a frame
+    frame_length = (int)floor(window_length * sample_rate);
+
+    // the FFT works in place on fft_order values,
+    // so the frame buffer is zero-padded up to fft_order
+    frame_buffer_length = _max(frame_length, fft_order);
+
+    // get Mel filter bank, DCT matrix, sin tables and hamming coefficients
+    tables = get_tables(
+            sample_rate,
+            filter_bank_size,
+            mfcc_size,
+            fft_order,
+            frame_length,
+            lower_frequency,
+            upper_frequency);
+    sparse_filters = tables->sparse_filters;
+    s2dct = tables->s2dct;
+    sin_table_full = tables->sin_table_full;
+    sin_table_half = tables->sin_table_half;
+    hamming_coefficients = tables->hamming_coefficients;
+
+    // allocate working buffers, reused by all the frames
+    frame = (double *)calloc(frame_buffer_length, sizeof(double));
+    tmp = (double *)calloc(fft_order + 1 + (fft_order / 2), sizeof(double));
+    power = (double *)calloc(filters_n, sizeof(double));
+    logsp = (double *)calloc(filter_bank_size, sizeof(double));
+
+    // process frames
+    for (k = 0; k < number_of_frames; ++k) {
+        frame_index = first_frame + k;
+
+        // copy frame values, with indices relative to the signal buffer
+        frame_start = _round(frame_index * samples_per_frame) - signal_offset;
+        frame_end = _min(frame_start + frame_length, signal_length);
+        // NOTE: the frame buffer is zeroed first => last frame is zero-padded,
+        //       if (frame_end - frame_start) < frame_length
+        memset(frame, 0, frame_buffer_length * sizeof(double));
+        if (single_precision) {
+            for (i = frame_start; i < frame_end; ++i) {
+                frame[i - frame_start] = signal_float_ptr[i];
+            }
+        } else if (frame_end > frame_start) {
+            memcpy(frame, signal_ptr + frame_start, (frame_end - frame_start) * sizeof(double));
+        }
+
+        // emphasis + hamming + compute power
+        apply_emphasis(frame, frame_length, emphasis_factor, prior);
+        apply_hamming(frame, frame_length, hamming_coefficients);
+        compute_power(frame, power, tmp, fft_order, sin_table_full, sin_table_half);
+
+        // apply Mel filter bank, over the non zero weights only
+        for (j = 0; j < filter_bank_size; ++j) {
+            acc = 0.0;
+            power_ptr = power + sparse_filters[j].start;
+            for (i = 0; i < sparse_filters[j].length; ++i) {
+                acc += power_ptr[i] * sparse_filters[j].weights[i];
+            }
+            if (acc < CUTOFF) {
+                acc = CUTOFF;
+            }
+            logsp[j] = log(acc);
+        }
+
+        // multiply by DCT matrix
+        for (i = 0; i < mfcc_size; ++i) {
+            acc = 0.0;
+            for (j = 0; j < filter_bank_size; ++j) {
+                acc += logsp[j] * s2dct[i * filter_bank_size + j];
+            }
+            if (single_precision) {
+                mfcc_float_ptr[k * mfcc_size + i] = (float)(acc / filter_bank_size);
+            } else {
+                mfcc_ptr[k * mfcc_size + i] = acc / filter_bank_size;
+            }
+        }
+    }
+
+    // free working buffers
+    free((void *)logsp);
+    free((void *)power);
+    free((void *)tmp);
+    free((void *)frame);
+}
+
+// convert the given signal to a C contiguous array,
+// keeping float32 data as it is
+static PyArrayObject *_get_signal(PyObject *signal_raw, int *single_precision) {
+    *single_precision = (PyArray_Check(signal_raw) && (PyArray_TYPE((PyArrayObject *)signal_raw) == PyArray_FLOAT));
+    if (*single_precision) {
+        return (PyArrayObject *) PyArray_ContiguousFromObject(signal_raw, PyArray_FLOAT, 1, 1);
+    }
+    return (PyArrayObject *) PyArray_ContiguousFromObject(signal_raw, PyArray_DOUBLE, 1, 1);
+}
+
 // compute the MFCCs of the given signal 
 // take the PyObject containing the following arguments (see below)
 // and return the MFCCs as a n x mfcc_size 2D array of double, where
 //   - n is the number of frames
 //   - mfcc_size is the number of ceptral coefficients (including the 0-th)
+// if the signal is a 1D array of float32, the MFCCs are returned
+// as a 2D array of float32 instead, and the signal is not converted to double
+// (each frame is still processed in double precision)
 static PyObject *cmfcc_compute_mfcc(PyObject *self, PyObject *args) {
-    PyObject *signal_raw;   // 1D array of double, holding the signal
+    PyObject *signal_raw;   // 1D array of double (or float32), holding the signal
     int sample_rate;        // sample rate (default: 16000)
     int frame_rate;         // frame rate (default: 25)
     int filter_bank_size;   // number of filters in the filter bank (default: 40)
@@ -367,12 +718,9 @@ static PyObject *cmfcc_compute_mfcc(PyObject *self, PyObject *args) {
 
     PyArrayObject *signal, *mfcc;
     npy_intp mfcc_dimensions[2];
-    double samples_per_frame, prior, acc;
-    double *signal_ptr, *mfcc_ptr;
-    double *filters, *s2dct, *sin_table_full, *sin_table_half, *hamming_coefficients;
-    double *frame, *power, *logsp;
-    int signal_length, filters_n, frame_length, number_of_frames;
-    int i, j, frame_index, frame_start, frame_end;
+    double samples_per_frame, prior;
+    int single_precision;
+    int signal_length, number_of_frames;
 
     // TODO use PyArg_ParseTupleAndKeywords instead, to have default values set automatically
     // O = object (do not convert or check for errors)
@@ -401,115 +749,208 @@ static PyObject *cmfcc_compute_mfcc(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    // convert to C contiguous array
-    signal = (PyArrayObject *) PyArray_ContiguousFromObject(signal_raw, PyArray_DOUBLE, 1, 1);
+    // convert to C contiguous array, keeping float32 data as it is
+    signal = _get_signal(signal_raw, &single_precision);
+    if (signal == NULL) {
+        PyErr_SetString(PyExc_ValueError, "Error while converting the signal using PyArray_ContiguousFromObject");
+        return NULL;
+    }
 
-    // pointer to signal data
-    signal_ptr = (double *)signal->data;
-    
     // get the number of samples of signal
     // NOTE: this is not the duration (in seconds), which is (n / sample_rate) !
     signal_length = signal->dimensions[0];
 
-    // create Mel filter bank (2D matrix, filters_n x filter_bank_size)
-    filters_n = ((fft_order / 2) + 1);
-    filters = create_mel_filter_bank(
-            fft_order,
-            filter_bank_size,
-            sample_rate,
-            upper_frequency,
-            lower_frequency);
-
-    // compute DCT matrix
-    s2dct = create_dct_matrix(mfcc_size, filter_bank_size);
-
     // samples per frame
     samples_per_frame = 1.0 * sample_rate / frame_rate;
 
-    // length of a frame
-    frame_length = (int)floor(window_length * sample_rate);
-
     // value of the last sample in the previous frame
     prior = 0.0;
 
     // number of frames
     number_of_frames = floor((signal_length / samples_per_frame) + 1);
 
-    // allocate the mfcc matrix 
-    mfcc_ptr = (double *)calloc(number_of_frames * mfcc_size, sizeof(double));
+    // create the mfcc matrix (number_of_frames x mfcc_size)
+    mfcc_dimensions[0] = number_of_frames;
+    mfcc_dimensions[1] = mfcc_size;
+    if (single_precision) {
+        mfcc = (PyArrayObject *) PyArray_SimpleNew(2, mfcc_dimensions, PyArray_FLOAT);
+    } else {
+        mfcc = (PyArrayObject *) PyArray_SimpleNew(2, mfcc_dimensions, PyArray_DOUBLE);
+    }
 
-    // precompute sin tables
-    sin_table_full = precompute_sin_table(fft_order);
-    sin_table_half = precompute_sin_table(fft_order / 2);
+    _compute_mfcc_frames(
+            (double *)signal->data,
+            (float *)signal->data,
+            single_precision,
+            signal_length,
+            0,
+            0,
+            number_of_frames,
+            &prior,
+            (double *)mfcc->data,
+            (float *)mfcc->data,
+            sample_rate,
+            frame_rate,
+            filter_bank_size,
+            mfcc_size,
+            fft_order,
+            lower_frequency,
+            upper_frequency,
+            emphasis_factor,
+            window_length);
 
-    // precompute hamming coefficients
-    hamming_coefficients = precompute_hamming(frame_length);
+    // decrement reference to local object no longer needed
+    Py_DECREF(signal);
+    
+    // return computed mfcc 
+    return PyArray_Return(mfcc);
+}
 
-    // TODO porting Python code "verbatim",
-    //      but some code cleanup should be done here
-    // process frames
-    for (frame_index = 0; frame_index < number_of_frames; ++frame_index) {
-        
-        // allocate working buffers
-        frame = (double *)calloc(frame_length, sizeof(double));
-        power = (double *)calloc(filters_n, sizeof(double));
-        logsp = (double *)calloc(filter_bank_size, sizeof(double));
-
-        // TODO porting Python code "verbatim",
-        //      but some code cleanup should be done here
-        // copy frame values
-        frame_start = _round(frame_index * samples_per_frame);
-        frame_end = _min(frame_start + frame_length, signal_length);
-        // NOTE: using calloc => last frame is zero-padded, if (frame_end - frame_start) < frame_length
-        memcpy(frame, signal_ptr + frame_start, (frame_end - frame_start) * sizeof(double));
-      
-        // emphasis + hamming + compute power
-        apply_emphasis(frame, frame_length, emphasis_factor, &prior);
-        apply_hamming(frame, frame_length, hamming_coefficients);
-        compute_power(frame, power, fft_order, sin_table_full, sin_table_half);
-       
-        // apply Mel filter bank
-        for (j = 0; j < filter_bank_size; ++j) {
-            acc = 0.0;
-            for (i = 0; i < filters_n; ++i) {
-                acc += power[i] * filters[i * filter_bank_size + j];
-            }
-            if (acc < CUTOFF) {
-                acc = CUTOFF;
-            }
-            logsp[j] = log(acc);
-        }
-        
-        // multiply by DCT matrix
-        for (i = 0; i < mfcc_size; ++i) {
-            acc = 0.0;
-            for (j = 0; j < filter_bank_size; ++j) {
-                acc += logsp[j] * s2dct[i * filter_bank_size + j];
-            }
-            mfcc_ptr[frame_index * mfcc_size + i] = acc / filter_bank_size;
-        }
+// compute the MFCCs of some frames of a signal,
+// given a buffer holding a portion of the signal,
+// so that the MFCCs of a long signal can be computed block by block
+// take the PyObject containing the following arguments (see below)
+// and return a tuple (mfcc, prior), where
+//   - mfcc is a number_of_frames x mfcc_size 2D array of double
+//     (or float32, if the signal is a 1D array of float32)
+//   - prior is the value of the last sample of the last computed frame,
+//     to be passed when computing the next frame
+// the MFCCs are identical to those computed by cmfcc_compute_mfcc on the whole signal
+static PyObject *cmfcc_compute_mfcc_frames(PyObject *self, PyObject *args) {
+    PyObject *signal_raw;   // 1D array of double (or float32), holding a portion of the signal
+    int signal_offset;      // index, in the whole signal, of the first sample of signal_raw
+    int first_frame;        // index of the first frame to be computed
+    int number_of_frames;   // number of frames to be computed
+    double prior;           // value of the last sample of the frame before first_frame
+    int sample_rate;        // sample rate (default: 16000)
+    int frame_rate;         // frame rate (default: 25)
+    int filter_bank_size;   // number of filters in the filter bank (default: 40)
+    int mfcc_size;          // number of ceptral coefficients (default: 13)
+    int fft_order;          // FFT order; must be a power of 2 (default: 512)
+    double lower_frequency; // lower frequency (default: 133.3333)
+    double upper_frequency; // upper frequency; must be <= sample_rate/2 = Nyquist frequency (default: 6855.4976)
+    double emphasis_factor; // pre-emphasis factor (default: 0.97)
+    double window_length;   // window length (default: 0.0256)
+
+    PyArrayObject *signal, *mfcc;
+    npy_intp mfcc_dimensions[2];
+    double samples_per_frame;
+    int single_precision;
+    int signal_length;
 
-        // free working buffers
-        free((void *)logsp);
-        free((void *)power);
-        free((void *)frame);
+    // O = object (do not convert or check for errors)
+    // i = integer
+    // d = double
+    if (!PyArg_ParseTuple(
+                args,
+                "Oiiidiiiiidddd",
+                &signal_raw,
+                &signal_offset,
+                &first_frame,
+                &number_of_frames,
+                &prior,
+                &sample_rate,
+                &frame_rate,
+                &filter_bank_size,
+                &mfcc_size,
+                &fft_order,
+                &lower_frequency,
+                &upper_frequency,
+                &emphasis_factor,
+                &window_length)) {
+        PyErr_SetString(PyExc_ValueError, "Error while parsing the arguments");
+        return NULL;
     }
 
-    // decrement reference to local object no longer needed
-    free((void *)hamming_coefficients);
-    free((void *)sin_table_half);
-    free((void *)sin_table_full);
-    free((void *)s2dct);
-    free((void *)filters);
-    Py_DECREF(signal);
-    
-    // create mfcc object
+    if (upper_frequency > sample_rate / 2.0) {
+        // raise exception
+        PyErr_SetString(PyExc_ValueError, "Upper frequency exceeds Nyquist");
+        return NULL;
+    }
+
+    if ((first_frame < 0) || (number_of_frames < 0)) {
+        PyErr_SetString(PyExc_ValueError, "The frame indices must be non negative");
+        return NULL;
+    }
+
+    // convert to C contiguous array, keeping float32 data as it is
+    signal = _get_signal(signal_raw, &single_precision);
+    if (signal == NULL) {
+        PyErr_SetString(PyExc_ValueError, "Error while converting the signal using PyArray_ContiguousFromObject");
+        return NULL;
+    }
+    signal_length = signal->dimensions[0];
+
+    // the buffer must start at or before the first sample of the first frame
+    samples_per_frame = 1.0 * sample_rate / frame_rate;
+    if ((number_of_frames > 0) && (_round(first_frame * samples_per_frame) < signal_offset)) {
+        Py_DECREF(signal);
+        PyErr_SetString(PyExc_ValueError, "The signal buffer starts after the first frame");
+        return NULL;
+    }
+
+    // create the mfcc matrix (number_of_frames x mfcc_size)
     mfcc_dimensions[0] = number_of_frames;
     mfcc_dimensions[1] = mfcc_size;
-    mfcc = (PyArrayObject *) PyArray_SimpleNewFromData(2, mfcc_dimensions, PyArray_DOUBLE, mfcc_ptr);
-    
-    // return computed mfcc 
-    return PyArray_Return(mfcc);
+    if (single_precision) {
+        mfcc = (PyArrayObject *) PyArray_SimpleNew(2, mfcc_dimensions, PyArray_FLOAT);
+    } else {
+        mfcc = (PyArrayObject *) PyArray_SimpleNew(2, mfcc_dimensions, PyArray_DOUBLE);
+    }
+
+    _compute_mfcc_frames(
+            (double *)signal->data,
+            (float *)signal->data,
+            single_precision,
+            signal_length,
+            signal_offset,
+            first_frame,
+            number_of_frames,
+            &prior,
+            (double *)mfcc->data,
+            (float *)mfcc->data,
+            sample_rate,
+            frame_rate,
+            filter_bank_size,
+            mfcc_size,
+            fft_order,
+            lower_frequency,
+            upper_frequency,
+            emphasis_factor,
+            window_length);
+
+    // decrement reference to local object no longer needed
+    Py_DECREF(signal);
+
+    return Py_BuildValue("Nd", PyArray_Return(mfcc), prior);
+}
+
+// return a tuple (hits, misses, size) describing the cache of the tables
+static PyObject *cmfcc_cache_info(PyObject *self, PyObject *args) {
+    int k, size;
+
+    size = 0;
+    for (k = 0; k < TABLES_CACHE_SIZE; ++k) {
+        if (tables_cache[k] != NULL) {
+            ++size;
+        }
+    }
+    return Py_BuildValue("kki", tables_cache_hits, tables_cache_misses, size);
+}
+
+// free all the cached tables and reset the counters
+static PyObject *cmfcc_cache_clear(PyObject *self, PyObject *args) {
+    int k;
+
+    for (k = 0; k < TABLES_CACHE_SIZE; ++k) {
+        if (tables_cache[k] != NULL) {
+            free_tables(tables_cache[k]);
+            tables_cache[k] = NULL;
+        }
+    }
+    tables_cache_hits = 0;
+    tables_cache_misses = 0;
+    Py_RETURN_NONE;
 }
 
 static PyMethodDef cmfcc_methods[] = {
@@ -519,6 +960,24 @@ static PyMethodDef cmfcc_methods[] = {
         METH_VARARGS,
         "Given the wave data, compute and return the MFCCs"
     },
+    {
+        "cmfcc_compute_mfcc_frames",
+        cmfcc_compute_mfcc_frames,
+        METH_VARARGS,
+        "Given a portion of the wave data, compute and return the MFCCs of the given frames"
+    },
+    {
+        "cmfcc_cache_info",
+        cmfcc_cache_info,
+        METH_NOARGS,
+        "Return a tuple (hits, misses, size) describing the cache of the MFCC tables"
+    },
+    {
+        "cmfcc_cache_clear",
+        cmfcc_cache_clear,
+        METH_NOARGS,
+        "Free the cached MFCC tables and reset the counters"
+    },
     {
         NULL,
         NULL,
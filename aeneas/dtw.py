@@ -7,13 +7,24 @@ of dynamic time warping (DTW) algorithms
 to align two audio waves, represented by their
 Mel-frequency cepstral coefficients (MFCCs).
 
-The two classes provided by this module are:
+The main classes provided by this module are:
 
 1. :class:`aeneas.dtw.DTWAlgorithm`
    is an enumeration of the available algorithms.
-2. :class:`aeneas.dtw.DTWAligner`
+2. :class:`aeneas.dtw.DTWCentering`
+   is an enumeration of the available ways
+   of centering the stripe of striped algorithms.
+3. :class:`aeneas.dtw.DTWAligner`
    is the actual feature extractor and aligner.
 
+:class:`aeneas.dtw.DTWSegmentedAligner`
+is an aligner which splits the waves at matching pauses,
+and aligns the resulting segments in parallel.
+
+:class:`aeneas.dtw.DTWOnline`
+is an online aligner, for real waves
+which are still being recorded or streamed.
+
 To align two wave files:
 
 1. build an :class:`aeneas.dtw.DTWAligner` object
@@ -27,6 +38,7 @@ To align two wave files:
    ``computed_map`` property.
 """
 
+import multiprocessing
 import numpy
 import os
 
@@ -34,6 +46,8 @@ import aeneas.globalconstants as gc
 import aeneas.globalfunctions as gf
 from aeneas.audiofile import AudioFile
 from aeneas.logger import Logger
+from aeneas.mfccfeatures import MFCCFeatures
+from aeneas.vad import VAD
 
 __author__ = "Alberto Pettarin"
 __copyright__ = """
@@ -70,7 +84,105 @@ class DTWAlgorithm(object):
     and ``d`` is the number of MFCCs
     corresponding to the margin. """
 
-    ALLOWED_VALUES = [EXACT, STRIPE]
+    CHECKPOINT = "checkpoint"
+    """ DTW algorithm restricted to a stripe around the main diagonal,
+    like ``STRIPE``, but storing only one row of the accumulated
+    cost matrix every ``k`` rows (checkpoints),
+    and recomputing the rows between two consecutive checkpoints
+    while backtracking.
+
+    It computes the same path as ``STRIPE``.
+
+    This implementation has ``O(nd)`` time complexity,
+    and ``O((n/k + k)d)`` space complexity,
+    where ``n`` is the number of MFCCs of the real wave,
+    ``d`` is the number of MFCCs
+    corresponding to the margin,
+    and ``k`` is the checkpoint interval (default: ``sqrt(n)``).
+
+    .. versionadded:: 1.3.0
+    """
+
+    MULTIRESOLUTION = "multiresolution"
+    """ Multi-resolution (coarse-to-fine) DTW algorithm.
+
+    The MFCCs of both waves are first downsampled
+    by a factor ``f`` (default: ``8``),
+    and aligned with a stripe around the main diagonal.
+    Then the path is projected to the next finer level
+    (with half the downsampling factor),
+    where it is refined inside a narrow corridor around it,
+    until the full resolution is reached.
+
+    Note that this is an heuristic approximation of the optimal (exact) path.
+
+    This implementation has ``O(nd/f^2 + nr)`` time and space complexity,
+    where ``n`` is the number of MFCCs of the real wave,
+    ``d`` is the number of MFCCs corresponding to the margin,
+    and ``r`` is the number of MFCCs corresponding to the corridor radius
+    (default: ``5s``), plus the width of the projected path.
+    If the corridor is wider than the stripe of ``STRIPE``,
+    the path is computed as done by ``STRIPE``.
+
+    .. versionadded:: 1.3.0
+    """
+
+    ADAPTIVE = "adaptive"
+    """ DTW algorithm restricted to a stripe,
+    like ``STRIPE``, but starting with a narrow stripe
+    around the main diagonal (default: ``5s`` margin),
+    and realigning with a stripe twice as wide,
+    following the path, only the regions
+    where the path touches the boundary of the stripe,
+    until it does not touch it anymore,
+    or the stripe reaches the full margin.
+
+    Note that this is an heuristic approximation of the optimal (exact) path.
+
+    This implementation has ``O(nd)`` time and space complexity,
+    where ``n`` is the number of MFCCs of the real wave,
+    and ``d`` is the number of MFCCs
+    corresponding to the initial margin,
+    plus ``O(n'd')`` for each realigned region,
+    where ``n'`` is the number of its rows,
+    and ``d'`` the width of its stripe.
+
+    Since the stripe has a different width in each realigned region,
+    this algorithm does not compute an accumulated cost matrix.
+
+    .. versionadded:: 1.3.0
+    """
+
+    ALLOWED_VALUES = [EXACT, STRIPE, CHECKPOINT, MULTIRESOLUTION, ADAPTIVE]
+    """ List of all the allowed values """
+
+
+
+class DTWCentering(object):
+    """
+    Enumeration of the ways of centering the stripe
+    of the ``STRIPE`` and ``ADAPTIVE`` DTW algorithms.
+
+    .. versionadded:: 1.3.0
+    """
+
+    DIAGONAL = "diagonal"
+    """ Center the stripe at row ``i`` at column ``m * i / n``,
+    assuming that the real wave is spoken at a constant rate
+    with respect to the synthesized wave. """
+
+    SPEECH = "speech"
+    """ Center the stripe at row ``i`` at the frame
+    of the synthesized wave where the same fraction of speech
+    has been spoken as at the frame ``i`` of the real wave,
+    computed by running the VAD on both waves.
+
+    Nonspeech intervals (e.g., a long silent intro
+    or long pauses between paragraphs) of the real wave
+    do not move the center of the stripe forward,
+    hence a smaller margin can be used. """
+
+    ALLOWED_VALUES = [DIAGONAL, SPEECH]
     """ List of all the allowed values """
 
 
@@ -89,10 +201,35 @@ class DTWAligner(object):
     :param margin: the margin to be used in DTW stripe algorithms, in seconds.
                    Default: :class:`aeneas.globalconstants.ALIGNER_MARGIN`
     :type  margin: int
+    :param radius: the radius of the corridor around the projected path
+                   used by the multi-resolution algorithm, in seconds.
+                   Default: :class:`aeneas.globalconstants.ALIGNER_MULTIRESOLUTION_RADIUS`
+    :type  radius: int
     :param algorithm: the DTW algorithm to be used when aligning the waves
     :type  algorithm: :class:`aeneas.dtw.DTWAlgorithm`
     :param logger: the logger object
     :type  logger: :class:`aeneas.logger.Logger`
+    :param precision: the floating point precision of the MFCCs
+                      and of the DTW computation. If ``None``, use
+                      :class:`aeneas.globalconstants.PRECISION`
+    :type  precision: string (from :class:`aeneas.precision.Precision` enumeration)
+    :param threads: the number of threads used by the C extension
+                    to compute the cost matrix of striped algorithms.
+                    Default: :class:`aeneas.globalconstants.ALIGNER_THREADS`
+    :type  threads: int
+    :param adaptive_margin: the initial margin
+                            used by the adaptive stripe algorithm, in seconds.
+                            Default: :class:`aeneas.globalconstants.ALIGNER_ADAPTIVE_MARGIN`
+    :type  adaptive_margin: int
+    :param centering: the way of centering the stripe
+                      of the stripe and adaptive stripe algorithms.
+                      If ``None``, use
+                      :class:`aeneas.globalconstants.ALIGNER_CENTERING`
+    :type  centering: string (from :class:`aeneas.dtw.DTWCentering` enumeration)
+
+    .. versionadded:: 1.3.0
+       The ``precision``, ``threads``, ``adaptive_margin``
+       and ``centering`` parameters.
     """
 
     TAG = "DTWAligner"
@@ -104,15 +241,29 @@ class DTWAligner(object):
             frame_rate=gc.MFCC_FRAME_RATE,
             margin=gc.ALIGNER_MARGIN,
             algorithm=DTWAlgorithm.STRIPE,
-            logger=None
+            logger=None,
+            radius=gc.ALIGNER_MULTIRESOLUTION_RADIUS,
+            precision=None,
+            threads=gc.ALIGNER_THREADS,
+            adaptive_margin=gc.ALIGNER_ADAPTIVE_MARGIN,
+            centering=None
         ):
         self.logger = logger
         if self.logger is None:
             self.logger = Logger()
+        self.precision = precision
+        if self.precision is None:
+            self.precision = gc.PRECISION
         self.real_wave_path = real_wave_path
         self.synt_wave_path = synt_wave_path
         self.frame_rate = frame_rate
         self.margin = margin
+        self.radius = radius
+        self.threads = threads
+        self.adaptive_margin = adaptive_margin
+        self.centering = centering
+        if self.centering is None:
+            self.centering = gc.ALIGNER_CENTERING
         self.algorithm = algorithm
         self.real_wave_full_mfcc = None
         self.synt_wave_full_mfcc = None
@@ -129,9 +280,15 @@ class DTWAligner(object):
         """
         MFCCs of the real wave, including the 0-th.
 
-        :rtype: numpy 2D array
+        Either a numpy 2D array (``l x n``), one frame per column,
+        or a :class:`aeneas.mfccfeatures.MFCCFeatures` object.
+
+        :rtype: numpy 2D array or :class:`aeneas.mfccfeatures.MFCCFeatures`
 
         .. versionadded:: 1.1.0
+
+        .. versionchanged:: 1.3.0
+           It can be a :class:`aeneas.mfccfeatures.MFCCFeatures` object.
         """
         return self.__real_wave_full_mfcc
 
@@ -159,9 +316,15 @@ class DTWAligner(object):
         """
         MFCCs of the synthesized wave, including the 0-th.
 
-        :rtype: numpy 2D array
+        Either a numpy 2D array (``l x n``), one frame per column,
+        or a :class:`aeneas.mfccfeatures.MFCCFeatures` object.
+
+        :rtype: numpy 2D array or :class:`aeneas.mfccfeatures.MFCCFeatures`
 
         .. versionadded:: 1.1.0
+
+        .. versionchanged:: 1.3.0
+           It can be a :class:`aeneas.mfccfeatures.MFCCFeatures` object.
         """
         return self.__synt_wave_full_mfcc
 
@@ -188,29 +351,41 @@ class DTWAligner(object):
         """
         Compute the MFCCs of the two waves,
         and store them internally.
+
+        If the path of a wave is ``None``
+        and its MFCCs have already been set,
+        for example from a :class:`aeneas.featurestore.FeatureStore`,
+        they are not computed again.
+
+        .. versionchanged:: 1.3.0
+           Skip the waves whose MFCCs have already been set.
         """
-        if (
+        if (self.real_wave_path is None) and (self.real_wave_full_mfcc is not None):
+            self._log("MFCCs for real wave already set")
+        elif (
                 (self.real_wave_path is not None) and
                 (os.path.isfile(self.real_wave_path))
             ):
             self._log("Computing MFCCs for real wave...")
-            wave = AudioFile(self.real_wave_path, logger=self.logger)
-            wave.extract_mfcc(self.frame_rate)
-            self.real_wave_full_mfcc = wave.audio_mfcc
+            wave = AudioFile(self.real_wave_path, logger=self.logger, precision=self.precision)
+            wave.extract_mfcc(self.frame_rate, use_cache=True)
+            self.real_wave_full_mfcc = wave.audio_features
             self.real_wave_length = wave.audio_length
             self._log("Computing MFCCs for real wave... done")
         else:
             self._log(["Input file '%s' cannot be read", self.real_wave_path], Logger.CRITICAL)
             raise OSError("Input file cannot be read")
 
-        if (
+        if (self.synt_wave_path is None) and (self.synt_wave_full_mfcc is not None):
+            self._log("MFCCs for synt wave already set")
+        elif (
                 (self.synt_wave_path is not None) and
                 (os.path.isfile(self.synt_wave_path))
             ):
             self._log("Computing MFCCs for synt wave...")
-            wave = AudioFile(self.synt_wave_path, logger=self.logger)
+            wave = AudioFile(self.synt_wave_path, logger=self.logger, precision=self.precision)
             wave.extract_mfcc(self.frame_rate)
-            self.synt_wave_full_mfcc = wave.audio_mfcc
+            self.synt_wave_full_mfcc = wave.audio_features
             self.synt_wave_length = wave.audio_length
             self._log("Computing MFCCs for synt wave... done")
         else:
@@ -220,7 +395,9 @@ class DTWAligner(object):
     def compute_path(self):
         """
         Compute the min cost path between the two waves,
-        and store it interally.
+        and store it interally,
+        as a 2D array (k x 2) of int32,
+        each row being a pair ``(i, j)`` of frame indices.
         """
         dtw = self._setup_dtw()
         self._log("Computing path...")
@@ -232,10 +409,16 @@ class DTWAligner(object):
         Compute the accumulated cost matrix,
         and return it.
 
+        Raise ``ValueError`` if the algorithm is ``ADAPTIVE``,
+        which does not compute an accumulated cost matrix.
+
         :rtype: numpy 2D array
 
         .. versionadded:: 1.2.0
         """
+        if self.algorithm == DTWAlgorithm.ADAPTIVE:
+            self._log("The ADAPTIVE algorithm does not compute the accumulated cost matrix", Logger.CRITICAL)
+            raise ValueError("The ADAPTIVE algorithm does not compute the accumulated cost matrix")
         dtw = self._setup_dtw()
         self._log("Returning accumulated cost matrix")
         return dtw.compute_accumulated_cost_matrix()
@@ -246,10 +429,16 @@ class DTWAligner(object):
         dtw = None
         algorithm = self.algorithm
         delta = self.frame_rate * (self.margin * 2)
-        mfcc2_size = self.synt_wave_full_mfcc.shape[1]
+        # MFCCs set directly by the caller might be stored coefficient-major,
+        # or have a different precision
+        mfcc1 = MFCCFeatures.from_mfcc(self.real_wave_full_mfcc, dtype=self.precision)
+        mfcc2 = MFCCFeatures.from_mfcc(self.synt_wave_full_mfcc, dtype=self.precision)
+        mfcc2_size = len(mfcc2)
         self._log(["Requested algorithm: '%s'", algorithm])
         self._log(["delta = %d", delta])
         self._log(["m = %d", mfcc2_size])
+        self._log(["precision = %s", self.precision])
+        self._log(["centering = %s", self.centering])
         # check if delta is >= length of synt wave
         if mfcc2_size <= delta:
             self._log("We have mfcc2_size <= delta")
@@ -262,29 +451,123 @@ class DTWAligner(object):
             else:
                 self._log("Selecting EXACT algorithm disabled in gc")
 
+        # compute the centers of the stripe, if not on the diagonal
+        prior = None
+        if (self.centering == DTWCentering.SPEECH) and (algorithm in [DTWAlgorithm.STRIPE, DTWAlgorithm.ADAPTIVE]):
+            self._log("Computing speech prior...")
+            prior = self._compute_speech_prior(mfcc1, mfcc2)
+            self._log("Computing speech prior... done")
+
         # execute the selected algorithm
+        if algorithm == DTWAlgorithm.ADAPTIVE:
+            self._log("Computing with ADAPTIVE algo")
+            initial_delta = self.frame_rate * (self.adaptive_margin * 2)
+            dtw = DTWAdaptive(
+                mfcc1,
+                mfcc2,
+                delta,
+                initial_delta,
+                self.logger,
+                centers=self._prior_to_centers(prior, initial_delta, mfcc2_size),
+                threads=self.threads
+            )
+        if algorithm == DTWAlgorithm.MULTIRESOLUTION:
+            self._log("Computing with MULTIRESOLUTION algo")
+            dtw = DTWMultiResolution(
+                mfcc1,
+                mfcc2,
+                delta,
+                self.frame_rate * self.radius,
+                self.logger,
+                threads=self.threads
+            )
+        if algorithm == DTWAlgorithm.CHECKPOINT:
+            self._log("Computing with CHECKPOINT algo")
+            dtw = DTWStripeCheckpoint(
+                mfcc1,
+                mfcc2,
+                delta,
+                self.logger
+            )
         if algorithm == DTWAlgorithm.STRIPE:
             self._log("Computing with STRIPE algo")
             dtw = DTWStripe(
-                self.real_wave_full_mfcc,
-                self.synt_wave_full_mfcc,
+                mfcc1,
+                mfcc2,
                 delta,
-                self.logger
+                self.logger,
+                centers=self._prior_to_centers(prior, delta, mfcc2_size),
+                threads=self.threads
             )
         if algorithm == DTWAlgorithm.EXACT:
             self._log("Computing with EXACT algo")
             dtw = DTWExact(
-                self.real_wave_full_mfcc,
-                self.synt_wave_full_mfcc,
+                mfcc1,
+                mfcc2,
                 self.logger
             )
         return dtw
 
+    def _compute_vad(self, mfcc):
+        """
+        Run the VAD on the wave with the given
+        :class:`aeneas.mfccfeatures.MFCCFeatures`,
+        and return a pair of lists ``(speech, nonspeech)``
+        of intervals ``[s, e]`` of frame indices,
+        where ``s`` is the first frame of the interval
+        and ``e`` the frame after the last one.
+        """
+        vad = VAD(frame_rate=self.frame_rate, logger=self.logger)
+        vad.wave_mfcc = mfcc
+        vad.wave_len = float(len(mfcc)) / self.frame_rate
+        vad.compute_vad()
+        return tuple(
+            [
+                [int(round(interval[0] * self.frame_rate)), int(round(interval[1] * self.frame_rate))]
+                for interval in intervals
+            ]
+            for intervals in [vad.speech, vad.nonspeech]
+        )
+
+    def _compute_speech_prior(self, mfcc1, mfcc2):
+        """
+        Return the prior warp between the two waves, that is,
+        for each frame ``i`` of the real wave,
+        the first frame of the synthesized wave where
+        the same fraction of the speech of the wave
+        has been spoken as at frame ``i`` of the real wave,
+        or ``None`` if either wave does not contain speech.
+        """
+        clocks = []
+        for mfcc in [mfcc1, mfcc2]:
+            speech = numpy.zeros(len(mfcc), dtype=int)
+            for start, end in self._compute_vad(mfcc)[0]:
+                speech[start:end] = 1
+            clocks.append(numpy.cumsum(speech))
+        real_clock, synt_clock = clocks
+        if (real_clock[-1] == 0) or (synt_clock[-1] == 0):
+            self._log("No speech found, using the diagonal", Logger.WARNING)
+            return None
+        self._log(["Speech frames: real %d, synt %d", real_clock[-1], synt_clock[-1]])
+        target = real_clock * (float(synt_clock[-1]) / real_clock[-1])
+        prior = numpy.searchsorted(synt_clock, target, side="left")
+        return numpy.minimum(prior, len(mfcc2) - 1)
+
+    def _prior_to_centers(self, prior, delta, m):
+        """
+        Return the (desired) index of the first column
+        of a stripe ``delta`` columns wide centered on the given prior,
+        or ``None`` if the prior is ``None``.
+        """
+        if prior is None:
+            return None
+        return prior - (min(delta, m) / 2)
+
     @property
     def computed_map(self):
         """
         Return the computed map between the two waves,
-        as a list of lists, each being a pair of floats: ::
+        as a 2D array of floats, each row being a pair: ::
 
         [[r_1, s_1], [r_2, s_2], ..., [r_k, s_k]]
 
@@ -293,14 +576,529 @@ class DTWAligner(object):
         and ``k = n + m`` (or ``k = n + d``)
         is the length of the min cost path.
 
-        :rtype: list of pairs of floats (see above)
+        The real (respectively, synthesized) time instants
+        are the first (respectively, second) column of the array,
+        that is, ``computed_map[:, 0]`` (respectively, ``computed_map[:, 1]``).
+
+        :rtype: numpy 2D array (k x 2) of floats (see above)
+        """
+        return numpy.asarray(self.computed_path, dtype=numpy.float64) / self.frame_rate
+
+
+
+class DTWSegmentedAligner(DTWAligner):
+    """
+    The MFCC extractor and wave aligner,
+    splitting the waves into segments at anchors,
+    and aligning each pair of segments independently,
+    in a pool of ``workers`` processes.
+
+    An anchor is a long nonspeech interval of the real wave
+    matching a long nonspeech interval of the synthesized wave.
+    Anchors are chosen starting from the longest
+    synthesized nonspeech interval:
+    its position in the real wave is estimated
+    by linear interpolation between the neighboring anchors
+    (initially, the start and the end of the waves),
+    and the longest real nonspeech interval within
+    ``margin`` seconds of the estimated position is matched to it,
+    provided that both segments on each side
+    are at least ``min_segment_length`` seconds long.
+    The centers of the two nonspeech intervals are then aligned.
+
+    The paths of the segments are stitched back together,
+    so that ``computed_path`` and ``computed_map``
+    cover the whole waves, as in :class:`aeneas.dtw.DTWAligner`.
+
+    Each worker keeps in memory only the data of its segment,
+    hence the memory used by each worker is bounded
+    by the length of the longest segment.
+
+    The parameters are those of :class:`aeneas.dtw.DTWAligner`, plus:
+
+    :param workers: the number of worker processes;
+                    if ``1``, the segments are aligned
+                    sequentially by the current process
+    :type  workers: int
+    :param min_nonspeech_length: the minimum length, in seconds,
+                                 of the nonspeech intervals
+                                 which can be used as anchors. Default:
+                                 :class:`aeneas.globalconstants.ALIGNER_SEGMENT_MIN_NONSPEECH_LENGTH`
+    :type  min_nonspeech_length: float
+    :param min_segment_length: the minimum length, in seconds,
+                               of a segment. Default:
+                               :class:`aeneas.globalconstants.ALIGNER_SEGMENT_MIN_LENGTH`
+    :type  min_segment_length: float
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "DTWSegmentedAligner"
+
+    def __init__(
+            self,
+            real_wave_path,
+            synt_wave_path,
+            frame_rate=gc.MFCC_FRAME_RATE,
+            margin=gc.ALIGNER_MARGIN,
+            algorithm=DTWAlgorithm.STRIPE,
+            logger=None,
+            radius=gc.ALIGNER_MULTIRESOLUTION_RADIUS,
+            precision=None,
+            threads=gc.ALIGNER_THREADS,
+            adaptive_margin=gc.ALIGNER_ADAPTIVE_MARGIN,
+            centering=None,
+            workers=1,
+            min_nonspeech_length=gc.ALIGNER_SEGMENT_MIN_NONSPEECH_LENGTH,
+            min_segment_length=gc.ALIGNER_SEGMENT_MIN_LENGTH
+        ):
+        DTWAligner.__init__(
+            self,
+            real_wave_path,
+            synt_wave_path,
+            frame_rate=frame_rate,
+            margin=margin,
+            algorithm=algorithm,
+            logger=logger,
+            radius=radius,
+            precision=precision,
+            threads=threads,
+            adaptive_margin=adaptive_margin,
+            centering=centering
+        )
+        self.workers = workers
+        self.min_nonspeech_length = min_nonspeech_length
+        self.min_segment_length = min_segment_length
+        self.anchors = None
+
+    def compute_anchors(self):
+        """
+        Compute the anchors between the two waves,
+        and store them internally,
+        as a list of pairs ``(i, j)`` of frame indices
+        of the real and of the synthesized wave, respectively,
+        sorted by increasing indices.
+        """
+        mfcc1 = MFCCFeatures.from_mfcc(self.real_wave_full_mfcc)
+        mfcc2 = MFCCFeatures.from_mfcc(self.synt_wave_full_mfcc)
+        self._log("Computing nonspeech intervals of real wave...")
+        real_nonspeech = self._compute_nonspeech(mfcc1)
+        self._log(["Computing nonspeech intervals of real wave... done (%d)", len(real_nonspeech)])
+        self._log("Computing nonspeech intervals of synt wave...")
+        synt_nonspeech = self._compute_nonspeech(mfcc2)
+        self._log(["Computing nonspeech intervals of synt wave... done (%d)", len(synt_nonspeech)])
+        self.anchors = self._match_nonspeech(
+            real_nonspeech,
+            synt_nonspeech,
+            len(mfcc1),
+            len(mfcc2)
+        )
+        self._log(["Found %d anchors", len(self.anchors)])
+
+    def compute_path(self):
+        """
+        Compute the min cost path between the two waves,
+        aligning the segments between consecutive anchors independently,
+        and store it interally,
+        as a 2D array (k x 2) of int32,
+        each row being a pair ``(i, j)`` of frame indices.
+        """
+        if self.anchors is None:
+            self.compute_anchors()
+        mfcc1 = MFCCFeatures.from_mfcc(self.real_wave_full_mfcc)
+        mfcc2 = MFCCFeatures.from_mfcc(self.synt_wave_full_mfcc)
+        n = len(mfcc1)
+        m = len(mfcc2)
+        boundaries = [(0, 0)] + self.anchors + [(n, m)]
+        jobs = []
+        for k in range(len(boundaries) - 1):
+            real_start, synt_start = boundaries[k]
+            real_end, synt_end = boundaries[k + 1]
+            jobs.append((
+                mfcc1[real_start:real_end],
+                mfcc2[synt_start:synt_end],
+                self.frame_rate,
+                self.margin,
+                self.algorithm,
+                self.radius,
+                self.precision,
+                self.threads,
+                self.adaptive_margin,
+                self.centering
+            ))
+        workers = min(self.workers, len(jobs))
+        self._log(["Computing path for %d segments with %d workers...", len(jobs), workers])
+        if workers <= 1:
+            paths = [_compute_segment_path(job) for job in jobs]
+        else:
+            pool = multiprocessing.Pool(workers)
+            try:
+                paths = pool.map(_compute_segment_path, jobs)
+            finally:
+                pool.close()
+                pool.join()
+        self._log("Computing path for segments... done")
+        # the last pair of a segment path and the first pair of the next one
+        # are adjacent on the diagonal, hence the stitched path is valid
+        self.computed_path = numpy.concatenate([
+            path + numpy.array(boundaries[k], dtype=numpy.int32)
+            for k, path in enumerate(paths)
+        ])
+
+    def _compute_nonspeech(self, mfcc):
+        """
+        Return the nonspeech intervals of the wave with the given
+        :class:`aeneas.mfccfeatures.MFCCFeatures`,
+        as a list of pairs ``[s, e]`` of frame indices,
+        where ``s`` is the first frame of the interval
+        and ``e`` the frame after the last one,
+        discarding those shorter than ``min_nonspeech_length``
+        and those at the beginning or at the end of the wave.
+        """
+        length = len(mfcc)
+        min_length = int(round(self.min_nonspeech_length * self.frame_rate))
+        nonspeech = []
+        for start, end in self._compute_vad(mfcc)[1]:
+            if (start > 0) and (end < length) and (end - start >= min_length):
+                nonspeech.append([start, end])
+        return nonspeech
+
+    def _match_nonspeech(self, real_nonspeech, synt_nonspeech, n, m):
+        """
+        Match the given nonspeech intervals of the two waves,
+        with ``n`` and ``m`` frames, respectively,
+        and return the list of anchors (see ``compute_anchors``).
+        """
+        tolerance = self.margin * self.frame_rate
+        min_segment = max(1, self.min_segment_length * self.frame_rate)
+        real_centers = [(s + e) / 2 for s, e in real_nonspeech]
+        real_lengths = [e - s for s, e in real_nonspeech]
+        # the start and the end of the waves are anchors
+        anchors = [(0, 0), (n, m)]
+        for s, e in sorted(synt_nonspeech, key=lambda interval: interval[0] - interval[1]):
+            synt_center = (s + e) / 2
+            # the neighboring anchors
+            k = 1
+            while anchors[k][1] < synt_center:
+                k += 1
+            left, right = anchors[k - 1], anchors[k]
+            if (synt_center - left[1] < min_segment) or (right[1] - synt_center < min_segment):
+                continue
+            expected = left[0] + (right[0] - left[0]) * float(synt_center - left[1]) / (right[1] - left[1])
+            best = None
+            for index, real_center in enumerate(real_centers):
+                if (
+                        (abs(real_center - expected) <= tolerance) and
+                        (real_center - left[0] >= min_segment) and
+                        (right[0] - real_center >= min_segment) and
+                        (
+                            (best is None) or
+                            (real_lengths[index] > real_lengths[best]) or
+                            (
+                                (real_lengths[index] == real_lengths[best]) and
+                                (abs(real_center - expected) < abs(real_centers[best] - expected))
+                            )
+                        )
+                    ):
+                    best = index
+            if best is not None:
+                self._log(["Anchor: real frame %d <=> synt frame %d", real_centers[best], synt_center])
+                anchors.insert(k, (real_centers[best], synt_center))
+        return anchors[1:-1]
+
+
+
+def _compute_segment_path(job):
+    """
+    Compute the min cost path between the MFCCs of two segments,
+    as described by the given job tuple.
+
+    This is a module-level function, so that
+    :class:`aeneas.dtw.DTWSegmentedAligner`
+    can run it in a pool of worker processes.
+    """
+    real_mfcc, synt_mfcc, frame_rate, margin, algorithm, radius, precision, threads, adaptive_margin, centering = job
+    aligner = DTWAligner(
+        None,
+        None,
+        frame_rate=frame_rate,
+        margin=margin,
+        algorithm=algorithm,
+        radius=radius,
+        precision=precision,
+        threads=threads,
+        adaptive_margin=adaptive_margin,
+        centering=centering
+    )
+    aligner.real_wave_full_mfcc = real_mfcc
+    aligner.synt_wave_full_mfcc = synt_mfcc
+    aligner.compute_path()
+    return aligner.computed_path
+
+
+
+class DTWOnline(object):
+    """
+    An online (streaming) aligner, in the style
+    of the on-line time warping (OLTW) algorithm,
+    for real waves which are still being recorded or streamed.
+
+    The MFCCs of the synthesized wave must be known in advance,
+    while the MFCCs of the real wave are passed to ``feed``
+    in blocks, as soon as they are available.
+    ``feed`` returns the pairs of the min cost path
+    which are final, that is, which will not change
+    whatever the frames of the real wave still to come.
+
+    At each frame of the real wave, only a window of the synthesized wave
+    ``2 * margin`` seconds wide is searched, which follows
+    the cell with the min normalized accumulated cost,
+    and only the moves of the frames not finalized yet are stored.
+    A pair is final when the paths backtracked from the first and
+    from the last cell of the current window meet there,
+    since every later path goes through a cell of the current window.
+    If this does not happen within ``max_latency`` seconds,
+    the older frames are finalized following the path
+    backtracked from the best cell of the current window,
+    so that both the latency and the memory are bounded.
+
+    When the real wave ends, call ``finalize``
+    to obtain the remaining pairs of the path,
+    which ends at the last frame of the synthesized wave,
+    if it is inside the current window.
+
+    :param synt_wave_mfcc: the MFCCs of the synthesized wave
+    :type  synt_wave_mfcc: numpy 2D array or :class:`aeneas.mfccfeatures.MFCCFeatures`
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+    :param frame_rate: the MFCC frame rate, in frames per second. Default:
+                       :class:`aeneas.globalconstants.MFCC_FRAME_RATE`
+    :type  frame_rate: int
+    :param margin: the margin of the window of the synthesized wave,
+                   in seconds. Default:
+                   :class:`aeneas.globalconstants.ALIGNER_ONLINE_MARGIN`
+    :type  margin: int
+    :param max_latency: the max latency, in seconds. Default:
+                        :class:`aeneas.globalconstants.ALIGNER_ONLINE_MAX_LATENCY`
+    :type  max_latency: float
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "DTWOnline"
+
+    def __init__(
+            self,
+            synt_wave_mfcc,
+            logger=None,
+            frame_rate=gc.MFCC_FRAME_RATE,
+            margin=gc.ALIGNER_ONLINE_MARGIN,
+            max_latency=gc.ALIGNER_ONLINE_MAX_LATENCY
+        ):
+        self.logger = logger
+        if self.logger is None:
+            self.logger = Logger()
+        self.frame_rate = frame_rate
+        self.synt_wave_mfcc = self._normalize(synt_wave_mfcc)
+        self.m = self.synt_wave_mfcc.shape[0]
+        self.delta = max(1, min(int(2 * margin * frame_rate), self.m))
+        self.max_latency = max(1, int(max_latency * frame_rate))
+        self.real_frames = 0
+        self.finished = False
+        self._stripe = DTWStripe(None, None, self.delta, self.logger)
+        self._previous_row = None
+        self._first_row = 0
+        self._starts = []
+        self._moves = []
+        self._root = (0, 0)
+        self._log(["m delta max_latency: %d %d %d", self.m, self.delta, self.max_latency])
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    @property
+    def pending_frames(self):
+        """
+        The number of frames of the real wave
+        whose pairs are not final yet.
+
+        :rtype: int
+        """
+        return max(0, self.real_frames - self._root[0])
+
+    def feed(self, real_wave_mfcc):
+        """
+        Process the given MFCCs of the next frames of the real wave,
+        and return the pairs of the path which became final,
+        as a 2D array of floats, each row representing
+        corresponding time instants in the real and synt wave,
+        respectively ``[real_time, synt_time]``.
+
+        :param real_wave_mfcc: the MFCCs of the next frames of the real wave
+        :type  real_wave_mfcc: numpy 2D array or :class:`aeneas.mfccfeatures.MFCCFeatures`
+        :rtype: numpy 2D array (k x 2) of floats
+        """
+        if self.finished:
+            self._log("The real wave has been already finalized", Logger.CRITICAL)
+            raise ValueError("The real wave has been already finalized")
+        frames = self._normalize(real_wave_mfcc)
+        finalized = []
+        if (self.real_frames == 0) and (len(frames) > 0):
+            finalized.append(self._root)
+        for frame in frames:
+            self._compute_row(frame)
+            finalized.extend(self._compute_final_pairs())
+        return self._to_map(finalized)
+
+    def finalize(self):
+        """
+        Signal that the real wave ended,
+        and return the remaining pairs of the path,
+        as a 2D array of floats (see ``feed``).
+
+        :rtype: numpy 2D array (k x 2) of floats
+        """
+        if self.finished:
+            self._log("The real wave has been already finalized", Logger.CRITICAL)
+            raise ValueError("The real wave has been already finalized")
+        self.finished = True
+        if self.real_frames == 0:
+            return self._to_map([])
+        i = self.real_frames - 1
+        start = self._starts[-1]
+        if start + self.delta == self.m:
+            j = self.m - 1
+        else:
+            self._log("The last synt frame is not in the window, ending at the best cell")
+            j = start + self._compute_best_column(self._previous_row, i, start)
+        finalized = self._backtrack(i, j)
+        self._previous_row = None
+        self._starts = []
+        self._moves = []
+        return self._to_map(finalized)
+
+    def _normalize(self, mfcc):
+        """
+        Discard the first MFCC component,
+        and return the frames normalized to unit norm2,
+        one per row, as done by ``DTWStripe``.
+        """
+        dtype = None
+        if hasattr(self, "synt_wave_mfcc"):
+            dtype = self.synt_wave_mfcc.dtype
+        return MFCCFeatures.from_mfcc(mfcc, dtype=dtype).normalized
+
+    def _to_map(self, pairs):
+        """ Convert the given pairs of frame indices into time instants """
+        return numpy.array(pairs, dtype=numpy.float64).reshape(-1, 2) / self.frame_rate
+
+    def _compute_best_column(self, row, i, start):
+        """
+        Return the index, in the window, of the cell of the given row
+        of the accumulated cost matrix with the min cost,
+        normalized by the length of the path ending there.
         """
-        result = []
-        for i in range(len(self.computed_path)):
-            real_time = 1.0 * self.computed_path[i][0] / self.frame_rate
-            synt_time = 1.0 * self.computed_path[i][1] / self.frame_rate
-            result.append([real_time, synt_time])
-        return result
+        return numpy.argmin(row / (i + start + numpy.arange(len(row)) + 2.0))
+
+    def _compute_row(self, frame):
+        """
+        Compute the row of the accumulated cost matrix
+        and the moves of the given frame of the real wave,
+        moving the window so that it is centered
+        on the best cell of the previous row, if possible.
+        """
+        i = self.real_frames
+        if i == 0:
+            start = 0
+            row = self._stripe._compute_cost_matrix_row(frame[numpy.newaxis, :], self.synt_wave_mfcc, 0, start, self.delta)
+            self._stripe._compute_acm_first_row(row)
+            moves = [1] * self.delta
+        else:
+            previous_start = self._starts[-1]
+            best_j = previous_start + self._compute_best_column(self._previous_row, i - 1, previous_start)
+            start = min(max(best_j - self.delta / 2, previous_start), self.m - self.delta)
+            offset = start - previous_start
+            row = self._stripe._compute_cost_matrix_row(frame[numpy.newaxis, :], self.synt_wave_mfcc, 0, start, self.delta)
+            self._stripe._compute_acm_row(self._previous_row, row, offset)
+            moves = self._stripe._compute_moves_row(self._previous_row, row, offset).tolist()
+        self._previous_row = row
+        self._starts.append(start)
+        self._moves.append(moves)
+        self.real_frames += 1
+
+    def _compute_final_pairs(self):
+        """
+        Return the pairs which became final after the last frame,
+        and make the last of them the new root of the path.
+        """
+        i = self.real_frames - 1
+        start = self._starts[-1]
+        left = self._backtrack(i, start)
+        right = self._backtrack(i, start + self.delta - 1)
+        common = 0
+        limit = min(len(left), len(right))
+        while (common < limit) and (left[common] == right[common]):
+            common += 1
+        finalized = left[:common]
+        if common > 0:
+            self._set_root(finalized[-1])
+        if i - self._root[0] > self.max_latency:
+            self._log(["Path not stable at frame %d, forcing it", i])
+            best = self._backtrack(i, start + self._compute_best_column(self._previous_row, i, start))
+            forced = [pair for pair in best if pair[0] <= i - self.max_latency]
+            if len(forced) > 0:
+                finalized.extend(forced)
+                self._set_root(forced[-1])
+        return finalized
+
+    def _set_root(self, root):
+        """
+        Set the last final pair of the path,
+        discarding the moves of the frames before it.
+        """
+        self._root = root
+        discarded = root[0] - self._first_row
+        del self._starts[:discarded]
+        del self._moves[:discarded]
+        self._first_row = root[0]
+
+    def _backtrack(self, i, j):
+        """
+        Return the path from the root (excluded) to the cell ``(i, j)``,
+        following the stored moves.
+
+        If the root has been forced, the path might reach
+        the frame of the root before its column:
+        in this case, its columns are clamped to the one of the root,
+        so that the path is still monotonic.
+        """
+        root_i, root_j = self._root
+        path = []
+        while i > root_i:
+            path.append((i, max(j, root_j)))
+            k = i - self._first_row
+            r_j = j - self._starts[k]
+            if j == 0:
+                move = 0
+            elif r_j < self.delta:
+                move = self._moves[k][r_j]
+            else:
+                # the path left the window: go left, back into the window
+                move = 1
+            if move == 0:
+                i -= 1
+            elif move == 1:
+                j -= 1
+            else:
+                i -= 1
+                j -= 1
+        # the moves of the frame of the root are not needed:
+        # the path goes left, to the root
+        path.extend([(root_i, k) for k in range(j, root_j, -1)])
+        path.reverse()
+        # remove the pairs repeated by the clamping
+        return [pair for k, pair in enumerate(path) if (k == 0) or (pair != path[k - 1])]
 
 
 
@@ -308,11 +1106,18 @@ class DTWStripe(object):
 
     TAG = "DTWStripe"
 
-    def __init__(self, m1, m2, delta, logger):
-        self.m1 = m1
-        self.m2 = m2
+    def __init__(self, m1, m2, delta, logger, centers=None, threads=gc.ALIGNER_THREADS):
+        # the MFCCs are omitted when only the row functions are used (see DTWOnline)
+        self.m1 = None
+        self.m2 = None
+        if m1 is not None:
+            self.m1 = MFCCFeatures.from_mfcc(m1)
+        if m2 is not None:
+            self.m2 = MFCCFeatures.from_mfcc(m2)
         self.delta = delta
         self.logger = logger
+        self.centers = centers
+        self.threads = threads
 
     def _log(self, message, severity=Logger.DEBUG):
         """ Log """
@@ -342,19 +1147,25 @@ class DTWStripe(object):
         self._log("Importing cdtw...")
         import aeneas.cdtw
         self._log("Importing cdtw... done")
-        # discard first MFCC component
-        mfcc1 = self.m1[1:, :]
-        mfcc2 = self.m2[1:, :]
-        norm2_1 = numpy.sqrt(numpy.sum(mfcc1 ** 2, 0))
-        norm2_2 = numpy.sqrt(numpy.sum(mfcc2 ** 2, 0))
-        n = mfcc1.shape[1]
-        m = mfcc2.shape[1]
+        mfcc1, mfcc2 = self._compute_normalized_mfcc_c_extension()
+        n = mfcc1.shape[0]
+        m = mfcc2.shape[0]
         delta = self.delta
         self._log(["n m delta: %d %d %d", n, m, delta])
         if delta > m:
             self._log("Limiting delta to m")
             delta = m
-        cost_matrix, centers = aeneas.cdtw.cdtw_compute_cost_matrix_step(mfcc1, mfcc2, norm2_1, norm2_2, delta)
+        self._log(["threads: %d", self.threads])
+        centers = None
+        if self.centers is not None:
+            centers = self._compute_centers(n, m, delta).astype(numpy.int32)
+        cost_matrix, centers = aeneas.cdtw.cdtw_compute_cost_matrix_step(
+            mfcc1,
+            mfcc2,
+            delta,
+            centers,
+            self.threads
+        )
         accumulated_cost_matrix = aeneas.cdtw.cdtw_compute_accumulated_cost_matrix_step(cost_matrix, centers)
         self._log("Computing acm using C extension... done")
         return accumulated_cost_matrix
@@ -394,73 +1205,166 @@ class DTWStripe(object):
         self._log("Importing cdtw...")
         import aeneas.cdtw
         self._log("Importing cdtw... done")
-        # discard first MFCC component
-        mfcc1 = self.m1[1:, :]
-        mfcc2 = self.m2[1:, :]
-        norm2_1 = numpy.sqrt(numpy.sum(mfcc1 ** 2, 0))
-        norm2_2 = numpy.sqrt(numpy.sum(mfcc2 ** 2, 0))
-        n = mfcc1.shape[1]
-        m = mfcc2.shape[1]
+        mfcc1, mfcc2 = self._compute_normalized_mfcc_c_extension()
+        n = mfcc1.shape[0]
+        m = mfcc2.shape[0]
         delta = self.delta
         self._log(["n m delta: %d %d %d", n, m, delta])
         if delta > m:
             self._log("Limiting delta to m")
             delta = m
+        self._log(["threads: %d", self.threads])
+        centers = None
+        if self.centers is not None:
+            centers = self._compute_centers(n, m, delta).astype(numpy.int32)
         best_path = aeneas.cdtw.cdtw_compute_best_path(
             mfcc1,
             mfcc2,
-            norm2_1,
-            norm2_2,
-            delta
+            delta,
+            centers,
+            self.threads
         )
         self._log("Computing path using C extension... done")
         return best_path
 
     def _compute_path_pure_python(self):
         self._log("Computing path using pure Python code...")
-        self._log("Computing cost matrix...")
-        cost_matrix, centers = self._compute_cost_matrix()
-        self._log("Computing cost matrix... done")
-        self._log("Computing accumulated cost matrix...")
-        accumulated_cost_matrix = self._compute_accumulated_cost_matrix(cost_matrix, centers)
-        self._log("Computing accumulated cost matrix... done")
+        mfcc1, mfcc2 = self._compute_normalized_mfcc()
+        n = mfcc1.shape[0]
+        m = mfcc2.shape[0]
+        delta = self.delta
+        self._log(["n m delta: %d %d %d", n, m, delta])
+        if delta > m:
+            self._log("Limiting delta to m")
+            delta = m
+        centers = self._compute_centers(n, m, delta)
+        # forward pass: keep two rows of the acm only,
+        # storing the move selected by the backtracking at each cell
+        self._log("Computing moves...")
+        moves = numpy.zeros((n, delta), dtype=numpy.int8)
+        previous_row = self._compute_cost_matrix_row(mfcc1, mfcc2, 0, centers[0], delta)
+        self._compute_acm_first_row(previous_row)
+        for i in range(1, n):
+            current_row = self._compute_cost_matrix_row(mfcc1, mfcc2, i, centers[i], delta)
+            offset = centers[i] - centers[i-1]
+            self._compute_acm_row(previous_row, current_row, offset)
+            moves[i, :] = self._compute_moves_row(previous_row, current_row, offset)
+            previous_row = current_row
+        self._log("Computing moves... done")
         self._log("Computing best path...")
-        best_path = self._compute_best_path(accumulated_cost_matrix, centers)
+        best_path = self._compute_best_path(moves, centers)
         self._log("Computing best path... done")
         self._log("Computing path using pure Python code... done")
         return best_path
 
+    def _compute_normalized_mfcc(self):
+        """
+        Return the MFCCs of the two waves,
+        discarding the first MFCC component,
+        normalized to unit norm2,
+        so that the ``i``-th row contains the ``i``-th frame.
+        """
+        return (self.m1.normalized, self.m2.normalized)
+
+    def _compute_normalized_mfcc_c_extension(self):
+        """
+        Return the normalized MFCCs of the two waves
+        (see ``_compute_normalized_mfcc``) as passed to ``cdtw``,
+        which reads them in place, hence they must be
+        C contiguous arrays of double: single precision MFCCs
+        are converted, while double precision MFCCs are not copied.
+        """
+        mfcc1, mfcc2 = self._compute_normalized_mfcc()
+        return (
+            numpy.ascontiguousarray(mfcc1, dtype=numpy.float64),
+            numpy.ascontiguousarray(mfcc2, dtype=numpy.float64)
+        )
+
     def _compute_cost_matrix(self):
-        # discard first MFCC component
-        mfcc1 = self.m1[1:, :]
-        mfcc2 = self.m2[1:, :]
-        norm2_1 = numpy.sqrt(numpy.sum(mfcc1 ** 2, 0))
-        norm2_2 = numpy.sqrt(numpy.sum(mfcc2 ** 2, 0))
-        n = mfcc1.shape[1]
-        m = mfcc2.shape[1]
+        mfcc1, mfcc2 = self._compute_normalized_mfcc()
+        n = mfcc1.shape[0]
+        m = mfcc2.shape[0]
         delta = self.delta
         self._log(["n m delta: %d %d %d", n, m, delta])
         if delta > m:
             self._log("Limiting delta to m")
             delta = m
-        cost_matrix = numpy.zeros((n, delta))
-        centers = numpy.zeros(n)
+        cost_matrix = numpy.zeros((n, delta), dtype=mfcc1.dtype)
+        centers = self._compute_centers(n, m, delta)
+        for i in range(n):
+            cost_matrix[i, :] = self._compute_cost_matrix_row(
+                mfcc1,
+                mfcc2,
+                i,
+                centers[i],
+                delta
+            )
+        return (cost_matrix, centers)
+
+    def _compute_centers(self, n, m, delta):
+        """
+        Compute the index of the first column of the stripe
+        at each row, centering the stripe on the main diagonal.
+
+        If custom centers were given in the constructor,
+        return them, made valid by ``_sanitize_centers``.
+
+        Note that the arithmetic is the same of the C extension,
+        so that both return the same centers.
+        """
+        if self.centers is not None:
+            return self._sanitize_centers(self.centers, n, m, delta)
+        centers = numpy.zeros(n, dtype=int)
         for i in range(n):
             # center j at row i
-            center_j = (m * i) / n
-            #self._log(["Center at row %d is %d", i, center_j])
+            center_j = int(numpy.floor(m * (1.0 * i / n)))
             range_start = max(0, center_j - (delta / 2))
             range_end = range_start + delta
             if range_end > m:
                 range_end = m
                 range_start = range_end - delta
             centers[i] = range_start
-            #self._log(["Range at row %d is %d %d", i, range_start, range_end])
-            for j in range(range_start, range_end):
-                tmp = mfcc1[:, i].transpose().dot(mfcc2[:, j])
-                tmp /= norm2_1[i] * norm2_2[j]
-                cost_matrix[i][j - range_start] = 1 - tmp
-        return (cost_matrix, centers)
+        return centers
+
+    def _sanitize_centers(self, centers, n, m, delta):
+        """
+        Turn the given (desired) index of the first column
+        of the stripe at each row into valid stripe centers, that is:
+
+        1. non-decreasing;
+        2. with the stripe within ``[0, m)``;
+        3. starting at column ``0`` and ending at column ``m - 1``;
+        4. with consecutive stripes overlapping by at least one column,
+           so that a path can always go from one row to the next one.
+
+        Conditions 3 and 4 are enforced by moving stripes right,
+        hence the first stripe might not start at column ``0``
+        if ``m`` is much larger than ``n``.
+        """
+        centers = numpy.floor(numpy.array(centers, dtype=float)).astype(int)
+        if len(centers) != n:
+            self._log(["Expected %d centers, got %d", n, len(centers)], Logger.CRITICAL)
+            raise ValueError("The number of centers must be equal to the number of rows")
+        centers = numpy.maximum.accumulate(centers)
+        centers = numpy.clip(centers, 0, m - delta)
+        centers[0] = 0
+        centers[-1] = m - delta
+        # c[i] = max_{k >= i} (c[k] - (k - i) * (delta - 1))
+        slack = numpy.arange(n) * max(delta - 1, 0)
+        centers = numpy.maximum.accumulate((centers - slack)[::-1])[::-1] + slack
+        return centers
+
+    def _compute_cost_matrix_row(self, mfcc1, mfcc2, i, range_start, delta):
+        """
+        Compute the ``i``-th row of the cost matrix,
+        that is, the cost of the columns
+        ``range_start <= j < range_start + delta``,
+        with a single matrix product.
+
+        The MFCCs must be normalized and transposed,
+        as returned by ``_compute_normalized_mfcc``.
+        """
+        return 1 - mfcc2[range_start:(range_start + delta)].dot(mfcc1[i])
 
     def _compute_accumulated_cost_matrix(self, cost_matrix, centers):
         # create accumulated cost matrix
@@ -476,79 +1380,275 @@ class DTWStripe(object):
         self._log("Using the in-place algorithm for computing the acm")
         n, delta = cost_matrix.shape
         self._log(["n delta: %d %d", n, delta])
-        current_row = numpy.copy(cost_matrix[0, :])
-        #cost_matrix[0][0] = current_row[0]
-        for j in range(1, delta):
-            cost_matrix[0][j] = current_row[j] + cost_matrix[0][j-1]
-        # fill table
+        self._compute_acm_first_row(cost_matrix[0, :])
         for i in range(1, n):
-            current_row = numpy.copy(cost_matrix[i, :])
-            offset = centers[i] - centers[i-1]
-            for j in range(delta):
-                cost0 = numpy.inf
-                if (j+offset) < delta:
-                    cost0 = cost_matrix[i-1][j+offset]
-                cost1 = numpy.inf
-                if j > 0:
-                    cost1 = cost_matrix[i][j-1]
-                cost2 = numpy.inf
-                if ((j+offset-1) < delta) and ((j+offset-1) >= 0):
-                    cost2 = cost_matrix[i-1][j+offset-1]
-                cost_matrix[i][j] = current_row[j] + min(cost0, cost1, cost2)
+            self._compute_acm_row(cost_matrix[i-1, :], cost_matrix[i, :], centers[i] - centers[i-1])
         return cost_matrix
 
     def _compute_acm_not_in_place(self, cost_matrix, centers):
         self._log("Using the not-in-place algorithm for computing the acm")
-        acc_matrix = numpy.zeros(cost_matrix.shape)
-        n, delta = acc_matrix.shape
-        self._log(["n delta: %d %d", n, delta])
-        # first row
-        acc_matrix[0][0] = cost_matrix[0][0]
-        for j in range(1, delta):
-            acc_matrix[0][j] = acc_matrix[0][j-1] + cost_matrix[0][j]
-        # fill table
-        for i in range(1, n):
-            offset = centers[i] - centers[i-1]
-            for j in range(delta):
-                cost0 = numpy.inf
-                if (j+offset) < delta:
-                    cost0 = acc_matrix[i-1][j+offset]
-                cost1 = numpy.inf
-                if j > 0:
-                    cost1 = acc_matrix[i][j-1]
-                cost2 = numpy.inf
-                if ((j+offset-1) < delta) and ((j+offset-1) >= 0):
-                    cost2 = acc_matrix[i-1][j+offset-1]
-                acc_matrix[i][j] = cost_matrix[i][j] + min(cost0, cost1, cost2)
-        return acc_matrix
+        return self._compute_acm_in_place(numpy.copy(cost_matrix), centers)
+
+    def _compute_acm_first_row(self, row):
+        """ Accumulate the first row of the cost matrix, in place """
+        numpy.cumsum(row, out=row)
+
+    def _compute_acm_row(self, previous_row, current_row, offset):
+        """
+        Accumulate the current row of the cost matrix, in place,
+        using the previous row of the accumulated cost matrix.
+
+        Since ``a[j] = c[j] + min(b[j], a[j-1])``,
+        where ``b[j]`` is the min between the vertical and the diagonal
+        predecessors in the previous row,
+        unrolling the horizontal dependency gives
+        ``a[j] = S[j] + min_{k <= j} (b[k] - S[k-1])``,
+        where ``S`` is the cumulative sum of ``c``,
+        which is computed with a cumulative min.
+
+        As the rounding of the latter differs from the one
+        of the sequential recurrence (used by the C extension),
+        the result is then refined by applying the recurrence
+        to whole rows, until no value changes:
+        the cells before the first changed one are final,
+        hence usually only a few short passes are needed,
+        and the result is exactly the one of the sequential recurrence.
+        """
+        delta = len(current_row)
+        cost = numpy.copy(current_row)
+        best_previous = numpy.minimum(
+            self._shift_row(previous_row, offset),
+            self._shift_row(previous_row, offset - 1)
+        )
+        cumulative_sum = numpy.cumsum(cost)
+        current_row[:] = cumulative_sum + numpy.minimum.accumulate(
+            best_previous - (cumulative_sum - cost)
+        )
+        current_row[0] = cost[0] + best_previous[0]
+        start = 1
+        while start < delta:
+            refined = cost[start:] + numpy.minimum(best_previous[start:], current_row[(start - 1):-1])
+            changed = numpy.nonzero(refined != current_row[start:])[0]
+            if len(changed) == 0:
+                break
+            current_row[start:] = refined
+            start += changed[0] + 1
+
+    def _compute_moves_row(self, previous_row, current_row, offset):
+        """
+        Return the move selected by the backtracking
+        at each cell of the current row
+        (``0`` = up, ``1`` = left, ``2`` = diagonal),
+        given the previous and the current rows of the accumulated cost matrix.
 
-    def _compute_best_path(self, acc_matrix, centers):
+        As in the backtracking, the diagonal move
+        is not considered for the first cell of the row.
+        """
+        costs = numpy.empty((3, len(current_row)), dtype=current_row.dtype)
+        costs[0, :] = self._shift_row(previous_row, offset)
+        costs[1, 0] = numpy.inf
+        costs[1, 1:] = current_row[:-1]
+        costs[2, :] = self._shift_row(previous_row, offset - 1)
+        costs[2, 0] = numpy.inf
+        return numpy.argmin(costs, axis=0)
+
+    def _shift_row(self, row, offset):
+        """
+        Return a copy ``s`` of the given row
+        such that ``s[j] = row[j + offset]``,
+        or ``inf`` if ``j + offset`` is outside the row.
+        """
+        delta = len(row)
+        shifted = numpy.empty(delta, dtype=row.dtype)
+        shifted.fill(numpy.inf)
+        start = max(0, -offset)
+        end = min(delta, delta - offset)
+        if start < end:
+            shifted[start:end] = row[(start + offset):(end + offset)]
+        return shifted
+
+    def _compute_best_path(self, moves, centers):
+        """
+        Compute the best path by backtracking,
+        following the moves computed by ``_compute_moves_row``.
+        """
         # get dimensions
-        n, delta = acc_matrix.shape
+        n, delta = moves.shape
         self._log(["n delta: %d %d", n, delta])
         i = n - 1
         j = delta - 1 + centers[i]
-        path = [(i, j)]
+        # the path has at most i + j + 1 pairs:
+        # fill it from the end, then return the used part
+        k = i + j
+        path = numpy.zeros((k + 1, 2), dtype=numpy.int32)
+        path[k] = (i, j)
         # compute best (min cost) path
         while (i > 0) or (j > 0):
             if i == 0:
-                path.append((0, j-1))
                 j -= 1
             elif j == 0:
-                path.append((i-1, 0))
                 i -= 1
             else:
+                r_j = j - centers[i]
+                if r_j < delta:
+                    move = moves[i, r_j]
+                else:
+                    # the path left the stripe: go left, back into the stripe
+                    move = 1
+                if move == 0:
+                    i -= 1
+                elif move == 1:
+                    j -= 1
+                else:
+                    i -= 1
+                    j -= 1
+            k -= 1
+            path[k] = (i, j)
+        return path[k:]
+
+
+
+class DTWStripeCheckpoint(DTWStripe):
+    """
+    Compute the same best path of :class:`aeneas.dtw.DTWStripe`,
+    storing only one row of the accumulated cost matrix
+    every ``checkpoint_interval`` rows,
+    and recomputing the rows between two consecutive checkpoints
+    while backtracking.
+
+    If ``checkpoint_interval`` is ``None``,
+    the square root of the number of rows is used,
+    which minimizes the memory used.
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "DTWStripeCheckpoint"
+
+    def __init__(self, m1, m2, delta, logger, checkpoint_interval=None):
+        DTWStripe.__init__(self, m1, m2, delta, logger)
+        self.checkpoint_interval = checkpoint_interval
+
+    def _get_checkpoint_interval(self, n):
+        """ Return the checkpoint interval for n rows """
+        interval = self.checkpoint_interval
+        if (interval is None) or (interval <= 0):
+            interval = int(numpy.ceil(numpy.sqrt(n)))
+        return max(1, interval)
+
+    def _compute_path_c_extension(self):
+        self._log("Computing path using C extension...")
+        self._log("Importing cdtw...")
+        import aeneas.cdtw
+        self._log("Importing cdtw... done")
+        mfcc1, mfcc2 = self._compute_normalized_mfcc_c_extension()
+        n = mfcc1.shape[0]
+        m = mfcc2.shape[0]
+        delta = self.delta
+        self._log(["n m delta: %d %d %d", n, m, delta])
+        if delta > m:
+            self._log("Limiting delta to m")
+            delta = m
+        interval = self._get_checkpoint_interval(n)
+        self._log(["checkpoint interval: %d", interval])
+        best_path = aeneas.cdtw.cdtw_compute_best_path_checkpoint(
+            mfcc1,
+            mfcc2,
+            delta,
+            interval
+        )
+        self._log("Computing path using C extension... done")
+        return best_path
+
+    def _compute_path_pure_python(self):
+        self._log("Computing path using pure Python code...")
+        mfcc1, mfcc2 = self._compute_normalized_mfcc()
+        n = mfcc1.shape[0]
+        m = mfcc2.shape[0]
+        delta = self.delta
+        self._log(["n m delta: %d %d %d", n, m, delta])
+        if delta > m:
+            self._log("Limiting delta to m")
+            delta = m
+        interval = self._get_checkpoint_interval(n)
+        self._log(["checkpoint interval: %d", interval])
+        centers = self._compute_centers(n, m, delta)
+
+        def cost_row(i):
+            """ Compute the i-th row of the cost matrix """
+            return self._compute_cost_matrix_row(
+                mfcc1,
+                mfcc2,
+                i,
+                centers[i],
+                delta
+            )
+
+        def recompute_block(first_row, length):
+            """ Recompute the given rows of the acm from the stored checkpoint """
+            block = numpy.zeros((length, delta), dtype=mfcc1.dtype)
+            block[0, :] = checkpoints[first_row / interval]
+            for r in range(1, length):
+                block[r, :] = cost_row(first_row + r)
+                self._compute_acm_row(
+                    block[r-1, :],
+                    block[r, :],
+                    centers[first_row + r] - centers[first_row + r - 1]
+                )
+            return block
+
+        # forward pass: keep two rows only, storing a copy of every interval-th row
+        self._log("Computing checkpoints...")
+        checkpoints = []
+        previous_row = cost_row(0)
+        self._compute_acm_first_row(previous_row)
+        checkpoints.append(numpy.copy(previous_row))
+        for i in range(1, n):
+            current_row = cost_row(i)
+            self._compute_acm_row(previous_row, current_row, centers[i] - centers[i-1])
+            if i % interval == 0:
+                checkpoints.append(numpy.copy(current_row))
+            previous_row = current_row
+        self._log(["Computing checkpoints... done (%d checkpoints)", len(checkpoints)])
+
+        # backward pass: recompute the block containing the current row, if needed
+        self._log("Computing best path...")
+        block_start = ((n - 1) / interval) * interval
+        block = recompute_block(block_start, n - block_start)
+        i = n - 1
+        j = delta - 1 + centers[i]
+        # the path has at most i + j + 1 pairs:
+        # fill it from the end, then return the used part
+        k = i + j
+        path = numpy.zeros((k + 1, 2), dtype=numpy.int32)
+        path[k] = (i, j)
+        while (i > 0) or (j > 0):
+            if i == 0:
+                j -= 1
+                k -= 1
+                path[k] = (i, j)
+            elif j == 0:
+                i -= 1
+                k -= 1
+                path[k] = (i, j)
+            else:
+                if i == block_start:
+                    # the previous row belongs to the previous block:
+                    # recompute it, including its last row (i.e., the current row)
+                    block_start -= interval
+                    block = recompute_block(block_start, interval + 1)
+                r_i = i - block_start
                 offset = centers[i] - centers[i-1]
                 r_j = j - centers[i]
                 cost0 = numpy.inf
                 if (r_j+offset) < delta:
-                    cost0 = acc_matrix[i-1][r_j+offset]
+                    cost0 = block[r_i-1][r_j+offset]
                 cost1 = numpy.inf
                 if r_j > 0:
-                    cost1 = acc_matrix[i][r_j-1]
+                    cost1 = block[r_i][r_j-1]
                 cost2 = numpy.inf
                 if (r_j > 0) and ((r_j+offset-1) < delta) and ((r_j+offset-1) >= 0):
-                    cost2 = acc_matrix[i-1][r_j+offset-1]
+                    cost2 = block[r_i-1][r_j+offset-1]
                 costs = [
                     cost0,
                     cost1,
@@ -559,15 +1659,361 @@ class DTWStripe(object):
                     (i, j-1),
                     (i-1, j-1)
                 ]
-                min_cost = numpy.argmin(costs)
-                #self._log(["Selected min cost move %d", min_cost])
-                min_move = moves[min_cost]
-                path.append(min_move)
+                min_move = moves[numpy.argmin(costs)]
                 i, j = min_move
-        # reverse path and return
-        path.reverse()
+                k -= 1
+                path[k] = (i, j)
+        path = path[k:]
+        self._log("Computing best path... done")
+        self._log("Computing path using pure Python code... done")
+        return path
+
+
+
+class DTWMultiResolution(object):
+    """
+    Compute an approximation of the best path
+    with a coarse-to-fine strategy (FastDTW-style).
+
+    The MFCCs are downsampled by ``factor``
+    (averaging groups of consecutive frames),
+    and aligned with :class:`aeneas.dtw.DTWStripe`
+    using a stripe of ``delta / factor`` frames
+    around the main diagonal.
+    Then, at each finer level (halving the downsampling factor),
+    the path of the coarser level is projected,
+    and the alignment is computed with a stripe
+    following the projected path,
+    wide enough to contain it plus ``radius`` frames
+    (scaled to the current level) on each side.
+
+    Since the stripe has the same width at every row,
+    a long horizontal or vertical run in the projected path
+    (e.g., text not read in the audio) widens the whole corridor.
+    If, at some level, the corridor is wider than
+    the stripe of ``delta`` frames (scaled to that level),
+    the alignment is computed with the stripe of ``delta`` frames
+    around the main diagonal at full resolution instead,
+    as :class:`aeneas.dtw.DTWStripe` would do.
+
+    The accumulated cost matrix is the one of the stripe
+    of the finest level.
+
+    :param m1: the MFCCs of the real wave
+    :type  m1: numpy 2D array
+    :param m2: the MFCCs of the synthesized wave
+    :type  m2: numpy 2D array
+    :param delta: the width of the stripe at full resolution, in frames
+    :type  delta: int
+    :param radius: the radius of the corridor at full resolution, in frames
+    :type  radius: int
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+    :param factor: the downsampling factor of the coarsest level
+    :type  factor: int
+    :param threads: the number of threads used by the C extension
+                    to compute the cost matrix at each level
+    :type  threads: int
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "DTWMultiResolution"
+
+    def __init__(
+            self,
+            m1,
+            m2,
+            delta,
+            radius,
+            logger,
+            factor=gc.ALIGNER_MULTIRESOLUTION_FACTOR,
+            threads=gc.ALIGNER_THREADS
+        ):
+        self.m1 = MFCCFeatures.from_mfcc(m1)
+        self.m2 = MFCCFeatures.from_mfcc(m2)
+        self.delta = delta
+        self.radius = radius
+        self.logger = logger
+        self.factor = factor
+        self.threads = threads
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    def compute_accumulated_cost_matrix(self):
+        return self._compute_finest_stripe().compute_accumulated_cost_matrix()
+
+    def compute_path(self):
+        return self._compute_finest_stripe().compute_path()
+
+    def _compute_finest_stripe(self):
+        """
+        Compute the paths of the coarser levels,
+        and return the :class:`aeneas.dtw.DTWStripe`
+        of the finest level, following the projected path,
+        or the stripe of ``delta`` frames around the main diagonal,
+        if the corridor of some level is wider than it.
+        """
+        factors = self._get_factors()
+        self._log(["Downsampling factors: %s", factors])
+
+        # coarsest level: stripe around the main diagonal
+        factor = factors[0]
+        m1 = self._downsample(self.m1, factor)
+        m2 = self._downsample(self.m2, factor)
+        delta = self._get_max_delta(factor, len(m2))
+        self._log(["Level %d: n m delta: %d %d %d", factor, len(m1), len(m2), delta])
+        stripe = DTWStripe(m1, m2, delta, self.logger, threads=self.threads)
+
+        # finer levels: stripe following the projected path
+        for factor in factors[1:]:
+            path = stripe.compute_path()
+            if factor > 1:
+                m1 = self._downsample(self.m1, factor)
+                m2 = self._downsample(self.m2, factor)
+            else:
+                m1 = self.m1
+                m2 = self.m2
+            n = len(m1)
+            m = len(m2)
+            radius = int(numpy.ceil(1.0 * self.radius / factor))
+            delta, centers = self._project_path(path, n, m, radius)
+            max_delta = self._get_max_delta(factor, m)
+            if delta > max_delta:
+                self._log(["Level %d: corridor wider than the stripe (%d > %d), falling back to the stripe", factor, delta, max_delta], Logger.WARNING)
+                return DTWStripe(self.m1, self.m2, self._get_max_delta(1, len(self.m2)), self.logger, threads=self.threads)
+            self._log(["Level %d: n m delta: %d %d %d", factor, n, m, delta])
+            stripe = DTWStripe(m1, m2, delta, self.logger, centers=centers, threads=self.threads)
+        return stripe
+
+    def _get_max_delta(self, factor, m):
+        """
+        Return the width of the stripe of ``delta`` frames,
+        scaled to the level with the given downsampling factor
+        and ``m`` columns.
+        """
+        return min(int(numpy.ceil(1.0 * self.delta / factor)), m)
+
+    def _get_factors(self):
+        """
+        Return the list of the downsampling factors,
+        from the coarsest one to ``1``.
+        """
+        factors = [1]
+        factor = 1
+        while factor * 2 <= self.factor:
+            factor *= 2
+            factors.append(factor)
+        factors.reverse()
+        return factors
+
+    def _downsample(self, mfcc, factor):
+        """
+        Downsample the given :class:`aeneas.mfccfeatures.MFCCFeatures`
+        by the given factor,
+        averaging groups of ``factor`` consecutive frames
+        (the last group might be shorter).
+        """
+        n = len(mfcc)
+        indices = numpy.arange(0, n, factor)
+        counts = numpy.diff(numpy.append(indices, n))
+        return MFCCFeatures(numpy.add.reduceat(mfcc.frames, indices, axis=0) / counts.astype(mfcc.dtype)[:, numpy.newaxis])
+
+    def _project_path(self, path, n, m, radius):
+        """
+        Project the given path, computed at the coarser level,
+        to the finer level with ``n`` rows and ``m`` columns,
+        where each coarse cell corresponds to ``2 x 2`` fine cells.
+
+        Return a pair ``(delta, centers)``,
+        where ``delta`` is the width of the stripe,
+        large enough to contain the projected path
+        plus ``radius`` columns on each side,
+        and ``centers`` is the (desired) index of the first column
+        of the stripe at each row.
+        """
+        path = numpy.array(path, dtype=int)
+        rows = numpy.concatenate((2 * path[:, 0], 2 * path[:, 0] + 1))
+        cols = numpy.concatenate((2 * path[:, 1], 2 * path[:, 1] + 1))
+        rows = numpy.minimum(rows, n - 1)
+        cols = numpy.minimum(cols, m - 1)
+        min_j = numpy.zeros(n, dtype=int) + m
+        max_j = numpy.zeros(n, dtype=int) - 1
+        numpy.minimum.at(min_j, rows, cols)
+        numpy.maximum.at(max_j, rows, cols)
+        # every fine row is covered by the projection of a coarse row
+        delta = min(int(numpy.max(max_j - min_j)) + 1 + 2 * radius, m)
+        centers = (min_j + max_j + 1) / 2 - delta / 2
+        return (delta, centers)
+
+
+
+class DTWAdaptive(object):
+    """
+    Compute an approximation of the best path
+    with a stripe which is widened only where needed.
+
+    The MFCCs are first aligned with :class:`aeneas.dtw.DTWStripe`,
+    using a narrow stripe of ``initial_delta`` frames
+    around the main diagonal (or with the given ``centers``).
+    Then, each region of rows where the path touches
+    the boundary of the stripe, extended by ``initial_delta / 2`` rows
+    before and after it, is realigned between the pairs
+    of the path where it begins and ends,
+    with a stripe twice as wide, following the path.
+    This is repeated until the path does not touch
+    the boundary of the stripe anymore,
+    or the stripe is ``delta`` frames wide.
+
+    The boundary of the whole matrix is not a boundary of the stripe,
+    and, since the path is monotonic, neither is the boundary
+    of the submatrix between the two pairs of a realigned region.
+
+    :param m1: the MFCCs of the real wave
+    :type  m1: numpy 2D array
+    :param m2: the MFCCs of the synthesized wave
+    :type  m2: numpy 2D array
+    :param delta: the max width of the stripe, in frames
+    :type  delta: int
+    :param initial_delta: the initial width of the stripe, in frames
+    :type  initial_delta: int
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+    :param centers: the (desired) index of the first column
+                    of the initial stripe at each row;
+                    if ``None``, the initial stripe
+                    is centered on the main diagonal
+    :type  centers: numpy 1D array of int
+    :param threads: the number of threads used by the C extension
+                    to compute the cost matrix of each stripe
+    :type  threads: int
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "DTWAdaptive"
+
+    def __init__(
+            self,
+            m1,
+            m2,
+            delta,
+            initial_delta,
+            logger,
+            centers=None,
+            threads=gc.ALIGNER_THREADS
+        ):
+        self.m1 = MFCCFeatures.from_mfcc(m1)
+        self.m2 = MFCCFeatures.from_mfcc(m2)
+        self.delta = delta
+        self.initial_delta = initial_delta
+        self.logger = logger
+        self.centers = centers
+        self.threads = threads
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    def compute_accumulated_cost_matrix(self):
+        self._log("The accumulated cost matrix of the adaptive stripe is not available", Logger.CRITICAL)
+        raise ValueError("The adaptive stripe algorithm does not compute the accumulated cost matrix")
+
+    def compute_path(self):
+        n = len(self.m1)
+        m = len(self.m2)
+        delta = max(1, min(self.initial_delta, self.delta, m))
+        self._log(["n m initial delta: %d %d %d", n, m, delta])
+        stripe = DTWStripe(self.m1, self.m2, delta, self.logger, centers=self.centers, threads=self.threads)
+        path = stripe.compute_path()
+        widths = numpy.zeros(n, dtype=int) + delta
+        touching = self._find_touching_rows(path, stripe._compute_centers(n, m, delta), delta, n, m)
+        pad = max(1, delta / 2)
+        while numpy.any(touching):
+            regions = self._find_regions(touching, pad)
+            self._log(["Realigning %d regions", len(regions)])
+            # from the last region, so that the indices
+            # of the pairs of the previous regions do not change
+            for i0, i1 in reversed(regions):
+                previous_width = numpy.max(widths[i0:(i1 + 1)])
+                if previous_width >= self.delta:
+                    self._log(["Rows %d-%d touch the boundary of the widest stripe", i0, i1])
+                    touching[i0:(i1 + 1)] = False
+                    continue
+                begin = numpy.searchsorted(path[:, 0], i0, side="left")
+                end = numpy.searchsorted(path[:, 0], i1, side="right") - 1
+                offset = path[begin]
+                sub_n = i1 - i0 + 1
+                sub_m = path[end, 1] - offset[1] + 1
+                width = min(2 * previous_width, self.delta, sub_m)
+                self._log(["Rows %d-%d: n m delta: %d %d %d", i0, i1, sub_n, sub_m, width])
+                centers = self._follow_path(path[begin:(end + 1)] - offset, sub_n, width)
+                stripe = DTWStripe(
+                    self.m1[i0:(i1 + 1)],
+                    self.m2[offset[1]:(offset[1] + sub_m)],
+                    width,
+                    self.logger,
+                    centers=centers,
+                    threads=self.threads
+                )
+                sub_path = stripe.compute_path()
+                path = numpy.concatenate((path[:begin], sub_path + offset, path[(end + 1):]))
+                widths[i0:(i1 + 1)] = width
+                touching[i0:(i1 + 1)] = self._find_touching_rows(
+                    sub_path,
+                    stripe._compute_centers(sub_n, sub_m, width),
+                    width,
+                    sub_n,
+                    sub_m
+                )
         return path
 
+    def _find_touching_rows(self, path, centers, delta, n, m):
+        """
+        Return a boolean array with ``n`` elements,
+        which is ``True`` for the rows where the given path
+        touches the boundary of the stripe with the given centers,
+        excluding the boundary of the matrix with ``m`` columns.
+        """
+        rows = path[:, 0]
+        cols = path[:, 1]
+        first = centers[rows]
+        last = first + delta - 1
+        touching = numpy.zeros(n, dtype=bool)
+        touching[rows[((cols == first) & (first > 0)) | ((cols == last) & (last < m - 1))]] = True
+        return touching
+
+    def _find_regions(self, touching, pad):
+        """
+        Return the list of the regions ``[i0, i1]`` to be realigned,
+        that is, the runs of touching rows, extended by ``pad`` rows
+        on each side, merging overlapping or adjacent regions.
+        """
+        n = len(touching)
+        regions = []
+        for row in numpy.nonzero(touching)[0]:
+            i0 = max(0, row - pad)
+            i1 = min(n - 1, row + pad)
+            if (len(regions) > 0) and (i0 <= regions[-1][1] + 1):
+                regions[-1][1] = i1
+            else:
+                regions.append([i0, i1])
+        return regions
+
+    def _follow_path(self, path, n, delta):
+        """
+        Return the (desired) index of the first column
+        of a stripe ``delta`` columns wide
+        centered on the given path, at each of the ``n`` rows.
+        """
+        min_j = numpy.zeros(n, dtype=int) + path[-1, 1]
+        max_j = numpy.zeros(n, dtype=int)
+        numpy.minimum.at(min_j, path[:, 0], path[:, 1])
+        numpy.maximum.at(max_j, path[:, 0], path[:, 1])
+        return (min_j + max_j + 1) / 2 - delta / 2
+
 
 
 class DTWExact(object):
@@ -575,8 +2021,8 @@ class DTWExact(object):
     TAG = "DTWExact"
 
     def __init__(self, m1, m2, logger):
-        self.m1 = m1
-        self.m2 = m2
+        self.m1 = MFCCFeatures.from_mfcc(m1)
+        self.m2 = MFCCFeatures.from_mfcc(m2)
         self.logger = logger
 
     def _log(self, message, severity=Logger.DEBUG):
@@ -609,33 +2055,13 @@ class DTWExact(object):
         return best_path
 
     def _compute_cost_matrix(self):
-        # discard first MFCC component
-        mfcc1 = self.m1[1:, :]
-        mfcc2 = self.m2[1:, :]
-        norm2_1 = numpy.sqrt(numpy.sum(mfcc1 ** 2, 0))
-        norm2_2 = numpy.sqrt(numpy.sum(mfcc2 ** 2, 0))
+        # discard first MFCC component, the frames are already normalized
+        mfcc1 = self.m1.normalized
+        mfcc2 = self.m2.normalized
         # compute dot product
-        self._log("Computing matrix with transpose+dot...")
-        cost_matrix = mfcc1.transpose().dot(mfcc2)
-        self._log("Computing matrix with transpose+dot... done")
-        # normalize
-        self._log("Normalizing matrix...")
-
-        #
-        # slower version
-        #
-        #for i in range(len(norm2_1)):
-        #    for j in range(len(norm2_2)):
-        #        cost_matrix[i][j] /= norm2_1[i] * norm2_2[j]
-        #        cost_matrix[i][j] = 1 - cost_matrix[i][j]
-
-        #
-        # faster version
-        #
-        norm_matrix = numpy.outer(norm2_1, norm2_2)
-        cost_matrix = 1 - (cost_matrix / norm_matrix)
-
-        self._log("Normalizing matrix... done")
+        self._log("Computing matrix with dot+transpose...")
+        cost_matrix = 1 - mfcc1.dot(mfcc2.transpose())
+        self._log("Computing matrix with dot+transpose... done")
         return cost_matrix
 
     def _compute_accumulated_cost_matrix(self, cost_matrix):
@@ -669,7 +2095,7 @@ class DTWExact(object):
 
     def _compute_acm_not_in_place(self, cost_matrix):
         self._log("Using the not-in-place algorithm for computing the acm")
-        acc_matrix = numpy.zeros(cost_matrix.shape)
+        acc_matrix = numpy.zeros(cost_matrix.shape, dtype=cost_matrix.dtype)
         n, m = acc_matrix.shape
         self._log(["n m: %d %d", n, m])
         acc_matrix[0][0] = cost_matrix[0][0]
@@ -692,15 +2118,21 @@ class DTWExact(object):
         self._log(["n m: %d %d", n, m])
         i = n - 1
         j = m - 1
-        path = [(i, j)]
+        # the path has at most i + j + 1 pairs:
+        # fill it from the end, then return the used part
+        k = i + j
+        path = numpy.zeros((k + 1, 2), dtype=numpy.int32)
+        path[k] = (i, j)
         # compute best (min cost) path
         while (i > 0) or (j > 0):
             if i == 0:
-                path.append((0, j-1))
                 j -= 1
+                k -= 1
+                path[k] = (i, j)
             elif j == 0:
-                path.append((i-1, 0))
                 i -= 1
+                k -= 1
+                path[k] = (i, j)
             else:
                 costs = [
                     acc_matrix[i-1][j],
@@ -715,11 +2147,261 @@ class DTWExact(object):
                 min_cost = numpy.argmin(costs)
                 #self._log(["Selected min cost move %d", min_cost])
                 min_move = moves[min_cost]
-                path.append(min_move)
                 i, j = min_move
-        # reverse path and return
-        path.reverse()
-        return path
+                k -= 1
+                path[k] = (i, j)
+        return path[k:]
+
+
+class DTWSubsequence(object):
+    """
+    Compute the subsequence DTW of a query wave
+    against an audio wave, open-begin and open-end,
+    where a match of the whole query can begin
+    only at the given frames of the audio.
+
+    The columns of the accumulated cost matrix
+    (one per audio frame) are computed one at a time,
+    keeping only two of them,
+    hence the working memory is linear in the length of the query.
+
+    ``compute_costs()`` evaluates each start separately,
+    in its own window ``[start, start + max_length)``,
+    among the matches whose length, in audio frames,
+    is in ``[min_length, max_length)``.
+
+    ``compute_end_costs()`` evaluates all the starts in a single pass,
+    returning the min cost of a match ending at each audio frame,
+    beginning at any start.
+    Since each of them is a lower bound
+    of the cost of the matches ending there computed by ``compute_costs()``,
+    they can be used to skip the starts which cannot be the best ones
+    (see :class:`aeneas.sd.SD`).
+
+    :param m1: the MFCCs of the query wave
+    :type  m1: numpy 2D array or :class:`aeneas.mfccfeatures.MFCCFeatures`
+    :param m2: the MFCCs of the audio wave
+    :type  m2: numpy 2D array or :class:`aeneas.mfccfeatures.MFCCFeatures`
+    :param starts: the audio frames where a match can begin
+    :type  starts: list of int
+    :param min_length: the min length of a match, in audio frames
+    :type  min_length: int
+    :param max_length: the max length (excluded) of a match, in audio frames
+    :type  max_length: int
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "DTWSubsequence"
+
+    def __init__(self, m1, m2, starts, min_length, max_length, logger):
+        self.m1 = MFCCFeatures.from_mfcc(m1)
+        self.m2 = MFCCFeatures.from_mfcc(m2)
+        self.starts = starts
+        self.min_length = min_length
+        self.max_length = max_length
+        self.logger = logger
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    def compute_costs(self, starts=None):
+        """
+        Return a pair ``(values, lengths)``,
+        where ``values[k]`` is the min accumulated cost
+        of a match beginning at the ``k``-th start
+        (or ``inf`` if no match begins there),
+        and ``lengths[k]`` is its length in audio frames
+        (or ``-1`` if no match begins there).
+
+        The starts are sorted, and duplicates removed,
+        hence ``k`` is the index of the start in ``numpy.unique(starts)``.
+
+        :param starts: the audio frames where a match can begin;
+                       if ``None``, use the starts passed to the constructor
+        :type  starts: list of int
+        :rtype: (numpy 1D array of float, numpy 1D array of int32)
+        """
+        starts = self._compute_starts(starts)
+        if gc.USE_C_EXTENSIONS:
+            self._log("C extensions enabled in gc")
+            if gf.can_run_c_extension("cdtw"):
+                self._log("C extensions enabled in gc and cdtw can be loaded")
+                try:
+                    return self._compute_costs_c_extension(starts)
+                except:
+                    self._log(
+                        "An error occurred running cdtw",
+                         severity=Logger.WARNING
+                    )
+            else:
+                self._log("C extensions enabled in gc, but cdtw cannot be loaded")
+        else:
+            self._log("C extensions disabled in gc")
+        self._log("Running the pure Python code")
+        return self._compute_costs_pure_python(starts)
+
+    def compute_end_costs(self):
+        """
+        Return the min accumulated cost of a match
+        ending at each audio frame, beginning at any start
+        (or ``inf`` if no match ends there),
+        computed in a single pass.
+
+        Each of them is a lower bound of the cost
+        of any match ending there computed by ``compute_costs()``.
+
+        :rtype: numpy 1D array of float
+        """
+        starts = self._compute_starts(None)
+        if gc.USE_C_EXTENSIONS:
+            self._log("C extensions enabled in gc")
+            if gf.can_run_c_extension("cdtw"):
+                self._log("C extensions enabled in gc and cdtw can be loaded")
+                try:
+                    return self._compute_end_costs_c_extension(starts)
+                except:
+                    self._log(
+                        "An error occurred running cdtw",
+                         severity=Logger.WARNING
+                    )
+            else:
+                self._log("C extensions enabled in gc, but cdtw cannot be loaded")
+        else:
+            self._log("C extensions disabled in gc")
+        self._log("Running the pure Python code")
+        return self._compute_end_costs_pure_python(starts)
+
+    def _compute_starts(self, starts):
+        """ Return the starts inside the audio wave, sorted and distinct """
+        if starts is None:
+            starts = self.starts
+        starts = numpy.unique(numpy.asarray(starts, dtype=numpy.int32))
+        return starts[(starts >= 0) & (starts < len(self.m2))]
+
+    def _get_normalized_mfcc_c_extension(self):
+        """ Return the normalized MFCCs, as required by cdtw """
+        # see DTWStripe._compute_normalized_mfcc_c_extension
+        mfcc1 = numpy.ascontiguousarray(self.m1.normalized, dtype=numpy.float64)
+        mfcc2 = numpy.ascontiguousarray(self.m2.normalized, dtype=numpy.float64)
+        return (mfcc1, mfcc2)
+
+    def _compute_costs_c_extension(self, starts):
+        self._log("Computing costs using C extension...")
+        self._log("Importing cdtw...")
+        import aeneas.cdtw
+        self._log("Importing cdtw... done")
+        mfcc1, mfcc2 = self._get_normalized_mfcc_c_extension()
+        self._log(["n m k: %d %d %d", len(mfcc1), len(mfcc2), len(starts)])
+        values, lengths = aeneas.cdtw.cdtw_compute_subsequence_costs(
+            mfcc1,
+            mfcc2,
+            starts,
+            self.min_length,
+            self.max_length
+        )
+        self._log("Computing costs using C extension... done")
+        return (values, lengths)
+
+    def _compute_end_costs_c_extension(self, starts):
+        self._log("Computing end costs using C extension...")
+        self._log("Importing cdtw...")
+        import aeneas.cdtw
+        self._log("Importing cdtw... done")
+        mfcc1, mfcc2 = self._get_normalized_mfcc_c_extension()
+        self._log(["n m k: %d %d %d", len(mfcc1), len(mfcc2), len(starts)])
+        end_costs = aeneas.cdtw.cdtw_compute_subsequence_end_costs(
+            mfcc1,
+            mfcc2,
+            starts,
+            self.max_length
+        )
+        self._log("Computing end costs using C extension... done")
+        return end_costs
+
+    def _compute_costs_pure_python(self, starts):
+        self._log("Computing costs using pure Python code...")
+        self._log(["n m k: %d %d %d", len(self.m1), len(self.m2), len(starts)])
+        values = numpy.inf * numpy.ones(len(starts))
+        lengths = -1 * numpy.ones(len(starts), dtype=numpy.int32)
+        # one start at a time, in its own window
+        for k in range(len(starts)):
+            values[k:(k + 1)], lengths[k:(k + 1)] = self._compute_columns_pure_python(starts[k:(k + 1)], self.min_length)
+        self._log("Computing costs using pure Python code... done")
+        return (values, lengths)
+
+    def _compute_end_costs_pure_python(self, starts):
+        self._log("Computing end costs using pure Python code...")
+        self._log(["n m k: %d %d %d", len(self.m1), len(self.m2), len(starts)])
+        end_costs = numpy.inf * numpy.ones(len(self.m2))
+        self._compute_columns_pure_python(starts, 0, end_costs)
+        self._log("Computing end costs using pure Python code... done")
+        return end_costs
+
+    def _compute_columns_pure_python(self, starts, min_length, end_costs=None):
+        """
+        Compute the columns of the accumulated cost matrix,
+        with matches beginning at any of the given starts,
+        and return the pair ``(values, lengths)`` of the starts,
+        where a start gets a value only if it is the best start
+        of a match ending at some audio frame.
+        If ``end_costs`` is not ``None``, store in it
+        the cost of the best match ending at each audio frame.
+        """
+        mfcc1 = self.m1.normalized
+        mfcc2 = self.m2.normalized
+        n = len(mfcc1)
+        m = len(mfcc2)
+        values = numpy.inf * numpy.ones(len(starts))
+        lengths = -1 * numpy.ones(len(starts), dtype=numpy.int32)
+        if (len(starts) == 0) or (n == 0):
+            return (values, lengths)
+        previous_column = numpy.inf * numpy.ones(n)
+        previous_starts = -1 * numpy.ones(n, dtype=int)
+        current_column = numpy.zeros(n)
+        current_starts = numpy.zeros(n, dtype=int)
+        next_start = 0
+        # no match can end after the last start plus max_length
+        for j in range(starts[0], min(m, starts[-1] + self.max_length)):
+            cost_column = 1 - mfcc1.dot(mfcc2[j])
+            if (next_start < len(starts)) and (starts[next_start] == j):
+                # a new match beginning here costs less
+                # than any match continuing here,
+                # since all the costs are non-negative
+                current_column[0] = cost_column[0]
+                current_starts[0] = next_start
+                next_start += 1
+            else:
+                current_column[0] = cost_column[0] + previous_column[0]
+                current_starts[0] = previous_starts[0]
+            for i in range(1, n):
+                costs = [
+                    current_column[i-1],
+                    previous_column[i],
+                    previous_column[i-1]
+                ]
+                min_cost = numpy.argmin(costs)
+                current_column[i] = cost_column[i] + costs[min_cost]
+                current_starts[i] = [
+                    current_starts[i-1],
+                    previous_starts[i],
+                    previous_starts[i-1]
+                ][min_cost]
+            # the match ending here consumed the whole query
+            if end_costs is not None:
+                end_costs[j] = current_column[n-1]
+            k = current_starts[n-1]
+            if k >= 0:
+                length = j - starts[k]
+                if (length >= min_length) and (length < self.max_length) and (current_column[n-1] < values[k]):
+                    values[k] = current_column[n-1]
+                    lengths[k] = length
+            previous_column, current_column = current_column, previous_column
+            previous_starts, current_starts = current_starts, previous_starts
+        return (values, lengths)
 
 
 
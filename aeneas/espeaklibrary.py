@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+A class to synthesize text with the ``espeak`` shared library,
+inside the current process.
+
+.. versionadded:: 1.3.0
+"""
+
+import ctypes
+import ctypes.util
+import numpy
+import threading
+
+import aeneas.globalconstants as gc
+from aeneas.logger import Logger
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL v3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+# int callback(short *wav, int numsamples, espeak_EVENT *events)
+SYNTH_CALLBACK = ctypes.CFUNCTYPE(
+    ctypes.c_int,
+    ctypes.POINTER(ctypes.c_short),
+    ctypes.c_int,
+    ctypes.c_void_p
+)
+
+class ESPEAKLibrary(object):
+    """
+    Synthesize text with the ``espeak`` shared library (``libespeak``),
+    loaded with ``ctypes``, inside the current process.
+
+    Each call of ``synthesize()`` synthesizes one text fragment,
+    collecting the samples returned by the library callback,
+    hence the samples of each fragment are known exactly,
+    without starting a process or writing a ``wav`` file per fragment.
+    The fragments are synthesized with the voice and the end pause
+    the ``espeak`` executable uses by default,
+    but the samples are the same it would write
+    only if the library and the executable come from the same ``espeak`` build
+    (see :class:`aeneas.globalconstants.USE_ESPEAK_LIBRARY`).
+
+    The library is loaded and initialized once per process,
+    and the calls are serialized, since ``espeak`` is not thread safe.
+
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+
+    .. versionadded:: 1.3.0
+    """
+
+    AUDIO_OUTPUT_SYNCHRONOUS = 2
+    """ ``espeak_AUDIO_OUTPUT`` value: synthesize synchronously,
+    passing the samples to the callback """
+
+    POS_CHARACTER = 1
+    """ ``espeak_POSITION_TYPE`` value: position in characters """
+
+    CHARS_UTF8 = 1
+    """ ``espeak_Synth`` flag: the text is UTF-8 encoded """
+
+    ENDPAUSE = 0x1000
+    """ ``espeak_Synth`` flag: add a pause at the end of the text,
+    as the ``espeak`` executable does """
+
+    EE_OK = 0
+    """ ``espeak_ERROR`` value: success """
+
+    TAG = "ESPEAKLibrary"
+
+    # the library, loaded and initialized once per process
+    __library = None
+    __sample_rate = None
+    __callback = None
+    __samples = []
+    __lock = threading.Lock()
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        if self.logger is None:
+            self.logger = Logger()
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    @classmethod
+    def _load(cls):
+        """
+        Load and initialize the library, if not done yet.
+
+        Raise ``OSError`` if the library cannot be loaded or initialized.
+        """
+        if cls.__library is not None:
+            return
+        path = gc.ESPEAK_LIBRARY_PATH
+        if path is None:
+            path = ctypes.util.find_library("espeak")
+        if path is None:
+            raise OSError("Cannot find the espeak library")
+        library = ctypes.CDLL(path)
+        library.espeak_Initialize.restype = ctypes.c_int
+        library.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        library.espeak_SetSynthCallback.restype = None
+        library.espeak_SetSynthCallback.argtypes = [SYNTH_CALLBACK]
+        library.espeak_SetVoiceByName.restype = ctypes.c_int
+        library.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        library.espeak_Synth.restype = ctypes.c_int
+        library.espeak_Synth.argtypes = [
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_uint,
+            ctypes.c_uint,
+            ctypes.POINTER(ctypes.c_uint),
+            ctypes.c_void_p
+        ]
+        sample_rate = library.espeak_Initialize(cls.AUDIO_OUTPUT_SYNCHRONOUS, 0, None, 0)
+        if sample_rate <= 0:
+            raise OSError("Cannot initialize the espeak library")
+        # keep a reference to the callback, otherwise it gets garbage collected
+        cls.__callback = SYNTH_CALLBACK(cls._collect_samples)
+        library.espeak_SetSynthCallback(cls.__callback)
+        cls.__sample_rate = sample_rate
+        cls.__library = library
+
+    @classmethod
+    def _collect_samples(cls, wav, numsamples, events):
+        """ Callback collecting the samples passed by the library """
+        if (wav) and (numsamples > 0):
+            cls.__samples.append(ctypes.string_at(wav, numsamples * 2))
+        return 0
+
+    @classmethod
+    def is_available(cls):
+        """
+        Return ``True`` if the library can be loaded and initialized.
+
+        :rtype: bool
+        """
+        try:
+            with cls.__lock:
+                cls._load()
+            return True
+        except (OSError, AttributeError):
+            return False
+
+    @property
+    def sample_rate(self):
+        """
+        The sample rate of the synthesized samples,
+        or ``None`` if the library is not loaded.
+
+        :rtype: int
+        """
+        return self.__sample_rate
+
+    def synthesize(self, text, language):
+        """
+        Synthesize the given text with the voice of the given language,
+        and return its samples.
+
+        As for the ``espeak`` executable,
+        no sample is returned if the voice does not exist.
+
+        :param text: the text to synthesize
+        :type  text: unicode
+        :param language: the language (voice) to use
+        :type  language: string (from :class:`aeneas.language.Language` enumeration)
+        :rtype: numpy 1D array of int16 (little endian)
+        """
+        text = text.encode("utf-8")
+        with self.__lock:
+            self._load()
+            if self.__library.espeak_SetVoiceByName(language.encode("ascii")) != self.EE_OK:
+                self._log(["Voice '%s' not found", language], Logger.WARNING)
+                return numpy.zeros(0, dtype="<i2")
+            del self.__samples[:]
+            result = self.__library.espeak_Synth(
+                text,
+                len(text) + 1,
+                0,
+                self.POS_CHARACTER,
+                0,
+                self.CHARS_UTF8 | self.ENDPAUSE,
+                None,
+                None
+            )
+            data = b"".join(self.__samples)
+            del self.__samples[:]
+        if result != self.EE_OK:
+            raise OSError("The espeak library cannot synthesize the text")
+        return numpy.fromstring(data, dtype=numpy.int16).astype("<i2")
+
+
+
@@ -5,11 +5,18 @@
 Wrapper around ``espeak`` to synthesize text into a ``wav`` audio file.
 """
 
+import collections
+import numpy
 import os
 import subprocess
+import tempfile
+from multiprocessing.pool import ThreadPool
 from scikits.audiolab import wavread
 
 import aeneas.globalconstants as gc
+import aeneas.globalfunctions as gf
+from aeneas.audiofile import read_wav
+from aeneas.espeaklibrary import ESPEAKLibrary
 from aeneas.language import Language
 from aeneas.logger import Logger
 
@@ -32,6 +39,11 @@ class ESPEAKWrapper(object):
 
         $ espeak -v language_code -w /tmp/output_file.wav < text
 
+    Many text fragments can be synthesized at once
+    by ``synthesize_multiple()``, which can use the ``espeak`` shared library
+    (see :class:`aeneas.espeaklibrary.ESPEAKLibrary`), if enabled and available,
+    or several ``espeak`` processes running concurrently.
+
     :param logger: the logger object
     :type  logger: :class:`aeneas.logger.Logger`
     """
@@ -123,16 +135,148 @@ class ESPEAKWrapper(object):
             raise OSError("Output file cannot be read")
 
         # return the duration of the output file
-        self._log(["Calling wavread to analyze file '%s'", output_file_path])
+        # (only its header is read, if it is a 16 bit PCM file)
         duration = 0
         try:
-            data, sample_frequency, encoding = wavread(output_file_path)
+            try:
+                data, sample_frequency, encoding = read_wav(output_file_path)
+            except ValueError:
+                self._log(["Calling wavread to analyze file '%s'", output_file_path])
+                data, sample_frequency, encoding = wavread(output_file_path)
             duration = len(data) / float(sample_frequency)
+            del data
             self._log(["Duration of '%s': %f", output_file_path, duration])
         except IOError as e:
             self._log("IOError while trying reading the generated file")
             self._log(["Message: %s", e])
         return duration
 
+    def synthesize_multiple(self, fragments, workers=None):
+        """
+        Synthesize the given text fragments, one after the other,
+        yielding a pair ``(samples, sample_rate)`` for each of them,
+        where ``samples`` are its mono 16 bit samples
+        (a numpy 1D array of int16, possibly empty)
+        and ``sample_rate`` is their sample rate
+        (``None`` if the fragment has no text).
+
+        If :class:`aeneas.globalconstants.USE_ESPEAK_LIBRARY` is ``True``
+        (by default, it is not)
+        and the ``espeak`` shared library is available,
+        all the fragments are synthesized by it, inside this process,
+        so that no process is started and no file is written.
+        Otherwise, each fragment is synthesized
+        by calling ``synthesize()`` on a temporary ``wav`` file,
+        which is read once and removed,
+        and if ``workers`` is greater than ``1``, the ``espeak`` executable
+        is run by that many threads concurrently,
+        and the results are yielded in the order of the fragments.
+        The number of workers never changes the backend,
+        so the samples do not depend on it.
+        In all cases, the number of samples of each fragment is exact,
+        so the time anchors of the fragments can be computed from it.
+
+        The fragments are synthesized only when requested
+        (or, with several workers, at most ``2 * workers`` fragments
+        ahead of the one being yielded),
+        hence the caller can stop at any fragment.
+
+        :param fragments: the text fragments, as pairs ``(text, language)``
+        :type  fragments: iterable of tuples
+        :param workers: the number of ``espeak`` processes
+                        running concurrently, ignored if the library is used;
+                        if ``None``, use
+                        :class:`aeneas.globalconstants.SYNTHESIZER_WORKERS`
+        :type  workers: int
+        :rtype: generator of tuples
+
+        .. versionadded:: 1.3.0
+        """
+        if workers is None:
+            workers = gc.SYNTHESIZER_WORKERS
+        library = None
+        if gc.USE_ESPEAK_LIBRARY:
+            if ESPEAKLibrary.is_available():
+                self._log("Synthesizing with the espeak library")
+                library = ESPEAKLibrary(logger=self.logger)
+                if workers > 1:
+                    self._log(["Ignoring %d workers, the espeak library synthesizes one fragment at a time", workers])
+            else:
+                self._log("The espeak library is not available, calling espeak")
+        if (library is None) and (workers > 1):
+            self._log(["Synthesizing with %d concurrent espeak processes", workers])
+            synthesized = self._synthesize_concurrently(fragments, workers)
+            try:
+                for result in synthesized:
+                    yield result
+            finally:
+                synthesized.close()
+            return
+        for text, language in fragments:
+            if (library is not None) and (text is not None) and (len(text) > 0):
+                language = self._replace_language(language)
+                yield (library.synthesize(text, language), library.sample_rate)
+            else:
+                yield self._synthesize_to_samples(text, language)
+
+    def _synthesize_concurrently(self, fragments, workers):
+        """
+        Synthesize the given fragments with a pool of ``workers`` threads,
+        each running the ``espeak`` executable,
+        yielding their samples and sample rates in the order of the fragments.
+
+        At most ``2 * workers`` fragments are dispatched
+        and not yet yielded at any time,
+        so that the dispatch stops soon after the caller stops.
+        """
+        pool = ThreadPool(workers)
+        pending = collections.deque()
+        fragments = iter(fragments)
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    try:
+                        text, language = next(fragments)
+                    except StopIteration:
+                        break
+                    pending.append(pool.apply_async(
+                        self._synthesize_to_samples,
+                        (text, language)
+                    ))
+                if len(pending) == 0:
+                    break
+                yield pending.popleft().get()
+        finally:
+            # let the dispatched fragments complete,
+            # so that their temporary files are removed
+            pool.close()
+            pool.join()
+
+    def _synthesize_to_samples(self, text, language):
+        """
+        Synthesize the given text into a temporary ``wav`` file,
+        and return its samples and sample rate, removing the file.
+        """
+        if (text is None) or (len(text) == 0):
+            self._log("Text is None or it has zero length")
+            return (numpy.zeros(0, dtype="<i2"), None)
+        handler, tmp_path = tempfile.mkstemp(
+            suffix=".wav",
+            dir=gf.custom_tmp_dir()
+        )
+        try:
+            duration = self.synthesize(text, language, tmp_path)
+            if duration <= 0:
+                return (numpy.zeros(0, dtype="<i2"), None)
+            samples, sample_rate, encoding = read_wav(tmp_path)
+            # copy the samples, releasing the memory map before removing the file
+            data = numpy.array(samples)
+            del samples
+            return (data, sample_rate)
+        finally:
+            self._log(["Removing temporary file '%s'", tmp_path])
+            os.close(handler)
+            os.remove(tmp_path)
+
 
 
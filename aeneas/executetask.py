@@ -5,6 +5,7 @@
 Execute a task, that is, compute the sync map for it.
 """
 
+import itertools
 import numpy
 import os
 import tempfile
@@ -12,16 +13,17 @@ import tempfile
 import aeneas.globalconstants as gc
 import aeneas.globalfunctions as gf
 from aeneas.adjustboundaryalgorithm import AdjustBoundaryAlgorithm
-from aeneas.audiofile import AudioFile
-from aeneas.dtw import DTWAligner
+from aeneas.dtw import DTWAligner, DTWSegmentedAligner
+from aeneas.featurestore import FeatureStore
 from aeneas.ffmpegwrapper import FFMPEGWrapper
 from aeneas.language import Language
 from aeneas.logger import Logger
+from aeneas.mfcccache import MFCCCache
+from aeneas.mfccstream import MFCCStream
 from aeneas.sd import SD
 from aeneas.syncmap import SyncMap, SyncMapFragment, SyncMapHeadTailFormat
 from aeneas.synthesizer import Synthesizer
 from aeneas.textfile import TextFragment
-from aeneas.vad import VAD
 
 __author__ = "Alberto Pettarin"
 __copyright__ = """
@@ -93,36 +95,49 @@ class ExecuteTask(object):
 
         #TODO refactor what follows
 
-        # real full wave    = the real audio file, converted to WAVE format
+        # real full wave    = the real audio file, decoded to mono 16 bit samples
         # real trimmed wave = real full wave, possibly with head and/or tail trimmed off
         # synt wave         = WAVE file synthesized from text; it will be aligned to real trimmed wave
-
-        # STEP 0 : convert audio file to real full wave
-        self._log("STEP 0 BEGIN")
-        result, real_full_handler, real_full_path = self._convert()
-        self.cleanup_info.append([real_full_handler, real_full_path])
-        if not result:
-            self._log("STEP 0 FAILURE")
-            self._cleanup()
-            return False
-        self._log("STEP 0 END")
-
-        # STEP 1 : extract MFCCs from real full wave
-        self._log("STEP 1 BEGIN")
-        result, real_full_wave_full_mfcc, real_full_wave_length = self._extract_mfcc(real_full_path)
-        if not result:
-            self._log("STEP 1 FAILURE")
-            self._cleanup()
-            return False
-        self._log("STEP 1 END")
+        #
+        # the MFCCs and the VAD intervals of the real full wave
+        # are computed once, and kept in a feature store:
+        # the real trimmed wave is just a range of frames of it
+        #
+        # if the MFCCs of the real full wave are in the on-disk cache,
+        # STEP 0 and STEP 1 are skipped
+        sample_rate = FFMPEGWrapper.DECODE_SAMPLE_RATE_DEFAULT
+        cache, cache_key, feature_store = self._load_cached_features(sample_rate)
+        if feature_store is not None:
+            self._log("STEP 0 SKIPPED (cached MFCCs)")
+            self._log("STEP 1 SKIPPED (cached MFCCs)")
+        else:
+            # STEP 0 : start decoding audio file to real full wave
+            self._log("STEP 0 BEGIN")
+            result, sample_rate, real_full_blocks = self._decode(sample_rate)
+            if not result:
+                self._log("STEP 0 FAILURE")
+                self._cleanup()
+                return False
+            self._log("STEP 0 END")
+
+            # STEP 1 : extract MFCCs from real full wave
+            #          block by block, while it is being decoded
+            self._log("STEP 1 BEGIN")
+            result, feature_store = self._extract_mfcc(sample_rate, real_full_blocks)
+            if not result:
+                self._log("STEP 1 FAILURE")
+                self._cleanup()
+                return False
+            if cache_key is not None:
+                cache.put(cache_key, feature_store.features, feature_store.audio_length)
+            self._log("STEP 1 END")
 
         # STEP 2 : cut head and/or tail off
         #          detecting head/tail if requested, and
-        #          overwriting real_path
-        #          at the end, read_path will not have the head/tail
+        #          trimming the frames of the feature store
+        #          at the end, its trimmed features will not have the head/tail
         self._log("STEP 2 BEGIN")
-        result = self._cut_head_tail(real_full_path)
-        real_trimmed_path = real_full_path
+        result = self._cut_head_tail(feature_store)
         if not result:
             self._log("STEP 2 FAILURE")
             self._cleanup()
@@ -141,7 +156,7 @@ class ExecuteTask(object):
 
         # STEP 4 : align waves
         self._log("STEP 4 BEGIN")
-        result, wave_map = self._align_waves(real_trimmed_path, synt_path)
+        result, wave_map = self._align_waves(feature_store, synt_path)
         if not result:
             self._log("STEP 4 FAILURE")
             self._cleanup()
@@ -161,7 +176,7 @@ class ExecuteTask(object):
         self._log("STEP 6 BEGIN")
         result, translated_text_map = self._translate_text_map(
             text_map,
-            real_full_wave_length
+            feature_store.audio_length
         )
         if not result:
             self._log("STEP 6 FAILURE")
@@ -173,8 +188,7 @@ class ExecuteTask(object):
         self._log("STEP 7 BEGIN")
         result, adjusted_map = self._adjust_boundaries(
             translated_text_map,
-            real_full_wave_full_mfcc,
-            real_full_wave_length
+            feature_store
         )
         if not result:
             self._log("STEP 7 FAILURE")
@@ -220,60 +234,121 @@ class ExecuteTask(object):
                     self._log("Failed")
         self.cleanup_info = []
 
-    def _convert(self):
+    def _load_cached_features(self, sample_rate):
+        """
+        Look up the MFCCs of the real full wave,
+        decoded at the given sample rate,
+        in the on-disk MFCC cache, if enabled,
+        keyed by the contents of the audio file
+        and by the decoding and MFCC parameters.
+
+        Return a triple:
+
+        1. the cache
+        2. the key of the MFCCs of the real full wave,
+           or ``None`` if the cache is disabled or cannot be used
+        3. the feature store holding the cached MFCCs,
+           or ``None`` if they are not cached
         """
-        Convert the entire audio file into a ``wav`` file.
+        cache = MFCCCache(logger=self.logger)
+        if not cache.enabled:
+            return (cache, None, None)
+        self._log("Looking up cached MFCCs of real full wave")
+        try:
+            parameters = MFCCCache.mfcc_parameters(
+                sample_rate,
+                gc.MFCC_FRAME_RATE,
+                self.task.configuration.precision
+            )
+            parameters["ffmpeg_parameters"] = " ".join(
+                FFMPEGWrapper.FFMPEG_MONO +
+                ["-ar", str(sample_rate)] +
+                FFMPEGWrapper.FFMPEG_FORMAT_S16LE
+            )
+            key = cache.file_key(self.task.audio_file_path_absolute, parameters)
+        except Exception as e:
+            self._log("Looking up cached MFCCs of real full wave: failed")
+            self._log(["Message: %s", str(e)])
+            return (cache, None, None)
+        cached = cache.get(key)
+        if cached is None:
+            self._log("Looking up cached MFCCs of real full wave: not cached")
+            return (cache, key, None)
+        features, audio_length = cached
+        self._log("Looking up cached MFCCs of real full wave: cached")
+        return (cache, key, FeatureStore(features, audio_length, logger=self.logger))
+
+    def _decode(self, sample_rate=FFMPEGWrapper.DECODE_SAMPLE_RATE_DEFAULT):
+        """
+        Start decoding the entire audio file into mono 16 bit samples,
+        reading them from the ``ffmpeg`` pipe block by block,
+        without writing a ``wav`` file.
+
+        The first block is read immediately,
+        so that an audio file that cannot be decoded
+        is detected here.
 
         (Head/tail will be cut off later.)
 
         Return a triple:
 
         1. a success bool flag
-        2. handler of the generated wave file
-        3. path of the generated wave file
+        2. the sample rate of the real full wave
+        3. an iterator over the blocks of samples of the real full wave
         """
-        self._log("Converting real audio to wav")
-        handler = None
-        path = None
+        self._log("Decoding real audio")
         try:
-            self._log("Creating an output tempfile")
-            handler, path = tempfile.mkstemp(
-                suffix=".wav",
-                dir=gf.custom_tmp_dir()
-            )
             self._log("Creating a FFMPEGWrapper")
             ffmpeg = FFMPEGWrapper(logger=self.logger)
-            self._log("Converting...")
-            ffmpeg.convert(
+            blocks = ffmpeg.decode_blocks(
                 input_file_path=self.task.audio_file_path_absolute,
-                output_file_path=path)
-            self._log("Converting... done")
-            self._log("Converting real audio to wav: succeeded")
-            return (True, handler, path)
+                sample_rate=sample_rate
+            )
+            first_block = next(blocks, None)
+            if first_block is None:
+                raise OSError("Audio file has no audio data")
+            self._log("Decoding real audio: started")
+            return (True, sample_rate, itertools.chain([first_block], blocks))
         except Exception as e:
-            self._log("Converting real audio to wav: failed")
+            self._log("Decoding real audio: failed")
             self._log(["Message: %s", str(e)])
-            return (False, handler, path)
+            return (False, sample_rate, None)
 
-    def _extract_mfcc(self, audio_file_path):
+    def _extract_mfcc(self, sample_rate, blocks):
         """
-        Extract the MFCCs of the real full wave.
+        Extract the MFCCs of the real full wave,
+        consuming its blocks of samples as they are decoded,
+        so that the real full wave is never held in memory.
+
+        Return a pair:
+
+        1. a success bool flag
+        2. the feature store holding the MFCCs of the real full wave
         """
         self._log("Extracting MFCCs from real full wave")
         try:
-            audio_file = AudioFile(audio_file_path, logger=self.logger)
-            audio_file.extract_mfcc()
+            stream = MFCCStream(
+                sample_rate,
+                precision=self.task.configuration.precision,
+                logger=self.logger
+            )
+            features = stream.extract(blocks)
+            feature_store = FeatureStore(
+                features,
+                float(stream.number_of_samples) / sample_rate,
+                logger=self.logger
+            )
             self._log("Extracting MFCCs from real full wave: succeeded")
-            return (True, audio_file.audio_mfcc, audio_file.audio_length)
+            return (True, feature_store)
         except Exception as e:
             self._log("Extracting MFCCs from real full wave: failed")
             self._log(["Message: %s", str(e)])
-            return (False, None, None)
+            return (False, None)
 
-    def _cut_head_tail(self, audio_file_path):
+    def _cut_head_tail(self, feature_store):
         """
         Set the audio file head or tail,
-        suitably cutting the audio file on disk,
+        suitably trimming the frames of the feature store,
         and setting the corresponding parameters in the task configuration.
 
         Return a success bool flag
@@ -300,10 +375,6 @@ class ExecuteTask(object):
             )
 
             if explicit or detect:
-                # we need to load the audio data
-                audio_file = AudioFile(audio_file_path, logger=self.logger)
-                audio_file.load_data()
-
                 if explicit:
                     self._log("Explicit head or process")
                 else:
@@ -316,7 +387,7 @@ class ExecuteTask(object):
                         detect_head_max = gf.safe_float(detect_head_max, gc.SD_MAX_HEAD_LENGTH)
                         self._log(["detect_head_min is %.3f", detect_head_min])
                         self._log(["detect_head_max is %.3f", detect_head_max])
-                        sd = SD(audio_file, self.task.text_file, logger=self.logger)
+                        sd = SD(None, self.task.text_file, logger=self.logger, feature_store=feature_store)
                         head = sd.detect_head(detect_head_min, detect_head_max)
                         self._log(["Detected head: %.3f", head])
 
@@ -327,13 +398,13 @@ class ExecuteTask(object):
                         detect_tail_min = gf.safe_float(detect_tail_min, gc.SD_MIN_TAIL_LENGTH)
                         self._log(["detect_tail_min is %.3f", detect_tail_min])
                         self._log(["detect_tail_max is %.3f", detect_tail_max])
-                        sd = SD(audio_file, self.task.text_file, logger=self.logger)
+                        sd = SD(None, self.task.text_file, logger=self.logger, feature_store=feature_store)
                         tail = sd.detect_tail(detect_tail_min, detect_tail_max)
                         self._log(["Detected tail: %.3f", tail])
 
                     # sanity check
                     head_length = max(0, head)
-                    process_length = max(0, audio_file.audio_length - tail - head)
+                    process_length = max(0, feature_store.audio_length - tail - head)
 
                     # we need to set these values
                     # in the config object for later use
@@ -351,13 +422,9 @@ class ExecuteTask(object):
                 # note that str() is necessary, as one might be None
                 self._log(["is_audio_file_head_length is %s", str(head_length)])
                 self._log(["is_audio_file_process_length is %s", str(process_length)])
-                self._log("Trimming audio data...")
-                audio_file.trim(head_length, process_length)
-                self._log("Trimming audio data... done")
-                self._log("Writing audio file...")
-                audio_file.write(audio_file_path)
-                self._log("Writing audio file... done")
-                audio_file.clear_data()
+                self._log("Trimming MFCCs...")
+                feature_store.trim(head_length, process_length)
+                self._log("Trimming MFCCs... done")
             else:
                 # nothing to do
                 self._log("No explicit head/process or detect head/tail")
@@ -406,23 +473,44 @@ class ExecuteTask(object):
             self._log(["Message: %s", str(e)])
             return (False, handler, path, anchors)
 
-    def _align_waves(self, real_path, synt_path):
+    def _align_waves(self, feature_store, synt_path):
         """
-        Align two ``wav`` files.
+        Align the real trimmed wave, whose MFCCs are read
+        from the given feature store, with the synt ``wav`` file.
 
         Return a pair:
 
         1. a success bool flag
         2. the computed alignment map, that is,
-           a list of pairs of floats, each representing
+           a 2D array of floats, each row representing
            corresponding time instants
            in the real and synt wave, respectively
            ``[real_time, synt_time]``
         """
         self._log("Aligning waves")
         try:
-            self._log("Creating DTWAligner object")
-            aligner = DTWAligner(real_path, synt_path, logger=self.logger)
+            workers = gf.safe_int(self.task.configuration.aligner_workers)
+            if workers is None:
+                self._log("Creating DTWAligner object")
+                aligner = DTWAligner(
+                    None,
+                    synt_path,
+                    logger=self.logger,
+                    precision=self.task.configuration.precision,
+                    centering=self.task.configuration.aligner_centering
+                )
+            else:
+                self._log(["Creating DTWSegmentedAligner object with %d workers", workers])
+                aligner = DTWSegmentedAligner(
+                    None,
+                    synt_path,
+                    logger=self.logger,
+                    precision=self.task.configuration.precision,
+                    centering=self.task.configuration.aligner_centering,
+                    workers=workers
+                )
+            aligner.real_wave_full_mfcc = feature_store.trimmed_features
+            aligner.real_wave_length = feature_store.trimmed_length
             self._log("Computing MFCC...")
             aligner.compute_mfcc()
             self._log("Computing MFCC... done")
@@ -457,22 +545,22 @@ class ExecuteTask(object):
         self._log(["Number of frames:    %d", len(wave_map)])
         self._log(["Number of fragments: %d", len(synt_anchors)])
         try:
-            real_times = numpy.array([t[0] for t in wave_map])
-            synt_times = numpy.array([t[1] for t in wave_map])
+            real_times = wave_map[:, 0]
+            synt_times = wave_map[:, 1]
+            # TODO allow an user-specified function instead of min
+            # partially solved by AdjustBoundaryAlgorithm
+            self._log("Looking for argmin indices...")
+            indices = self._find_nearest_indices(
+                synt_times,
+                numpy.array([anchor[0] for anchor in synt_anchors], dtype=numpy.float64)
+            )
+            self._log("Looking for argmin indices... done")
             real_anchors = []
-            anchor_index = 0
-            # TODO numpy-fy this loop
-            for anchor in synt_anchors:
+            for anchor_index, anchor in enumerate(synt_anchors):
                 time, fragment_id, fragment_text = anchor
-                self._log("Looking for argmin index...")
-                # TODO allow an user-specified function instead of min
-                # partially solved by AdjustBoundaryAlgorithm
-                index = (numpy.abs(synt_times - time)).argmin()
-                self._log("Looking for argmin index... done")
-                real_time = real_times[index]
+                real_time = real_times[indices[anchor_index]]
                 real_anchors.append([real_time, fragment_id, fragment_text])
                 self._log(["Time for anchor %d: %f", anchor_index, real_time])
-                anchor_index += 1
 
             # dummy last anchor, starting at the real file duration
             real_anchors.append([real_times[-1], None, None])
@@ -495,6 +583,23 @@ class ExecuteTask(object):
             self._log(["Message: %s", str(e)])
             return (False, None)
 
+    def _find_nearest_indices(self, sorted_values, targets):
+        """
+        For each target, return the index of the element of
+        the (non-decreasing) ``sorted_values`` array
+        closest to it, that is,
+        ``(numpy.abs(sorted_values - target)).argmin()``
+        (in case of ties, the smallest index),
+        using a binary search instead of a linear scan.
+        """
+        last = len(sorted_values) - 1
+        after = numpy.minimum(numpy.searchsorted(sorted_values, targets, side="left"), last)
+        before = numpy.maximum(after - 1, 0)
+        use_before = (targets - sorted_values[before]) <= (sorted_values[after] - targets)
+        nearest_values = numpy.where(use_before, sorted_values[before], sorted_values[after])
+        # the first occurrence of the nearest value
+        return numpy.searchsorted(sorted_values, nearest_values, side="left")
+
     def _translate_text_map(self, text_map, real_full_wave_length):
         """
         Translate the text_map by adding head and tail dummy fragments
@@ -517,11 +622,12 @@ class ExecuteTask(object):
     def _adjust_boundaries(
             self,
             text_map,
-            real_wave_full_mfcc,
-            real_wave_length
+            feature_store
         ):
         """
-        Adjust the boundaries between consecutive fragments.
+        Adjust the boundaries between consecutive fragments,
+        using the speech intervals of the real full wave
+        read from the given feature store.
 
         Return a pair:
 
@@ -554,12 +660,8 @@ class ExecuteTask(object):
         self._log(["Requested algo %s and value %s", algo, value])
 
         try:
-            self._log("Running VAD...")
-            vad = VAD(logger=self.logger)
-            vad.wave_mfcc = real_wave_full_mfcc
-            vad.wave_len = real_wave_length
-            vad.compute_vad()
-            self._log("Running VAD... done")
+            speech = feature_store.speech
+            nonspeech = feature_store.nonspeech
         except Exception as e:
             self._log("Adjusting boundaries: failed")
             self._log(["Message: %s", str(e)])
@@ -569,8 +671,8 @@ class ExecuteTask(object):
         adjust_boundary = AdjustBoundaryAlgorithm(
             algorithm=algo,
             text_map=text_map,
-            speech=vad.speech,
-            nonspeech=vad.nonspeech,
+            speech=speech,
+            nonspeech=nonspeech,
             value=value,
             logger=self.logger
         )
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+A class holding the features of the real wave of a task,
+that is, its MFCCs and its speech/nonspeech intervals,
+computed once and shared by all the steps of the task.
+
+.. versionadded:: 1.3.0
+"""
+
+import aeneas.globalconstants as gc
+from aeneas.logger import Logger
+from aeneas.mfccfeatures import MFCCFeatures
+from aeneas.vad import VAD
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL v3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+class FeatureStore(object):
+    """
+    The features of the real (full) wave of a task.
+
+    The MFCCs are extracted once, by the caller,
+    and the speech/nonspeech intervals are computed
+    on first access and then cached.
+    Both are also available reversed (last frame first),
+    as needed to detect the tail.
+
+    Trimming the head and/or the tail off the wave
+    just sets the range of frames returned by :data:`trimmed_features`,
+    which is a view of the MFCCs of the full wave,
+    hence neither the audio data nor the MFCCs are recomputed.
+
+    Note that both the reversed and the trimmed MFCCs
+    are approximations of the MFCCs that would be extracted
+    from the reversed or trimmed samples:
+    they keep the frame grid of the full wave,
+    which is anchored at its beginning,
+    while the grid of the reversed (trimmed) wave
+    is anchored at its end (at the new beginning),
+    and the frames of the reversed wave are not extracted
+    from reversed windows.
+    Hence the head and the tail detected from them,
+    and the time map computed on the trimmed wave,
+    might differ by up to a couple of frames
+    (``2 / frame_rate`` seconds) from those
+    computed on the reversed or trimmed audio file.
+
+    :param features: the MFCCs of the full wave
+    :type  features: :class:`aeneas.mfccfeatures.MFCCFeatures`
+    :param audio_length: the length of the full wave, in seconds
+    :type  audio_length: float
+    :param frame_rate: the MFCC frame rate, in frames per second. Default:
+                       :class:`aeneas.globalconstants.MFCC_FRAME_RATE`
+    :type  frame_rate: int
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "FeatureStore"
+
+    def __init__(
+            self,
+            features,
+            audio_length,
+            frame_rate=gc.MFCC_FRAME_RATE,
+            logger=None
+        ):
+        self.logger = logger
+        if self.logger is None:
+            self.logger = Logger()
+        self.features = MFCCFeatures.from_mfcc(features)
+        self.audio_length = audio_length
+        self.frame_rate = frame_rate
+        self.begin_index = 0
+        self.end_index = len(self.features)
+        self.trimmed_length = audio_length
+        self.__reversed_features = None
+        self.__speech = None
+        self.__nonspeech = None
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    @property
+    def precision(self):
+        """
+        The floating point precision of the MFCCs.
+
+        :rtype: string (from :class:`aeneas.precision.Precision` enumeration)
+        """
+        return self.features.dtype.name
+
+    @property
+    def reversed_features(self):
+        """
+        The MFCCs of the full wave, last frame first.
+
+        These are not the MFCCs of the reversed samples,
+        since the frames keep the grid of the full wave
+        (see :class:`aeneas.featurestore.FeatureStore`).
+
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        if self.__reversed_features is None:
+            self._log("Reversing MFCCs")
+            self.__reversed_features = MFCCFeatures(self.features.frames[::-1])
+        return self.__reversed_features
+
+    @property
+    def speech(self):
+        """
+        The time intervals of the full wave containing speech,
+        as computed by :class:`aeneas.vad.VAD`.
+
+        :rtype: list of pairs of floats
+        """
+        if self.__speech is None:
+            self._compute_vad()
+        return self.__speech
+
+    @property
+    def nonspeech(self):
+        """
+        The time intervals of the full wave not containing speech,
+        as computed by :class:`aeneas.vad.VAD`.
+
+        :rtype: list of pairs of floats
+        """
+        if self.__nonspeech is None:
+            self._compute_vad()
+        return self.__nonspeech
+
+    @property
+    def reversed_speech(self):
+        """
+        The time intervals of the full wave containing speech,
+        measured from the end of the wave,
+        that is, the speech intervals of the reversed wave.
+
+        :rtype: list of pairs of floats
+        """
+        return [[self.audio_length - e, self.audio_length - s] for s, e in self.speech[::-1]]
+
+    @property
+    def trimmed_features(self):
+        """
+        The MFCCs of the trimmed wave,
+        as a view of the MFCCs of the full wave,
+        hence on the frame grid of the full wave
+        (see :class:`aeneas.featurestore.FeatureStore`).
+
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        return self.features[self.begin_index:self.end_index]
+
+    def trim(self, begin=None, length=None):
+        """
+        Trim the wave, keeping ``length`` seconds,
+        starting from ``begin`` seconds,
+        as done by :func:`aeneas.audiofile.AudioFile.trim`.
+
+        Only the range of frames of :data:`trimmed_features` is set,
+        the MFCCs of the full wave are not changed.
+
+        :param begin: the start position, in seconds
+        :type  begin: float
+        :param length: the length, in seconds
+        :type  length: float
+        """
+        if begin is None:
+            begin = 0
+        begin = min(max(0, begin), self.audio_length)
+        if length is None:
+            length = self.audio_length - begin
+        length = min(max(0, length), self.audio_length - begin)
+        self._log(["begin is %.3f", begin])
+        self._log(["length is %.3f", length])
+        self.begin_index = min(int(begin * self.frame_rate), len(self.features))
+        self.end_index = min(int((begin + length) * self.frame_rate), len(self.features))
+        self.trimmed_length = length
+        self._log(["Trimmed frames: %d %d", self.begin_index, self.end_index])
+
+    def _compute_vad(self):
+        """ Compute the speech/nonspeech intervals of the full wave """
+        self._log("Running VAD...")
+        vad = VAD(frame_rate=self.frame_rate, logger=self.logger)
+        vad.wave_mfcc = self.features
+        vad.wave_len = self.audio_length
+        vad.compute_vad()
+        self.__speech = vad.speech
+        self.__nonspeech = vad.nonspeech
+        self._log("Running VAD... done")
+
+
+
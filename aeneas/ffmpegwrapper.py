@@ -5,6 +5,7 @@
 Wrapper around ``ffmpeg`` to convert audio files.
 """
 
+import numpy
 import os
 import subprocess
 
@@ -61,6 +62,13 @@ class FFMPEGWrapper(object):
     (must be the second to last argument to ``ffmpeg``,
     just before path of the output file) """
 
+    FFMPEG_FORMAT_S16LE = ["-f", "s16le"]
+    """ Single parameter for ``ffmpeg``: produce output in raw
+    signed 16 bit little endian PCM format, without any header
+
+    .. versionadded:: 1.3.0
+    """
+
     FFMPEG_PARAMETERS_SAMPLE_KEEP = (
         FFMPEG_MONO + FFMPEG_OVERWRITE + FFMPEG_FORMAT_WAV
     )
@@ -84,6 +92,18 @@ class FFMPEGWrapper(object):
     FFMPEG_PARAMETERS_DEFAULT = FFMPEG_PARAMETERS_SAMPLE_22050
     """ Default set of parameters for ``ffmpeg`` """
 
+    DECODE_SAMPLE_RATE_DEFAULT = 22050
+    """ Default sample rate of the samples returned by ``decode()``
+
+    .. versionadded:: 1.3.0
+    """
+
+    DECODE_BLOCK_SIZE = 65536
+    """ Number of bytes read from the ``ffmpeg`` pipe at a time
+
+    .. versionadded:: 1.3.0
+    """
+
     TAG = "FFMPEGWrapper"
 
     def __init__(self, parameters=FFMPEG_PARAMETERS_DEFAULT, logger=None):
@@ -180,5 +200,151 @@ class FFMPEGWrapper(object):
             self._log(["Returning output file path '%s'", output_file_path])
             return output_file_path
 
+    def decode_blocks(
+            self,
+            input_file_path,
+            sample_rate=DECODE_SAMPLE_RATE_DEFAULT,
+            head_length=None,
+            process_length=None
+        ):
+        """
+        Decode the audio file at ``input_file_path``
+        into mono 16 bit samples at ``sample_rate`` Hz,
+        yielding them block by block,
+        as read from the standard output of ``ffmpeg``.
+
+        No file is written, and at most
+        :data:`aeneas.ffmpegwrapper.FFMPEGWrapper.DECODE_BLOCK_SIZE`
+        bytes are held at a time,
+        hence the blocks can be fed to a consumer
+        (for example, an MFCC extractor)
+        while ``ffmpeg`` is still decoding.
+
+        The parameters set in the constructor are not used.
+        ``head_length`` and ``process_length``
+        have the same meaning as in ``convert()``.
+
+        :param input_file_path: the path of the audio file to decode
+        :type  input_file_path: string
+        :param sample_rate: the sample rate of the decoded samples
+        :type  sample_rate: int
+        :param head_length: skip these many seconds
+                            from the beginning of the audio file
+        :type  head_length: float
+        :param process_length: process these many seconds of the audio file
+        :type  process_length: float
+        :rtype: generator of numpy 1D arrays of int16
+
+        .. versionadded:: 1.3.0
+        """
+        # test if we can read the input file
+        if not os.path.isfile(input_file_path):
+            self._log(["Input file '%s' cannot be read", input_file_path], Logger.CRITICAL)
+            raise OSError("Input file cannot be read")
+
+        # call ffmpeg, writing the samples to its standard output
+        arguments = []
+        arguments += [gc.FFMPEG_PATH]
+        arguments += ["-i", input_file_path]
+        if head_length is not None:
+            arguments += ["-ss", str(head_length)]
+        if process_length is not None:
+            arguments += ["-t", str(process_length)]
+        arguments += self.FFMPEG_MONO
+        arguments += ["-ar", str(sample_rate)]
+        arguments += self.FFMPEG_FORMAT_S16LE
+        arguments += ["pipe:1"]
+        self._log(["Calling with arguments '%s'", arguments])
+        devnull = open(os.devnull, "w")
+        proc = subprocess.Popen(
+            arguments,
+            stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            stderr=devnull)
+        proc.stdin.close()
+        completed = False
+        try:
+            # an odd trailing byte is kept for the next block
+            remainder = ""
+            while True:
+                data = proc.stdout.read(self.DECODE_BLOCK_SIZE)
+                if len(data) == 0:
+                    break
+                data = remainder + data
+                usable = len(data) - (len(data) % 2)
+                remainder = data[usable:]
+                if usable > 0:
+                    yield numpy.fromstring(data[:usable], dtype="<i2")
+            completed = True
+        finally:
+            # if the consumer stopped early,
+            # closing the pipe makes ffmpeg terminate
+            proc.stdout.close()
+            proc.wait()
+            devnull.close()
+        self._log("Call completed")
+
+        if completed and (proc.returncode != 0):
+            self._log(["Input file '%s' cannot be decoded", input_file_path], Logger.CRITICAL)
+            raise OSError("Input file cannot be decoded")
+
+    def decode(
+            self,
+            input_file_path,
+            sample_rate=DECODE_SAMPLE_RATE_DEFAULT,
+            head_length=None,
+            process_length=None
+        ):
+        """
+        Decode the audio file at ``input_file_path``
+        into mono 16 bit samples at ``sample_rate`` Hz,
+        and return them as a numpy array.
+
+        The samples are read from the standard output of ``ffmpeg``
+        into a preallocated array,
+        whose size is doubled if it is not large enough,
+        so no file is written.
+
+        The parameters set in the constructor are not used.
+        ``head_length`` and ``process_length``
+        have the same meaning as in ``convert()``.
+
+        :param input_file_path: the path of the audio file to decode
+        :type  input_file_path: string
+        :param sample_rate: the sample rate of the decoded samples
+        :type  sample_rate: int
+        :param head_length: skip these many seconds
+                            from the beginning of the audio file
+        :type  head_length: float
+        :param process_length: process these many seconds of the audio file
+        :type  process_length: float
+        :rtype: numpy 1D array of int16
+
+        .. versionadded:: 1.3.0
+        """
+        # start with one minute of samples,
+        # or with the requested length, if known
+        capacity = 60 * sample_rate
+        if process_length is not None:
+            capacity = int(float(process_length) * sample_rate) + 1
+        samples = numpy.zeros(max(capacity, 1), dtype=numpy.int16)
+        length = 0
+        for block in self.decode_blocks(
+                input_file_path,
+                sample_rate=sample_rate,
+                head_length=head_length,
+                process_length=process_length
+            ):
+            if length + len(block) > len(samples):
+                samples.resize(max(2 * len(samples), length + len(block)), refcheck=False)
+            samples[length:length+len(block)] = block
+            length += len(block)
+        self._log(["Decoded %d samples", length])
+        if length == 0:
+            self._log(["Input file '%s' has no audio data", input_file_path], Logger.CRITICAL)
+            raise OSError("Input file cannot be decoded")
+        samples.resize(length, refcheck=False)
+        return samples
+
 
 
@@ -24,6 +24,13 @@ __status__ = "Production"
 ESPEAK_PATH = "espeak"
 """ Path to the ``espeak`` executable """
 
+ESPEAK_LIBRARY_PATH = None
+""" Path to the ``espeak`` shared library (e.g., ``libespeak.so.1``).
+If ``None``, the library is searched in the system library path.
+
+.. versionadded:: 1.3.0
+"""
+
 #FFMPEG_PATH = "/usr/bin/ffmpeg"
 FFMPEG_PATH = "ffmpeg"
 """ Path to the ``ffmpeg`` executable """
@@ -38,11 +45,92 @@ TMP_PATH = "/tmp/"
 
 ### CONSTANTS ###
 
+ALIGNER_ADAPTIVE_MARGIN = 5
+""" Initial aligner margin, in seconds,
+for the adaptive stripe DTW algorithm,
+which is widened (up to ``ALIGNER_MARGIN``)
+only where the path touches the stripe boundary.
+Default: ``5``, corresponding to ``5s`` ahead and behind
+(i.e., ``10s`` total margin).
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_CENTERING = "diagonal"
+""" How to center the stripe of striped DTW algorithms.
+See :class:`aeneas.dtw.DTWCentering` for the allowed values.
+Default: ``diagonal``.
+
+.. versionadded:: 1.3.0
+"""
+
 ALIGNER_MARGIN = 60
 """ Aligner margin, in seconds, for striped algorithms.
 Default: ``60``, corresponding to ``60s`` ahead and behind
 (i.e., ``120s`` total margin). """
 
+ALIGNER_MULTIRESOLUTION_FACTOR = 8
+""" Downsampling factor of the coarsest level
+of the multi-resolution DTW algorithm.
+Default: ``8``, corresponding to aligning
+at ``1/8`` of the MFCC frame rate first.
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_MULTIRESOLUTION_RADIUS = 5
+""" Radius, in seconds, of the corridor around the projected path
+used by the multi-resolution DTW algorithm at each finer level.
+Default: ``5``, corresponding to ``5s`` ahead and behind the path.
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_ONLINE_MARGIN = 2
+""" Margin, in seconds, of the window of the synthesized wave
+searched by the online aligner :class:`aeneas.dtw.DTWOnline`
+at each frame of the real wave.
+Default: ``2``, corresponding to ``2s`` ahead and behind
+the current best position (i.e., ``4s`` total window).
+Larger windows are more robust, but the path
+takes longer to become final.
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_ONLINE_MAX_LATENCY = 10
+""" Maximum latency, in seconds, of the online aligner
+:class:`aeneas.dtw.DTWOnline`: the frames of the real wave
+older than this are finalized, even if the path is not stable yet.
+Default: ``10``.
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_SEGMENT_MIN_LENGTH = 120
+""" Minimum length, in seconds, of a segment
+aligned by :class:`aeneas.dtw.DTWSegmentedAligner`.
+Default: ``120``.
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_SEGMENT_MIN_NONSPEECH_LENGTH = 1.0
+""" Minimum length, in seconds, of a nonspeech interval
+to be used as an anchor by :class:`aeneas.dtw.DTWSegmentedAligner`.
+Default: ``1.0``.
+
+.. versionadded:: 1.3.0
+"""
+
+ALIGNER_THREADS = 1
+""" Number of threads used by the C extension
+to compute the cost matrix of striped algorithms.
+Default: ``1``.
+
+.. versionadded:: 1.3.0
+"""
+
 ALIGNER_USE_EXACT_ALGORITHM_WHEN_MARGIN_TOO_LARGE = True
 """ Use the exact DTW algorithm, instead of a striped algorithm,
 if the aligner margin is larger than the synthesized audio file.
@@ -74,6 +162,36 @@ CONFIG_STRING_SEPARATOR_SYMBOL = "|"
 CONFIG_STRING_ASSIGNMENT_SYMBOL = "="
 """ Assignment symbol in config string ``key=value`` pairs """
 
+MFCC_BLOCK_LENGTH = 60
+""" Length, in seconds, of the blocks of audio samples
+converted and processed at a time when extracting MFCCs.
+Default: ``60``.
+
+.. versionadded:: 1.3.0
+"""
+
+MFCC_CACHE_MAX_SIZE = 1073741824
+""" Maximum size, in bytes, of the on-disk MFCC cache
+(see :class:`aeneas.mfcccache.MFCCCache`):
+the least recently used entries are removed beyond it.
+Default: ``1073741824`` (``1 GB``).
+
+.. versionadded:: 1.3.0
+"""
+
+MFCC_CACHE_PATH = None
+""" Path of the directory of the on-disk MFCC cache
+(see :class:`aeneas.mfcccache.MFCCCache`),
+used by :class:`aeneas.executetask.ExecuteTask`
+and by :func:`aeneas.audiofile.AudioFile.extract_mfcc`
+for the input audio files (not for the synthesized waves),
+to skip decoding the audio and extracting the MFCCs
+when the same audio has been processed before.
+Default: ``None``, meaning that the cache is disabled.
+
+.. versionadded:: 1.3.0
+"""
+
 MFCC_FRAME_RATE = 25
 """ MFCC frame rate, in steps per second.
 Default: ``25``, corresponding to steps of ``40ms`` length.
@@ -84,6 +202,15 @@ Default: ``25``, corresponding to steps of ``40ms`` length.
 PARSED_TEXT_SEPARATOR = "|"
 """ Separator for input text files in parsed format """
 
+PRECISION = "float64"
+""" Floating point precision used to store audio samples
+and MFCCs, and to compute the DTW alignment.
+See :class:`aeneas.precision.Precision` for the allowed values.
+Default: ``float64``.
+
+.. versionadded:: 1.3.0
+"""
+
 # reserved parameter names (RPN)
 RPN_JOB_IDENTIFIER = "job_identifier"
 """
@@ -529,6 +656,60 @@ Example::
 .. versionadded:: 1.0.4
 """
 
+PPN_TASK_ALIGNER_WORKERS = "task_aligner_workers"
+"""
+Key for the number of worker processes aligning the waves
+segment by segment, splitting them at the long pauses
+matching in the real and synthesized waves
+(see :class:`aeneas.dtw.DTWSegmentedAligner`).
+If not specified, the waves are aligned as a whole.
+
+Usage: config string, TXT config file, XML config file
+
+Values: int
+
+Example::
+
+    task_aligner_workers=1
+    task_aligner_workers=8
+
+.. versionadded:: 1.3.0
+"""
+
+PPN_TASK_ALIGNER_CENTERING = "task_aligner_centering"
+"""
+Key for the way of centering the stripe
+of the DTW algorithm aligning the waves of the task
+
+Usage: config string, TXT config file, XML config file
+
+Values: listed in :class:`aeneas.dtw.DTWCentering`
+
+Example::
+
+    task_aligner_centering=diagonal
+    task_aligner_centering=speech
+
+.. versionadded:: 1.3.0
+"""
+
+PPN_TASK_PRECISION = "task_precision"
+"""
+Key for the floating point precision used to compute
+the MFCCs and the DTW alignment of the task
+
+Usage: config string, TXT config file, XML config file
+
+Values: listed in :class:`aeneas.precision.Precision`
+
+Example::
+
+    task_precision=float32
+    task_precision=float64
+
+.. versionadded:: 1.3.0
+"""
+
 PPN_TASK_IS_AUDIO_FILE_DETECT_HEAD_MAX = "is_audio_file_detect_head_max"
 """
 Detect the head length of the audio file,
@@ -844,6 +1025,21 @@ Default: ``0.0``.
 .. versionadded:: 1.2.0
 """
 
+SYNTHESIZER_WORKERS = 1
+"""
+Synthesize the text fragments with this many ``espeak`` processes
+running concurrently, instead of one after the other.
+It is ignored if the fragments are synthesized
+by the ``espeak`` shared library
+(see :class:`aeneas.globalconstants.USE_ESPEAK_LIBRARY`),
+which synthesizes one fragment at a time,
+so that the backend, hence the samples,
+do not depend on the number of workers.
+Default: ``1``.
+
+.. versionadded:: 1.3.0
+"""
+
 USE_C_EXTENSIONS = True
 """
 Try to use the C extensions instead of pure Python code.
@@ -854,6 +1050,21 @@ Default: ``True``.
 .. versionadded:: 1.1.0
 """
 
+USE_ESPEAK_LIBRARY = False
+"""
+Try to synthesize all the text fragments with the ``espeak`` shared library,
+inside the current process,
+instead of running the ``espeak`` executable once per fragment.
+If the library is not available, the executable
+will be run instead.
+The library and the executable might come from different ``espeak`` builds,
+and then their samples (hence the time anchors) might differ:
+enable it only after checking that they agree on your system.
+Default: ``False``.
+
+.. versionadded:: 1.3.0
+"""
+
 VAD_EXTEND_SPEECH_INTERVAL_AFTER = 0
 """
 Extend to the right (after/future)
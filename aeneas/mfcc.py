@@ -13,7 +13,9 @@ system.
 __author__ = "David Huggins-Daines <dhuggins@cs.cmu.edu>"
 __version__ = "$Revision: 6390 $"
 
+import collections
 import numpy, numpy.fft
+from numpy.lib.stride_tricks import as_strided
 
 def mel(f):
     return 2595. * numpy.log10(1. + f / 700.)
@@ -21,7 +23,96 @@ def mel(f):
 def melinv(m):
     return 700. * (numpy.power(10., m / 2595.) - 1.)
 
+class TableCache(object):
+    """A bounded cache of the tables built by MFCC (Hamming window,
+    mel filter matrix, DCT matrices), keyed by their parameters,
+    so that the MFCC objects with the same parameters share them.
+
+    When more than size tables are cached, the least recently used
+    one is discarded. The cached tables are read-only."""
+
+    def __init__(self, size=16):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.__tables = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.__tables)
+
+    def get(self, key, build, *args):
+        """Return the table with the given key,
+        building it as build(*args) if not cached"""
+        try:
+            table = self.__tables.pop(key)
+            self.hits += 1
+        except KeyError:
+            table = build(*args)
+            table.flags.writeable = False
+            self.misses += 1
+        self.__tables[key] = table
+        while len(self.__tables) > self.size:
+            self.__tables.popitem(last=False)
+        return table
+
+    def clear(self):
+        """Discard all the tables and reset the counters"""
+        self.__tables.clear()
+        self.hits = 0
+        self.misses = 0
+
+# The tables shared by all the MFCC objects of the process
+TABLES = TableCache()
+
+def hamming(wlen):
+    """Return the Hamming window of length wlen"""
+    return numpy.hamming(wlen)
+
+def melfilters(nfilt, nfft, samprate, lowerf, upperf):
+    """Return the mel filter matrix ((nfft/2+1) x nfilt)"""
+    filters = numpy.zeros((nfft/2+1,nfilt), 'd')
+    dfreq = float(samprate) / nfft
+    melmax = mel(upperf)
+    melmin = mel(lowerf)
+    dmelbw = (melmax - melmin) / (nfilt + 1)
+    # Filter edges, in Hz
+    filt_edge = melinv(melmin + dmelbw * numpy.arange(nfilt + 2, dtype='d'))
+
+    for whichfilt in range(0, nfilt):
+        # Filter triangles, in DFT points
+        leftfr = int(round(filt_edge[whichfilt] / dfreq))
+        centerfr = int(round(filt_edge[whichfilt + 1] / dfreq))
+        rightfr = int(round(filt_edge[whichfilt + 2] / dfreq))
+        # For some reason this is calculated in Hz, though I think
+        # it doesn't really matter
+        fwidth = (rightfr - leftfr) * dfreq
+        height = 2. / fwidth
+
+        if centerfr != leftfr:
+            leftslope = height / (centerfr - leftfr)
+        else:
+            leftslope = 0
+        freq = leftfr + 1
+        while freq < centerfr:
+            filters[freq,whichfilt] = (freq - leftfr) * leftslope
+            freq = freq + 1
+        if freq == centerfr: # This is always true
+            filters[freq,whichfilt] = height
+            freq = freq + 1
+        if centerfr != rightfr:
+            rightslope = height / (centerfr - rightfr)
+        while freq < rightfr:
+            filters[freq,whichfilt] = (freq - rightfr) * rightslope
+            freq = freq + 1
+    return filters
+
 class MFCC(object):
+    # number of frames processed at once by the vectorized code,
+    # bounding the size of the frame matrix;
+    # the batches start at multiples of it, so that the MFCCs
+    # of a frame do not depend on the other frames computed with it
+    FRAMES_PER_BATCH = 1024
+
     def __init__(self, nfilt=40, ncep=13,
                  lowerf=133.3333, upperf=6855.4976, alpha=0.97,
                  samprate=16000, frate=100, wlen=0.0256,
@@ -37,92 +128,130 @@ class MFCC(object):
 
         # Build Hamming window
         self.wlen = int(wlen * samprate)
-        self.win = numpy.hamming(self.wlen)
+        self.win = TABLES.get(("hamming", self.wlen), hamming, self.wlen)
 
         # Prior sample for pre-emphasis
         self.prior = 0
         self.alpha = alpha
 
         # Build mel filter matrix
-        self.filters = numpy.zeros((nfft/2+1,nfilt), 'd')
-        dfreq = float(samprate) / nfft
         if upperf > samprate/2:
             raise(Exception,
                    "Upper frequency %f exceeds Nyquist %f" % (upperf, samprate/2))
-        melmax = mel(upperf)
-        melmin = mel(lowerf)
-        dmelbw = (melmax - melmin) / (nfilt + 1)
-        # Filter edges, in Hz
-        filt_edge = melinv(melmin + dmelbw * numpy.arange(nfilt + 2, dtype='d'))
-
-        for whichfilt in range(0, nfilt):
-            # Filter triangles, in DFT points
-            leftfr = round(filt_edge[whichfilt] / dfreq)
-            centerfr = round(filt_edge[whichfilt + 1] / dfreq)
-            rightfr = round(filt_edge[whichfilt + 2] / dfreq)
-            # For some reason this is calculated in Hz, though I think
-            # it doesn't really matter
-            fwidth = (rightfr - leftfr) * dfreq
-            height = 2. / fwidth
-
-            if centerfr != leftfr:
-                leftslope = height / (centerfr - leftfr)
-            else:
-                leftslope = 0
-            freq = leftfr + 1
-            while freq < centerfr:
-                self.filters[freq,whichfilt] = (freq - leftfr) * leftslope
-                freq = freq + 1
-            if freq == centerfr: # This is always true
-                self.filters[freq,whichfilt] = height
-                freq = freq + 1
-            if centerfr != rightfr:
-                rightslope = height / (centerfr - rightfr)
-            while freq < rightfr:
-                self.filters[freq,whichfilt] = (freq - rightfr) * rightslope
-                freq = freq + 1
-#             print("Filter %d: left %d=%f center %d=%f right %d=%f width %d" %
-#                   (whichfilt,
-#                   leftfr, leftfr*dfreq,
-#                   centerfr, centerfr*dfreq,
-#                   rightfr, rightfr*dfreq,
-#                   freq - leftfr))
-#             print self.filters[leftfr:rightfr,whichfilt]
+        self.filters = TABLES.get(
+            ("filters", nfilt, nfft, samprate, lowerf, upperf),
+            melfilters, nfilt, nfft, samprate, lowerf, upperf
+        )
 
         # Build DCT matrix
-        self.s2dct = s2dctmat(nfilt, ncep, 1./nfilt)
-        self.dct = dctmat(nfilt, ncep, numpy.pi/nfilt)
+        self.s2dct = TABLES.get(("s2dct", nfilt, ncep), s2dctmat, nfilt, ncep, 1./nfilt)
+        self.dct = TABLES.get(("dct", nfilt, ncep), dctmat, nfilt, ncep, numpy.pi/nfilt)
 
     def sig2s2mfc(self, sig):
         nfr = int(len(sig) / self.fshift + 1)
-        mfcc = numpy.zeros((nfr, self.ncep), 'd')
-        fr = 0
-        while fr < nfr:
-            start = round(fr * self.fshift)
-            end = min(len(sig), start + self.wlen)
-            frame = sig[start:end]
-            if len(frame) < self.wlen:
-                frame = numpy.resize(frame,self.wlen)
-                frame[self.wlen:] = 0
-            mfcc[fr] = self.frame2s2mfc(frame)
-            fr = fr + 1
-        return mfcc
+        return self.sig2s2mfc_frames(sig, 0, 0, nfr)
 
     def sig2logspec(self, sig):
         nfr = int(len(sig) / self.fshift + 1)
-        mfcc = numpy.zeros((nfr, self.nfilt), 'd')
-        fr = 0
-        while fr < nfr:
-            start = round(fr * self.fshift)
-            end = min(len(sig), start + self.wlen)
-            frame = sig[start:end]
-            if len(frame) < self.wlen:
-                frame = numpy.resize(frame,self.wlen)
-                frame[self.wlen:] = 0
-            mfcc[fr] = self.frame2logspec(frame)
-            fr = fr + 1
+        return self.sig2logspec_frames(sig, 0, 0, nfr)
+
+    def sig2s2mfc_frames(self, sig, offset, first, count):
+        """Compute the MFCCs of the frames first, ..., first + count - 1
+        of a signal, given the samples of the signal from index offset on,
+        processing the frames in batches of (at most) FRAMES_PER_BATCH
+        frames, starting at multiples of FRAMES_PER_BATCH.
+
+        The pre-emphasis starts from self.prior (the last sample of
+        the frame before first), which is then set to the last sample
+        of the last frame. The last frames are zero-padded."""
+        mfcc = numpy.zeros((count, self.ncep), 'd')
+        for begin, end in self.batches(first, count):
+            frames = self.sig2frames(sig, offset, begin, end - begin)
+            mfcc[begin-first:end-first] = self.frames2s2mfc(frames)
         return mfcc
 
+    def sig2logspec_frames(self, sig, offset, first, count):
+        """Compute the log spectrum of the frames first, ..., first + count - 1
+        of a signal, as sig2s2mfc_frames does"""
+        logspec = numpy.zeros((count, self.nfilt), 'd')
+        for begin, end in self.batches(first, count):
+            frames = self.sig2frames(sig, offset, begin, end - begin)
+            logspec[begin-first:end-first] = self.frames2logspec(frames)
+        return logspec
+
+    def batches(self, first, count):
+        """Split the frames first, ..., first + count - 1 in batches,
+        returning the list of (begin, end) frame indices"""
+        boundaries = range(
+            (first // self.FRAMES_PER_BATCH + 1) * self.FRAMES_PER_BATCH,
+            first + count,
+            self.FRAMES_PER_BATCH
+        )
+        boundaries = [first] + boundaries + [first + count]
+        return [(b, e) for b, e in zip(boundaries[:-1], boundaries[1:]) if e > b]
+
+    def frame_starts(self, first, count):
+        """Return the index of the first sample of the given frames,
+        rounding half away from zero"""
+        return numpy.floor(numpy.arange(first, first + count) * self.fshift + 0.5).astype(int)
+
+    def sig2frames(self, sig, offset, first, count):
+        """Return the frame matrix (count x wlen) of the given frames,
+        given the samples of the signal from index offset on.
+
+        The frames entirely inside sig are views of it,
+        if they are evenly spaced; the other frames are zero-padded."""
+        sig = numpy.asarray(sig)
+        starts = self.frame_starts(first, count) - offset
+        # number of frames entirely inside sig
+        full = numpy.searchsorted(starts + self.wlen, len(sig), side="right")
+        step = self.fshift
+        if (full > 1) and (step == int(step)):
+            frames = as_strided(
+                sig[starts[0]:],
+                shape=(full, self.wlen),
+                strides=(int(step) * sig.strides[0], sig.strides[0])
+            )
+        else:
+            frames = sig[starts[:full, numpy.newaxis] + numpy.arange(self.wlen)]
+        if full == count:
+            return frames
+        padded = numpy.zeros((count, self.wlen), sig.dtype)
+        padded[:full] = frames
+        for k in range(full, count):
+            tail = sig[starts[k]:]
+            padded[k, :len(tail)] = tail
+        return padded
+
+    def frames2s2mfc(self, frames):
+        """Compute the MFCCs of the rows of the given frame matrix,
+        consecutive frames of a signal, all at once"""
+        logspec = self.frames2logspec(frames)
+        return numpy.dot(logspec, self.s2dct.T) / self.nfilt
+
+    def frames2logspec(self, frames):
+        """Compute the log spectrum of the rows of the given frame matrix,
+        consecutive frames of a signal, all at once"""
+        frames = self.pre_emphasis_frames(frames) * self.win
+        fft = numpy.fft.rfft(frames, self.nfft)
+        # Square of absolute value
+        power = fft.real * fft.real + fft.imag * fft.imag
+        return numpy.log(numpy.dot(power, self.filters).clip(1e-5,numpy.inf))
+
+    def pre_emphasis_frames(self, frames):
+        """Apply the pre-emphasis to the rows of the given frame matrix,
+        consecutive frames of a signal, where the prior of each frame
+        is the last sample of the previous frame"""
+        frames = numpy.asarray(frames, 'd')
+        outfr = numpy.empty(frames.shape, 'd')
+        if len(frames) == 0:
+            return outfr
+        outfr[:, 1:] = frames[:, 1:] - self.alpha * frames[:, :-1]
+        outfr[0, 0] = frames[0, 0] - self.alpha * self.prior
+        outfr[1:, 0] = frames[1:, 0] - self.alpha * frames[:-1, -1]
+        self.prior = frames[-1, -1]
+        return outfr
+
     def pre_emphasis(self, frame):
         # FIXME: Do this with matrix multiplication
         outfr = numpy.empty(len(frame), 'd')
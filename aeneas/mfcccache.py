@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+A class to store the MFCCs extracted from an audio file on disk,
+so that they are not extracted again
+when the same audio is processed again.
+
+.. versionadded:: 1.3.0
+"""
+
+import hashlib
+import numpy
+import os
+import tempfile
+import time
+
+import aeneas.globalconstants as gc
+from aeneas.logger import Logger
+from aeneas.mfccfeatures import MFCCFeatures
+from aeneas.mfccstream import MFCCStream
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL v3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+class MFCCCache(object):
+    """
+    A persistent, content-addressed cache of MFCCs.
+
+    Each entry is keyed by a hash of the audio content
+    (the bytes of the input file, or the samples)
+    and of all the parameters affecting the MFCCs
+    (decoding parameters, sample rate, MFCC parameters, precision),
+    and it is stored in the cache directory as two files:
+    ``<key>.npy``, holding the MFCCs (one frame per row),
+    which is memory-mapped when read,
+    and ``<key>.len``, holding the length of the audio, in seconds.
+
+    Both files are written to a temporary file first,
+    and then renamed, so that concurrent writers
+    (e.g., several processes running tasks on the same audio)
+    never expose a partially written entry.
+    The temporary files left behind by crashed writers
+    are removed when older than ``TEMPORARY_MAX_AGE`` seconds.
+
+    When the total size of the entries exceeds ``max_size`` bytes,
+    the least recently used entries are removed.
+
+    :param path: the path of the cache directory;
+                 if ``None``, use
+                 :class:`aeneas.globalconstants.MFCC_CACHE_PATH`,
+                 and if that is ``None`` as well, the cache is disabled
+    :type  path: string (path)
+    :param max_size: the maximum size, in bytes, of the cache;
+                     if ``None``, use
+                     :class:`aeneas.globalconstants.MFCC_CACHE_MAX_SIZE`
+    :type  max_size: int
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+
+    .. versionadded:: 1.3.0
+    """
+
+    FORMAT_VERSION = 1
+    """ Version of the format of the entries,
+    included in the keys """
+
+    HASH_BLOCK_SIZE = 1048576
+    """ Size, in bytes, of the blocks of the input file
+    read at a time while hashing it """
+
+    MFCC_EXTENSION = ".npy"
+    """ Extension of the file holding the MFCCs of an entry """
+
+    LENGTH_EXTENSION = ".len"
+    """ Extension of the file holding the audio length of an entry """
+
+    TEMPORARY_EXTENSION = ".tmp"
+    """ Extension of the temporary files written before being renamed """
+
+    TEMPORARY_MAX_AGE = 3600
+    """ Age, in seconds, beyond which a temporary file
+    is considered left behind by a crashed writer,
+    and it is removed """
+
+    TAG = "MFCCCache"
+
+    def __init__(self, path=None, max_size=None, logger=None):
+        self.logger = logger
+        if self.logger is None:
+            self.logger = Logger()
+        self.path = path
+        if self.path is None:
+            self.path = gc.MFCC_CACHE_PATH
+        self.max_size = max_size
+        if self.max_size is None:
+            self.max_size = gc.MFCC_CACHE_MAX_SIZE
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    @property
+    def enabled(self):
+        """
+        ``True`` if the cache is enabled,
+        that is, if its directory is set.
+
+        :rtype: bool
+        """
+        return self.path is not None
+
+    @classmethod
+    def mfcc_parameters(cls, sample_rate, frame_rate, precision):
+        """
+        Return a dictionary with all the parameters
+        affecting the MFCCs extracted by
+        :class:`aeneas.mfccstream.MFCCStream`.
+
+        :param sample_rate: the sample rate of the audio
+        :type  sample_rate: int
+        :param frame_rate: the MFCC frame rate, in frames per second
+        :type  frame_rate: int
+        :param precision: the floating point precision of the MFCCs.
+                          If ``None``, use
+                          :class:`aeneas.globalconstants.PRECISION`
+        :type  precision: string (from :class:`aeneas.precision.Precision` enumeration)
+        :rtype: dict
+        """
+        if precision is None:
+            precision = gc.PRECISION
+        return {
+            "sample_rate": sample_rate,
+            "frame_rate": frame_rate,
+            "precision": precision,
+            "filter_bank_size": MFCCStream.FILTER_BANK_SIZE,
+            "mfcc_size": MFCCStream.MFCC_SIZE,
+            "fft_order": MFCCStream.FFT_ORDER,
+            "lower_frequency": MFCCStream.LOWER_FREQUENCY,
+            "upper_frequency": MFCCStream.UPPER_FREQUENCY,
+            "emphasis_factor": MFCCStream.EMPHASIS_FACTOR,
+            "window_length": MFCCStream.WINDOW_LENGTH,
+        }
+
+    def file_key(self, file_path, parameters):
+        """
+        Return the key of the MFCCs of the audio file
+        at the given path, hashing its contents.
+
+        :param file_path: the path of the audio file
+        :type  file_path: string (path)
+        :param parameters: the decoding and MFCC parameters
+        :type  parameters: dict
+        :rtype: string
+        """
+        digest = self._new_digest(parameters)
+        with open(file_path, "rb") as audio_file:
+            while True:
+                block = audio_file.read(self.HASH_BLOCK_SIZE)
+                if len(block) == 0:
+                    break
+                digest.update(block)
+        return digest.hexdigest()
+
+    def samples_key(self, samples, parameters):
+        """
+        Return the key of the MFCCs of the given samples,
+        hashing their bytes.
+
+        :param samples: the samples
+        :type  samples: numpy 1D array
+        :param parameters: the MFCC parameters
+        :type  parameters: dict
+        :rtype: string
+        """
+        digest = self._new_digest(parameters)
+        digest.update(str(samples.dtype).encode("ascii"))
+        digest.update(numpy.ascontiguousarray(samples).data)
+        return digest.hexdigest()
+
+    def _new_digest(self, parameters):
+        """ Return a new digest, initialized with the given parameters """
+        digest = hashlib.sha1()
+        digest.update(("%d\n" % self.FORMAT_VERSION).encode("ascii"))
+        for name in sorted(parameters.keys()):
+            digest.update(("%s=%r\n" % (name, parameters[name])).encode("utf-8"))
+        return digest
+
+    def _entry_path(self, key, extension):
+        """ Return the path of the given file of the given entry """
+        return os.path.join(self.path, key + extension)
+
+    def get(self, key):
+        """
+        Return the MFCCs and the audio length stored with the given key,
+        as a pair ``(features, audio_length)``,
+        or ``None`` if the cache is disabled or the key is not cached.
+
+        The MFCCs are memory-mapped, read-only.
+
+        :param key: the key
+        :type  key: string
+        :rtype: tuple
+        """
+        if not self.enabled:
+            return None
+        mfcc_path = self._entry_path(key, self.MFCC_EXTENSION)
+        length_path = self._entry_path(key, self.LENGTH_EXTENSION)
+        try:
+            frames = numpy.load(mfcc_path, mmap_mode="r")
+            with open(length_path, "r") as length_file:
+                audio_length = float(length_file.read())
+            # mark the entry as recently used
+            os.utime(mfcc_path, None)
+        except (IOError, OSError, ValueError):
+            self._log(["Cache miss for key '%s'", key])
+            return None
+        self._log(["Cache hit for key '%s'", key])
+        return (MFCCFeatures(frames), audio_length)
+
+    def put(self, key, features, audio_length):
+        """
+        Store the given MFCCs and audio length with the given key,
+        and remove the least recently used entries,
+        if the cache exceeds its maximum size.
+
+        Return ``True`` if the entry has been stored,
+        ``False`` otherwise (e.g., if the cache is disabled
+        or its directory cannot be written).
+
+        :param key: the key
+        :type  key: string
+        :param features: the MFCCs
+        :type  features: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        :param audio_length: the length of the audio, in seconds
+        :type  audio_length: float
+        :rtype: bool
+        """
+        if not self.enabled:
+            return False
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+        except OSError:
+            # another process might have created it meanwhile
+            if not os.path.isdir(self.path):
+                self._log(["Cannot create the cache directory '%s'", self.path], Logger.WARNING)
+                return False
+        try:
+            # write the length first, since the MFCCs file marks a complete entry
+            self._write_atomically(
+                self._entry_path(key, self.LENGTH_EXTENSION),
+                lambda f: f.write(("%r" % float(audio_length)).encode("ascii"))
+            )
+            self._write_atomically(
+                self._entry_path(key, self.MFCC_EXTENSION),
+                lambda f: numpy.save(f, features.frames)
+            )
+        except (IOError, OSError) as e:
+            self._log(["Cannot store the entry '%s': %s", key, e], Logger.WARNING)
+            return False
+        self._log(["Stored entry '%s'", key])
+        self._evict()
+        return True
+
+    def _write_atomically(self, path, write):
+        """
+        Write a temporary file in the cache directory
+        using the given function, and then rename it to ``path``.
+        """
+        handler, tmp_path = tempfile.mkstemp(suffix=self.TEMPORARY_EXTENSION, dir=self.path)
+        try:
+            with os.fdopen(handler, "wb") as tmp_file:
+                write(tmp_file)
+            os.rename(tmp_path, path)
+        except:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self):
+        """
+        Remove the temporary files left behind by crashed writers,
+        and the least recently used entries,
+        until the total size of the cache
+        does not exceed its maximum size.
+        """
+        entries = []
+        total_size = 0
+        now = time.time()
+        for file_name in os.listdir(self.path):
+            if file_name.endswith(self.TEMPORARY_EXTENSION):
+                # a writer still running has just created it
+                tmp_path = os.path.join(self.path, file_name)
+                try:
+                    if now - os.path.getmtime(tmp_path) > self.TEMPORARY_MAX_AGE:
+                        self._log(["Removing stale temporary file '%s'", file_name])
+                        os.remove(tmp_path)
+                except OSError:
+                    # removed by another process
+                    pass
+                continue
+            if not file_name.endswith(self.MFCC_EXTENSION):
+                continue
+            key = file_name[:-len(self.MFCC_EXTENSION)]
+            mfcc_path = self._entry_path(key, self.MFCC_EXTENSION)
+            length_path = self._entry_path(key, self.LENGTH_EXTENSION)
+            try:
+                stat = os.stat(mfcc_path)
+                size = stat.st_size
+                if os.path.isfile(length_path):
+                    size += os.path.getsize(length_path)
+            except OSError:
+                # removed by another process
+                continue
+            entries.append((stat.st_mtime, size, key))
+            total_size += size
+        entries.sort()
+        for mtime, size, key in entries:
+            if total_size <= self.max_size:
+                break
+            self._log(["Removing entry '%s'", key])
+            for extension in [self.MFCC_EXTENSION, self.LENGTH_EXTENSION]:
+                try:
+                    os.remove(self._entry_path(key, extension))
+                except OSError:
+                    pass
+            total_size -= size
+
+
+
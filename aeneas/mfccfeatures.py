@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+A class holding the MFCCs of a wave,
+stored frame-major, as consumed by DTW and VAD.
+
+.. versionadded:: 1.3.0
+"""
+
+import numpy
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL v3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+class MFCCFeatures(object):
+    """
+    The MFCCs of a wave, stored frame-major,
+    that is, as a C contiguous ``n x l`` matrix
+    whose ``i``-th row contains the ``l`` MFCCs of the ``i``-th frame,
+    as returned by ``cmfcc``.
+
+    The 0th MFCC (the energy of the frame), used by the VAD,
+    is split out in a contiguous vector,
+    while the remaining MFCCs, used by the DTW,
+    are normalized to unit norm2 frame by frame,
+    so that the DTW cost of a pair of frames
+    is one minus the dot product of two contiguous rows.
+    Both are computed on first access and then cached.
+
+    Slicing (e.g., ``features[a:b]``) selects a range of frames,
+    returning a new object whose arrays are views
+    of the arrays of this object, without copying them.
+
+    :param frames: the MFCCs, one frame per row
+    :type  frames: numpy 2D array (``n x l``)
+    :param dtype: the dtype of the stored MFCCs;
+                  if ``None``, use the dtype of ``frames``
+    :type  dtype: string or numpy dtype
+
+    .. versionadded:: 1.3.0
+    """
+
+    TAG = "MFCCFeatures"
+
+    def __init__(self, frames, dtype=None):
+        self.__frames = numpy.ascontiguousarray(frames, dtype=dtype)
+        if self.__frames.ndim != 2:
+            raise ValueError("The MFCCs must be a 2D array")
+        self.__energy = None
+        self.__normalized = None
+
+    @classmethod
+    def from_mfcc(cls, mfcc, dtype=None):
+        """
+        Create an object from MFCCs stored coefficient-major,
+        that is, as a ``l x n`` matrix
+        whose ``i``-th column contains the ``i``-th frame,
+        as returned by :data:`aeneas.audiofile.AudioFile.audio_mfcc`.
+
+        If ``mfcc`` is already a :class:`aeneas.mfccfeatures.MFCCFeatures`
+        object, it is returned (converted to ``dtype``, if needed).
+
+        :param mfcc: the MFCCs, one frame per column
+        :type  mfcc: numpy 2D array (``l x n``)
+        :param dtype: the dtype of the stored MFCCs;
+                      if ``None``, use the dtype of ``mfcc``
+        :type  dtype: string or numpy dtype
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        if isinstance(mfcc, cls):
+            return mfcc.astype(dtype)
+        return cls(numpy.asarray(mfcc).transpose(), dtype=dtype)
+
+    def __len__(self):
+        return self.__frames.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError("MFCCFeatures can be sliced by frames only")
+        if (key.step is not None) and (key.step != 1):
+            raise ValueError("MFCCFeatures can be sliced by contiguous frames only")
+        sliced = MFCCFeatures(self.__frames[key])
+        if self.__energy is not None:
+            sliced.__energy = self.__energy[key]
+        if self.__normalized is not None:
+            sliced.__normalized = self.__normalized[key]
+        return sliced
+
+    def __str__(self):
+        return "%d frames, %d MFCCs, %s" % (len(self), self.number_of_coefficients, self.dtype)
+
+    @property
+    def dtype(self):
+        """
+        The dtype of the stored MFCCs.
+
+        :rtype: numpy dtype
+        """
+        return self.__frames.dtype
+
+    @property
+    def number_of_coefficients(self):
+        """
+        The number of MFCCs of each frame,
+        including the 0th.
+
+        :rtype: int
+        """
+        return self.__frames.shape[1]
+
+    @property
+    def frames(self):
+        """
+        The MFCCs, one frame per row (``n x l``, C contiguous).
+
+        :rtype: numpy 2D array
+        """
+        return self.__frames
+
+    @property
+    def mfcc(self):
+        """
+        The MFCCs, one frame per column (``l x n``),
+        as a transposed view of :data:`frames`.
+
+        :rtype: numpy 2D array
+        """
+        return self.__frames.transpose()
+
+    @property
+    def energy(self):
+        """
+        The 0th MFCC of each frame (``n``, contiguous).
+
+        :rtype: numpy 1D array
+        """
+        if self.__energy is None:
+            self.__energy = numpy.ascontiguousarray(self.__frames[:, 0])
+        return self.__energy
+
+    @property
+    def normalized(self):
+        """
+        The MFCCs of each frame, except the 0th,
+        normalized to unit norm2 (``n x (l-1)``, C contiguous).
+
+        :rtype: numpy 2D array
+        """
+        if self.__normalized is None:
+            coefficients = self.__frames[:, 1:]
+            norm2 = numpy.sqrt(numpy.sum(coefficients ** 2, 1))
+            self.__normalized = numpy.ascontiguousarray(coefficients / norm2[:, numpy.newaxis])
+        return self.__normalized
+
+    def astype(self, dtype):
+        """
+        Return an object storing the MFCCs with the given dtype,
+        that is, this object if it already does,
+        or a converted copy otherwise.
+
+        :param dtype: the dtype; if ``None``, return this object
+        :type  dtype: string or numpy dtype
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        if (dtype is None) or (numpy.dtype(dtype) == self.dtype):
+            return self
+        return MFCCFeatures(self.__frames, dtype=dtype)
+
+
+
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+A class to extract the MFCCs of a signal
+whose samples arrive block by block,
+holding only one block of samples at a time.
+
+.. versionadded:: 1.3.0
+"""
+
+import numpy
+
+import aeneas.globalconstants as gc
+import aeneas.globalfunctions as gf
+from aeneas.logger import Logger
+from aeneas.mfcc import MFCC
+from aeneas.mfccfeatures import MFCCFeatures
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL v3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+class MFCCStream(object):
+    """
+    Extract the MFCCs of a signal block by block.
+
+    The blocks of samples are passed to ``push()``,
+    in order, and the MFCCs of the frames
+    lying entirely inside the samples received so far
+    are computed immediately.
+    Only the samples of the frames not yet computed are kept,
+    together with the pre-emphasis state
+    (the last sample of the last computed frame),
+    so the memory used depends on the block size,
+    not on the length of the signal.
+    The last frames, which might extend past the end of the signal,
+    are computed by ``close()``, which returns all the MFCCs.
+
+    The MFCCs are identical to those computed
+    on the whole signal, by ``cmfcc`` or by
+    :class:`aeneas.mfcc.MFCC`.
+    (The pure Python code processes the frames
+    in batches of ``MFCC.FRAMES_PER_BATCH`` frames,
+    so until a batch is complete its samples are kept as well.)
+
+    Blocks of 16 bit samples (e.g., as read by
+    :func:`aeneas.audiofile.read_wav` or decoded by
+    :func:`aeneas.ffmpegwrapper.FFMPEGWrapper.decode_blocks`)
+    are converted to floating point one at a time.
+
+    :param sample_rate: the sample rate of the signal
+    :type  sample_rate: int
+    :param frame_rate: the MFCC frame rate, in frames per second. Default:
+                       :class:`aeneas.globalconstants.MFCC_FRAME_RATE`
+    :type  frame_rate: int
+    :param precision: the floating point precision of the samples
+                      and of the MFCCs. If ``None``, use
+                      :class:`aeneas.globalconstants.PRECISION`
+    :type  precision: string (from :class:`aeneas.precision.Precision` enumeration)
+    :param logger: the logger object
+    :type  logger: :class:`aeneas.logger.Logger`
+
+    .. versionadded:: 1.3.0
+    """
+
+    FILTER_BANK_SIZE = 40
+    """ Number of filters in the Mel filter bank """
+
+    MFCC_SIZE = 13
+    """ Number of MFCCs per frame, including the 0th """
+
+    FFT_ORDER = 512
+    """ Order of the FFT """
+
+    LOWER_FREQUENCY = 133.3333
+    """ Lower frequency of the Mel filter bank, in Hz """
+
+    UPPER_FREQUENCY = 6855.4976
+    """ Upper frequency of the Mel filter bank, in Hz """
+
+    EMPHASIS_FACTOR = 0.97
+    """ Pre-emphasis factor """
+
+    WINDOW_LENGTH = 0.0256
+    """ Length of the window of a frame, in seconds """
+
+    INITIAL_CAPACITY = 1024
+    """ Initial number of frames of the output buffer,
+    doubled every time it is full """
+
+    TAG = "MFCCStream"
+
+    def __init__(
+            self,
+            sample_rate,
+            frame_rate=gc.MFCC_FRAME_RATE,
+            precision=None,
+            logger=None
+        ):
+        self.logger = logger
+        if self.logger is None:
+            self.logger = Logger()
+        self.precision = precision
+        if self.precision is None:
+            self.precision = gc.PRECISION
+        self.sample_rate = sample_rate
+        self.frame_rate = frame_rate
+        self.samples_per_frame = float(sample_rate) / frame_rate
+        self.frame_length = int(self.WINDOW_LENGTH * sample_rate)
+        self.use_c_extension = self._can_use_c_extension()
+        self.__extractor = None
+        self.__samples = numpy.zeros(0, dtype=self.precision)
+        self.__offset = 0
+        self.__prior = 0.0
+        self.__frames = numpy.zeros((self.INITIAL_CAPACITY, self.MFCC_SIZE), dtype=self.precision)
+        self.__number_of_frames = 0
+
+    def _log(self, message, severity=Logger.DEBUG):
+        """ Log """
+        self.logger.log(message, severity, self.TAG)
+
+    @property
+    def number_of_samples(self):
+        """
+        The number of samples received so far.
+
+        :rtype: int
+        """
+        return self.__offset + len(self.__samples)
+
+    @property
+    def number_of_frames(self):
+        """
+        The number of frames computed so far.
+
+        :rtype: int
+        """
+        return self.__number_of_frames
+
+    def extract(self, blocks):
+        """
+        Push all the given blocks of samples,
+        and return the MFCCs of the signal.
+
+        :param blocks: the blocks of samples
+        :type  blocks: iterable of numpy 1D arrays
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        for block in blocks:
+            self.push(block)
+        return self.close()
+
+    def push(self, block):
+        """
+        Append the given block of samples to the signal,
+        and compute the MFCCs of the frames
+        it completes.
+
+        :param block: the samples
+        :type  block: numpy 1D array
+        """
+        if block.dtype == numpy.int16:
+            block = numpy.multiply(block, 1.0 / 32768, dtype=self.precision)
+        else:
+            block = numpy.asarray(block, dtype=self.precision)
+        self.__samples = numpy.concatenate((self.__samples, block))
+        end = self.__offset + len(self.__samples)
+        # frames lying entirely inside the samples received so far
+        last_frame = max(int((end - self.frame_length) / self.samples_per_frame) + 1, 0)
+        while (last_frame > 0) and (self._frame_start(last_frame - 1) + self.frame_length > end):
+            last_frame -= 1
+        while self._frame_start(last_frame) + self.frame_length <= end:
+            last_frame += 1
+        if not self.use_c_extension:
+            # compute only complete batches,
+            # as done on the whole signal
+            last_frame -= last_frame % MFCC.FRAMES_PER_BATCH
+        self._compute_frames(last_frame)
+
+    def computed_frames(self, first_frame=0):
+        """
+        Return a copy of the MFCCs of the frames computed so far,
+        starting from the given frame
+        (e.g., the value of ``number_of_frames`` before a ``push()``,
+        to get the MFCCs of the frames it completed).
+
+        :param first_frame: the index of the first frame
+        :type  first_frame: int
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        return MFCCFeatures(self.__frames[first_frame:self.__number_of_frames].copy())
+
+    def close(self):
+        """
+        Compute the MFCCs of the last frames of the signal,
+        and return the MFCCs of the whole signal.
+
+        :rtype: :class:`aeneas.mfccfeatures.MFCCFeatures`
+        """
+        end = self.__offset + len(self.__samples)
+        self._compute_frames(int(end / self.samples_per_frame + 1))
+        self._log(["Computed %d frames from %d samples", self.__number_of_frames, end])
+        self.__frames.resize((self.__number_of_frames, self.MFCC_SIZE), refcheck=False)
+        self.__offset = end
+        self.__samples = numpy.zeros(0, dtype=self.precision)
+        return MFCCFeatures(self.__frames)
+
+    def _frame_start(self, frame_index):
+        """
+        Index of the first sample of the given frame,
+        rounded half away from zero, as done by ``cmfcc``
+        """
+        return int(numpy.floor(frame_index * self.samples_per_frame + 0.5))
+
+    def _compute_frames(self, last_frame):
+        """
+        Compute the MFCCs of the frames not yet computed,
+        up to (excluded) the given frame,
+        and drop the samples before the start of the latter.
+        """
+        first_frame = self.__number_of_frames
+        number_of_frames = last_frame - first_frame
+        if number_of_frames <= 0:
+            return
+        mfcc = None
+        if self.use_c_extension:
+            try:
+                mfcc = self._compute_frames_c_extension(first_frame, number_of_frames)
+            except:
+                self._log(
+                    "An error occurred running cmfcc",
+                    severity=Logger.WARNING
+                )
+                self.use_c_extension = False
+        if mfcc is None:
+            mfcc = self._compute_frames_pure_python(first_frame, number_of_frames)
+        self._append(mfcc)
+        drop = min(self._frame_start(last_frame) - self.__offset, len(self.__samples))
+        self.__samples = self.__samples[drop:]
+        self.__offset += drop
+
+    def _append(self, mfcc):
+        """ Append the given MFCCs to the output buffer """
+        length = self.__number_of_frames + len(mfcc)
+        if length > len(self.__frames):
+            self.__frames.resize(
+                (max(2 * len(self.__frames), length), self.MFCC_SIZE),
+                refcheck=False
+            )
+        self.__frames[self.__number_of_frames:length] = mfcc
+        self.__number_of_frames = length
+
+    def _can_use_c_extension(self):
+        """ Return ``True`` if cmfcc can be used """
+        if gc.USE_C_EXTENSIONS:
+            self._log("C extensions enabled in gc")
+            if gf.can_run_c_extension("cmfcc"):
+                self._log("C extensions enabled in gc and cmfcc can be loaded")
+                return True
+            self._log("C extensions enabled in gc, but cmfcc cannot be loaded")
+        else:
+            self._log("C extensions disabled in gc")
+        return False
+
+    def _compute_frames_c_extension(self, first_frame, number_of_frames):
+        """
+        Compute the MFCCs of the given frames
+        using the Python C extension cmfcc.
+        """
+        import aeneas.cmfcc
+        mfcc, self.__prior = aeneas.cmfcc.cmfcc_compute_mfcc_frames(
+            self.__samples,
+            self.__offset,
+            first_frame,
+            number_of_frames,
+            self.__prior,
+            self.sample_rate,
+            self.frame_rate,
+            self.FILTER_BANK_SIZE,
+            self.MFCC_SIZE,
+            self.FFT_ORDER,
+            self.LOWER_FREQUENCY,
+            self.UPPER_FREQUENCY,
+            self.EMPHASIS_FACTOR,
+            self.WINDOW_LENGTH
+        )
+        return mfcc
+
+    def _compute_frames_pure_python(self, first_frame, number_of_frames):
+        """
+        Compute the MFCCs of the given frames
+        using the pure Python code,
+        as done by ``MFCC.sig2s2mfc()`` on the whole signal.
+        """
+        if self.__extractor is None:
+            self.__extractor = MFCC(
+                nfilt=self.FILTER_BANK_SIZE,
+                ncep=self.MFCC_SIZE,
+                lowerf=self.LOWER_FREQUENCY,
+                upperf=self.UPPER_FREQUENCY,
+                alpha=self.EMPHASIS_FACTOR,
+                samprate=self.sample_rate,
+                frate=self.frame_rate,
+                wlen=self.WINDOW_LENGTH,
+                nfft=self.FFT_ORDER
+            )
+        self.__extractor.prior = self.__prior
+        mfcc = self.__extractor.sig2s2mfc_frames(
+            self.__samples,
+            self.__offset,
+            first_frame,
+            number_of_frames
+        )
+        self.__prior = self.__extractor.prior
+        return mfcc
+
+
+
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+Enumeration of the available floating point precisions
+for computing MFCCs and aligning them with DTW.
+
+.. versionadded:: 1.3.0
+"""
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL v3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+class Precision:
+    """
+    Enumeration of the available floating point precisions
+    for computing MFCCs and aligning them with DTW.
+
+    Each value is also the name of the corresponding NumPy ``dtype``.
+
+    .. versionadded:: 1.3.0
+    """
+
+    FLOAT32 = "float32"
+    """ Single precision: audio samples, MFCCs and DTW costs
+    are stored as 32 bit floats, halving the memory used,
+    at the price of slightly less accurate boundaries """
+
+    FLOAT64 = "float64"
+    """ Double precision (default) """
+
+    ALLOWED_VALUES = [FLOAT32, FLOAT64]
+    """ List of all the allowed values """
+
+
+
@@ -4,7 +4,7 @@
 """
 This module contains the implementation
 of a simple Start Detector (SD),
-based on VAD and iterated DTW.
+based on VAD and subsequence DTW.
 
 Given a (full) audio file and the corresponding (full) text,
 it will compute the time interval
@@ -21,7 +21,7 @@ import tempfile
 import aeneas.globalconstants as gc
 import aeneas.globalfunctions as gf
 from aeneas.audiofile import AudioFile
-from aeneas.dtw import DTWAligner
+from aeneas.dtw import DTWSubsequence
 from aeneas.logger import Logger
 from aeneas.synthesizer import Synthesizer
 from aeneas.vad import VAD
@@ -63,13 +63,22 @@ class SD(object):
     :type  frame_rate: int
     :param logger: the logger object
     :type  logger: :class:`aeneas.logger.Logger`
+    :param feature_store: if not ``None``, read the MFCCs
+                          and the speech intervals of the audio file
+                          from this object, instead of computing them;
+                          the tail is then detected on the reversed frames
+                          of the audio file, not on the frames
+                          of the reversed audio file, and it might differ
+                          by up to a couple of frames
+    :type  feature_store: :class:`aeneas.featurestore.FeatureStore`
+
+    .. versionchanged:: 1.3.0
+       The ``feature_store`` parameter.
     """
 
     TAG = "SD"
 
     # TODO eliminate these magic numbers
-    MAX_RUNS_NO_IMPROVEMENT = 20
-    MAX_RUNS_WITH_MIN_LENGTH = 20
     QUERY_FACTOR = 2.0
     AUDIO_FACTOR = 6.0
 
@@ -78,7 +87,8 @@ class SD(object):
             audio_file,
             text_file,
             frame_rate=gc.MFCC_FRAME_RATE,
-            logger=None
+            logger=None,
+            feature_store=None
         ):
         self.logger = logger
         if self.logger is None:
@@ -86,6 +96,8 @@ class SD(object):
         self.audio_file = audio_file
         self.text_file = text_file
         self.frame_rate = frame_rate
+        self.feature_store = feature_store
+        self.audio_mfcc = None
         self.audio_speech = None
 
     def _log(self, message, severity=Logger.DEBUG):
@@ -114,8 +126,8 @@ class SD(object):
         head = self.detect_head(min_head_length, max_head_length, metric)
         tail = self.detect_tail(min_tail_length, max_tail_length, metric)
         begin = head
-        end = self.audio_file.audio_length - tail
-        self._log(["Audio length: %.3f", self.audio_file.audio_length])
+        end = self._audio_length() - tail
+        self._log(["Audio length: %.3f", self._audio_length()])
         self._log(["Head length:  %.3f", head])
         self._log(["Tail length:  %.3f", tail])
         self._log(["Begin:        %.3f", begin])
@@ -143,9 +155,7 @@ class SD(object):
         :type  metric: :class:`aeneas.sd.SDMetric`
         :rtype: float
         """
-        self._extract_mfcc()
-        self._extract_speech()
-        self.audio_file.clear_data()
+        self._set_features(backwards=False)
         head = 0.0
         try:
             head = self._detect_start(min_head_length, max_head_length, metric, False)
@@ -171,12 +181,7 @@ class SD(object):
         :type  metric: :class:`aeneas.sd.SDMetric`
         :rtype: float
         """
-        self.audio_file.reverse()
-        self._extract_mfcc()
-        self._extract_speech()
-        self._log("Reversing audio")
-        self.audio_file.reverse()
-        self.audio_file.clear_data()
+        self._set_features(backwards=True)
         tail = 0.0
         try:
             tail = self._detect_start(min_tail_length, max_tail_length, metric, True)
@@ -193,7 +198,7 @@ class SD(object):
         self._log(["Metric:           %s", metric])
         self._log(["Backwards:        %s", str(backwards)])
 
-        audio_rate = self.text_file.characters / self.audio_file.audio_length
+        audio_rate = self.text_file.characters / self._audio_length()
         self._log(["Audio rate:     %.3f", audio_rate])
 
         self._log("Synthesizing query...")
@@ -212,7 +217,7 @@ class SD(object):
         )
         self._log("Synthesizing query... done")
 
-        query_file = AudioFile(tmp_file_path)
+        query_file = AudioFile(tmp_file_path, precision=self.audio_mfcc.dtype.name)
         if backwards:
             self._log("Reversing query")
             query_file.reverse()
@@ -227,7 +232,7 @@ class SD(object):
 
         query_characters = result[2]
         query_len = query_file.audio_length
-        query_mfcc = query_file.audio_mfcc
+        query_mfcc = query_file.audio_features
         query_rate = query_characters / query_len
 
         stretch_factor = max(1, query_rate / audio_rate)
@@ -235,16 +240,16 @@ class SD(object):
         self._log(["Query rate:     %.3f", query_rate])
         self._log(["Stretch factor: %.3f", stretch_factor])
 
-        audio_mfcc = self.audio_file.audio_mfcc
-        self._log(["Actual audio has %d frames", audio_mfcc.shape[1]])
+        audio_mfcc = self.audio_mfcc
+        self._log(["Actual audio has %d frames", len(audio_mfcc)])
         audio_mfcc_end_index = int(max_start_length * self.AUDIO_FACTOR * self.frame_rate)
         self._log(["Limiting audio to first %d frames", audio_mfcc_end_index])
-        audio_mfcc_end_index = min(audio_mfcc_end_index, audio_mfcc.shape[1])
-        audio_mfcc = audio_mfcc[:, 0:audio_mfcc_end_index]
-        self._log(["Limited audio has %d frames", audio_mfcc.shape[1]])
+        audio_mfcc_end_index = min(audio_mfcc_end_index, len(audio_mfcc))
+        audio_mfcc = audio_mfcc[0:audio_mfcc_end_index]
+        self._log(["Limited audio has %d frames", len(audio_mfcc)])
 
-        l, o = audio_mfcc.shape
-        l, n = query_mfcc.shape
+        o = len(audio_mfcc)
+        n = len(query_mfcc)
 
         # minimum length of a matched interval in the real audio
         stretched_match_minimum_length = int(n * stretch_factor)
@@ -262,87 +267,56 @@ class SD(object):
         for interval in admissible_intervals:
             self._log(["  %d %d == %.3f %.3f", self._t2i(interval[0]), self._t2i(interval[1]), interval[0], interval[1]])
 
-        candidates = []
-        runs_with_min_length = 0
-        runs_no_improvement = 0
-        runs_min_distortion = numpy.inf
-        runs_min_value = numpy.inf
-
-        for interval in admissible_intervals:
-            if runs_no_improvement >= self.MAX_RUNS_NO_IMPROVEMENT:
-                self._log("  Breaking: too many runs without improvement")
-                break
-
-            if runs_with_min_length >= self.MAX_RUNS_WITH_MIN_LENGTH:
-                self._log("  Breaking: too many runs with minimum required length")
-                break
+        # a candidate starts at the beginning of an admissible interval,
+        # and it must leave enough audio for a match of the required minimum length
+        starts = [self._t2i(x[0]) for x in admissible_intervals]
+        starts = sorted(set([x for x in starts if x + stretched_match_minimum_length < o]))
+        self._log(["Evaluating %d candidate starts", len(starts)])
+
+        # matches up to twice as long as the query
+        dtw = DTWSubsequence(
+            query_mfcc,
+            audio_mfcc,
+            starts,
+            stretched_match_minimum_length,
+            2 * n,
+            self.logger
+        )
 
-            start_time = interval[0]
-            start_index = self._t2i(start_time)
-            self._log(["Evaluating interval starting at %d == %.3f ", start_index, start_time])
-            if start_index > o:
-                self._log("  Breaking: start index outside audio window")
-                break
+        # a single pass over the audio gives a lower bound
+        # of the value (or distortion) of each candidate
+        self._log("Computing lower bounds...")
+        bounds = self._compute_lower_bounds(
+            dtw.compute_end_costs(),
+            starts,
+            stretched_match_minimum_length,
+            2 * n,
+            metric
+        )
+        self._log("Computing lower bounds... done")
 
-            req_end_index = start_index + stretched_match_minimum_length
-            req_end_time = self._i2t(req_end_index)
-            if req_end_index > o:
-                self._log("  Breaking: not enough audio left in shifted window")
+        # evaluate the candidates exactly, from the one with the lowest bound,
+        # until the bound exceeds the best value (or distortion) found so far,
+        # since no other candidate can be better
+        candidates = []
+        best = numpy.inf
+        for bound, start_index in sorted(zip(bounds, starts)):
+            if bound > best:
+                self._log(["Skipping the remaining candidates: bound %.6f > best %.6f", bound, best])
                 break
-            end_index = min(start_index + 2 * n, o)
-            end_time = self._i2t(end_index)
-
-            self._log(["  Start   %d == %.3f", start_index, start_time])
-            self._log(["  Req end %d == %.3f", req_end_index, req_end_time])
-            self._log(["  Eff end %d == %.3f", end_index, end_time])
-
-            audio_mfcc_sub = audio_mfcc[:, start_index:end_index]
-            l, m = audio_mfcc_sub.shape
-
-            self._log("Computing DTW...")
-            aligner = DTWAligner(None, None, frame_rate=self.frame_rate, logger=self.logger)
-            aligner.real_wave_full_mfcc = audio_mfcc_sub
-            aligner.synt_wave_full_mfcc = query_mfcc
-            aligner.real_wave_length = self._i2t(m)
-            aligner.synt_wave_length = self._i2t(n)
-            acm = aligner.compute_accumulated_cost_matrix()
-            # transpose, so we have an n x m accumulated cost matrix
-            acm = acm.transpose()
-            last_row = acm[-1, :]
-            self._log("Computing DTW... done")
-
-            # find the minimum, but its index must be >= stretched_match_minimum_length
-            candidate_argmin_index = numpy.argmin(last_row[stretched_match_minimum_length:])
-            candidate_length_index = stretched_match_minimum_length + candidate_argmin_index
+            values, lengths = dtw.compute_costs([start_index])
+            candidate_value = values[0]
+            candidate_length_index = lengths[0]
+            if candidate_length_index < 0:
+                self._log(["  No match begins at %d == %.3f", start_index, self._i2t(start_index)])
+                continue
+            start_time = self._i2t(start_index)
             candidate_length_time = self._i2t(candidate_length_index)
-            candidate_value = last_row[candidate_length_index]
             candidate_end_index = start_index + candidate_length_index
             candidate_end_time = self._i2t(candidate_end_index)
             candidate_distortion = candidate_value / candidate_length_index
 
-            # check if the candidate has minimum length
-            if candidate_length_index == stretched_match_minimum_length:
-                runs_with_min_length += 1
-            else:
-                runs_with_min_length = 0
-
-            # check if the candidate improved the global minimum value
-            if metric == SDMetric.VALUE:
-                if candidate_value < runs_min_value:
-                    runs_min_value = candidate_value
-                    runs_no_improvement = 0
-                else:
-                    runs_no_improvement += 1
-            if metric == SDMetric.DISTORTION:
-                if candidate_distortion < runs_min_distortion:
-                    runs_min_distortion = candidate_distortion
-                    runs_no_improvement = 0
-                else:
-                    runs_no_improvement += 1
-
             # append to the list of candidates
-            self._log(["    Interval  start:      %d == %.6f", start_index, start_time])
-            self._log(["    Interval  end:        %d == %.6f", end_index, end_time])
             self._log(["    Candidate start:      %d == %.6f", start_index, start_time])
             self._log(["    Candidate end:        %d == %.6f", candidate_end_index, candidate_end_time])
             self._log(["    Candidate length:     %d == %.6f", candidate_length_index, candidate_length_time])
@@ -350,10 +324,15 @@ class SD(object):
             self._log(["    Candidate distortion: %.6f", candidate_distortion])
             candidates.append({
                 "start_index": start_index,
-                "length": candidate_length_index,
-                "value": candidate_value,
-                "distortion": candidate_distortion
+                "length": int(candidate_length_index),
+                "value": float(candidate_value),
+                "distortion": float(candidate_distortion)
             })
+            if metric == SDMetric.VALUE:
+                best = min(best, candidate_value)
+            if metric == SDMetric.DISTORTION:
+                best = min(best, candidate_distortion)
+        self._log(["Evaluated %d of %d candidate starts", len(candidates), len(starts)])
 
         # select best candidate and return its start time
         # if we have no best candidate, return 0.0
@@ -377,10 +356,43 @@ class SD(object):
             except:
                 pass
 
+    def _audio_length(self):
+        """ Length of the audio file, in seconds """
+        if self.feature_store is not None:
+            return self.feature_store.audio_length
+        return self.audio_file.audio_length
+
+    def _set_features(self, backwards):
+        """
+        Set the MFCCs and the speech intervals of the audio,
+        reversed if ``backwards`` is ``True``,
+        reading them from the feature store, if any,
+        or computing them otherwise
+        """
+        if self.feature_store is not None:
+            self._log("Reading MFCCs and speech intervals from feature store")
+            if backwards:
+                self.audio_mfcc = self.feature_store.reversed_features
+                self.audio_speech = self.feature_store.reversed_speech
+            else:
+                self.audio_mfcc = self.feature_store.features
+                self.audio_speech = self.feature_store.speech
+            return
+        if backwards:
+            self._log("Reversing audio")
+            self.audio_file.reverse()
+        self._extract_mfcc()
+        self._extract_speech()
+        if backwards:
+            self._log("Reversing audio")
+            self.audio_file.reverse()
+        self.audio_file.clear_data()
+
     def _extract_mfcc(self):
         """ Extract MFCCs for audio """
         self._log("Extracting MFCCs for audio...")
-        self.audio_file.extract_mfcc(frame_rate=self.frame_rate)
+        self.audio_file.extract_mfcc(frame_rate=self.frame_rate, use_cache=True)
+        self.audio_mfcc = self.audio_file.audio_features
         self._log("Extracting MFCCs for audio... done")
 
     def _extract_speech(self):
@@ -388,7 +400,7 @@ class SD(object):
         self._log("Running VAD...")
         vad = VAD(frame_rate=self.frame_rate, logger=self.logger)
         vad.wave_len = self.audio_file.audio_length
-        vad.wave_mfcc = self.audio_file.audio_mfcc
+        vad.wave_mfcc = self.audio_file.audio_features
         vad.compute_vad()
         self.audio_speech = vad.speech
         self._log("Running VAD... done")
@@ -401,6 +413,26 @@ class SD(object):
         """ Frame (start) time to index """
         return int(time * self.frame_rate)
 
+    def _compute_lower_bounds(self, end_costs, starts, min_length, max_length, metric):
+        """
+        Return, for each start, a lower bound of the value
+        (or of the distortion, depending on the metric)
+        of the candidate beginning there,
+        from the min cost of the matches ending at each audio frame
+        (see :func:`aeneas.dtw.DTWSubsequence.compute_end_costs`).
+        """
+        bounds = []
+        for start_index in starts:
+            lengths = numpy.arange(min_length, min(max_length, len(end_costs) - start_index))
+            if len(lengths) == 0:
+                bounds.append(numpy.inf)
+                continue
+            costs = end_costs[start_index + lengths]
+            if metric == SDMetric.DISTORTION:
+                costs = costs / numpy.maximum(lengths, 1)
+            bounds.append(numpy.min(costs))
+        return bounds
+
     def _select_best_candidate(self, candidates, metric):
         """ Select the best candidate (or None if no one is found) """
         self._log(["Using metric '%s'", metric])
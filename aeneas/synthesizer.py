@@ -7,13 +7,8 @@ a single ``wav`` file,
 along with the corresponding time anchors.
 """
 
-import numpy
-import os
-import tempfile
-from scikits.audiolab import wavread
-from scikits.audiolab import wavwrite
+import wave
 
-import aeneas.globalfunctions as gf
 from aeneas.espeakwrapper import ESPEAKWrapper
 from aeneas.logger import Logger
 
@@ -34,10 +29,20 @@ class Synthesizer(object):
     a single ``wav`` file,
     along with the corresponding time anchors.
 
+    The samples of each fragment are written to the output ``wav`` file
+    as soon as the fragment is synthesized,
+    so the time and memory needed
+    are linear in the length of the output.
+
     :param logger: the logger object
     :type  logger: :class:`aeneas.logger.Logger`
     """
 
+    EMPTY_SAMPLE_RATE = 22050
+    """ Sample rate of the output ``wav`` file
+    if no fragment has a positive duration
+    (the sample rate of the ``espeak`` output) """
+
     TAG = "Synthesizer"
 
     def __init__(self, logger=None):
@@ -49,7 +54,7 @@ class Synthesizer(object):
         """ Log """
         self.logger.log(message, severity, self.TAG)
 
-    def synthesize(self, text_file, audio_file_path, quit_after=None, backwards=False):
+    def synthesize(self, text_file, audio_file_path, quit_after=None, backwards=False, workers=None):
         """
         Synthesize the text contained in the given fragment list
         into a ``wav`` file.
@@ -63,6 +68,20 @@ class Synthesizer(object):
         :type  quit_after: float
         :param backwards: synthesizing from the end of the text file
         :type  backwards: bool
+        :param workers: the number of ``espeak`` processes running concurrently,
+                        ignored if the ``espeak`` library is used;
+                        if ``None``, use
+                        :class:`aeneas.globalconstants.SYNTHESIZER_WORKERS`
+        :type  workers: int
+
+        .. versionchanged:: 1.3.0
+           The fragments are written to the output file as they are synthesized
+           (or, if ``backwards`` is ``True``, collected and written at the end,
+           in reverse order), instead of being concatenated into a single array.
+           The fragments are synthesized by
+           :func:`aeneas.espeakwrapper.ESPEAKWrapper.synthesize_multiple`,
+           and the time anchors are computed from their number of samples.
+           Added the ``workers`` parameter.
         """
 
         # time anchors
@@ -71,8 +90,14 @@ class Synthesizer(object):
         # initialize time
         current_time = 0.0
 
-        # waves is used to concatenate all the fragments WAV files
-        waves = numpy.array([])
+        # the output WAV file, opened when the first samples are available,
+        # to which the samples of the fragments are appended;
+        # the wave module writes the actual data size in the header on close
+        output_file = None
+
+        # if synthesizing backwards, the samples of the fragments
+        # are written in reverse order at the end
+        chunks = []
 
         # espeak wrapper
         espeak = ESPEAKWrapper(logger=self.logger)
@@ -83,24 +108,24 @@ class Synthesizer(object):
             self._log("Synthesizing backwards")
 
         # for each fragment, synthesize it and concatenate it
-        num = 0
         num_chars = 0
         fragments = text_file.fragments
         if backwards:
             fragments = fragments[::-1]
-        for fragment in fragments:
-
-            # synthesize and get the duration of the output file
+        # the fragments are synthesized lazily, one at a time,
+        # so that quitting early does not synthesize the remaining ones
+        synthesized = espeak.synthesize_multiple(
+            ((fragment.text, fragment.language) for fragment in fragments),
+            workers=workers
+        )
+        for num, fragment in enumerate(fragments):
+
+            # synthesize and get the duration from the number of samples
             self._log(["Synthesizing fragment %d", num])
-            handler, tmp_destination = tempfile.mkstemp(
-                suffix=".wav",
-                dir=gf.custom_tmp_dir()
-            )
-            duration = espeak.synthesize(
-                text=fragment.text,
-                language=fragment.language,
-                output_file_path=tmp_destination
-            )
+            samples, sample_frequency = next(synthesized)
+            duration = 0
+            if len(samples) > 0:
+                duration = len(samples) / float(sample_frequency)
 
             # store for later output
             anchors.append([current_time, fragment.identifier, fragment.text])
@@ -113,37 +138,32 @@ class Synthesizer(object):
             if duration > 0:
                 self._log(["Fragment %d duration: %f", num, duration])
                 current_time += duration
-                data, sample_frequency, encoding = wavread(tmp_destination)
-                #
-                # TODO this might result in memory swapping
-                # if we have a large number of fragments
-                # is there a better way?
-                #
-                # NOTE since append cannot be in place,
-                # it seems that the only alternative is pre-allocating
-                # the destination array,
-                # possibly truncating or extending it as needed
-                #
+                if output_file is None:
+                    output_file = self._open_output_file(
+                        audio_file_path,
+                        samples.shape[1] if samples.ndim > 1 else 1,
+                        sample_frequency
+                    )
+                data = samples.tostring()
                 if backwards:
-                    waves = numpy.append(data, waves)
+                    chunks.append(data)
                 else:
-                    waves = numpy.append(waves, data)
+                    output_file.writeframes(data)
             else:
                 self._log(["Fragment %d has zero duration", num])
 
-            # remove temporary file
-            self._log(["Removing temporary file '%s'", tmp_destination])
-            os.close(handler)
-            os.remove(tmp_destination)
-            num += 1
-
             if (quit_after is not None) and (current_time > quit_after):
                 self._log(["Quitting after reached duration %.3f", current_time])
                 break
+        synthesized.close()
 
         # output WAV file, concatenation of synthesized fragments
         self._log(["Writing audio file '%s'", audio_file_path])
-        wavwrite(waves, audio_file_path, sample_frequency, encoding)
+        if output_file is None:
+            output_file = self._open_output_file(audio_file_path, 1, self.EMPTY_SAMPLE_RATE)
+        for data in reversed(chunks):
+            output_file.writeframes(data)
+        output_file.close()
 
         # return the time anchors
         # TODO anchors do not make sense if backwards == True
@@ -152,5 +172,18 @@ class Synthesizer(object):
         self._log(["Synthesized %d characters", num_chars])
         return (anchors, current_time, num_chars)
 
+    def _open_output_file(self, audio_file_path, channels, sample_rate):
+        """
+        Open the output 16 bit PCM ``wav`` file
+        with the given number of channels and sample rate,
+        and return the ``wave.Wave_write`` object writing it.
+        """
+        self._log(["Opening audio file '%s' (%d channels, %d Hz)", audio_file_path, channels, sample_rate])
+        output_file = wave.open(audio_file_path, "wb")
+        output_file.setnchannels(channels)
+        output_file.setsampwidth(2)
+        output_file.setframerate(sample_rate)
+        return output_file
+
 
 
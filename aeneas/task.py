@@ -216,6 +216,10 @@ class TaskConfiguration(object):
             gc.PPN_TASK_ADJUST_BOUNDARY_PERCENT_VALUE,
             gc.PPN_TASK_ADJUST_BOUNDARY_RATE_VALUE,
 
+            gc.PPN_TASK_ALIGNER_CENTERING,
+            gc.PPN_TASK_ALIGNER_WORKERS,
+            gc.PPN_TASK_PRECISION,
+
             gc.PPN_TASK_IS_AUDIO_FILE_DETECT_HEAD_MIN,
             gc.PPN_TASK_IS_AUDIO_FILE_DETECT_HEAD_MAX,
             gc.PPN_TASK_IS_AUDIO_FILE_DETECT_TAIL_MIN,
@@ -388,6 +392,54 @@ class TaskConfiguration(object):
     def adjust_boundary_rate_value(self, value):
         self.fields[gc.PPN_TASK_ADJUST_BOUNDARY_RATE_VALUE] = value
 
+    @property
+    def aligner_centering(self):
+        """
+        The way of centering the stripe
+        of the DTW algorithm aligning the waves.
+        If ``None``, the default ``gc.ALIGNER_CENTERING`` is used.
+
+        .. versionadded:: 1.3.0
+
+        :rtype: string (from the :class:`aeneas.dtw.DTWCentering` enumeration)
+        """
+        return self.fields[gc.PPN_TASK_ALIGNER_CENTERING]
+    @aligner_centering.setter
+    def aligner_centering(self, value):
+        self.fields[gc.PPN_TASK_ALIGNER_CENTERING] = value
+
+    @property
+    def aligner_workers(self):
+        """
+        The number of worker processes aligning the waves
+        segment by segment.
+        If ``None``, the waves are aligned as a whole.
+
+        .. versionadded:: 1.3.0
+
+        :rtype: int
+        """
+        return self.fields[gc.PPN_TASK_ALIGNER_WORKERS]
+    @aligner_workers.setter
+    def aligner_workers(self, value):
+        self.fields[gc.PPN_TASK_ALIGNER_WORKERS] = value
+
+    @property
+    def precision(self):
+        """
+        The floating point precision used to compute
+        the MFCCs and the DTW alignment.
+        If ``None``, the default ``gc.PRECISION`` is used.
+
+        .. versionadded:: 1.3.0
+
+        :rtype: string (from the :class:`aeneas.precision.Precision` enumeration)
+        """
+        return self.fields[gc.PPN_TASK_PRECISION]
+    @precision.setter
+    def precision(self, value):
+        self.fields[gc.PPN_TASK_PRECISION] = value
+
     @property
     def is_text_file_format(self):
         """
@@ -1,13 +1,16 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import numpy
 import os
 import tempfile
 import unittest
+import wave
 
 from . import get_abs_path, delete_file
 
-from aeneas.audiofile import AudioFile
+from aeneas.audiofile import AudioFile, read_wav
+from aeneas.precision import Precision
 
 class TestAudioFile(unittest.TestCase):
 
@@ -83,6 +86,16 @@ class TestAudioFile(unittest.TestCase):
     def load(self, path):
         return AudioFile(get_abs_path(path))
 
+    def write_wav(self, samples, channels=1, sample_width=2):
+        handler, output_file_path = tempfile.mkstemp(suffix=".wav")
+        wav = wave.open(output_file_path, "wb")
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tostring())
+        wav.close()
+        return (handler, output_file_path)
+
     def test_cannot_load(self):
         audiofile = self.load("this_file_does_not_exist.mp3")
         with self.assertRaises(OSError):
@@ -104,6 +117,19 @@ class TestAudioFile(unittest.TestCase):
         self.assertNotEqual(audiofile.audio_data, None)
         audiofile.clear_data()
 
+    def test_load_samples(self):
+        audiofile = AudioFile(None)
+        audiofile.load_samples(numpy.array([-32768, 0, 16384], dtype=numpy.int16), 3)
+        self.assertEqual(audiofile.audio_data.dtype, numpy.float64)
+        self.assertTrue(numpy.array_equal(audiofile.audio_data, [-1.0, 0.0, 0.5]))
+        self.assertEqual(audiofile.audio_sample_rate, 3)
+        self.assertAlmostEqual(audiofile.audio_length, 1.0)
+
+    def test_load_samples_float32(self):
+        audiofile = AudioFile(None, precision=Precision.FLOAT32)
+        audiofile.load_samples(numpy.zeros(10, dtype=numpy.int16), 10)
+        self.assertEqual(audiofile.audio_data.dtype, numpy.float32)
+
     def test_clear_data(self):
         audiofile = self.load(self.AUDIO_FILE_PATH_MFCC)
         audiofile.load_data()
@@ -119,6 +145,18 @@ class TestAudioFile(unittest.TestCase):
         self.assertEqual(audiofile.audio_mfcc.shape[0], 13)
         self.assertEqual(audiofile.audio_mfcc.shape[1], 1332)
 
+    def test_extract_mfcc_float32(self):
+        expected = self.load(self.AUDIO_FILE_PATH_MFCC)
+        expected.extract_mfcc()
+        audiofile = AudioFile(get_abs_path(self.AUDIO_FILE_PATH_MFCC), precision=Precision.FLOAT32)
+        audiofile.load_data()
+        self.assertEqual(audiofile.audio_data.dtype, numpy.float32)
+        audiofile.extract_mfcc()
+        audiofile.clear_data()
+        self.assertEqual(audiofile.audio_mfcc.dtype, numpy.float32)
+        self.assertEqual(audiofile.audio_mfcc.shape, expected.audio_mfcc.shape)
+        self.assertTrue(numpy.allclose(audiofile.audio_mfcc, expected.audio_mfcc, atol=1e-4))
+
     def test_length(self):
         audiofile = self.load(self.AUDIO_FILE_PATH_MFCC)
         audiofile.load_data()
@@ -152,6 +190,90 @@ class TestAudioFile(unittest.TestCase):
             self.assertAlmostEqual(audiofile.audio_length, interval[2], places=1) # 53.315918
             audiofile.clear_data()
 
+    def test_trim_is_view(self):
+        audiofile = AudioFile(None)
+        samples = numpy.zeros(20 * 16000)
+        audiofile.audio_data = samples
+        audiofile.audio_sample_rate = 16000
+        audiofile.audio_length = 20.0
+        audiofile.trim(1.0, 10.0)
+        self.assertEqual(audiofile.audio_window, (16000, 11 * 16000))
+        self.assertTrue(numpy.may_share_memory(audiofile.audio_data, samples))
+        self.assertEqual(len(audiofile.audio_data), 10 * 16000)
+        audiofile.clear_data()
+        self.assertEqual(audiofile.audio_window, None)
+
+    def test_trim_twice(self):
+        audiofile = self.load(self.AUDIO_FILE_PATH_MFCC)
+        audiofile.load_data()
+        samples = audiofile.audio_data
+        audiofile.trim(1.0, 20.0)
+        audiofile.trim(2.0, 5.0)
+        self.assertAlmostEqual(audiofile.audio_length, 5.0, places=3)
+        begin = 3 * audiofile.audio_sample_rate
+        self.assertTrue(numpy.array_equal(audiofile.audio_data, samples[begin:begin + 5 * audiofile.audio_sample_rate]))
+        audiofile.clear_data()
+
+    def test_set_audio_data_resets_window(self):
+        audiofile = self.load(self.AUDIO_FILE_PATH_MFCC)
+        audiofile.load_data()
+        audiofile.trim(1.0, 10.0)
+        audiofile.audio_data = numpy.zeros(100)
+        self.assertEqual(audiofile.audio_window, (0, 100))
+        self.assertEqual(len(audiofile.audio_data), 100)
+        audiofile.clear_data()
+
+    def test_read_wav(self):
+        samples = numpy.array([-32768, 0, 16384, 32767], dtype=numpy.int16)
+        handler, path = self.write_wav(samples)
+        data, sample_rate, encoding = read_wav(path)
+        self.assertTrue(isinstance(data, numpy.memmap))
+        self.assertEqual(data.dtype, numpy.int16)
+        self.assertTrue(numpy.array_equal(data, samples))
+        self.assertEqual(sample_rate, 16000)
+        self.assertEqual(encoding, "pcm16")
+        del data
+        delete_file(handler, path)
+
+    def test_read_wav_stereo(self):
+        samples = numpy.array([1, 2, 3, 4, 5, 6], dtype=numpy.int16)
+        handler, path = self.write_wav(samples, channels=2)
+        data, sample_rate, encoding = read_wav(path)
+        self.assertEqual(data.shape, (3, 2))
+        self.assertTrue(numpy.array_equal(data[:, 1], [2, 4, 6]))
+        del data
+        delete_file(handler, path)
+
+    def test_read_wav_empty(self):
+        handler, path = self.write_wav(numpy.zeros(0, dtype=numpy.int16))
+        data, sample_rate, encoding = read_wav(path)
+        self.assertEqual(len(data), 0)
+        delete_file(handler, path)
+
+    def test_read_wav_not_pcm16(self):
+        handler, path = self.write_wav(numpy.zeros(10, dtype=numpy.uint8), sample_width=1)
+        with self.assertRaises(ValueError):
+            read_wav(path)
+        delete_file(handler, path)
+
+    def test_read_wav_not_wav(self):
+        with self.assertRaises(ValueError):
+            read_wav(get_abs_path("res/audioformats/p001.mp3"))
+
+    def test_load_data_memmap(self):
+        samples = numpy.array([-32768, 0, 16384, 32767], dtype=numpy.int16)
+        handler, path = self.write_wav(samples)
+        audiofile = AudioFile(path, precision=Precision.FLOAT32)
+        audiofile.load_data()
+        self.assertEqual(audiofile.audio_sample_rate, 16000)
+        self.assertAlmostEqual(audiofile.audio_length, 4.0 / 16000)
+        self.assertEqual(audiofile.audio_data.dtype, numpy.float32)
+        self.assertTrue(numpy.array_equal(audiofile.audio_data, [-1.0, 0.0, 0.5, 32767.0 / 32768]))
+        audiofile.reverse()
+        self.assertTrue(numpy.array_equal(audiofile.audio_data, [32767.0 / 32768, 0.5, 0.0, -1.0]))
+        audiofile.clear_data()
+        delete_file(handler, path)
+
     def test_write(self):
         audiofile = self.load(self.AUDIO_FILE_PATH_MFCC)
         audiofile.load_data()
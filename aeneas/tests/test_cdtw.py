@@ -6,33 +6,190 @@ import unittest
 
 from . import get_abs_path
 
+from aeneas.mfccfeatures import MFCCFeatures
+
 class TestCDTW(unittest.TestCase):
 
     MFCC1 = get_abs_path("res/cdtw/mfcc1_53")
     MFCC2 = get_abs_path("res/cdtw/mfcc2_53")
 
+    def load(self):
+        # frame-major, normalized, as passed by DTWStripe
+        mfcc1 = MFCCFeatures.from_mfcc(numpy.loadtxt(self.MFCC1)).normalized
+        mfcc2 = MFCCFeatures.from_mfcc(numpy.loadtxt(self.MFCC2)).normalized
+        return (mfcc1, mfcc2)
+
     def test_compute_path(self):
         try:
             import aeneas.cdtw
-            mfcc1 = numpy.loadtxt(self.MFCC1)
-            mfcc2 = numpy.loadtxt(self.MFCC2)
-            l, n = mfcc1.shape
-            l, m = mfcc2.shape
-            norm2_1 = numpy.sqrt(numpy.sum(mfcc1 ** 2, 0))
-            norm2_2 = numpy.sqrt(numpy.sum(mfcc2 ** 2, 0))
+            mfcc1, mfcc2 = self.load()
+            n, l = mfcc1.shape
+            m, l = mfcc2.shape
             delta = 3000
             if delta > m:
                 delta = m
             best_path = aeneas.cdtw.cdtw_compute_best_path(
                 mfcc1,
                 mfcc2,
-                norm2_1,
-                norm2_2,
                 delta
             )
-            self.assertEqual(len(best_path), 1418)
-            self.assertEqual(best_path[0], (0, 0))
-            self.assertEqual(best_path[-1], (n-1, m-1))
+            self.assertEqual(best_path.shape, (1418, 2))
+            self.assertEqual(best_path.dtype, numpy.int32)
+            self.assertEqual(tuple(best_path[0]), (0, 0))
+            self.assertEqual(tuple(best_path[-1]), (n-1, m-1))
+        except ImportError as e:
+            pass
+
+    def test_compute_path_same_as_step(self):
+        try:
+            import aeneas.cdtw
+            mfcc1, mfcc2 = self.load()
+            for delta in [17, 100, 3000]:
+                best_path = aeneas.cdtw.cdtw_compute_best_path(
+                    mfcc1,
+                    mfcc2,
+                    delta
+                )
+                cost_matrix, centers = aeneas.cdtw.cdtw_compute_cost_matrix_step(
+                    mfcc1,
+                    mfcc2,
+                    delta
+                )
+                accumulated_cost_matrix = aeneas.cdtw.cdtw_compute_accumulated_cost_matrix_step(
+                    cost_matrix,
+                    centers
+                )
+                step_path = aeneas.cdtw.cdtw_compute_best_path_step(
+                    accumulated_cost_matrix,
+                    centers
+                )
+                self.assertTrue(numpy.array_equal(best_path, step_path))
+        except ImportError as e:
+            pass
+
+    def test_compute_path_checkpoint(self):
+        try:
+            import aeneas.cdtw
+            mfcc1, mfcc2 = self.load()
+            for delta in [100, 3000]:
+                best_path = aeneas.cdtw.cdtw_compute_best_path(
+                    mfcc1,
+                    mfcc2,
+                    delta
+                )
+                for interval in [0, 1, 37, 5000]:
+                    checkpoint_path = aeneas.cdtw.cdtw_compute_best_path_checkpoint(
+                        mfcc1,
+                        mfcc2,
+                        delta,
+                        interval
+                    )
+                    self.assertTrue(numpy.array_equal(checkpoint_path, best_path))
+        except ImportError as e:
+            pass
+
+    def test_compute_path_threads(self):
+        try:
+            import aeneas.cdtw
+            mfcc1, mfcc2 = self.load()
+            for delta in [100, 3000]:
+                best_path = aeneas.cdtw.cdtw_compute_best_path(
+                    mfcc1,
+                    mfcc2,
+                    delta
+                )
+                cost_matrix, centers = aeneas.cdtw.cdtw_compute_cost_matrix_step(
+                    mfcc1,
+                    mfcc2,
+                    delta
+                )
+                for threads in [0, 2, 3, 8, 5000]:
+                    threads_path = aeneas.cdtw.cdtw_compute_best_path(
+                        mfcc1,
+                        mfcc2,
+                        delta,
+                        None,
+                        threads
+                    )
+                    self.assertTrue(numpy.array_equal(threads_path, best_path))
+                    threads_cost_matrix, threads_centers = aeneas.cdtw.cdtw_compute_cost_matrix_step(
+                        mfcc1,
+                        mfcc2,
+                        delta,
+                        None,
+                        threads
+                    )
+                    self.assertTrue(numpy.array_equal(threads_cost_matrix, cost_matrix))
+                    self.assertTrue(numpy.array_equal(threads_centers, centers))
+        except ImportError as e:
+            pass
+
+    def test_compute_path_not_contiguous(self):
+        try:
+            import aeneas.cdtw
+            mfcc1, mfcc2 = self.load()
+            # the MFCCs are read in place, hence they are not transposed
+            with self.assertRaises(ValueError):
+                aeneas.cdtw.cdtw_compute_best_path(
+                    mfcc1.transpose(),
+                    mfcc2.transpose(),
+                    100
+                )
+            with self.assertRaises(ValueError):
+                aeneas.cdtw.cdtw_compute_best_path(
+                    mfcc1.astype(numpy.float32),
+                    mfcc2.astype(numpy.float32),
+                    100
+                )
+        except ImportError as e:
+            pass
+
+    def test_compute_subsequence_costs(self):
+        try:
+            import aeneas.cdtw
+            mfcc1, mfcc2 = self.load()
+            audio = mfcc1[0:400]
+            query = numpy.ascontiguousarray(audio[200:260])
+            starts = numpy.array([0, 13, 90, 200, 250], dtype=numpy.int32)
+            values, lengths = aeneas.cdtw.cdtw_compute_subsequence_costs(
+                query,
+                audio,
+                starts,
+                30,
+                120
+            )
+            self.assertEqual(values.shape, (5,))
+            self.assertEqual(numpy.argmin(values), 3)
+            self.assertEqual(lengths[3], 59)
+            # the starts must be increasing
+            with self.assertRaises(ValueError):
+                aeneas.cdtw.cdtw_compute_subsequence_costs(
+                    query,
+                    audio,
+                    starts[::-1],
+                    30,
+                    120
+                )
+        except ImportError as e:
+            pass
+
+    def test_compute_subsequence_end_costs(self):
+        try:
+            import aeneas.cdtw
+            mfcc1, mfcc2 = self.load()
+            audio = mfcc1[0:400]
+            query = numpy.ascontiguousarray(audio[200:260])
+            starts = numpy.array([0, 13, 90, 200, 250], dtype=numpy.int32)
+            end_costs = aeneas.cdtw.cdtw_compute_subsequence_end_costs(
+                query,
+                audio,
+                starts,
+                120
+            )
+            self.assertEqual(end_costs.shape, (400,))
+            self.assertEqual(numpy.argmin(end_costs), 259)
+            # no match ends after the last start plus max_length
+            self.assertTrue(numpy.all(numpy.isinf(end_costs[370:])))
         except ImportError as e:
             pass
 
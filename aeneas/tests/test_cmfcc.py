@@ -39,6 +39,93 @@ class TestCMFCC(unittest.TestCase):
         except ImportError as e:
             pass
 
+    def test_compute_mfcc_frames(self):
+        try:
+            import aeneas.cmfcc
+            parameters = [16000, 25, 40, 13, 512, 133.3333, 6855.4976, 0.97, 0.0256]
+            rng = numpy.random.RandomState(0)
+            data = rng.uniform(-1.0, 1.0, 48000)
+            mfcc = aeneas.cmfcc.cmfcc_compute_mfcc(data, *parameters)
+            # frames 10 to 19 start at samples 6400 to 12160,
+            # and each frame is 409 samples long
+            mfcc_frames, prior = aeneas.cmfcc.cmfcc_compute_mfcc_frames(
+                data[6000:20000],
+                6000,
+                10,
+                10,
+                data[5760 + 408],
+                *parameters
+            )
+            self.assertTrue(numpy.array_equal(mfcc_frames, mfcc[10:20]))
+            self.assertEqual(prior, data[12160 + 408])
+        except ImportError as e:
+            pass
+
+    def test_compute_mfcc_same_as_pure_python(self):
+        try:
+            import aeneas.cmfcc
+            from aeneas.mfcc import MFCC
+            rng = numpy.random.RandomState(0)
+            for sample_rate, frame_rate in [(16000, 25), (22050, 100), (44100, 33)]:
+                data = rng.uniform(-1.0, 1.0, int(3.37 * sample_rate))
+                mfcc_c = aeneas.cmfcc.cmfcc_compute_mfcc(
+                    data,
+                    sample_rate,
+                    frame_rate,
+                    40,
+                    13,
+                    512,
+                    133.3333,
+                    6855.4976,
+                    0.97,
+                    0.0256
+                )
+                mfcc_py = MFCC(samprate=sample_rate, frate=frame_rate).sig2s2mfc(data)
+                self.assertEqual(mfcc_c.shape, mfcc_py.shape)
+                self.assertTrue(numpy.allclose(mfcc_c, mfcc_py, rtol=0, atol=1E-9))
+        except ImportError as e:
+            pass
+
+    def test_compute_mfcc_frames_buffer_after_frame(self):
+        try:
+            import aeneas.cmfcc
+            parameters = [16000, 25, 40, 13, 512, 133.3333, 6855.4976, 0.97, 0.0256]
+            with self.assertRaises(ValueError):
+                aeneas.cmfcc.cmfcc_compute_mfcc_frames(numpy.zeros(1000), 7000, 10, 1, 0.0, *parameters)
+        except ImportError as e:
+            pass
+
+    def test_cache(self):
+        try:
+            import aeneas.cmfcc
+            parameters = [16000, 25, 40, 13, 512, 133.3333, 6855.4976, 0.97, 0.0256]
+            data = numpy.random.RandomState(0).uniform(-1.0, 1.0, 16000)
+            aeneas.cmfcc.cmfcc_cache_clear()
+            self.assertEqual(aeneas.cmfcc.cmfcc_cache_info(), (0, 0, 0))
+            mfcc1 = aeneas.cmfcc.cmfcc_compute_mfcc(data, *parameters)
+            self.assertEqual(aeneas.cmfcc.cmfcc_cache_info(), (0, 1, 1))
+            mfcc2 = aeneas.cmfcc.cmfcc_compute_mfcc(data, *parameters)
+            self.assertEqual(aeneas.cmfcc.cmfcc_cache_info(), (1, 1, 1))
+            self.assertTrue(numpy.array_equal(mfcc1, mfcc2))
+            parameters[0] = 22050
+            aeneas.cmfcc.cmfcc_compute_mfcc(data, *parameters)
+            self.assertEqual(aeneas.cmfcc.cmfcc_cache_info(), (1, 2, 2))
+        except ImportError as e:
+            pass
+
+    def test_cache_bounded(self):
+        try:
+            import aeneas.cmfcc
+            data = numpy.random.RandomState(0).uniform(-1.0, 1.0, 16000)
+            aeneas.cmfcc.cmfcc_cache_clear()
+            for sample_rate in range(16000, 16100):
+                aeneas.cmfcc.cmfcc_compute_mfcc(data, sample_rate, 25, 40, 13, 512, 133.3333, 6855.4976, 0.97, 0.0256)
+            hits, misses, size = aeneas.cmfcc.cmfcc_cache_info()
+            self.assertEqual(misses, 100)
+            self.assertTrue(size < 100)
+        except ImportError as e:
+            pass
+
 if __name__ == '__main__':
     unittest.main()
 
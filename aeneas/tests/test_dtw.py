@@ -0,0 +1,464 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import unittest
+
+from . import get_abs_path
+
+import aeneas.globalconstants as gc
+from aeneas.dtw import DTWAlgorithm, DTWAligner, DTWCentering, DTWExact, DTWMultiResolution, DTWOnline, DTWSegmentedAligner, DTWStripe, DTWSubsequence
+from aeneas.logger import Logger
+from aeneas.mfccfeatures import MFCCFeatures
+from aeneas.precision import Precision
+
+class TestDTW(unittest.TestCase):
+
+    MFCC1 = get_abs_path("res/cdtw/mfcc1_53")
+    MFCC2 = get_abs_path("res/cdtw/mfcc2_53")
+
+    def load(self, n=None, m=None):
+        mfcc1 = numpy.loadtxt(self.MFCC1)
+        mfcc2 = numpy.loadtxt(self.MFCC2)
+        if n is not None:
+            mfcc1 = mfcc1[:, :n]
+        if m is not None:
+            mfcc2 = mfcc2[:, :m]
+        return (mfcc1, mfcc2)
+
+    def compute_aligner(self, algorithm, mfcc1, mfcc2, c_extension=True, margin=gc.ALIGNER_MARGIN, precision=None):
+        use_c_extensions = gc.USE_C_EXTENSIONS
+        gc.USE_C_EXTENSIONS = c_extension
+        try:
+            aligner = DTWAligner(None, None, margin=margin, algorithm=algorithm, precision=precision)
+            aligner.real_wave_full_mfcc = mfcc1
+            aligner.synt_wave_full_mfcc = mfcc2
+            aligner.compute_path()
+        finally:
+            gc.USE_C_EXTENSIONS = use_c_extensions
+        return aligner
+
+    def compute_path(self, algorithm, mfcc1, mfcc2, c_extension=True, margin=gc.ALIGNER_MARGIN):
+        aligner = self.compute_aligner(algorithm, mfcc1, mfcc2, c_extension, margin)
+        return aligner.computed_path
+
+    def load_with_pause(self, real_pause=50, synt_pause=30):
+        # add an energy row to the MFCCs, and insert a pause
+        # (low energy, constant coefficients) in both waves,
+        # at positions aligned by the stripe algorithm
+        mfcc1, mfcc2 = self.load()
+        path = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2)
+        i = mfcc1.shape[1] / 2
+        j = path[path[:, 0] == i][0, 1]
+
+        def insert_pause(mfcc, index, length):
+            l, n = mfcc.shape
+            energy = numpy.ones((1, n)) * 5.0
+            pause = numpy.zeros((l + 1, length))
+            pause[1:, :] = 1.0
+            with_energy = numpy.vstack([energy, mfcc])
+            return numpy.hstack([with_energy[:, :index], pause, with_energy[:, index:]])
+
+        mfcc1 = insert_pause(mfcc1, i, real_pause)
+        mfcc2 = insert_pause(mfcc2, j, synt_pause)
+        return (mfcc1, mfcc2, (i + real_pause / 2, j + synt_pause / 2))
+
+    def load_with_intro(self):
+        # add an energy row to the MFCCs, a long silent intro
+        # and a long pause to the real wave,
+        # and short leading and trailing pauses to the synt wave
+        mfcc1, mfcc2 = self.load()
+        l = mfcc1.shape[0] + 1
+
+        def with_energy(mfcc):
+            return numpy.vstack([numpy.ones((1, mfcc.shape[1])) * 5.0, mfcc])
+
+        def pause(length):
+            pause = numpy.ones((l, length))
+            pause[0, :] = 0.0
+            return pause
+
+        mfcc1 = numpy.hstack([pause(1000), with_energy(mfcc1[:, :500]), pause(200), with_energy(mfcc1[:, 500:])])
+        mfcc2 = numpy.hstack([pause(10), with_energy(mfcc2), pause(10)])
+        return (mfcc1, mfcc2)
+
+    def compute_centered_path(self, algorithm, mfcc1, mfcc2, margin, centering):
+        aligner = DTWAligner(None, None, algorithm=algorithm, margin=margin, adaptive_margin=margin, centering=centering)
+        aligner.real_wave_full_mfcc = mfcc1
+        aligner.synt_wave_full_mfcc = mfcc2
+        aligner.compute_path()
+        return aligner.computed_path
+
+    def compute_segmented_aligner(self, mfcc1, mfcc2, workers=1, min_segment_length=10):
+        aligner = DTWSegmentedAligner(None, None, workers=workers, min_segment_length=min_segment_length)
+        aligner.real_wave_full_mfcc = mfcc1
+        aligner.synt_wave_full_mfcc = mfcc2
+        aligner.compute_path()
+        return aligner
+
+    def compute_online_path(self, mfcc1, mfcc2, block, margin=gc.ALIGNER_ONLINE_MARGIN, max_latency=gc.ALIGNER_ONLINE_MAX_LATENCY):
+        online = DTWOnline(mfcc2, margin=margin, max_latency=max_latency)
+        computed_map = []
+        pending = []
+        for start in range(0, mfcc1.shape[1], block):
+            computed_map.append(online.feed(mfcc1[:, start:(start + block)]))
+            pending.append(online.pending_frames)
+        computed_map.append(online.finalize())
+        path = numpy.rint(numpy.vstack(computed_map) * gc.MFCC_FRAME_RATE).astype(int)
+        return (path, max(pending))
+
+    def compute_boundaries(self, algorithm, mfcc1, mfcc2, c_extension, precision):
+        # map an anchor every 2 seconds of the synt wave to the real wave,
+        # as done by ExecuteTask when computing the sync map
+        aligner = self.compute_aligner(algorithm, mfcc1, mfcc2, c_extension, precision=precision)
+        computed_map = aligner.computed_map
+        anchors = numpy.arange(0, computed_map[-1, 1], 2.0)
+        indices = numpy.searchsorted(computed_map[:, 1], anchors)
+        return computed_map[indices, 0]
+
+    def test_computed_path_and_map(self):
+        mfcc1, mfcc2 = self.load(300, 200)
+        for algorithm in DTWAlgorithm.ALLOWED_VALUES:
+            for c_extension in [True, False]:
+                aligner = self.compute_aligner(algorithm, mfcc1, mfcc2, c_extension, margin=2)
+                path = aligner.computed_path
+                self.assertEqual(path.dtype, numpy.int32)
+                self.assertEqual(path.shape[1], 2)
+                self.assertEqual(tuple(path[0]), (0, 0))
+                self.assertEqual(tuple(path[-1]), (299, 199))
+                computed_map = aligner.computed_map
+                self.assertEqual(computed_map.shape, path.shape)
+                self.assertEqual(computed_map[-1, 0], 299.0 / gc.MFCC_FRAME_RATE)
+                self.assertEqual(computed_map[-1, 1], 199.0 / gc.MFCC_FRAME_RATE)
+
+    def test_sanitize_centers(self):
+        stripe = DTWStripe(None, None, 10, Logger())
+        n, m, delta = 50, 200, 10
+        desired = [[0] * n, [190] * n, range(n, 0, -1), [(4 * i) % 70 for i in range(n)]]
+        for centers in desired:
+            centers = stripe._sanitize_centers(centers, n, m, delta)
+            self.assertEqual(len(centers), n)
+            self.assertEqual(centers[-1], m - delta)
+            self.assertTrue(numpy.all(centers >= 0))
+            self.assertTrue(numpy.all(centers + delta <= m))
+            self.assertTrue(numpy.all(numpy.diff(centers) >= 0))
+            self.assertTrue(numpy.all(numpy.diff(centers) <= delta - 1))
+
+    def test_compute_path_stripe_diagonal_centers(self):
+        mfcc1, mfcc2 = self.load(200, 150)
+        n, m, delta = 200, 150, 40
+        stripe = DTWStripe(mfcc1, mfcc2, delta, Logger())
+        centers = stripe._compute_centers(n, m, delta)
+        for c_extension in [True, False]:
+            use_c_extensions = gc.USE_C_EXTENSIONS
+            gc.USE_C_EXTENSIONS = c_extension
+            try:
+                expected = DTWStripe(mfcc1, mfcc2, delta, Logger()).compute_path()
+                computed = DTWStripe(mfcc1, mfcc2, delta, Logger(), centers=centers).compute_path()
+            finally:
+                gc.USE_C_EXTENSIONS = use_c_extensions
+            self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_path_stripe_pure_python(self):
+        mfcc1, mfcc2 = self.load()
+        for delta in [100, 3000]:
+            margin = delta / (2 * gc.MFCC_FRAME_RATE)
+            expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2, margin=margin)
+            computed = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2, c_extension=False, margin=margin)
+            self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_acm_stripe_pure_python(self):
+        mfcc1, mfcc2 = self.load(400, 300)
+        use_c_extensions = gc.USE_C_EXTENSIONS
+        try:
+            gc.USE_C_EXTENSIONS = True
+            expected = DTWStripe(mfcc1, mfcc2, 100, Logger()).compute_accumulated_cost_matrix()
+            gc.USE_C_EXTENSIONS = False
+            computed = DTWStripe(mfcc1, mfcc2, 100, Logger()).compute_accumulated_cost_matrix()
+        finally:
+            gc.USE_C_EXTENSIONS = use_c_extensions
+        self.assertTrue(numpy.allclose(computed, expected, rtol=1e-12, atol=0))
+
+    def test_compute_path_multiresolution(self):
+        mfcc1, mfcc2 = self.load()
+        expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2)
+        computed = self.compute_path(DTWAlgorithm.MULTIRESOLUTION, mfcc1, mfcc2)
+        self.assertEqual(tuple(computed[0]), (0, 0))
+        self.assertEqual(tuple(computed[-1]), (mfcc1.shape[1] - 1, mfcc2.shape[1] - 1))
+        self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_path_multiresolution_pure_python(self):
+        mfcc1, mfcc2 = self.load(300, 200)
+        expected = self.compute_path(DTWAlgorithm.MULTIRESOLUTION, mfcc1, mfcc2)
+        computed = self.compute_path(DTWAlgorithm.MULTIRESOLUTION, mfcc1, mfcc2, c_extension=False)
+        self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_acm_multiresolution(self):
+        mfcc1, mfcc2 = self.load()
+        expected = self.compute_aligner(DTWAlgorithm.STRIPE, mfcc1, mfcc2).compute_accumulated_cost_matrix()
+        computed = self.compute_aligner(DTWAlgorithm.MULTIRESOLUTION, mfcc1, mfcc2).compute_accumulated_cost_matrix()
+        self.assertEqual(computed.shape[0], mfcc1.shape[1])
+        self.assertLess(computed.shape[1], expected.shape[1])
+        # both stripes contain the best path, ending in their last column
+        self.assertAlmostEqual(computed[-1, -1], expected[-1, -1])
+
+    def test_multiresolution_falls_back_to_stripe(self):
+        # the corridor of the finer levels is wider than the (narrow) stripe
+        mfcc1, mfcc2 = self.load()
+        mr = DTWMultiResolution(mfcc1, mfcc2, 64, 25, Logger(), factor=8)
+        stripe = DTWStripe(mfcc1, mfcc2, 64, Logger())
+        self.assertTrue(numpy.array_equal(mr.compute_path(), stripe.compute_path()))
+        self.assertTrue(numpy.array_equal(mr.compute_accumulated_cost_matrix(), stripe.compute_accumulated_cost_matrix()))
+
+    def test_multiresolution_corridor_not_wider_than_stripe(self):
+        mfcc1, mfcc2 = self.load()
+        for delta in [64, 100, 200, 3000]:
+            mr = DTWMultiResolution(mfcc1, mfcc2, delta, 25, Logger(), factor=8)
+            self.assertLessEqual(mr._compute_finest_stripe().delta, delta)
+
+    def test_compute_path_adaptive(self):
+        mfcc1, mfcc2 = self.load()
+        expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2)
+        computed = self.compute_path(DTWAlgorithm.ADAPTIVE, mfcc1, mfcc2)
+        self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_path_adaptive_widened(self):
+        # the reader skipped 28 seconds of text:
+        # the path leaves the initial stripe
+        mfcc1, mfcc2 = self.load()
+        mfcc1 = numpy.hstack([mfcc1[:, :300], mfcc1[:, 1000:]])
+        narrow = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2, margin=gc.ALIGNER_ADAPTIVE_MARGIN)
+        expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2)
+        self.assertFalse(numpy.array_equal(narrow, expected))
+        for c_extension in [True, False]:
+            computed = self.compute_path(DTWAlgorithm.ADAPTIVE, mfcc1, mfcc2, c_extension=c_extension)
+            self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_acm_adaptive(self):
+        mfcc1, mfcc2 = self.load(300, 200)
+        aligner = DTWAligner(None, None, algorithm=DTWAlgorithm.ADAPTIVE)
+        aligner.real_wave_full_mfcc = mfcc1
+        aligner.synt_wave_full_mfcc = mfcc2
+        with self.assertRaises(ValueError):
+            aligner.compute_accumulated_cost_matrix()
+
+    def test_speech_prior(self):
+        mfcc1, mfcc2 = self.load_with_intro()
+        prior = DTWAligner(None, None)._compute_speech_prior(
+            MFCCFeatures.from_mfcc(mfcc1),
+            MFCCFeatures.from_mfcc(mfcc2)
+        )
+        self.assertEqual(len(prior), mfcc1.shape[1])
+        self.assertTrue(numpy.all(numpy.diff(prior) >= 0))
+        self.assertTrue(numpy.all(prior[:1000] <= 10))
+        self.assertTrue(numpy.all(prior[1500:1700] == prior[1500]))
+        self.assertEqual(prior[-1], mfcc2.shape[1] - 11)
+
+    def test_speech_prior_no_speech(self):
+        features = MFCCFeatures(numpy.ones((100, 13)))
+        self.assertIsNone(DTWAligner(None, None)._compute_speech_prior(features, features))
+
+    def test_compute_path_speech_centering(self):
+        mfcc1, mfcc2 = self.load_with_intro()
+        expected = self.compute_centered_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2, gc.ALIGNER_MARGIN, DTWCentering.DIAGONAL)
+        diagonal = self.compute_centered_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2, 3, DTWCentering.DIAGONAL)
+        self.assertFalse(numpy.array_equal(diagonal, expected))
+        for algorithm in [DTWAlgorithm.STRIPE, DTWAlgorithm.ADAPTIVE]:
+            computed = self.compute_centered_path(algorithm, mfcc1, mfcc2, 3, DTWCentering.SPEECH)
+            self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_path_features(self):
+        mfcc1, mfcc2 = self.load()
+        for algorithm in DTWAlgorithm.ALLOWED_VALUES:
+            for c_extension in [True, False]:
+                expected = self.compute_path(algorithm, mfcc1, mfcc2, c_extension)
+                computed = self.compute_path(
+                    algorithm,
+                    MFCCFeatures.from_mfcc(mfcc1),
+                    MFCCFeatures.from_mfcc(mfcc2),
+                    c_extension
+                )
+                self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_compute_path_stripe_c_extension(self):
+        mfcc1, mfcc2 = self.load()
+        logger = Logger()
+        path = DTWStripe(mfcc1, mfcc2, 3000, logger)._compute_path_c_extension()
+        expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2, c_extension=False)
+        self.assertTrue(numpy.array_equal(path, expected))
+
+    def test_compute_acm_stripe_float32(self):
+        mfcc1, mfcc2 = self.load(400, 300)
+        mfcc1 = mfcc1.astype(numpy.float32)
+        mfcc2 = mfcc2.astype(numpy.float32)
+        use_c_extensions = gc.USE_C_EXTENSIONS
+        try:
+            gc.USE_C_EXTENSIONS = False
+            acm = DTWStripe(mfcc1, mfcc2, 100, Logger()).compute_accumulated_cost_matrix()
+        finally:
+            gc.USE_C_EXTENSIONS = use_c_extensions
+        self.assertEqual(acm.dtype, numpy.float32)
+        self.assertEqual(acm.shape, (400, 100))
+
+    def test_compute_boundaries_float32(self):
+        mfcc1, mfcc2 = self.load()
+        for algorithm in DTWAlgorithm.ALLOWED_VALUES:
+            for c_extension in [True, False]:
+                expected = self.compute_boundaries(algorithm, mfcc1, mfcc2, c_extension, Precision.FLOAT64)
+                computed = self.compute_boundaries(algorithm, mfcc1, mfcc2, c_extension, Precision.FLOAT32)
+                self.assertEqual(len(computed), len(expected))
+                self.assertLessEqual(numpy.max(numpy.abs(computed - expected)), 1.0 / gc.MFCC_FRAME_RATE)
+
+    def test_segmented_anchors(self):
+        mfcc1, mfcc2, anchor = self.load_with_pause()
+        aligner = DTWSegmentedAligner(None, None, min_segment_length=10)
+        aligner.real_wave_full_mfcc = mfcc1
+        aligner.synt_wave_full_mfcc = mfcc2
+        aligner.compute_anchors()
+        self.assertEqual(aligner.anchors, [anchor])
+
+    def test_segmented_anchors_short_pause(self):
+        mfcc1, mfcc2, anchor = self.load_with_pause(synt_pause=10)
+        aligner = DTWSegmentedAligner(None, None, min_segment_length=10)
+        aligner.real_wave_full_mfcc = mfcc1
+        aligner.synt_wave_full_mfcc = mfcc2
+        aligner.compute_anchors()
+        self.assertEqual(aligner.anchors, [])
+
+    def test_segmented_compute_path(self):
+        mfcc1, mfcc2, anchor = self.load_with_pause()
+        n, m = mfcc1.shape[1], mfcc2.shape[1]
+        expected = None
+        for workers in [1, 2]:
+            path = self.compute_segmented_aligner(mfcc1, mfcc2, workers=workers).computed_path
+            self.assertEqual(path.dtype, numpy.int32)
+            self.assertEqual(tuple(path[0]), (0, 0))
+            self.assertEqual(tuple(path[-1]), (n - 1, m - 1))
+            self.assertTrue(anchor in set([tuple(pair) for pair in path]))
+            steps = set([tuple(step) for step in numpy.diff(path, axis=0)])
+            self.assertTrue(steps <= set([(0, 1), (1, 0), (1, 1)]))
+            if expected is not None:
+                self.assertTrue(numpy.array_equal(path, expected))
+            expected = path
+
+    def test_segmented_compute_path_no_anchors(self):
+        mfcc1, mfcc2, anchor = self.load_with_pause()
+        expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2)
+        aligner = self.compute_segmented_aligner(mfcc1, mfcc2, workers=2, min_segment_length=gc.ALIGNER_SEGMENT_MIN_LENGTH)
+        self.assertEqual(aligner.anchors, [])
+        self.assertTrue(numpy.array_equal(aligner.computed_path, expected))
+
+    def test_online_compute_path(self):
+        mfcc1, mfcc2 = self.load()
+        expected = self.compute_path(DTWAlgorithm.STRIPE, mfcc1, mfcc2)
+        for block in [1, 25, 2000]:
+            path, pending = self.compute_online_path(mfcc1, mfcc2, block)
+            self.assertTrue(numpy.array_equal(path, expected))
+
+    def test_online_bounded_latency(self):
+        mfcc1, mfcc2 = self.load()
+        max_latency = 3
+        path, pending = self.compute_online_path(mfcc1, mfcc2, 25, margin=10, max_latency=max_latency)
+        self.assertLessEqual(pending, max_latency * gc.MFCC_FRAME_RATE + 1)
+        self.assertEqual(tuple(path[0]), (0, 0))
+        self.assertEqual(tuple(path[-1]), (mfcc1.shape[1] - 1, mfcc2.shape[1] - 1))
+        steps = set([tuple(step) for step in numpy.diff(path, axis=0)])
+        self.assertTrue(steps <= set([(0, 1), (1, 0), (1, 1)]))
+
+    def test_online_feed_after_finalize(self):
+        mfcc1, mfcc2 = self.load(100, 100)
+        online = DTWOnline(mfcc2)
+        online.feed(mfcc1)
+        online.finalize()
+        with self.assertRaises(ValueError):
+            online.feed(mfcc1)
+
+    def compute_subsequence_costs(self, query, audio, starts, min_length, max_length, c_extension=True):
+        use_c_extensions = gc.USE_C_EXTENSIONS
+        gc.USE_C_EXTENSIONS = c_extension
+        try:
+            dtw = DTWSubsequence(query, audio, starts, min_length, max_length, Logger())
+            return dtw.compute_costs()
+        finally:
+            gc.USE_C_EXTENSIONS = use_c_extensions
+
+    def test_subsequence_finds_query(self):
+        audio, ignored = self.load(400)
+        query = audio[:, 200:260]
+        starts = [0, 13, 90, 200, 250, 390]
+        values, lengths = self.compute_subsequence_costs(query, audio, starts, 30, 120)
+        self.assertEqual(len(values), len(starts))
+        self.assertEqual(numpy.argmin(values), 3)
+        self.assertAlmostEqual(values[3], 0.0)
+        self.assertEqual(lengths[3], 59)
+        # not enough audio left for a match
+        self.assertEqual(values[5], numpy.inf)
+        self.assertEqual(lengths[5], -1)
+
+    def test_subsequence_same_as_c_extension(self):
+        audio, query = self.load(400, 120)
+        query = query[:, 50:120]
+        starts = [90, 0, 13, 40, 41, 200, 200, 390]
+        expected_values, expected_lengths = self.compute_subsequence_costs(query, audio, starts, 50, 140, c_extension=False)
+        self.assertEqual(len(expected_values), 7)
+        values, lengths = self.compute_subsequence_costs(query, audio, starts, 50, 140)
+        self.assertTrue(numpy.allclose(values, expected_values))
+        self.assertTrue(numpy.array_equal(lengths, expected_lengths))
+
+    def compute_subsequence_costs_per_start(self, query, audio, starts, min_length, max_length):
+        # the full accumulated cost matrix of the query
+        # against the window of each start
+        values = []
+        lengths = []
+        for start in starts:
+            window = audio[:, start:(start + max_length)]
+            last_row = DTWExact(query, window, Logger()).compute_accumulated_cost_matrix()[-1, min_length:]
+            if len(last_row) == 0:
+                values.append(numpy.inf)
+                lengths.append(-1)
+            else:
+                values.append(numpy.min(last_row))
+                lengths.append(min_length + numpy.argmin(last_row))
+        return (numpy.array(values), numpy.array(lengths))
+
+    def test_subsequence_same_as_per_start(self):
+        # many starts close to the planted query,
+        # whose matches compete for the same audio frames
+        audio, ignored = self.load(400)
+        query = audio[:, 200:260]
+        starts = range(150, 240, 2) + [390]
+        expected_values, expected_lengths = self.compute_subsequence_costs_per_start(query, audio, starts, 40, 120)
+        for c_extension in [True, False]:
+            values, lengths = self.compute_subsequence_costs(query, audio, starts, 40, 120, c_extension)
+            self.assertTrue(numpy.allclose(values, expected_values, rtol=0, atol=1e-9))
+            self.assertTrue(numpy.array_equal(lengths, expected_lengths))
+        self.assertEqual(numpy.sum(lengths >= 0), len(starts) - 1)
+
+    def test_subsequence_end_costs_lower_bound(self):
+        audio, query = self.load(400, 120)
+        query = query[:, 50:120]
+        starts = [0, 13, 40, 41, 90, 200]
+        for c_extension in [True, False]:
+            use_c_extensions = gc.USE_C_EXTENSIONS
+            gc.USE_C_EXTENSIONS = c_extension
+            try:
+                dtw = DTWSubsequence(query, audio, starts, 50, 140, Logger())
+                end_costs = dtw.compute_end_costs()
+                values, lengths = dtw.compute_costs()
+            finally:
+                gc.USE_C_EXTENSIONS = use_c_extensions
+            self.assertEqual(len(end_costs), 400)
+            for start, value, length in zip(starts, values, lengths):
+                self.assertLessEqual(end_costs[start + length], value)
+            # no match ends after the last start plus max_length
+            self.assertTrue(numpy.all(numpy.isinf(end_costs[340:])))
+
+    def test_subsequence_no_starts(self):
+        audio, query = self.load(400, 100)
+        for c_extension in [True, False]:
+            values, lengths = self.compute_subsequence_costs(query, audio, [], 50, 140, c_extension)
+            self.assertEqual(len(values), 0)
+            self.assertEqual(len(lengths), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import unittest
+
+import aeneas.globalconstants as gc
+from aeneas.espeaklibrary import ESPEAKLibrary
+from aeneas.language import Language
+
+@unittest.skipUnless(ESPEAKLibrary.is_available(), "the espeak library is not available")
+class TestESPEAKLibrary(unittest.TestCase):
+
+    def synthesize(self, text, language, zero_length=False):
+        library = ESPEAKLibrary()
+        samples = library.synthesize(text, language)
+        self.assertEqual(samples.dtype.itemsize, 2)
+        if zero_length:
+            self.assertEqual(len(samples), 0)
+        else:
+            self.assertGreater(len(samples), 0)
+        self.assertGreater(library.sample_rate, 0)
+        return samples
+
+    def test_str_ascii(self):
+        self.synthesize("Word", Language.EN)
+
+    def test_str_unicode(self):
+        with self.assertRaises(UnicodeDecodeError):
+            self.synthesize("Ausführliche", Language.DE)
+
+    def test_unicode_ascii(self):
+        self.synthesize(u"Word", Language.EN)
+
+    def test_unicode_unicode(self):
+        self.synthesize(u"Ausführliche", Language.DE)
+
+    def test_invalid_language(self):
+        # "zzzz" is not a valid espeak voice
+        self.synthesize(u"Word", "zzzz", zero_length=True)
+
+    def test_same_samples(self):
+        samples = self.synthesize(u"Word", Language.EN)
+        self.assertEqual(samples.tostring(), self.synthesize(u"Word", Language.EN).tostring())
+
+class TestESPEAKLibraryNotAvailable(unittest.TestCase):
+
+    def test_is_available_invalid_path(self):
+        # force loading the library again, from a path that does not exist
+        library = ESPEAKLibrary._ESPEAKLibrary__library
+        espeak_library_path = gc.ESPEAK_LIBRARY_PATH
+        ESPEAKLibrary._ESPEAKLibrary__library = None
+        gc.ESPEAK_LIBRARY_PATH = "/this/path/does/not/exist/libespeak.so"
+        try:
+            self.assertFalse(ESPEAKLibrary.is_available())
+        finally:
+            ESPEAKLibrary._ESPEAKLibrary__library = library
+            gc.ESPEAK_LIBRARY_PATH = espeak_library_path
+
+if __name__ == '__main__':
+    unittest.main()
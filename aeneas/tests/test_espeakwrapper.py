@@ -6,6 +6,8 @@ import unittest
 
 from . import delete_file
 
+import aeneas.globalconstants as gc
+from aeneas.espeaklibrary import ESPEAKLibrary
 from aeneas.espeakwrapper import ESPEAKWrapper
 from aeneas.language import Language
 
@@ -53,6 +55,73 @@ class TestESPEAKWrapper(unittest.TestCase):
         #self.synthesize(u"Word", "en-gb", zero_length=True)
         self.synthesize(u"Word", "en-gb")
 
+    def synthesize_multiple(self, use_library, workers=1):
+        fragments = [
+            (u"Word", Language.EN),
+            (None, Language.EN),
+            (u"", Language.EN),
+            (u"Ausführliche", Language.DE),
+            (u"Word", "zzzz"),
+        ]
+        use_espeak_library = gc.USE_ESPEAK_LIBRARY
+        gc.USE_ESPEAK_LIBRARY = use_library
+        try:
+            result = list(ESPEAKWrapper().synthesize_multiple(fragments, workers=workers))
+        finally:
+            gc.USE_ESPEAK_LIBRARY = use_espeak_library
+        self.assertEqual(len(result), 5)
+        self.assertGreater(len(result[0][0]), 0)
+        self.assertEqual(len(result[1][0]), 0)
+        self.assertEqual(len(result[2][0]), 0)
+        self.assertGreater(len(result[3][0]), 0)
+        self.assertEqual(len(result[4][0]), 0)
+        return result
+
+    @unittest.skipUnless(ESPEAKLibrary.is_available(), "the espeak library is not available")
+    def test_synthesize_multiple(self):
+        self.synthesize_multiple(True)
+
+    @unittest.skipUnless(ESPEAKLibrary.is_available(), "the espeak library is not available")
+    def test_synthesize_multiple_library_same_as_executable(self):
+        expected = self.synthesize_multiple(False)
+        result = self.synthesize_multiple(True)
+        for (samples, sample_rate), (expected_samples, expected_sample_rate) in zip(result, expected):
+            self.assertEqual(sample_rate, expected_sample_rate)
+            self.assertEqual(len(samples), len(expected_samples))
+
+    def test_synthesize_multiple_without_library(self):
+        self.synthesize_multiple(False)
+
+    def test_synthesize_multiple_concurrently(self):
+        expected = self.synthesize_multiple(False)
+        result = self.synthesize_multiple(False, workers=4)
+        for (samples, sample_rate), (expected_samples, expected_sample_rate) in zip(result, expected):
+            self.assertEqual(sample_rate, expected_sample_rate)
+            self.assertEqual(samples.tostring(), expected_samples.tostring())
+
+    @unittest.skipUnless(ESPEAKLibrary.is_available(), "the espeak library is not available")
+    def test_synthesize_multiple_concurrently_with_library(self):
+        # the workers are ignored, the library synthesizes all the fragments
+        expected = self.synthesize_multiple(True)
+        result = self.synthesize_multiple(True, workers=4)
+        for (samples, sample_rate), (expected_samples, expected_sample_rate) in zip(result, expected):
+            self.assertEqual(sample_rate, expected_sample_rate)
+            self.assertEqual(samples.tostring(), expected_samples.tostring())
+
+    def test_synthesize_multiple_concurrently_stop(self):
+        fragments = [(u"Word", Language.EN)] * 100
+        synthesized = ESPEAKWrapper().synthesize_multiple(fragments, workers=2)
+        self.assertGreater(len(next(synthesized)[0]), 0)
+        synthesized.close()
+
+    def test_synthesize_multiple_same_duration(self):
+        text = u"Word"
+        handler, output_file_path = tempfile.mkstemp(suffix=".wav")
+        duration = ESPEAKWrapper().synthesize(text, Language.EN, output_file_path)
+        delete_file(handler, output_file_path)
+        samples, sample_rate = self.synthesize_multiple(False)[0]
+        self.assertAlmostEqual(len(samples) / float(sample_rate), duration)
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import unittest
+
+import aeneas.globalconstants as gc
+from aeneas.audiofile import AudioFile
+from aeneas.featurestore import FeatureStore
+from aeneas.mfccfeatures import MFCCFeatures
+
+class TestFeatureStore(unittest.TestCase):
+
+    def load(self):
+        # 200 frames (8 seconds), speech between frames 50 and 150
+        frames = numpy.ones((200, 13))
+        frames[:, 0] = 0.0
+        frames[50:150, 0] = 5.0
+        return FeatureStore(MFCCFeatures(frames), 8.0)
+
+    def test_features(self):
+        store = self.load()
+        self.assertEqual(len(store.features), 200)
+        self.assertEqual(store.precision, "float64")
+
+    def test_features_coefficient_major(self):
+        store = FeatureStore(numpy.ones((13, 200)), 8.0)
+        self.assertEqual(len(store.features), 200)
+
+    def test_speech(self):
+        store = self.load()
+        self.assertEqual(len(store.speech), 1)
+        self.assertEqual(len(store.nonspeech), 2)
+        self.assertAlmostEqual(store.speech[0][0], 2.0)
+        self.assertAlmostEqual(store.speech[0][1], 6.0)
+
+    def test_reversed_speech(self):
+        store = self.load()
+        self.assertEqual(len(store.reversed_speech), 1)
+        self.assertAlmostEqual(store.reversed_speech[0][0], 2.0)
+        self.assertAlmostEqual(store.reversed_speech[0][1], 6.0)
+
+    def test_reversed_features(self):
+        store = self.load()
+        reversed_features = store.reversed_features
+        self.assertEqual(len(reversed_features), 200)
+        self.assertTrue(reversed_features.frames.flags["C_CONTIGUOUS"])
+        self.assertTrue(numpy.array_equal(reversed_features.energy, store.features.energy[::-1]))
+        self.assertTrue(store.reversed_features is reversed_features)
+
+    def test_trimmed_features_not_trimmed(self):
+        store = self.load()
+        self.assertEqual(len(store.trimmed_features), 200)
+        self.assertEqual(store.trimmed_length, 8.0)
+
+    def test_trim(self):
+        store = self.load()
+        store.trim(1.0, 4.0)
+        trimmed = store.trimmed_features
+        self.assertEqual(len(trimmed), 100)
+        self.assertEqual(store.trimmed_length, 4.0)
+        self.assertTrue(numpy.may_share_memory(trimmed.frames, store.features.frames))
+        self.assertTrue(numpy.array_equal(trimmed.frames, store.features.frames[25:125]))
+
+    def test_trim_head_only(self):
+        store = self.load()
+        store.trim(2.0, None)
+        self.assertEqual(len(store.trimmed_features), 150)
+        self.assertEqual(store.trimmed_length, 6.0)
+
+    def test_trim_clamped(self):
+        store = self.load()
+        store.trim(-1.0, 100.0)
+        self.assertEqual(len(store.trimmed_features), 200)
+        self.assertEqual(store.trimmed_length, 8.0)
+
+    def test_trim_does_not_change_vad(self):
+        store = self.load()
+        store.trim(3.0, 1.0)
+        self.assertAlmostEqual(store.speech[0][0], 2.0)
+        self.assertEqual(len(store.features), 200)
+
+    def samples(self, seed):
+        # about 20 seconds of low noise, with loud noise bursts
+        # (speech) of random positions and lengths,
+        # and a length which is not a multiple of the frame length
+        random = numpy.random.RandomState(seed)
+        samples = random.normal(0, 30, 16000 * 20).astype(numpy.int16)
+        end = 0
+        while True:
+            begin = end + int(random.uniform(1.0, 2.0) * 16000)
+            end = begin + int(random.uniform(0.5, 1.5) * 16000)
+            if end > len(samples):
+                break
+            samples[begin:end] = random.normal(0, 5000, end - begin).astype(numpy.int16)
+        return samples[:len(samples) - random.randint(1, 640)]
+
+    def store(self, samples):
+        audiofile = AudioFile(None)
+        audiofile.load_samples(samples, 16000)
+        audiofile.extract_mfcc()
+        return FeatureStore(audiofile.audio_features, audiofile.audio_length)
+
+    def assertBoundariesShiftedAtMost(self, speech, expected, frames):
+        self.assertEqual(len(speech), len(expected))
+        shift = numpy.max(numpy.abs(numpy.array(speech) - numpy.array(expected)))
+        self.assertLessEqual(shift, float(frames) / gc.MFCC_FRAME_RATE + 1e-9)
+
+    def test_reversed_speech_shift(self):
+        # the reversed frames approximate the frames of the reversed samples
+        for seed in range(3):
+            samples = self.samples(seed)
+            expected = self.store(samples[::-1].copy()).speech
+            self.assertBoundariesShiftedAtMost(self.store(samples).reversed_speech, expected, 2)
+
+    def test_trimmed_features_speech_shift(self):
+        # the trimmed frames approximate the frames of the trimmed samples
+        for seed in range(3):
+            samples = self.samples(seed)
+            begin = 1.013 + 0.007 * seed
+            store = self.store(samples)
+            store.trim(begin, None)
+            trimmed = FeatureStore(store.trimmed_features, store.trimmed_length)
+            expected = self.store(samples[int(begin * 16000):].copy()).speech
+            self.assertBoundariesShiftedAtMost(trimmed.speech, expected, 2)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+
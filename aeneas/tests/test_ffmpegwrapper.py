@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import numpy
 import os
 import tempfile
 import unittest
@@ -61,6 +62,44 @@ class TestFFMPEGWrapper(unittest.TestCase):
         with self.assertRaises(OSError):
             self.convert(self.EMPTY_FILE_PATH)
 
+    def decode(self, input_file_path, sample_rate=22050, head_length=None, process_length=None):
+        converter = FFMPEGWrapper()
+        return converter.decode(
+            get_abs_path(input_file_path),
+            sample_rate=sample_rate,
+            head_length=head_length,
+            process_length=process_length
+        )
+
+    def test_decode(self):
+        for f in self.FILES:
+            samples = self.decode(f["path"])
+            self.assertEqual(samples.dtype, numpy.int16)
+            self.assertAlmostEqual(float(len(samples)) / 22050, 9.0, places=0)
+
+    def test_decode_sample_rate(self):
+        samples = self.decode("res/audioformats/p001.wav", sample_rate=16000)
+        self.assertAlmostEqual(float(len(samples)) / 16000, 9.0, places=0)
+
+    def test_decode_head_process_length(self):
+        samples = self.decode("res/audioformats/p001.wav", head_length=1.0, process_length=2.0)
+        self.assertEqual(len(samples), 2 * 22050)
+
+    def test_decode_blocks(self):
+        converter = FFMPEGWrapper()
+        path = get_abs_path("res/audioformats/p001.wav")
+        blocks = list(converter.decode_blocks(path))
+        self.assertTrue(len(blocks) > 1)
+        self.assertTrue(numpy.array_equal(numpy.concatenate(blocks), converter.decode(path)))
+
+    def test_decode_not_existing(self):
+        with self.assertRaises(OSError):
+            self.decode(self.NOT_EXISTING_PATH)
+
+    def test_decode_empty(self):
+        with self.assertRaises(OSError):
+            self.decode(self.EMPTY_FILE_PATH)
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import unittest
+
+from aeneas.mfcc import MFCC, TableCache, TABLES
+
+class TestMFCC(unittest.TestCase):
+
+    def test_tables_shared(self):
+        TABLES.clear()
+        mfcc1 = MFCC(samprate=16000, frate=25)
+        self.assertEqual(TABLES.misses, 4)
+        self.assertEqual(TABLES.hits, 0)
+        mfcc2 = MFCC(samprate=16000, frate=100)
+        self.assertEqual(TABLES.misses, 4)
+        self.assertEqual(TABLES.hits, 4)
+        self.assertTrue(mfcc1.filters is mfcc2.filters)
+        self.assertTrue(mfcc1.s2dct is mfcc2.s2dct)
+        self.assertTrue(mfcc1.win is mfcc2.win)
+
+    def test_tables_different_parameters(self):
+        TABLES.clear()
+        mfcc1 = MFCC(samprate=16000)
+        mfcc2 = MFCC(samprate=22050)
+        self.assertFalse(mfcc1.filters is mfcc2.filters)
+        self.assertFalse(mfcc1.win is mfcc2.win)
+        # the DCT matrices do not depend on the sample rate
+        self.assertTrue(mfcc1.s2dct is mfcc2.s2dct)
+        self.assertEqual(TABLES.misses, 6)
+
+    def test_tables_read_only(self):
+        mfcc = MFCC()
+        with self.assertRaises(ValueError):
+            mfcc.filters[0, 0] = 1.0
+
+    def test_table_cache_bounded(self):
+        cache = TableCache(size=2)
+        cache.get("a", numpy.zeros, 1)
+        cache.get("b", numpy.zeros, 2)
+        cache.get("a", numpy.zeros, 1)
+        cache.get("c", numpy.zeros, 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 3)
+        # "b" was the least recently used
+        cache.get("a", numpy.zeros, 1)
+        self.assertEqual(cache.hits, 2)
+        cache.get("b", numpy.zeros, 2)
+        self.assertEqual(cache.misses, 4)
+
+    def test_table_cache_clear(self):
+        cache = TableCache()
+        cache.get("a", numpy.zeros, 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 0)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import aeneas.globalconstants as gc
+from aeneas.audiofile import AudioFile
+from aeneas.mfcccache import MFCCCache
+from aeneas.mfccfeatures import MFCCFeatures
+
+class TestMFCCCache(unittest.TestCase):
+
+    PARAMETERS = MFCCCache.mfcc_parameters(16000, 25, "float64")
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache_path = gc.MFCC_CACHE_PATH
+
+    def tearDown(self):
+        gc.MFCC_CACHE_PATH = self.cache_path
+        shutil.rmtree(self.path)
+
+    def features(self, length=100):
+        return MFCCFeatures(numpy.random.RandomState(0).uniform(-1.0, 1.0, (length, 13)))
+
+    def samples(self, length=16000):
+        return numpy.random.RandomState(0).randint(-32768, 32767, length).astype(numpy.int16)
+
+    def test_disabled(self):
+        gc.MFCC_CACHE_PATH = None
+        cache = MFCCCache()
+        self.assertFalse(cache.enabled)
+        self.assertFalse(cache.put("key", self.features(), 4.0))
+        self.assertEqual(cache.get("key"), None)
+
+    def test_enabled_by_gc(self):
+        gc.MFCC_CACHE_PATH = self.path
+        self.assertTrue(MFCCCache().enabled)
+
+    def test_get_not_cached(self):
+        cache = MFCCCache(self.path)
+        self.assertEqual(cache.get("key"), None)
+
+    def test_put_get(self):
+        cache = MFCCCache(self.path)
+        features = self.features()
+        self.assertTrue(cache.put("key", features, 4.0))
+        cached_features, audio_length = cache.get("key")
+        self.assertTrue(numpy.array_equal(cached_features.frames, features.frames))
+        self.assertEqual(audio_length, 4.0)
+        self.assertFalse(cached_features.frames.flags["WRITEABLE"])
+
+    def test_put_creates_directory(self):
+        path = os.path.join(self.path, "sub", "dir")
+        cache = MFCCCache(path)
+        self.assertTrue(cache.put("key", self.features(), 4.0))
+        self.assertTrue(os.path.isfile(os.path.join(path, "key.npy")))
+
+    def test_put_no_temporary_files(self):
+        cache = MFCCCache(self.path)
+        cache.put("key", self.features(), 4.0)
+        cache.put("key", self.features(), 4.0)
+        self.assertEqual(sorted(os.listdir(self.path)), ["key.len", "key.npy"])
+
+    def test_get_incomplete_entry(self):
+        cache = MFCCCache(self.path)
+        cache.put("key", self.features(), 4.0)
+        os.remove(os.path.join(self.path, "key.len"))
+        self.assertEqual(cache.get("key"), None)
+
+    def test_evict_least_recently_used(self):
+        features = self.features()
+        cache = MFCCCache(self.path)
+        for key in ["a", "b", "c"]:
+            cache.put(key, features, 4.0)
+        # set distinct last use times, "b" being the least recently used
+        now = time.time()
+        for key, age in [("a", 20), ("b", 30), ("c", 10)]:
+            os.utime(os.path.join(self.path, key + ".npy"), (now - age, now - age))
+        entry_size = os.path.getsize(os.path.join(self.path, "a.npy")) + os.path.getsize(os.path.join(self.path, "a.len"))
+        cache.max_size = 3 * entry_size
+        cache.get("b")
+        cache.put("d", features, 4.0)
+        self.assertEqual(cache.get("a"), None)
+        self.assertNotEqual(cache.get("b"), None)
+        self.assertNotEqual(cache.get("c"), None)
+        self.assertNotEqual(cache.get("d"), None)
+
+    def test_evict_stale_temporary_files(self):
+        cache = MFCCCache(self.path)
+        now = time.time()
+        for name, age in [("stale.tmp", 2 * MFCCCache.TEMPORARY_MAX_AGE), ("recent.tmp", 10)]:
+            tmp_path = os.path.join(self.path, name)
+            with open(tmp_path, "wb") as tmp_file:
+                tmp_file.write(b"partial")
+            os.utime(tmp_path, (now - age, now - age))
+        cache.put("key", self.features(), 4.0)
+        self.assertEqual(sorted(os.listdir(self.path)), ["key.len", "key.npy", "recent.tmp"])
+
+    def test_file_key(self):
+        cache = MFCCCache(self.path)
+        handler, file_path = tempfile.mkstemp(dir=self.path)
+        os.write(handler, b"audio")
+        os.close(handler)
+        key = cache.file_key(file_path, self.PARAMETERS)
+        self.assertEqual(key, cache.file_key(file_path, self.PARAMETERS))
+        parameters = dict(self.PARAMETERS)
+        parameters["frame_rate"] = 100
+        self.assertNotEqual(key, cache.file_key(file_path, parameters))
+        with open(file_path, "wb") as audio_file:
+            audio_file.write(b"other audio")
+        self.assertNotEqual(key, cache.file_key(file_path, self.PARAMETERS))
+
+    def test_samples_key(self):
+        cache = MFCCCache(self.path)
+        samples = self.samples()
+        key = cache.samples_key(samples, self.PARAMETERS)
+        self.assertEqual(key, cache.samples_key(samples.copy(), self.PARAMETERS))
+        self.assertNotEqual(key, cache.samples_key(samples[1:], self.PARAMETERS))
+        self.assertNotEqual(key, cache.samples_key(samples.astype(numpy.float64), self.PARAMETERS))
+
+    def test_mfcc_parameters_default_precision(self):
+        self.assertEqual(
+            MFCCCache.mfcc_parameters(16000, 25, None),
+            MFCCCache.mfcc_parameters(16000, 25, gc.PRECISION)
+        )
+
+    def test_audiofile_extract_mfcc(self):
+        gc.MFCC_CACHE_PATH = self.path
+        audiofile = AudioFile(None)
+        audiofile.load_samples(self.samples(), 16000)
+        audiofile.extract_mfcc(use_cache=True)
+        expected = audiofile.audio_features.frames
+        self.assertEqual(len([f for f in os.listdir(self.path) if f.endswith(".npy")]), 1)
+        audiofile = AudioFile(None)
+        audiofile.load_samples(self.samples(), 16000)
+        audiofile.extract_mfcc(use_cache=True)
+        self.assertFalse(audiofile.audio_features.frames.flags["WRITEABLE"])
+        self.assertTrue(numpy.array_equal(audiofile.audio_features.frames, expected))
+
+    def test_audiofile_extract_mfcc_trimmed(self):
+        gc.MFCC_CACHE_PATH = self.path
+        audiofile = AudioFile(None)
+        audiofile.load_samples(self.samples(), 16000)
+        audiofile.extract_mfcc(use_cache=True)
+        audiofile.trim(0.5, None)
+        audiofile.extract_mfcc(use_cache=True)
+        self.assertEqual(len(audiofile.audio_features), 13)
+        self.assertEqual(len([f for f in os.listdir(self.path) if f.endswith(".npy")]), 2)
+
+    def test_audiofile_extract_mfcc_not_cached_by_default(self):
+        gc.MFCC_CACHE_PATH = self.path
+        audiofile = AudioFile(None)
+        audiofile.load_samples(self.samples(), 16000)
+        audiofile.extract_mfcc()
+        self.assertEqual(len(audiofile.audio_features), 26)
+        self.assertEqual(os.listdir(self.path), [])
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+
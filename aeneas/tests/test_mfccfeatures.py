@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import unittest
+
+from . import get_abs_path
+
+from aeneas.mfccfeatures import MFCCFeatures
+
+class TestMFCCFeatures(unittest.TestCase):
+
+    MFCC = get_abs_path("res/cdtw/mfcc1_53")
+
+    def load(self):
+        return numpy.loadtxt(self.MFCC)
+
+    def test_from_mfcc(self):
+        mfcc = self.load()
+        features = MFCCFeatures.from_mfcc(mfcc)
+        self.assertEqual(len(features), mfcc.shape[1])
+        self.assertEqual(features.number_of_coefficients, mfcc.shape[0])
+        self.assertTrue(features.frames.flags["C_CONTIGUOUS"])
+        self.assertTrue(numpy.array_equal(features.frames, mfcc.transpose()))
+        self.assertTrue(numpy.array_equal(features.mfcc, mfcc))
+
+    def test_from_mfcc_features(self):
+        features = MFCCFeatures.from_mfcc(self.load())
+        self.assertTrue(MFCCFeatures.from_mfcc(features) is features)
+
+    def test_frames_not_copied(self):
+        frames = numpy.ascontiguousarray(self.load().transpose())
+        features = MFCCFeatures(frames)
+        self.assertTrue(features.frames is frames)
+
+    def test_frames_not_2d(self):
+        with self.assertRaises(ValueError):
+            MFCCFeatures(numpy.zeros(10))
+
+    def test_energy(self):
+        mfcc = self.load()
+        features = MFCCFeatures.from_mfcc(mfcc)
+        self.assertTrue(features.energy.flags["C_CONTIGUOUS"])
+        self.assertTrue(numpy.array_equal(features.energy, mfcc[0]))
+
+    def test_normalized(self):
+        mfcc = self.load()
+        normalized = MFCCFeatures.from_mfcc(mfcc).normalized
+        self.assertEqual(normalized.shape, (mfcc.shape[1], mfcc.shape[0] - 1))
+        self.assertTrue(normalized.flags["C_CONTIGUOUS"])
+        self.assertTrue(numpy.allclose(numpy.sum(normalized ** 2, 1), 1.0))
+        expected = (mfcc[1:] / numpy.sqrt(numpy.sum(mfcc[1:] ** 2, 0))).transpose()
+        self.assertTrue(numpy.allclose(normalized, expected))
+
+    def test_normalized_cached(self):
+        features = MFCCFeatures.from_mfcc(self.load())
+        self.assertTrue(features.normalized is features.normalized)
+
+    def test_slice(self):
+        mfcc = self.load()
+        features = MFCCFeatures.from_mfcc(mfcc)
+        sliced = features[100:200]
+        self.assertEqual(len(sliced), 100)
+        self.assertTrue(numpy.may_share_memory(sliced.frames, features.frames))
+        self.assertTrue(numpy.array_equal(sliced.mfcc, mfcc[:, 100:200]))
+        self.assertTrue(numpy.allclose(sliced.normalized, features.normalized[100:200]))
+
+    def test_slice_shares_normalized(self):
+        features = MFCCFeatures.from_mfcc(self.load())
+        normalized = features.normalized
+        energy = features.energy
+        sliced = features[100:200]
+        self.assertTrue(numpy.may_share_memory(sliced.normalized, normalized))
+        self.assertTrue(numpy.may_share_memory(sliced.energy, energy))
+
+    def test_slice_step(self):
+        features = MFCCFeatures.from_mfcc(self.load())
+        with self.assertRaises(ValueError):
+            features[0:100:2]
+
+    def test_slice_index(self):
+        features = MFCCFeatures.from_mfcc(self.load())
+        with self.assertRaises(TypeError):
+            features[0]
+
+    def test_astype(self):
+        features = MFCCFeatures.from_mfcc(self.load())
+        self.assertTrue(features.astype(None) is features)
+        self.assertTrue(features.astype("float64") is features)
+        converted = features.astype("float32")
+        self.assertEqual(converted.dtype, numpy.float32)
+        self.assertEqual(converted.normalized.dtype, numpy.float32)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import unittest
+
+import aeneas.globalconstants as gc
+from aeneas.mfcc import MFCC
+from aeneas.mfccstream import MFCCStream
+
+class TestMFCCStream(unittest.TestCase):
+
+    SAMPLE_RATE = 16000
+
+    def setUp(self):
+        self.use_c_extensions = gc.USE_C_EXTENSIONS
+
+    def tearDown(self):
+        gc.USE_C_EXTENSIONS = self.use_c_extensions
+
+    def load(self, length=3.37):
+        rng = numpy.random.RandomState(0)
+        return rng.randint(-32768, 32767, int(length * self.SAMPLE_RATE)).astype(numpy.int16)
+
+    def blocks(self, samples, block_length):
+        return [samples[i:i+block_length] for i in range(0, len(samples), block_length)]
+
+    def extract(self, samples, block_length, frame_rate=25, precision="float64"):
+        stream = MFCCStream(self.SAMPLE_RATE, frame_rate=frame_rate, precision=precision)
+        return stream.extract(self.blocks(samples, block_length)).frames
+
+    def compute_mfcc_c_extension(self, signal, frame_rate=25):
+        import aeneas.cmfcc
+        return aeneas.cmfcc.cmfcc_compute_mfcc(
+            signal,
+            self.SAMPLE_RATE,
+            frame_rate,
+            40,
+            13,
+            512,
+            133.3333,
+            6855.4976,
+            0.97,
+            0.0256
+        )
+
+    def test_same_as_c_extension(self):
+        try:
+            import aeneas.cmfcc
+            gc.USE_C_EXTENSIONS = True
+            samples = self.load()
+            for frame_rate in [25, 100]:
+                expected = self.compute_mfcc_c_extension(samples / 32768.0, frame_rate)
+                for block_length in [1000, 4096, len(samples)]:
+                    computed = self.extract(samples, block_length, frame_rate=frame_rate)
+                    self.assertTrue(numpy.array_equal(computed, expected))
+        except ImportError:
+            pass
+
+    def test_same_as_c_extension_float32(self):
+        try:
+            import aeneas.cmfcc
+            gc.USE_C_EXTENSIONS = True
+            samples = self.load()
+            expected = self.compute_mfcc_c_extension(numpy.multiply(samples, 1.0 / 32768, dtype=numpy.float32))
+            computed = self.extract(samples, 4096, precision="float32")
+            self.assertEqual(computed.dtype, numpy.float32)
+            self.assertTrue(numpy.array_equal(computed, expected))
+        except ImportError:
+            pass
+
+    def test_same_as_pure_python(self):
+        gc.USE_C_EXTENSIONS = False
+        samples = self.load(length=1.37)
+        for frame_rate in [25, 100]:
+            expected = MFCC(samprate=self.SAMPLE_RATE, frate=frame_rate).sig2s2mfc(samples / 32768.0)
+            for block_length in [1000, len(samples)]:
+                computed = self.extract(samples, block_length, frame_rate=frame_rate)
+                self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_same_as_pure_python_several_batches(self):
+        gc.USE_C_EXTENSIONS = False
+        samples = self.load(length=22.37)
+        expected = MFCC(samprate=self.SAMPLE_RATE, frate=100).sig2s2mfc(samples / 32768.0)
+        self.assertTrue(len(expected) > 2 * MFCC.FRAMES_PER_BATCH)
+        computed = self.extract(samples, 4096, frame_rate=100)
+        self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_float_blocks(self):
+        samples = self.load()
+        expected = self.extract(samples, 4096)
+        stream = MFCCStream(self.SAMPLE_RATE)
+        computed = stream.extract(self.blocks(samples / 32768.0, 4096)).frames
+        self.assertTrue(numpy.array_equal(computed, expected))
+
+    def test_push(self):
+        samples = self.load()
+        stream = MFCCStream(self.SAMPLE_RATE)
+        stream.push(samples[0:16000])
+        # the 26th frame starts at sample 16000
+        self.assertEqual(stream.number_of_frames, 25)
+        self.assertEqual(stream.number_of_samples, 16000)
+        stream.push(samples[16000:])
+        features = stream.close()
+        self.assertEqual(stream.number_of_samples, len(samples))
+        self.assertEqual(len(features), int(len(samples) / 640.0 + 1))
+
+    def test_computed_frames(self):
+        samples = self.load()
+        expected = self.extract(samples, 4096)
+        stream = MFCCStream(self.SAMPLE_RATE, precision="float64")
+        computed = []
+        for block in self.blocks(samples, 4096):
+            first_frame = stream.number_of_frames
+            stream.push(block)
+            computed.append(stream.computed_frames(first_frame).frames)
+        first_frame = stream.number_of_frames
+        computed.append(stream.close()[first_frame:].frames)
+        self.assertTrue(numpy.array_equal(numpy.vstack(computed), expected))
+
+    def test_empty(self):
+        stream = MFCCStream(self.SAMPLE_RATE)
+        features = stream.extract([])
+        self.assertEqual(features.frames.shape, (1, 13))
+        self.assertEqual(stream.number_of_samples, 0)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+
@@ -6,6 +6,9 @@ import unittest
 
 from . import get_abs_path, delete_file
 
+import aeneas.globalconstants as gc
+from aeneas.audiofile import read_wav
+from aeneas.espeaklibrary import ESPEAKLibrary
 from aeneas.language import Language
 from aeneas.logger import Logger
 from aeneas.synthesizer import Synthesizer
@@ -13,19 +16,34 @@ from aeneas.textfile import TextFile, TextFileFormat
 
 class TestSynthesizer(unittest.TestCase):
     
-    def perform(self, path, logger=None, quit_after=None, backwards=False):
+    def perform(self, path, logger=None, quit_after=None, backwards=False, workers=None, use_library=False):
         handler, output_file_path = tempfile.mkstemp(suffix=".wav")
         tfl = TextFile(get_abs_path(path), TextFileFormat.PLAIN)
         tfl.set_language(Language.EN)
         synth = Synthesizer(logger=logger)
-        result = synth.synthesize(tfl, output_file_path, quit_after=quit_after, backwards=backwards)
-        delete_file(handler, output_file_path)
+        use_espeak_library = gc.USE_ESPEAK_LIBRARY
+        gc.USE_ESPEAK_LIBRARY = use_library
+        try:
+            result = synth.synthesize(tfl, output_file_path, quit_after=quit_after, backwards=backwards, workers=workers)
+        finally:
+            gc.USE_ESPEAK_LIBRARY = use_espeak_library
+            delete_file(handler, output_file_path)
         return result
 
     def test_synthesize(self):
         result = self.perform("res/inputtext/sonnet_plain.txt")
         self.assertEqual(len(result[0]), 15)
 
+    def test_synthesize_output_file(self):
+        handler, output_file_path = tempfile.mkstemp(suffix=".wav")
+        tfl = TextFile(get_abs_path("res/inputtext/sonnet_plain.txt"), TextFileFormat.PLAIN)
+        tfl.set_language(Language.EN)
+        result = Synthesizer().synthesize(tfl, output_file_path)
+        samples, sample_rate, encoding = read_wav(output_file_path)
+        self.assertAlmostEqual(float(len(samples)) / sample_rate, result[1], places=3)
+        del samples
+        delete_file(handler, output_file_path)
+
     def test_synthesize_logger(self):
         logger = Logger()
         result = self.perform("res/inputtext/sonnet_plain.txt", logger=logger)
@@ -49,6 +67,28 @@ class TestSynthesizer(unittest.TestCase):
         self.assertEqual(len(result[0]), 4)
         self.assertAlmostEqual(result[1], 10.0, places=1) # 10.049
 
+    def test_synthesize_workers(self):
+        expected = self.perform("res/inputtext/sonnet_plain.txt", workers=1)
+        result = self.perform("res/inputtext/sonnet_plain.txt", workers=4)
+        self.assertEqual(result, expected)
+
+    @unittest.skipUnless(ESPEAKLibrary.is_available(), "the espeak library is not available")
+    def test_synthesize_workers_with_library(self):
+        expected = self.perform("res/inputtext/sonnet_plain.txt", workers=1, use_library=True)
+        result = self.perform("res/inputtext/sonnet_plain.txt", workers=4, use_library=True)
+        self.assertEqual(result, expected)
+
+    def test_synthesize_workers_quit_after_backwards(self):
+        expected = self.perform("res/inputtext/sonnet_plain.txt", quit_after=10.0, backwards=True, workers=1)
+        result = self.perform("res/inputtext/sonnet_plain.txt", quit_after=10.0, backwards=True, workers=4)
+        self.assertEqual(result, expected)
+
+    @unittest.skipUnless(ESPEAKLibrary.is_available(), "the espeak library is not available")
+    def test_synthesize_library_same_as_executable(self):
+        expected = self.perform("res/inputtext/sonnet_plain.txt", use_library=False)
+        result = self.perform("res/inputtext/sonnet_plain.txt", use_library=True)
+        self.assertEqual(result, expected)
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -7,8 +7,10 @@ import unittest
 from . import get_abs_path, delete_file
 
 from aeneas.adjustboundaryalgorithm import AdjustBoundaryAlgorithm
+from aeneas.dtw import DTWCentering
 from aeneas.idsortingalgorithm import IDSortingAlgorithm
 from aeneas.language import Language
+from aeneas.precision import Precision
 from aeneas.syncmap import SyncMap, SyncMapFormat, SyncMapFragment, SyncMapHeadTailFormat
 from aeneas.task import Task, TaskConfiguration
 from aeneas.textfile import TextFileFormat, TextFragment
@@ -211,6 +213,15 @@ class TestTask(unittest.TestCase):
     def test_tc_adjust_boundary_rate_value(self):
         self.setter("adjust_boundary_rate_value", "22.5")
 
+    def test_tc_aligner_centering(self):
+        self.setter("aligner_centering", DTWCentering.SPEECH)
+
+    def test_tc_aligner_workers(self):
+        self.setter("aligner_workers", "4")
+
+    def test_tc_precision(self):
+        self.setter("precision", Precision.FLOAT32)
+
     def test_tc_is_audio_file_detect_head_min(self):
         self.setter("is_audio_file_detect_head_min", "1.000")
 
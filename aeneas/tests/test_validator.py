@@ -235,6 +235,18 @@ class TestValidator(unittest.TestCase):
     def test_check_tc_valid_head_tail_format(self):
         self.tc("task_language=it|is_text_type=plain|os_task_file_name=output.txt|os_task_file_format=txt|os_task_file_head_tail_format=add", True)
 
+    def test_check_tc_invalid_value_06(self):
+        self.tc("task_language=it|is_text_type=plain|os_task_file_name=output.txt|os_task_file_format=txt|task_precision=float16", False)
+
+    def test_check_tc_invalid_value_07(self):
+        self.tc("task_language=it|is_text_type=plain|os_task_file_name=output.txt|os_task_file_format=txt|task_aligner_centering=foo", False)
+
+    def test_check_tc_valid_aligner_centering(self):
+        self.tc("task_language=it|is_text_type=plain|os_task_file_name=output.txt|os_task_file_format=txt|task_aligner_centering=speech", True)
+
+    def test_check_tc_valid_precision(self):
+        self.tc("task_language=it|is_text_type=plain|os_task_file_name=output.txt|os_task_file_format=txt|task_precision=float32", True)
+
     def test_check_container_txt_valid(self):
         self.container("res/validator/job_txt_config", True)
 
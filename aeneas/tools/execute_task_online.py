@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+"""
+Align a text file to a (mono, 16 bit) wav audio stream
+read from the standard input, while it is still being
+recorded or streamed, writing each fragment of the sync map
+to the output file as soon as it is final.
+"""
+
+import numpy
+import os
+import sys
+import tempfile
+import wave
+
+import aeneas.globalfunctions as gf
+from aeneas.audiofile import AudioFile
+from aeneas.dtw import DTWOnline
+from aeneas.logger import Logger
+from aeneas.mfccstream import MFCCStream
+from aeneas.synthesizer import Synthesizer
+from aeneas.task import Task
+from aeneas.tools import get_rel_path
+
+__author__ = "Alberto Pettarin"
+__copyright__ = """
+    Copyright 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+    Copyright 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+    Copyright 2015,      Alberto Pettarin (www.albertopettarin.it)
+    """
+__license__ = "GNU AGPL 3"
+__version__ = "1.2.0"
+__email__ = "aeneas@readbeyond.it"
+__status__ = "Production"
+
+BLOCK_LENGTH = 1.0
+""" Length, in seconds, of the blocks of audio read from the standard input """
+
+def usage():
+    """ Print usage message """
+    name = "aeneas.tools.execute_task_online"
+    dir_path = get_rel_path("../tests/res/example_jobs/example1/OEBPS/Resources")
+    config_string = "task_language=en|is_text_type=parsed"
+    print ""
+    print "Usage:"
+    print "  $ cat path/to/audio.wav | python -m %s path/to/text.txt config_string /path/to/output.tsv [-v]" % name
+    print ""
+    print "The audio stream must be a mono, 16 bit wav file."
+    print "Each fragment is appended to the output file, in TSV format, as soon as it is final."
+    print ""
+    print "Example:"
+    print "  $ DIR=\"%s\"" % dir_path
+    print "  $ CONFIG_STRING=\"%s\"" % config_string
+    print "  $ ffmpeg -i $DIR/sonnet001.mp3 -ac 1 -ar 16000 -f wav - | python -m %s $DIR/sonnet001.txt \"$CONFIG_STRING\" /tmp/sonnet001.tsv" % name
+    print ""
+
+def cleanup(handler, path):
+    """ Remove temporary hadler/file """
+    if handler is not None:
+        try:
+            os.close(handler)
+        except:
+            pass
+    if path is not None:
+        try:
+            os.remove(path)
+        except:
+            pass
+
+def synthesize(text_file, logger):
+    """
+    Synthesize the given text file, and return a pair:
+
+    1. the list of anchors ``[start_time, fragment_id, fragment_text]``
+    2. the MFCCs of the synthesized wave
+    """
+    tmp_handler, tmp_file_path = tempfile.mkstemp(
+        suffix=".wav",
+        dir=gf.custom_tmp_dir()
+    )
+    try:
+        synt = Synthesizer(logger=logger)
+        anchors = synt.synthesize(text_file, tmp_file_path)[0]
+        synt_wave = AudioFile(tmp_file_path, logger=logger)
+        synt_wave.extract_mfcc()
+        return (anchors, synt_wave.audio_features)
+    finally:
+        cleanup(tmp_handler, tmp_file_path)
+
+def read_mfcc_blocks(stream, logger):
+    """
+    Read the wav stream block by block,
+    yielding the MFCCs of the frames completed by each block.
+
+    The blocks are pushed to a single
+    :class:`aeneas.mfccstream.MFCCStream`,
+    so the MFCCs are identical to those
+    extracted from the whole audio file.
+    (Without the C extension, the frames
+    are computed in batches of ``MFCC.FRAMES_PER_BATCH`` frames.)
+    """
+    wav = wave.open(stream, "rb")
+    if (wav.getnchannels() != 1) or (wav.getsampwidth() != 2):
+        raise ValueError("The audio stream must be a mono, 16 bit wav file")
+    sample_rate = wav.getframerate()
+    block_length = int(BLOCK_LENGTH * sample_rate)
+    mfcc_stream = MFCCStream(sample_rate, logger=logger)
+    while True:
+        first_frame = mfcc_stream.number_of_frames
+        data = wav.readframes(block_length)
+        if len(data) == 0:
+            # last frames, zero-padded
+            yield mfcc_stream.close()[first_frame:]
+            return
+        mfcc_stream.push(numpy.fromstring(data, dtype="<i2"))
+        if mfcc_stream.number_of_frames > first_frame:
+            yield mfcc_stream.computed_frames(first_frame)
+
+class FragmentWriter(object):
+    """
+    Compute the begin time of each fragment in the real wave
+    from the final pairs of the path, as done by ExecuteTask,
+    that is, at the first pair whose synt time is the closest
+    to the begin time of the fragment in the synt wave,
+    and write each fragment as soon as the next one begins.
+    """
+
+    def __init__(self, anchors, output_file):
+        self.anchors = anchors
+        self.output_file = output_file
+        self.begins = []
+        self.previous = None
+        self.last_real_time = 0.0
+
+    def add(self, computed_map):
+        """ Process the given final pairs ``[real_time, synt_time]`` """
+        for real_time, synt_time in computed_map:
+            self.last_real_time = real_time
+            if (self.previous is not None) and (synt_time == self.previous[1]):
+                continue
+            while (len(self.begins) < len(self.anchors)) and (self.anchors[len(self.begins)][0] <= synt_time):
+                target = self.anchors[len(self.begins)][0]
+                if (self.previous is not None) and (target - self.previous[1] <= synt_time - target):
+                    self._begin(self.previous[0])
+                else:
+                    self._begin(real_time)
+            self.previous = (real_time, synt_time)
+
+    def close(self):
+        """ Write the remaining fragments, ending at the last real time """
+        while len(self.begins) < len(self.anchors):
+            # past the end of the path: the closest pair is the last one
+            if self.previous is not None:
+                self._begin(self.previous[0])
+            else:
+                self._begin(self.last_real_time)
+        self._write(len(self.begins) - 1, self.last_real_time)
+
+    def _begin(self, real_time):
+        """ Set the begin of the next fragment, writing the previous one """
+        self.begins.append(real_time)
+        if len(self.begins) > 1:
+            self._write(len(self.begins) - 2, real_time)
+
+    def _write(self, index, end):
+        """ Write the fragment with the given index """
+        if index < 0:
+            return
+        self.output_file.write("%s\t%s\t%s\n" % (
+            gf.time_to_ssmmm(self.begins[index]),
+            gf.time_to_ssmmm(end),
+            self.anchors[index][1]
+        ))
+        self.output_file.flush()
+
+def main():
+    """ Entry point """
+    if len(sys.argv) < 4:
+        usage()
+        return
+    text_file_path = sys.argv[1]
+    config_string = sys.argv[2]
+    output_file_path = sys.argv[3]
+    verbose = (sys.argv[-1] == "-v")
+
+    if not gf.can_run_c_extension():
+        print "[WARN] Unable to load Python C Extensions"
+        print "[WARN] Running the slower pure Python code"
+        print "[WARN] See the README file for directions to compile the Python C Extensions"
+
+    logger = Logger(tee=verbose)
+
+    print "[INFO] Reading text file..."
+    task = Task(config_string)
+    task.text_file_path_absolute = text_file_path
+    print "[INFO] Reading text file... done"
+
+    print "[INFO] Synthesizing text..."
+    anchors, synt_wave_mfcc = synthesize(task.text_file, logger)
+    print "[INFO] Synthesizing text... done"
+
+    print "[INFO] Aligning audio stream..."
+    aligner = DTWOnline(synt_wave_mfcc, logger=logger)
+    output_file = open(output_file_path, "w")
+    writer = FragmentWriter(anchors, output_file)
+    for real_wave_mfcc in read_mfcc_blocks(sys.stdin, logger):
+        writer.add(aligner.feed(real_wave_mfcc))
+    writer.add(aligner.finalize())
+    writer.close()
+    output_file.close()
+    print "[INFO] Aligning audio stream... done"
+
+    print "[INFO] Created file %s" % output_file_path
+
+if __name__ == '__main__':
+    main()
+
+
+
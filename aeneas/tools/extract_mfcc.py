@@ -50,7 +50,7 @@ def main():
 
     audiofile = AudioFile(file_path)
     audiofile.load_data()
-    audiofile.extract_mfcc()
+    audiofile.extract_mfcc(use_cache=True)
     audiofile.clear_data()
     numpy.savetxt(save_path, audiofile.audio_mfcc)
     print "[INFO] MFCCs saved to %s" % (save_path)
@@ -21,6 +21,7 @@ import os
 import aeneas.globalconstants as gc
 from aeneas.audiofile import AudioFile
 from aeneas.logger import Logger
+from aeneas.mfccfeatures import MFCCFeatures
 
 __author__ = "Alberto Pettarin"
 __copyright__ = """
@@ -103,7 +104,7 @@ class VAD(object):
             try:
                 wave = AudioFile(self.wave_path, logger=self.logger)
                 wave.extract_mfcc(self.frame_rate)
-                self.wave_mfcc = wave.audio_mfcc
+                self.wave_mfcc = wave.audio_features
                 self.wave_len = wave.audio_length
             except IOError as e:
                 self._log("IOError", Logger.CRITICAL)
@@ -166,7 +167,8 @@ class VAD(object):
 
     def _compute_vad(self):
         labels = []
-        energy_vector = self.wave_mfcc[0]
+        # the MFCCs set by the caller might be stored coefficient-major
+        energy_vector = MFCCFeatures.from_mfcc(self.wave_mfcc).energy
         energy_threshold = numpy.min(energy_vector) + self.energy_threshold
         current_time = 0
         time_step = 1.0 / self.frame_rate
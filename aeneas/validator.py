@@ -12,10 +12,12 @@ import aeneas.globalconstants as gc
 import aeneas.globalfunctions as gf
 from aeneas.analyzecontainer import AnalyzeContainer
 from aeneas.container import Container, ContainerFormat
+from aeneas.dtw import DTWCentering
 from aeneas.executetask import AdjustBoundaryAlgorithm
 from aeneas.hierarchytype import HierarchyType
 from aeneas.language import Language
 from aeneas.logger import Logger
+from aeneas.precision import Precision
 from aeneas.syncmap import SyncMapFormat, SyncMapHeadTailFormat
 from aeneas.textfile import TextFileFormat
 
@@ -248,6 +250,18 @@ class Validator(object):
             SyncMapHeadTailFormat.ALLOWED_VALUES,
             result
         )
+        self._check_allowed_value(
+            parameters,
+            gc.PPN_TASK_ALIGNER_CENTERING,
+            DTWCentering.ALLOWED_VALUES,
+            result
+        )
+        self._check_allowed_value(
+            parameters,
+            gc.PPN_TASK_PRECISION,
+            Precision.ALLOWED_VALUES,
+            result
+        )
 
         # check all parameters implied by other_parameter=value are present
         self._log("Checking all implied parameters are present")
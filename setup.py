@@ -4,6 +4,7 @@
 """
 Set aeneas package up
 """
+import os
 from numpy.distutils import misc_util
 from setuptools import setup, Extension
 
@@ -18,6 +19,11 @@ __version__ = "1.1.2"
 __email__ = "aeneas@readbeyond.it"
 __status__ = "Production"
 
+# on POSIX systems, cdtw computes the cost matrix with multiple threads
+CDTW_LIBRARIES = []
+if os.name != "nt":
+    CDTW_LIBRARIES = ["pthread"]
+
 setup(
     name="aeneas",
     packages=["aeneas", "aeneas.tests", "aeneas.tools"],
@@ -69,7 +75,7 @@ setup(
         "Topic :: Software Development :: Libraries :: Python Modules"
     ],
     ext_modules=[
-        Extension("aeneas.cdtw", ["aeneas/cdtw.c"]),
+        Extension("aeneas.cdtw", ["aeneas/cdtw.c"], libraries=CDTW_LIBRARIES),
         Extension("aeneas.cmfcc", ["aeneas/cmfcc.c"])
     ],
     include_dirs=misc_util.get_numpy_include_dirs()